@@ -12,6 +12,32 @@ namespace FoundationaLLM.AIModel.Validation
         /// <summary>
         /// Configures the validation rules for the <see cref="AIModel"/> model.
         /// </summary>
-        public AIModelBaseValidator() => Include(new ResourceBaseValidator());
+        public AIModelBaseValidator()
+        {
+            Include(new ResourceBaseValidator());
+
+            RuleFor(x => x.TokensPerMinute)
+                .GreaterThan(0)
+                .When(x => x.TokensPerMinute.HasValue)
+                .WithMessage("The tokens per minute rate limit must be greater than zero.");
+
+            RuleForEach(x => x.Deployments)
+                .ChildRules(deployment =>
+                {
+                    deployment.RuleFor(d => d.EndpointObjectId)
+                        .NotEmpty()
+                        .WithMessage("Each deployment must reference an API endpoint configuration.");
+                    deployment.RuleFor(d => d.DeploymentName)
+                        .NotEmpty()
+                        .WithMessage("Each deployment must have a deployment name.");
+                    deployment.RuleFor(d => d.Weight)
+                        .GreaterThan(0)
+                        .WithMessage("The weight of each deployment must be greater than zero.");
+                    deployment.RuleFor(d => d.TokensPerMinute)
+                        .GreaterThan(0)
+                        .When(d => d.TokensPerMinute.HasValue)
+                        .WithMessage("The tokens per minute rate limit of each deployment must be greater than zero.");
+                });
+        }
     }
 }
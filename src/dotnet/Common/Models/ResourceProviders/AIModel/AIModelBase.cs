@@ -37,6 +37,19 @@ namespace FoundationaLLM.Common.Models.ResourceProviders.AIModel
         [JsonPropertyName("deployment_name")]
         public string? DeploymentName { get; set; }
 
+        /// <summary>
+        /// The tokens-per-minute rate limit enforced by the client for the deployment of the AI model.
+        /// </summary>
+        [JsonPropertyName("tokens_per_minute")]
+        public int? TokensPerMinute { get; set; }
+
+        /// <summary>
+        /// Additional deployments of the AI model, possibly on other API endpoints, sharing the traffic
+        /// of the deployment referenced by <see cref="EndpointObjectId"/> and <see cref="DeploymentName"/>.
+        /// </summary>
+        [JsonPropertyName("deployments")]
+        public List<AIModelDeployment> Deployments { get; set; } = [];
+
         /// <summary>
         /// Dictionary with default values for the model parameters.
         /// <para>
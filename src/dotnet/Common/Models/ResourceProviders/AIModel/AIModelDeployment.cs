@@ -0,0 +1,35 @@
+﻿using FoundationaLLM.Common.Models.ResourceProviders.Configuration;
+using System.Text.Json.Serialization;
+
+namespace FoundationaLLM.Common.Models.ResourceProviders.AIModel
+{
+    /// <summary>
+    /// Provides the properties of an additional deployment of an AI model, sharing the traffic of the model.
+    /// </summary>
+    public class AIModelDeployment
+    {
+        /// <summary>
+        /// The object id of the <see cref="APIEndpointConfiguration"/> object providing the configuration for the API endpoint hosting the deployment.
+        /// </summary>
+        [JsonPropertyName("endpoint_object_id")]
+        public required string EndpointObjectId { get; set; }
+
+        /// <summary>
+        /// The name of the deployment.
+        /// </summary>
+        [JsonPropertyName("deployment_name")]
+        public required string DeploymentName { get; set; }
+
+        /// <summary>
+        /// The relative share of the traffic sent to the deployment when all the deployments have capacity.
+        /// </summary>
+        [JsonPropertyName("weight")]
+        public double Weight { get; set; } = 1.0;
+
+        /// <summary>
+        /// The tokens-per-minute rate limit enforced by the client for the deployment.
+        /// </summary>
+        [JsonPropertyName("tokens_per_minute")]
+        public int? TokensPerMinute { get; set; }
+    }
+}
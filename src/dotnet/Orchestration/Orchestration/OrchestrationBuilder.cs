@@ -276,6 +276,11 @@ namespace FoundationaLLM.Orchestration.Core.Orchestration
                             explodedObjectsManager.TryAdd(
                                 retrievedAIModel.EndpointObjectId!,
                                 retrievedAPIEndpointConfiguration);
+                            await AddAIModelDeploymentEndpoints(
+                                retrievedAIModel,
+                                explodedObjectsManager,
+                                configurationResourceProvider,
+                                currentUserIdentity);
                         }
 
                         break;                    
@@ -410,6 +415,12 @@ namespace FoundationaLLM.Orchestration.Core.Orchestration
                                     aiModelEndpoint);
                             }
 
+                            await AddAIModelDeploymentEndpoints(
+                                aiModel,
+                                explodedObjectsManager,
+                                configurationResourceProvider,
+                                currentUserIdentity);
+
                             break;
 
                         case ConfigurationResourceTypeNames.APIEndpointConfigurations:
@@ -641,6 +652,31 @@ namespace FoundationaLLM.Orchestration.Core.Orchestration
             return (agentBase, mainAIModel, mainAIModelAPIEndpointConfiguration, explodedObjectsManager, false);
         }
 
+        /// <summary>
+        /// Adds the API endpoint configurations of the additional deployments of an AI model to the exploded objects.
+        /// </summary>
+        private static async Task AddAIModelDeploymentEndpoints(
+            AIModelBase aiModel,
+            ExplodedObjectsManager explodedObjectsManager,
+            IResourceProviderService configurationResourceProvider,
+            UnifiedUserIdentity currentUserIdentity)
+        {
+            foreach (var deployment in aiModel.Deployments ?? [])
+            {
+                if (string.IsNullOrEmpty(deployment.EndpointObjectId)
+                    || explodedObjectsManager.HasKey(deployment.EndpointObjectId))
+                    continue;
+
+                var deploymentEndpoint = await configurationResourceProvider.GetResourceAsync<APIEndpointConfiguration>(
+                    deployment.EndpointObjectId,
+                    currentUserIdentity);
+
+                explodedObjectsManager.TryAdd(
+                    deployment.EndpointObjectId,
+                    deploymentEndpoint);
+            }
+        }
+
         private static async Task<string?> EnsureAgentCapabilities(
             string instanceId,
             AgentBase agent,
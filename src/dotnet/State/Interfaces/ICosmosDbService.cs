@@ -1,4 +1,5 @@
-﻿using System.Text.Json;
+﻿using System.Dynamic;
+using System.Text.Json;
 using FoundationaLLM.Common.Models.Orchestration;
 
 namespace FoundationaLLM.State.Interfaces
@@ -55,5 +56,17 @@ namespace FoundationaLLM.State.Interfaces
         /// <param name="cancellationToken"></param>
         /// <returns></returns>
         Task<object?> UpsertLongRunningOperationResult(dynamic operationResult, CancellationToken cancellationToken = default);
+
+        /// <summary>
+        /// Replaces the result of a long-running operation, provided it was not changed since it was read.
+        /// </summary>
+        /// <param name="operationId">The long-running operation identifier.</param>
+        /// <param name="id">The identifier of the operation result document.</param>
+        /// <param name="operationResult">The updated operation result.</param>
+        /// <param name="eTag">The ETag of the operation result when it was read.</param>
+        /// <param name="cancellationToken"></param>
+        /// <returns></returns>
+        /// <exception cref="FoundationaLLM.State.Exceptions.StateException">Thrown with status code 409 when the operation result was changed since it was read.</exception>
+        Task<object?> ReplaceLongRunningOperationResult(string operationId, string id, ExpandoObject operationResult, string eTag, CancellationToken cancellationToken = default);
     }
 }
@@ -57,5 +57,15 @@ namespace FoundationaLLM.State.Interfaces
         /// <param name="operationResult">The operation result to insert or update.</param>
         /// <returns></returns>
         Task<object?> UpsertLongRunningOperationResult(dynamic operationResult);
+
+        /// <summary>
+        /// Applies an incremental update to the result of a long-running operation.
+        /// </summary>
+        /// <param name="operationId">The long-running operation identifier.</param>
+        /// <param name="resultDelta">The incremental update, containing the appended text and the changed items since the version identified by its base sequence number.</param>
+        /// <returns></returns>
+        /// <remarks>The update is rejected with status code 409 when it is not based on the stored version of the result
+        /// or when the stored result is changed by another request while the update is applied.</remarks>
+        Task<object?> ApplyLongRunningOperationResultDelta(string operationId, JsonElement resultDelta);
     }
 }
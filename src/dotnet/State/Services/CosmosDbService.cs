@@ -281,5 +281,42 @@ namespace FoundationaLLM.State.Services
                 throw;
             }
         }
+
+        /// <inheritdoc/>
+        public async Task<object?> ReplaceLongRunningOperationResult(string operationId, string id, ExpandoObject operationResult, string eTag, CancellationToken cancellationToken = default)
+        {
+            try
+            {
+                ((IDictionary<string, object?>)operationResult)["type"] = LongRunningOperationTypes.LongRunningOperationResult;
+
+                ItemResponse<ExpandoObject> result = await _state.ReplaceItemAsync(
+                    item: operationResult,
+                    id: id,
+                    partitionKey: new PartitionKey(operationId),
+                    requestOptions: new ItemRequestOptions { IfMatchEtag = eTag },
+                    cancellationToken: cancellationToken
+                );
+
+                return result.Resource;
+            }
+            catch (CosmosException cosmosException) when ((int)cosmosException.StatusCode == StatusCodes.Status412PreconditionFailed)
+            {
+                throw new StateException(
+                    message: $"The result of operation '{operationId}' was changed by another request.",
+                    innerException: cosmosException,
+                    statusCode: StatusCodes.Status409Conflict
+                );
+            }
+            catch (CosmosException cosmosException)
+            {
+                _logger.LogError(cosmosException, "Cosmos DB error occurred while replacing long-running operation result.");
+                throw;
+            }
+            catch (Exception ex)
+            {
+                _logger.LogError(ex, "An error occurred while replacing long-running operation result.");
+                throw;
+            }
+        }
     }
 }
@@ -1,9 +1,13 @@
 ﻿using FoundationaLLM.Common.Models.Orchestration;
+using FoundationaLLM.State.Exceptions;
 using FoundationaLLM.State.Interfaces;
+using Microsoft.AspNetCore.Http;
 using FoundationaLLM.State.Models.Configuration;
 using Microsoft.Extensions.Logging;
 using Microsoft.Extensions.Options;
+using System.Dynamic;
 using System.Text.Json;
+using System.Text.Json.Nodes;
 
 namespace FoundationaLLM.State.Services
 {
@@ -86,5 +90,84 @@ namespace FoundationaLLM.State.Services
 
             return await cosmosDbService.UpsertLongRunningOperationResult(operationResult);
         }
+
+        /// <inheritdoc/>
+        public async Task<object?> ApplyLongRunningOperationResultDelta(string operationId, JsonElement resultDelta)
+        {
+            logger.LogInformation("Applying incremental update to long running operation result for operation ID: {operationId}", operationId);
+
+            var currentResult = await cosmosDbService.GetLongRunningOperationResult(operationId)
+                ?? throw new StateException(
+                    $"The operation '{operationId}' does not have a result to update.",
+                    StatusCodes.Status404NotFound);
+
+            var result = JsonNode.Parse(currentResult.RootElement.GetRawText())!.AsObject();
+            var delta = JsonNode.Parse(resultDelta.GetRawText())!.AsObject();
+
+            // The update must be based on the version of the result that is currently stored.
+            var currentSequenceNumber = result["sequence_number"]?.GetValue<long>();
+            var baseSequenceNumber = delta["base_sequence_number"]?.GetValue<long>();
+            if (currentSequenceNumber == null || currentSequenceNumber != baseSequenceNumber)
+                throw new StateException(
+                    $"The incremental update of operation '{operationId}' is based on version {baseSequenceNumber} but the stored result is at version {currentSequenceNumber}.",
+                    StatusCodes.Status409Conflict);
+
+            ApplyListDelta(result, "content", delta["content"]);
+            ApplyListDelta(result, "analysis_results", delta["analysis_results"]);
+            result["sequence_number"] = delta["sequence_number"]?.DeepClone();
+
+            // Replace the stored document only if it was not changed since it was read,
+            // so concurrent updates based on the same version cannot overwrite each other.
+            var id = result["id"]!.GetValue<string>();
+            var eTag = result["_etag"]!.GetValue<string>();
+
+            // Remove the Cosmos DB system properties of the stored document before replacing it.
+            foreach (var systemProperty in new[] { "_rid", "_self", "_etag", "_attachments", "_ts" })
+                result.Remove(systemProperty);
+
+            var operationResult = JsonSerializer.Deserialize<ExpandoObject>(result.ToJsonString())!;
+            return await cosmosDbService.ReplaceLongRunningOperationResult(operationId, id, operationResult, eTag);
+        }
+
+        /// <summary>
+        /// Applies the incremental update of a list property of an operation result.
+        /// </summary>
+        /// <param name="result">The operation result to update.</param>
+        /// <param name="propertyName">The name of the list property.</param>
+        /// <param name="listDelta">The update, containing the new length of the list and the updated items.
+        /// An updated item either replaces the item at its index or appends text to its string properties.</param>
+        private static void ApplyListDelta(JsonObject result, string propertyName, JsonNode? listDelta)
+        {
+            if (listDelta is not JsonObject listDeltaObject)
+                return;
+
+            var items = result[propertyName] as JsonArray;
+            if (items == null)
+            {
+                items = new JsonArray();
+                result[propertyName] = items;
+            }
+
+            var length = listDeltaObject["length"]?.GetValue<int>() ?? items.Count;
+            while (items.Count > length)
+                items.RemoveAt(items.Count - 1);
+            while (items.Count < length)
+                items.Add((JsonNode?)null);
+
+            foreach (var update in listDeltaObject["updates"] as JsonArray ?? new JsonArray())
+            {
+                var index = update!["index"]!.GetValue<int>();
+                if (update["item"] is JsonNode item)
+                {
+                    items[index] = item.DeepClone();
+                }
+                else if (update["append"] is JsonObject append
+                    && items[index] is JsonObject existingItem)
+                {
+                    foreach (var (key, suffix) in append)
+                        existingItem[key] = (existingItem[key]?.GetValue<string>() ?? string.Empty) + suffix!.GetValue<string>();
+                }
+            }
+        }
     }
 }
@@ -151,5 +151,26 @@ namespace FoundationaLLM.State.API.Controllers
             var result = await stateService.UpsertLongRunningOperationResult(dynamicOperationResult);
             return new OkObjectResult(result);
         }
+
+        /// <summary>
+        /// Applies an incremental update to the result of a long-running operation.
+        /// </summary>
+        /// <param name="instanceId">The FoundationaLLM instance ID.</param>
+        /// <param name="operationId">The long-running operation identifier.</param>
+        /// <param name="resultDelta">The incremental update to apply.</param>
+        /// <returns></returns>
+        [HttpPost("{operationId}/result/delta")]
+        public async Task<IActionResult> UpdateLongRunningOperationResult(string instanceId, string operationId, [FromBody] JsonElement resultDelta)
+        {
+            if (!resultDelta.TryGetProperty("operation_id", out var operationIdElement)
+                || operationIdElement.ValueKind != JsonValueKind.String
+                || operationIdElement.GetString() != operationId)
+            {
+                return BadRequest("The operation ID in the request path does not match the operation ID of the object in the request body.");
+            }
+
+            var result = await stateService.ApplyLongRunningOperationResultDelta(operationId, resultDelta);
+            return new OkObjectResult(result);
+        }
     }
 }
@@ -7,7 +7,7 @@ with the FoundationaLLMAgentRouterWorkflow workflow.
 from typing import List, Dict, Tuple
 
 #Azure imports
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from azure.identity import get_bearer_token_provider
 
 # LangChain imports
 from langchain_core.messages import (
@@ -21,7 +21,9 @@ from langchain_openai import AzureChatOpenAI
 from opentelemetry.trace import SpanKind
 
 # FoundationaLLM imports
+from foundationallm.authentication import AzureCredentialManager
 from foundationallm.config import Configuration, UserIdentity
+from foundationallm.resilience import RetryStrategyRegistry
 from foundationallm.langchain.common import FoundationaLLMToolBase
 from foundationallm.models.authentication import AuthenticationTypes
 from foundationallm.models.agents import AgentTool
@@ -61,7 +63,7 @@ class FoundationaLLMIntentToolBase(FoundationaLLMToolBase):
             'An error occurred while processing the request.') \
             if tool_config.properties else 'An error occurred while processing the request.'
 
-        self.default_credential = DefaultAzureCredential(exclude_environment_credential=True)
+        self.default_credential = AzureCredentialManager.get_credential()
         self.main_llm_deployment_name = None
 
         self.__create_main_llm()
@@ -230,6 +232,7 @@ class FoundationaLLMIntentToolBase(FoundationaLLMToolBase):
         main_llm_endpoint_url = main_llm_endpoint_properties['url']
         main_llm_endpoint_api_version = main_llm_endpoint_properties['api_version']
         main_llm_endpoint_api_authentication_type = main_llm_endpoint_properties['authentication_type']
+        retry_strategy = RetryStrategyRegistry.get_strategy(main_llm_endpoint_properties.get('retry_strategy_name'))
         if main_llm_endpoint_api_authentication_type == AuthenticationTypes.API_KEY:
 
             main_llm_endpoint_authentication_parameters = main_llm_endpoint_properties['authentication_parameters']
@@ -242,7 +245,7 @@ class FoundationaLLMIntentToolBase(FoundationaLLMToolBase):
                 openai_api_type='azure_ad',
                 api_key=main_llm_endpoint_api_key,
                 azure_deployment=main_llm_deployment_name,
-                max_retries=0,
+                max_retries=retry_strategy.max_retries,
                 timeout=30.0
             )
         else:
@@ -259,7 +262,7 @@ class FoundationaLLMIntentToolBase(FoundationaLLMToolBase):
                 openai_api_type='azure_ad',
                 azure_ad_token_provider=token_provider,
                 azure_deployment=main_llm_deployment_name,
-                max_retries=0,
+                max_retries=retry_strategy.max_retries,
                 timeout=30.0
             )
 
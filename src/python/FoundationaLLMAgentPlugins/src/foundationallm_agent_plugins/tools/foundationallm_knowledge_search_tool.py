@@ -49,13 +49,12 @@ class FoundationaLLMKnowledgeSearchTool(FoundationaLLMToolBase):
             run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
             runnable_config: RunnableConfig = None) -> Tuple[str, List[ContentArtifact]]:
         """ Retrieves documents from an index based on the proximity to the prompt to answer the prompt."""
-        # Azure AI Search retriever only supports synchronous execution.
         # Get the original prompt
         original_prompt = prompt
         if runnable_config is not None and 'original_user_prompt' in runnable_config['configurable']:        
             original_prompt = runnable_config['configurable']['original_user_prompt']
 
-        docs = self.retriever.invoke(prompt)
+        docs = await self.retriever.ainvoke(prompt)
         context = self.retriever.format_docs(docs)
         rag_prompt = f"Answer the question using only the context provided.\n\nContext:\n{context}\n\nQuestion:{prompt}"
         
@@ -0,0 +1,247 @@
+"""
+Provides admission control for the completion requests processed by the LangChainAPI.
+"""
+import time
+from contextlib import asynccontextmanager, nullcontext
+from typing import Optional
+from foundationallm.config import Configuration, read_settings
+from foundationallm.langchain.orchestration import CompletionScheduler
+from foundationallm.models.orchestration import CompletionPriorityClasses
+from foundationallm.telemetry import Telemetry
+
+ADMISSION_CONTROL_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:AdmissionControl'
+ADMISSION_CONTROL_MAX_IN_FLIGHT = f'{ADMISSION_CONTROL_CONFIGURATION_NAMESPACE}:MaxInFlight'
+ADMISSION_CONTROL_MAX_QUEUE_SIZE = f'{ADMISSION_CONTROL_CONFIGURATION_NAMESPACE}:MaxQueueSize'
+ADMISSION_CONTROL_RETRY_AFTER_SECONDS = f'{ADMISSION_CONTROL_CONFIGURATION_NAMESPACE}:RetryAfterSeconds'
+
+DEFAULT_MAX_IN_FLIGHT = 16
+DEFAULT_MAX_QUEUE_SIZE = 64
+DEFAULT_RETRY_AFTER_SECONDS = 5
+
+# Initialize telemetry logging
+logger = Telemetry.get_logger(__name__)
+
+class AdmissionRejectedException(Exception):
+    """
+    Raised when a completion request cannot be admitted because the wait queue is full
+    or the application is shutting down.
+    """
+    def __init__(self, message: str, retry_after_seconds: int, status_code: int = 429):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+        self.status_code = status_code
+
+class AdmissionTicket:
+    """
+    Represents a completion request that has been admitted but not yet released.
+    """
+    def __init__(
+        self,
+        instance_id: str,
+        user_id: Optional[str],
+        agent_name: Optional[str],
+        priority_class: Optional[CompletionPriorityClasses],
+        holds_slot: bool = True):
+        self.instance_id = instance_id
+        self.user_id = user_id
+        self.agent_name = agent_name
+        self.priority_class = priority_class
+        self.holds_slot = holds_slot
+        self.admitted_at = time.monotonic()
+        self.started = False
+        self.released = False
+
+class AdmissionController:
+    """
+    Limits the number of completion requests waiting for an execution slot.
+    Execution slots are granted by the completion scheduler, which bounds the number
+    of requests executing concurrently and shares the slots fairly between instances and users.
+    """
+    def __init__(
+        self,
+        scheduler: CompletionScheduler,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        retry_after_seconds: int = DEFAULT_RETRY_AFTER_SECONDS):
+        """
+        Initializes the admission controller.
+
+        Parameters
+        ----------
+        scheduler : CompletionScheduler
+            The scheduler granting execution slots to admitted requests.
+        max_queue_size : int
+            The maximum number of admitted completion requests waiting for an execution slot.
+        retry_after_seconds : int
+            The value of the Retry-After header returned when a request is rejected.
+        """
+        if max_queue_size < 0:
+            raise ValueError('The max_queue_size parameter cannot be negative.')
+
+        self.scheduler = scheduler
+        self.max_in_flight = scheduler.max_concurrency
+        self.max_queue_size = max_queue_size
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0
+        self.queued = 0
+        self.closed = False
+
+        meter = Telemetry.get_meter(__name__)
+        self.__queue_depth = meter.create_up_down_counter(
+            'langchainapi.admission.queue_depth',
+            description='The number of admitted completion requests waiting for an execution slot.')
+        self.__in_flight = meter.create_up_down_counter(
+            'langchainapi.admission.in_flight',
+            description='The number of completion requests currently executing.')
+        self.__wait_time = meter.create_histogram(
+            'langchainapi.admission.wait_time',
+            unit='s',
+            description='The time admitted completion requests spend waiting for an execution slot.')
+        self.__rejected = meter.create_counter(
+            'langchainapi.admission.rejected',
+            description='The number of completion requests rejected because the wait queue was full.')
+
+    @staticmethod
+    def from_config(config: Configuration) -> 'AdmissionController':
+        """
+        Creates an admission controller using the LangChainAPI configuration settings.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+
+        Returns
+        -------
+        AdmissionController
+            The configured admission controller.
+        """
+        settings = read_settings(config, [
+            (ADMISSION_CONTROL_MAX_IN_FLIGHT, int, DEFAULT_MAX_IN_FLIGHT),
+            (ADMISSION_CONTROL_MAX_QUEUE_SIZE, int, DEFAULT_MAX_QUEUE_SIZE),
+            (ADMISSION_CONTROL_RETRY_AFTER_SECONDS, int, DEFAULT_RETRY_AFTER_SECONDS)], logger)
+
+        return AdmissionController(
+            scheduler = CompletionScheduler.from_config(config, settings[ADMISSION_CONTROL_MAX_IN_FLIGHT]),
+            max_queue_size = settings[ADMISSION_CONTROL_MAX_QUEUE_SIZE],
+            retry_after_seconds = settings[ADMISSION_CONTROL_RETRY_AFTER_SECONDS]
+        )
+
+    def admit(
+        self,
+        instance_id: str,
+        user_id: Optional[str],
+        agent_name: Optional[str] = None,
+        priority_class: Optional[CompletionPriorityClasses] = None,
+        holds_slot: bool = True) -> AdmissionTicket:
+        """
+        Admits a completion request if there is room in the wait queue.
+
+        Parameters
+        ----------
+        instance_id : str
+            The unique identifier of the FoundationaLLM instance.
+        user_id : str
+            The user principal name of the user who submitted the request.
+        agent_name : str
+            The name of the agent executing the request.
+        priority_class : CompletionPriorityClasses
+            Overrides the priority class assigned to the agent.
+        holds_slot : bool
+            Indicates whether the request holds an execution slot while it runs. Batches do not;
+            each of their completion requests holds its own slot, granted by schedule().
+
+        Returns
+        -------
+        AdmissionTicket
+            The ticket that must be passed to run() or release().
+
+        Raises
+        ------
+        AdmissionRejectedException
+            Raised when the maximum number of in-flight and queued requests has been reached
+            or when the admission controller is closed.
+        """
+        if self.closed:
+            self.__rejected.add(1)
+            raise AdmissionRejectedException(
+                'The LangChainAPI is shutting down. Retry the request later.',
+                self.retry_after_seconds,
+                status_code = 503)
+
+        if self.in_flight + self.queued >= self.max_in_flight + self.max_queue_size:
+            self.__rejected.add(1)
+            raise AdmissionRejectedException(
+                f'The LangChainAPI is at capacity ({self.in_flight} in flight, {self.queued} queued). Retry the request later.',
+                self.retry_after_seconds)
+
+        self.queued += 1
+        self.__queue_depth.add(1)
+        return AdmissionTicket(instance_id, user_id, agent_name, priority_class, holds_slot)
+
+    def close(self):
+        """
+        Stops admitting completion requests. Requests that were already admitted still run.
+        Safe to call from a signal handler.
+        """
+        self.closed = True
+
+    def release(self, ticket: AdmissionTicket):
+        """
+        Releases a ticket that was admitted but will never run.
+
+        Parameters
+        ----------
+        ticket : AdmissionTicket
+            The ticket returned by admit().
+        """
+        if ticket.started or ticket.released:
+            return
+        ticket.released = True
+        self.queued -= 1
+        self.__queue_depth.add(-1)
+
+    def schedule(self, ticket: AdmissionTicket):
+        """
+        Waits for the scheduler to grant an execution slot to one of the completion requests
+        of an admitted batch and holds it for the duration of the context.
+
+        Parameters
+        ----------
+        ticket : AdmissionTicket
+            The ticket returned by admit().
+        """
+        return self.scheduler.schedule(
+            ticket.instance_id,
+            ticket.user_id,
+            agent_name = ticket.agent_name,
+            priority_class = ticket.priority_class)
+
+    @asynccontextmanager
+    async def run(self, ticket: AdmissionTicket):
+        """
+        Waits for the scheduler to grant an execution slot and holds it for the duration of the context.
+        Requests admitted without holding a slot run immediately.
+
+        Parameters
+        ----------
+        ticket : AdmissionTicket
+            The ticket returned by admit().
+        """
+        try:
+            async with self.schedule(ticket) if ticket.holds_slot else nullcontext():
+                ticket.started = True
+                self.queued -= 1
+                self.in_flight += 1
+                self.__queue_depth.add(-1)
+                self.__in_flight.add(1)
+                self.__wait_time.record(time.monotonic() - ticket.admitted_at)
+                try:
+                    yield
+                finally:
+                    ticket.released = True
+                    self.in_flight -= 1
+                    self.__in_flight.add(-1)
+        finally:
+            # Covers a request that was cancelled while waiting for a slot.
+            self.release(ticket)
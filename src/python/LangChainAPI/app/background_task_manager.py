@@ -0,0 +1,194 @@
+"""
+Tracks the background tasks started by the LangChainAPI and drains them on shutdown.
+"""
+import asyncio
+from typing import Coroutine, Dict, Optional
+from app.admission_controller import AdmissionRejectedException, DEFAULT_RETRY_AFTER_SECONDS
+from foundationallm.config import Configuration, read_setting
+from foundationallm.models.operations import OperationStatus
+from foundationallm.models.orchestration import CompletionResponse
+from foundationallm.operations import OperationsManager
+from foundationallm.telemetry import Telemetry
+
+SHUTDOWN_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:Shutdown'
+SHUTDOWN_DRAIN_TIMEOUT_SECONDS = f'{SHUTDOWN_CONFIGURATION_NAMESPACE}:DrainTimeoutSeconds'
+
+# Leaves time to mark the remaining operations as failed within the default
+# 30 second termination grace period of Kubernetes and Azure Container Apps.
+DEFAULT_DRAIN_TIMEOUT_SECONDS = 20
+
+# Initialize telemetry logging
+logger = Telemetry.get_logger(__name__)
+
+class TrackedOperation:
+    """
+    The long running operation processed by a background task.
+    """
+    def __init__(
+        self,
+        operation_id: str,
+        instance_id: str,
+        operations_manager: OperationsManager,
+        user_identity: Optional[str]):
+        self.operation_id = operation_id
+        self.instance_id = instance_id
+        self.operations_manager = operations_manager
+        self.user_identity = user_identity
+
+class BackgroundTaskManager:
+    """
+    Keeps track of the fire-and-forget tasks started by the completion endpoints.
+    On shutdown, waits for the tasks to finish up to a deadline, then cancels the
+    remaining tasks and marks their operations as failed. No new tasks are started
+    once the drain has begun, so every task is either awaited or cancelled by the drain.
+    """
+    def __init__(self, drain_timeout_seconds: float = DEFAULT_DRAIN_TIMEOUT_SECONDS):
+        """
+        Initializes the background task manager.
+
+        Parameters
+        ----------
+        drain_timeout_seconds : float
+            The maximum time to wait for the background tasks to finish on shutdown.
+        """
+        if drain_timeout_seconds < 0:
+            raise ValueError('The drain_timeout_seconds parameter cannot be negative.')
+
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.draining = False
+        self.__tasks: Dict[asyncio.Task, Optional[TrackedOperation]] = {}
+
+    @staticmethod
+    def from_config(config: Configuration) -> 'BackgroundTaskManager':
+        """
+        Creates a background task manager using the LangChainAPI configuration settings.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+
+        Returns
+        -------
+        BackgroundTaskManager
+            The configured background task manager.
+        """
+        return BackgroundTaskManager(
+            read_setting(config, SHUTDOWN_DRAIN_TIMEOUT_SECONDS, float, DEFAULT_DRAIN_TIMEOUT_SECONDS, logger, minimum=0))
+
+    @property
+    def pending(self) -> int:
+        """The number of background tasks that have not finished."""
+        return len(self.__tasks)
+
+    def start(
+        self,
+        coroutine: Coroutine,
+        operation_id: Optional[str] = None,
+        instance_id: Optional[str] = None,
+        operations_manager: Optional[OperationsManager] = None,
+        user_identity: Optional[str] = None) -> asyncio.Task:
+        """
+        Starts a tracked background task.
+
+        Parameters
+        ----------
+        coroutine : Coroutine
+            The coroutine executed by the task.
+        operation_id : str
+            The identifier of the operation processed by the task, if any.
+            The operation is marked as failed if the task does not finish before the drain deadline.
+        instance_id : str
+            The unique identifier of the FoundationaLLM instance.
+        operations_manager : OperationsManager
+            The operations manager used to update the operation.
+        user_identity : str
+            The JSON serialized identity of the user who submitted the operation.
+
+        Returns
+        -------
+        asyncio.Task
+            The started task.
+
+        Raises
+        ------
+        AdmissionRejectedException
+            Raised with status code 503 when the drain has begun. The coroutine is closed without being run.
+        """
+        if self.draining:
+            coroutine.close()
+            raise AdmissionRejectedException(
+                'The LangChainAPI is shutting down. Retry the request later.',
+                DEFAULT_RETRY_AFTER_SECONDS,
+                status_code = 503)
+
+        task = asyncio.create_task(coroutine)
+        self.__tasks[task] = TrackedOperation(operation_id, instance_id, operations_manager, user_identity) \
+            if operation_id is not None and operations_manager is not None else None
+        task.add_done_callback(self.__on_task_done)
+        return task
+
+    def begin_drain(self):
+        """
+        Marks the application as draining, after which start() refuses new tasks.
+        Safe to call from a signal handler.
+        """
+        self.draining = True
+
+    async def drain_async(self):
+        """
+        Waits for the background tasks to finish up to the drain deadline, then cancels
+        the remaining tasks and marks their operations as failed. Each operation is updated
+        with its own State API calls; the updates of the operations are sent concurrently.
+        """
+        self.begin_drain()
+        if self.pending == 0:
+            return
+
+        logger.info(f'Waiting up to {self.drain_timeout_seconds} seconds for {self.pending} background tasks to finish.')
+        _, remaining = await asyncio.wait(list(self.__tasks.keys()), timeout=self.drain_timeout_seconds)
+        if len(remaining) == 0:
+            logger.info('All background tasks finished.')
+            return
+
+        operations = [self.__tasks.get(task) for task in remaining]
+        for task in remaining:
+            task.cancel()
+        await asyncio.gather(*remaining, return_exceptions=True)
+
+        operations = [operation for operation in operations if operation is not None]
+        logger.warning(f'{len(remaining)} background tasks did not finish before the drain deadline. Marking {len(operations)} operations as failed.')
+        results = await asyncio.gather(
+            *[self.__fail_operation_async(operation) for operation in operations],
+            return_exceptions=True)
+        for operation, result in zip(operations, results):
+            if isinstance(result, Exception):
+                logger.error(f'The operation {operation.operation_id} could not be marked as failed: {result}')
+
+    async def __fail_operation_async(self, operation: TrackedOperation):
+        status_message = 'The LangChainAPI shut down before the operation completed. Resubmit the request.'
+        await asyncio.gather(
+            operation.operations_manager.set_operation_result_async(
+                operation_id = operation.operation_id,
+                instance_id = operation.instance_id,
+                completion_response = CompletionResponse(
+                    operation_id = operation.operation_id,
+                    user_prompt = '',
+                    content = [],
+                    errors = [status_message],
+                    is_error = True
+                )),
+            operation.operations_manager.update_operation_async(
+                operation_id = operation.operation_id,
+                instance_id = operation.instance_id,
+                status = OperationStatus.FAILED,
+                status_message = status_message,
+                user_identity = operation.user_identity
+            )
+        )
+
+    def __on_task_done(self, task: asyncio.Task):
+        self.__tasks.pop(task, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f'A background task failed: {task.exception()}')
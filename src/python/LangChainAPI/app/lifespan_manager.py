@@ -1,12 +1,28 @@
+import signal
 from aiohttp import ClientSession
 from contextlib import asynccontextmanager
+from app.admission_controller import AdmissionController
+from app.background_task_manager import BackgroundTaskManager
 from foundationallm.config import Configuration
+from foundationallm.langchain.language_models import (
+    LanguageModelClientRegistry,
+    LanguageModelFactory,
+    LanguageModelRateLimiter
+)
+from foundationallm.langchain.retrievers import AzureAISearchServiceRetriever
+from foundationallm.operations import OperationsManager, OperationsOutbox
 from foundationallm.plugins import PluginManager, plugin_manager
+from foundationallm.resilience import CircuitBreakerRegistry, RetryStrategyRegistry
+from foundationallm.services import HttpClientService
+from foundationallm.services.gateway_text_embedding import GatewayTextEmbeddingService
 from foundationallm.telemetry import Telemetry
 
 config: Configuration = None
 http_client_session: ClientSession = None
 plugin_manager: PluginManager = None
+admission_controller: AdmissionController = None
+background_task_manager: BackgroundTaskManager = None
+operations_outbox: OperationsOutbox = None
 
 @asynccontextmanager
 async def lifespan(app):
@@ -14,6 +30,9 @@ async def lifespan(app):
     global config
     global http_client_session
     global plugin_manager
+    global admission_controller
+    global background_task_manager
+    global operations_outbox
 
     # Create the application configuration
     config = Configuration()
@@ -26,10 +45,65 @@ async def lifespan(app):
     plugin_manager = PluginManager(config, Telemetry.get_logger(__name__))
     plugin_manager.load_external_modules()
 
+    # Register the retry strategies referenced by the API endpoints
+    RetryStrategyRegistry.configure(config)
+    CircuitBreakerRegistry.configure(config)
+
+    # Configure the connection pools shared by the HTTP clients of the API endpoints
+    HttpClientService.configure(config)
+
+    # Create the registry of language model clients shared across requests
+    LanguageModelFactory.client_registry = LanguageModelClientRegistry.from_config(config)
+    LanguageModelRateLimiter.configure(config)
+
+    # Create the cache of the embedding vectors obtained from the Gateway API
+    GatewayTextEmbeddingService.configure(config)
+
+    # Read the timeout of the concurrent Azure AI Search index queries
+    AzureAISearchServiceRetriever.configure(config)
+
+    # Create the admission controller for completion requests
+    admission_controller = AdmissionController.from_config(config)
+
+    # Create the background task manager and stop admitting new work as soon as SIGTERM is received
+    background_task_manager = BackgroundTaskManager.from_config(config)
+    install_sigterm_handler()
+
+    # Create the outbox for State API writes and replay the writes left over by a previous process
+    operations_outbox = OperationsOutbox.from_config(config)
+    operations_outbox.start(
+        OperationsManager(config, http_client_session, Telemetry.get_logger(__name__)).deliver_outbox_entry_async)
+
     yield
 
     # Perform shutdown actions here
+    # Let the background tasks finish before closing the client session they use.
+    admission_controller.close()
+    await background_task_manager.drain_async()
+    await operations_outbox.stop_async()
+    await LanguageModelFactory.client_registry.aclose()
+    await HttpClientService.close_sessions_async()
     await http_client_session.close()
+    config.close()
+
+def install_sigterm_handler():
+    """
+    Stops admitting completion requests when SIGTERM is received, chaining to the handler
+    installed by the server, which then shuts the application down.
+    """
+    try:
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        def handle_sigterm(signum, frame):
+            admission_controller.close()
+            background_task_manager.begin_drain()
+            if callable(previous_handler):
+                previous_handler(signum, frame)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+    except ValueError:
+        # Signal handlers can only be installed from the main thread.
+        Telemetry.get_logger(__name__).info('The SIGTERM handler could not be installed. Admission stops when the application shuts down.')
 
 async def get_config() -> Configuration:
     """Retrieves the application configuration."""
@@ -42,3 +116,15 @@ async def get_http_client_session() -> ClientSession:
 async def get_plugin_manager() -> PluginManager:
     """Retrieves the plugin manager."""
     return plugin_manager
+
+async def get_admission_controller() -> AdmissionController:
+    """Retrieves the admission controller."""
+    return admission_controller
+
+async def get_background_task_manager() -> BackgroundTaskManager:
+    """Retrieves the background task manager."""
+    return background_task_manager
+
+async def get_operations_outbox() -> OperationsOutbox:
+    """Retrieves the outbox for State API writes."""
+    return operations_outbox
@@ -4,28 +4,49 @@ The API endpoint for returning the completion from the LLM for the specified use
 import asyncio
 import json
 from aiohttp import ClientSession
+from app.admission_controller import AdmissionController, AdmissionRejectedException, AdmissionTicket
+from app.background_task_manager import BackgroundTaskManager
 from app.dependencies import validate_api_key_header
-from app.lifespan_manager import get_config, get_http_client_session, get_plugin_manager
+from app.lifespan_manager import (
+    get_admission_controller,
+    get_background_task_manager,
+    get_config,
+    get_http_client_session,
+    get_operations_outbox,
+    get_plugin_manager
+)
 from fastapi import (
     APIRouter,
     Body,
     Depends,
     Header,
     HTTPException,
+    Query,
     status
 )
+from fastapi.responses import StreamingResponse
 from opentelemetry.trace import SpanKind
-from typing import Optional, List
+from starlette.background import BackgroundTask
+from typing import AsyncIterator, Optional, List
 from foundationallm.config import Configuration, UserIdentity
 from foundationallm.langchain.orchestration import OrchestrationManager
-from foundationallm.models.agents import KnowledgeManagementCompletionRequest
+from foundationallm.models.agents import (
+    KnowledgeManagementBatchCompletionRequest,
+    KnowledgeManagementCompletionRequest
+)
 from foundationallm.models.operations import (
     LongRunningOperation,
     LongRunningOperationLogEntry,
     OperationStatus
 )
-from foundationallm.models.orchestration import CompletionRequestBase, CompletionResponse
-from foundationallm.operations import OperationsManager
+from foundationallm.models.orchestration import (
+    BatchCompletionItemResult,
+    BatchCompletionResponse,
+    CompletionPriorityClasses,
+    CompletionRequestBase,
+    CompletionResponse
+)
+from foundationallm.operations import OperationsManager, OperationsOutbox
 from foundationallm.plugins import PluginManager
 from foundationallm.telemetry import Telemetry
 
@@ -52,12 +73,30 @@ async def resolve_completion_request(request_body: dict = Body(...)) -> Completi
         case _:
             raise ValueError(f"Unsupported agent type: {agent_type}")
 
+async def resolve_batch_completion_request(request_body: dict = Body(...)) -> KnowledgeManagementBatchCompletionRequest:
+    agent_type = request_body.get("agent", {}).get("type", None)
+
+    match agent_type:
+        case "knowledge-management":
+            request = KnowledgeManagementBatchCompletionRequest(**request_body)
+            request.agent.type = agent_type
+            try:
+                # Reject the batches that cannot be executed before admitting them.
+                request.get_completion_requests()
+            except ValueError as e:
+                raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail = str(e))
+            return request
+        case _:
+            raise ValueError(f"Unsupported agent type: {agent_type}")
+
 @router.post(
     '/async-completions',
     summary = 'Submit an async completion request.',
     status_code = status.HTTP_202_ACCEPTED,
     responses = {
         202: {'description': 'Completion request accepted.'},
+        429: {'description': 'Too many completion requests are in progress. Retry after the interval in the Retry-After header.'},
+        503: {'description': 'The LangChainAPI is shutting down. Retry the request after the interval in the Retry-After header.'}
     }
 )
 async def submit_completion_request(
@@ -65,7 +104,10 @@ async def submit_completion_request(
     completion_request: CompletionRequestBase = Depends(resolve_completion_request),
     config: Configuration = Depends(get_config),
     http_client_session: ClientSession = Depends(get_http_client_session),
+    operations_outbox: OperationsOutbox = Depends(get_operations_outbox),
     plugin_manager: PluginManager = Depends(get_plugin_manager),
+    admission_controller: AdmissionController = Depends(get_admission_controller),
+    background_task_manager: BackgroundTaskManager = Depends(get_background_task_manager),
     x_user_identity: Optional[str] = Header(None)
 ) -> LongRunningOperation:
     """
@@ -85,27 +127,46 @@ async def submit_completion_request(
             span.set_attribute('instance_id', instance_id)
             span.set_attribute('user_identity', x_user_identity)
 
-            # Create an operations manager to create the operation.
-            operations_manager = OperationsManager(config, http_client_session, logger)
-            # Submit the completion request operation to the state API.
-            operation = await operations_manager.create_operation_async(operation_id, instance_id, x_user_identity)
+            # Reserve a place in the wait queue before creating the operation.
+            admission_ticket = admission_controller.admit(
+                instance_id,
+                get_user_principal_name(x_user_identity),
+                agent_name = completion_request.agent.name if completion_request.agent is not None else None
+            )
 
-            # Start a background task to perform the completion request.
-            asyncio.create_task(
-                create_completion_response(
-                    operation_id,
-                    instance_id,
-                    completion_request,
-                    config,
-                    plugin_manager,
-                    operations_manager,
-                    x_user_identity
+            try:
+                # Create an operations manager to create the operation.
+                operations_manager = OperationsManager(config, http_client_session, logger, operations_outbox)
+                # Submit the completion request operation to the state API.
+                operation = await operations_manager.create_operation_async(operation_id, instance_id, x_user_identity)
+
+                # Start a background task to perform the completion request.
+                background_task_manager.start(
+                    create_completion_response(
+                        operation_id,
+                        instance_id,
+                        completion_request,
+                        config,
+                        plugin_manager,
+                        operations_manager,
+                        admission_controller,
+                        admission_ticket,
+                        x_user_identity
+                    ),
+                    operation_id = operation_id,
+                    instance_id = instance_id,
+                    operations_manager = operations_manager,
+                    user_identity = x_user_identity
                 )
-            )
+            except BaseException:
+                admission_controller.release(admission_ticket)
+                raise
 
             # Return the long running operation object.
             return operation
 
+        except AdmissionRejectedException as e:
+            handle_admission_rejected(e)
         except Exception as e:
             handle_exception(e)
 
@@ -116,10 +177,36 @@ async def create_completion_response(
     config: Configuration,
     plugin_manager: PluginManager,
     operations_manager: OperationsManager,
+    admission_controller: AdmissionController,
+    admission_ticket: AdmissionTicket,
     x_user_identity: Optional[str] = Header(None)
 ):
     """
-    Generates the completion response for the specified completion request.
+    Generates the completion response for the specified completion request
+    once the admission controller grants an execution slot.
+    """
+    async with admission_controller.run(admission_ticket):
+        await execute_completion_request(
+            operation_id,
+            instance_id,
+            completion_request,
+            config,
+            plugin_manager,
+            operations_manager,
+            x_user_identity
+        )
+
+async def execute_completion_request(
+    operation_id: str,
+    instance_id: str,
+    completion_request: KnowledgeManagementCompletionRequest,
+    config: Configuration,
+    plugin_manager: PluginManager,
+    operations_manager: OperationsManager,
+    x_user_identity: Optional[str] = None
+):
+    """
+    Executes the completion request and sends the result to the State API.
     """
     with tracer.start_as_current_span('langchainapi_create_completion_response', kind=SpanKind.SERVER) as span:
         try:
@@ -192,6 +279,528 @@ async def create_completion_response(
                 )
             )
 
+@router.post(
+    '/completions',
+    summary = 'Execute a completion request and return the completion response.',
+    responses = {
+        200: {'description': 'Completion response.'},
+        429: {'description': 'Too many completion requests are in progress. Retry after the interval in the Retry-After header.'},
+        503: {'description': 'The LangChainAPI is shutting down. Retry the request after the interval in the Retry-After header.'}
+    }
+)
+async def create_completion(
+    instance_id: str,
+    completion_request: CompletionRequestBase = Depends(resolve_completion_request),
+    config: Configuration = Depends(get_config),
+    http_client_session: ClientSession = Depends(get_http_client_session),
+    operations_outbox: OperationsOutbox = Depends(get_operations_outbox),
+    plugin_manager: PluginManager = Depends(get_plugin_manager),
+    admission_controller: AdmissionController = Depends(get_admission_controller),
+    background_task_manager: BackgroundTaskManager = Depends(get_background_task_manager),
+    persist_result: bool = Query(False, description='Indicates whether the completion response should be persisted to the State API in the background.'),
+    x_user_identity: Optional[str] = Header(None)
+) -> CompletionResponse:
+    """
+    Generates the completion response inline, without the State API round-trips of async completions.
+
+    Returns
+    -------
+    CompletionResponse
+        Object containing the completion response.
+    """
+    with tracer.start_as_current_span('langchainapi_create_completion', kind=SpanKind.SERVER) as span:
+        try:
+            operation_id = completion_request.operation_id
+
+            span.set_attribute('operation_id', operation_id)
+            span.set_attribute('instance_id', instance_id)
+            span.set_attribute('user_identity', x_user_identity)
+
+            admission_ticket = admission_controller.admit(
+                instance_id,
+                get_user_principal_name(x_user_identity),
+                agent_name = completion_request.agent.name if completion_request.agent is not None else None
+            )
+
+            async with admission_controller.run(admission_ticket):
+                orchestration_manager = OrchestrationManager(
+                    completion_request = completion_request,
+                    configuration = config,
+                    plugin_manager = plugin_manager,
+                    operations_manager = None,
+                    instance_id = instance_id,
+                    user_identity = UserIdentity(**json.loads(x_user_identity))
+                )
+                completion_response = await orchestration_manager.invoke_async(completion_request)
+
+            if persist_result:
+                # Persist the result without delaying the response.
+                try:
+                    background_task_manager.start(
+                        persist_completion_response(
+                            operation_id,
+                            instance_id,
+                            completion_response,
+                            OperationsManager(config, http_client_session, logger, operations_outbox),
+                            x_user_identity
+                        )
+                    )
+                except AdmissionRejectedException:
+                    logger.warning(f'The result of the operation {operation_id} is not persisted because the LangChainAPI is shutting down.')
+
+            return completion_response
+
+        except AdmissionRejectedException as e:
+            handle_admission_rejected(e)
+        except Exception as e:
+            handle_exception(e)
+
+async def persist_completion_response(
+    operation_id: str,
+    instance_id: str,
+    completion_response: CompletionResponse,
+    operations_manager: OperationsManager,
+    x_user_identity: Optional[str] = None
+):
+    """
+    Creates an operation for a completion that was executed synchronously and stores its result in the State API.
+    """
+    with tracer.start_as_current_span('langchainapi_persist_completion_response', kind=SpanKind.SERVER) as span:
+        try:
+            span.set_attribute('operation_id', operation_id)
+            span.set_attribute('instance_id', instance_id)
+
+            await operations_manager.create_operation_async(operation_id, instance_id, x_user_identity)
+            await asyncio.gather(
+                operations_manager.set_operation_result_async(
+                    operation_id = operation_id,
+                    instance_id = instance_id,
+                    completion_response = completion_response),
+                operations_manager.update_operation_async(
+                    operation_id = operation_id,
+                    instance_id = instance_id,
+                    status = OperationStatus.COMPLETED if not completion_response.is_error else OperationStatus.FAILED,
+                    status_message = "Operation completed successfully." if not completion_response.is_error else "Operation failed.",
+                    user_identity = x_user_identity
+                )
+            )
+        except Exception as e:
+            # The completion response was already returned to the caller, so the failure is only logged.
+            logger.error(f'The result of operation {operation_id} could not be persisted: {e}')
+            Telemetry.record_exception(span, e)
+
+@router.post(
+    '/batch-completions',
+    summary = 'Execute a batch of completion requests and return their completion responses.',
+    responses = {
+        200: {'description': 'Batch completion response with the status of each completion request.'},
+        429: {'description': 'Too many completion requests are in progress. Retry after the interval in the Retry-After header.'},
+        503: {'description': 'The LangChainAPI is shutting down. Retry the request after the interval in the Retry-After header.'}
+    }
+)
+async def create_batch_completion(
+    instance_id: str,
+    batch_request: KnowledgeManagementBatchCompletionRequest = Depends(resolve_batch_completion_request),
+    config: Configuration = Depends(get_config),
+    plugin_manager: PluginManager = Depends(get_plugin_manager),
+    admission_controller: AdmissionController = Depends(get_admission_controller),
+    x_user_identity: Optional[str] = Header(None)
+) -> BatchCompletionResponse:
+    """
+    Executes the completion requests of a batch with a single agent and returns their results.
+
+    Returns
+    -------
+    BatchCompletionResponse
+        Object containing the completion response and status of each completion request.
+    """
+    with tracer.start_as_current_span('langchainapi_create_batch_completion', kind=SpanKind.SERVER) as span:
+        try:
+            span.set_attribute('operation_id', batch_request.operation_id)
+            span.set_attribute('instance_id', instance_id)
+            span.set_attribute('user_identity', x_user_identity)
+
+            admission_ticket = admit_batch_completion_request(instance_id, batch_request, admission_controller, x_user_identity)
+
+            async with admission_controller.run(admission_ticket):
+                return await execute_batch_completion_request(
+                    instance_id,
+                    batch_request,
+                    config,
+                    plugin_manager,
+                    admission_controller,
+                    admission_ticket,
+                    x_user_identity
+                )
+
+        except AdmissionRejectedException as e:
+            handle_admission_rejected(e)
+        except Exception as e:
+            handle_exception(e)
+
+@router.post(
+    '/async-batch-completions',
+    summary = 'Submit an async batch of completion requests.',
+    status_code = status.HTTP_202_ACCEPTED,
+    responses = {
+        202: {'description': 'Batch completion request accepted.'},
+        429: {'description': 'Too many completion requests are in progress. Retry after the interval in the Retry-After header.'},
+        503: {'description': 'The LangChainAPI is shutting down. Retry the request after the interval in the Retry-After header.'}
+    }
+)
+async def submit_batch_completion_request(
+    instance_id: str,
+    batch_request: KnowledgeManagementBatchCompletionRequest = Depends(resolve_batch_completion_request),
+    config: Configuration = Depends(get_config),
+    http_client_session: ClientSession = Depends(get_http_client_session),
+    operations_outbox: OperationsOutbox = Depends(get_operations_outbox),
+    plugin_manager: PluginManager = Depends(get_plugin_manager),
+    admission_controller: AdmissionController = Depends(get_admission_controller),
+    background_task_manager: BackgroundTaskManager = Depends(get_background_task_manager),
+    x_user_identity: Optional[str] = Header(None)
+) -> LongRunningOperation:
+    """
+    Initiates the execution of a batch of completion requests in the background.
+    The BatchCompletionResponse is stored as the result of a single operation.
+
+    Returns
+    -------
+    LongRunningOperation
+        Object containing the operation ID and status.
+    """
+    with tracer.start_as_current_span('langchainapi_submit_batch_completion_request', kind=SpanKind.SERVER) as span:
+        try:
+            operation_id = batch_request.operation_id
+
+            span.set_attribute('operation_id', operation_id)
+            span.set_attribute('instance_id', instance_id)
+            span.set_attribute('user_identity', x_user_identity)
+
+            admission_ticket = admit_batch_completion_request(instance_id, batch_request, admission_controller, x_user_identity)
+
+            try:
+                operations_manager = OperationsManager(config, http_client_session, logger, operations_outbox)
+                operation = await operations_manager.create_operation_async(operation_id, instance_id, x_user_identity)
+
+                background_task_manager.start(
+                    create_batch_completion_response(
+                        instance_id,
+                        batch_request,
+                        config,
+                        plugin_manager,
+                        operations_manager,
+                        admission_controller,
+                        admission_ticket,
+                        x_user_identity
+                    ),
+                    operation_id = operation_id,
+                    instance_id = instance_id,
+                    operations_manager = operations_manager,
+                    user_identity = x_user_identity
+                )
+            except BaseException:
+                admission_controller.release(admission_ticket)
+                raise
+
+            return operation
+
+        except AdmissionRejectedException as e:
+            handle_admission_rejected(e)
+        except Exception as e:
+            handle_exception(e)
+
+async def create_batch_completion_response(
+    instance_id: str,
+    batch_request: KnowledgeManagementBatchCompletionRequest,
+    config: Configuration,
+    plugin_manager: PluginManager,
+    operations_manager: OperationsManager,
+    admission_controller: AdmissionController,
+    admission_ticket: AdmissionTicket,
+    x_user_identity: Optional[str] = None
+):
+    """
+    Executes the batch once the admission controller grants an execution slot and sends the result to the State API.
+    """
+    operation_id = batch_request.operation_id
+    async with admission_controller.run(admission_ticket):
+        with tracer.start_as_current_span('langchainapi_create_batch_completion_response', kind=SpanKind.SERVER) as span:
+            try:
+                span.set_attribute('operation_id', operation_id)
+                span.set_attribute('instance_id', instance_id)
+                span.set_attribute('user_identity', x_user_identity)
+
+                await operations_manager.update_operation_async(
+                    operation_id,
+                    instance_id,
+                    status = OperationStatus.INPROGRESS,
+                    status_message = 'Operation state changed to in progress.',
+                    user_identity = x_user_identity
+                )
+
+                batch_response = await execute_batch_completion_request(
+                    instance_id,
+                    batch_request,
+                    config,
+                    plugin_manager,
+                    admission_controller,
+                    admission_ticket,
+                    x_user_identity
+                )
+                batch_status = OperationStatus.COMPLETED if batch_response.failed_count == 0 else OperationStatus.FAILED
+                batch_status_message = 'Operation completed successfully.' if batch_response.failed_count == 0 \
+                    else f'{batch_response.failed_count} of {len(batch_response.items)} completion requests failed.'
+            except Exception as e:
+                logger.error(e, stack_info=True, exc_info=True)
+                Telemetry.record_exception(span, e)
+
+                batch_response = BatchCompletionResponse(operation_id = operation_id)
+                batch_status = OperationStatus.FAILED
+                batch_status_message = f'{e}'
+
+            try:
+                await asyncio.gather(
+                    operations_manager.set_operation_result_async(
+                        operation_id = operation_id,
+                        instance_id = instance_id,
+                        completion_response = batch_response),
+                    operations_manager.update_operation_async(
+                        operation_id = operation_id,
+                        instance_id = instance_id,
+                        status = batch_status,
+                        status_message = batch_status_message,
+                        user_identity = x_user_identity
+                    )
+                )
+            except Exception as e:
+                logger.error(f'The result of operation {operation_id} could not be persisted: {e}')
+                Telemetry.record_exception(span, e)
+
+async def execute_batch_completion_request(
+    instance_id: str,
+    batch_request: KnowledgeManagementBatchCompletionRequest,
+    config: Configuration,
+    plugin_manager: PluginManager,
+    admission_controller: AdmissionController,
+    admission_ticket: AdmissionTicket,
+    x_user_identity: Optional[str] = None
+) -> BatchCompletionResponse:
+    """
+    Executes the completion requests of a batch using a single orchestration manager.
+    The agent is set up once; each request holds an execution slot of the batch priority class
+    while it runs, and the requests run concurrently up to the batch concurrency limit.
+    """
+    completion_requests = batch_request.get_completion_requests()
+
+    # A batch never has more requests waiting for or holding a slot than the scheduler allows for the batch priority class.
+    max_concurrency = admission_controller.scheduler.max_class_concurrency[CompletionPriorityClasses.BATCH]
+    if batch_request.max_concurrency is not None:
+        max_concurrency = max(1, min(batch_request.max_concurrency, max_concurrency))
+
+    items = []
+    if len(completion_requests) > 0:
+        orchestration_manager = OrchestrationManager(
+            completion_request = completion_requests[0],
+            configuration = config,
+            plugin_manager = plugin_manager,
+            operations_manager = None,
+            instance_id = instance_id,
+            user_identity = UserIdentity(**json.loads(x_user_identity))
+        )
+        results = await orchestration_manager.invoke_batch_async(
+            completion_requests,
+            max_concurrency,
+            schedule = lambda: admission_controller.schedule(admission_ticket))
+
+        for index, (completion_request, result) in enumerate(zip(completion_requests, results)):
+            if isinstance(result, CompletionResponse):
+                items.append(BatchCompletionItemResult(
+                    index = index,
+                    operation_id = completion_request.operation_id,
+                    status = OperationStatus.COMPLETED if not result.is_error else OperationStatus.FAILED,
+                    completion_response = result,
+                    errors = result.errors or []
+                ))
+            else:
+                logger.error(f'The completion request {completion_request.operation_id} of batch {batch_request.operation_id} failed: {result}')
+                items.append(BatchCompletionItemResult(
+                    index = index,
+                    operation_id = completion_request.operation_id,
+                    status = OperationStatus.FAILED,
+                    errors = [f'{result}']
+                ))
+
+    completed_count = sum(1 for item in items if item.status == OperationStatus.COMPLETED)
+    return BatchCompletionResponse(
+        operation_id = batch_request.operation_id,
+        items = items,
+        completed_count = completed_count,
+        failed_count = len(items) - completed_count
+    )
+
+def admit_batch_completion_request(
+    instance_id: str,
+    batch_request: KnowledgeManagementBatchCompletionRequest,
+    admission_controller: AdmissionController,
+    x_user_identity: Optional[str] = None) -> AdmissionTicket:
+    """
+    Admits a batch as a single request of the batch priority class.
+    The batch only takes a place in the wait queue; its completion requests wait for their own execution slots.
+    """
+    return admission_controller.admit(
+        instance_id,
+        get_user_principal_name(x_user_identity),
+        agent_name = batch_request.agent.name if batch_request.agent is not None else None,
+        priority_class = CompletionPriorityClasses.BATCH,
+        holds_slot = False
+    )
+
+@router.post(
+    '/completions/stream',
+    summary = 'Stream a completion using server-sent events.',
+    response_class = StreamingResponse,
+    responses = {
+        200: {
+            'description': 'Stream of token events followed by a completion event containing the CompletionResponse.',
+            'content': {'text/event-stream': {}}
+        },
+        429: {'description': 'Too many completion requests are in progress. Retry after the interval in the Retry-After header.'},
+        503: {'description': 'The LangChainAPI is shutting down. Retry the request after the interval in the Retry-After header.'}
+    }
+)
+async def stream_completion_request(
+    instance_id: str,
+    completion_request: CompletionRequestBase = Depends(resolve_completion_request),
+    config: Configuration = Depends(get_config),
+    plugin_manager: PluginManager = Depends(get_plugin_manager),
+    admission_controller: AdmissionController = Depends(get_admission_controller),
+    x_user_identity: Optional[str] = Header(None)
+) -> StreamingResponse:
+    """
+    Generates the completion response and streams the generated text as server-sent events.
+    The State API is not used; the final CompletionResponse is sent as the last event of the stream.
+
+    Returns
+    -------
+    StreamingResponse
+        The text/event-stream response.
+    """
+    try:
+        admission_ticket = admission_controller.admit(
+            instance_id,
+            get_user_principal_name(x_user_identity),
+            agent_name = completion_request.agent.name if completion_request.agent is not None else None
+        )
+    except AdmissionRejectedException as e:
+        handle_admission_rejected(e)
+
+    return StreamingResponse(
+        stream_completion_events(
+            instance_id,
+            completion_request,
+            config,
+            plugin_manager,
+            admission_controller,
+            admission_ticket,
+            x_user_identity
+        ),
+        media_type = 'text/event-stream',
+        headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        # Releases the admission ticket if the stream was never started.
+        background = BackgroundTask(admission_controller.release, admission_ticket)
+    )
+
+async def stream_completion_events(
+    instance_id: str,
+    completion_request: KnowledgeManagementCompletionRequest,
+    config: Configuration,
+    plugin_manager: PluginManager,
+    admission_controller: AdmissionController,
+    admission_ticket: AdmissionTicket,
+    x_user_identity: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Executes the completion request and yields the server-sent events of the stream.
+    """
+    async with admission_controller.run(admission_ticket):
+        with tracer.start_as_current_span('langchainapi_stream_completion_response', kind=SpanKind.SERVER) as span:
+            try:
+                span.set_attribute('operation_id', completion_request.operation_id)
+                span.set_attribute('instance_id', instance_id)
+                span.set_attribute('user_identity', x_user_identity)
+
+                orchestration_manager = OrchestrationManager(
+                    completion_request = completion_request,
+                    configuration = config,
+                    plugin_manager = plugin_manager,
+                    operations_manager = None,
+                    instance_id = instance_id,
+                    user_identity = UserIdentity(**json.loads(x_user_identity))
+                )
+
+                async for item in orchestration_manager.stream_async(completion_request):
+                    if isinstance(item, CompletionResponse):
+                        yield format_server_sent_event('completion', item.model_dump_json())
+                    else:
+                        yield format_server_sent_event('token', json.dumps({'value': item}))
+            except Exception as e:
+                logger.error(e, stack_info=True, exc_info=True)
+                Telemetry.record_exception(span, e)
+                yield format_server_sent_event('error', json.dumps({'errors': [f'{e}']}))
+
+def format_server_sent_event(event: str, data: str) -> str:
+    """
+    Formats a server-sent event.
+
+    Parameters
+    ----------
+    event : str
+        The name of the event.
+    data : str
+        The single-line data of the event.
+
+    Returns
+    -------
+    str
+        The event formatted for a text/event-stream response.
+    """
+    return f'event: {event}\ndata: {data}\n\n'
+
+def get_user_principal_name(x_user_identity: Optional[str]) -> Optional[str]:
+    """
+    Retrieves the user principal name from the X-USER-IDENTITY header value.
+
+    Parameters
+    ----------
+    x_user_identity : str
+        The JSON serialized user identity.
+
+    Returns
+    -------
+    str
+        The user principal name, or None if the header value is missing or invalid.
+    """
+    try:
+        return UserIdentity(**json.loads(x_user_identity)).upn
+    except Exception:
+        return None
+
+def handle_admission_rejected(exception: AdmissionRejectedException):
+    """
+    Handles a completion request that was rejected by the admission controller.
+
+    Parameters
+    ----------
+    exception : AdmissionRejectedException
+        The exception raised by the admission controller.
+    """
+    logger.warning(str(exception))
+    raise HTTPException(
+        status_code = exception.status_code,
+        detail = str(exception),
+        headers = {'Retry-After': str(exception.retry_after_seconds)}
+    ) from exception
+
 def handle_exception(exception: Exception, status_code: int = 500):
     """
     Handles an exception that occurred while processing a request.
@@ -0,0 +1,5 @@
+from .azure_credential_manager import (
+    AsyncCachingTokenCredential,
+    AzureCredentialManager,
+    CachingTokenCredential
+)
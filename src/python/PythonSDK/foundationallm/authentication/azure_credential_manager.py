@@ -0,0 +1,283 @@
+"""
+Class: AzureCredentialManager
+Description: Process-wide registry of Azure credentials with per-scope token caching.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from azure.core.credentials import AccessToken, TokenCredential
+from azure.identity import DefaultAzureCredential
+
+# Tokens are refreshed when they expire within this margin.
+DEFAULT_REFRESH_MARGIN_SECONDS = 300
+
+DEFAULT_COGNITIVE_SERVICES_SCOPE = 'https://cognitiveservices.azure.com/.default'
+
+class CachingTokenCredential(TokenCredential):
+    """
+    Wraps a credential and caches its tokens per scope and tenant.
+
+    A cached token is returned until it is within the refresh margin of its expiry.
+    Within the margin, one caller refreshes the token while the other callers keep
+    using the cached token, as long as it has not expired.
+    """
+    def __init__(self, credential: TokenCredential, refresh_margin_seconds: float = DEFAULT_REFRESH_MARGIN_SECONDS):
+        """
+        Initializes the caching credential.
+
+        Parameters
+        ----------
+        credential : TokenCredential
+            The credential used to acquire the tokens.
+        refresh_margin_seconds : float
+            The time before expiry at which a cached token is refreshed.
+        """
+        self.credential = credential
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.__tokens: Dict[Tuple, AccessToken] = {}
+        self.__locks: Dict[Tuple, threading.Lock] = {}
+        self.__locks_lock = threading.Lock()
+
+    def get_token(
+        self,
+        *scopes: str,
+        claims: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        **kwargs) -> AccessToken:
+        """
+        Gets a token for the specified scopes from the cache, acquiring it if needed.
+
+        Parameters
+        ----------
+        scopes : str
+            The scopes of the token.
+        claims : str
+            Additional claims required in the token. Tokens requested with claims
+            answer a claims challenge and are never served from the cache.
+        tenant_id : str
+            The tenant of the token.
+
+        Returns
+        -------
+        AccessToken
+            The access token.
+        """
+        if claims:
+            return self.credential.get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+
+        key = (scopes, tenant_id)
+        token = self.__get_cached_token(key)
+        if token is not None:
+            return token
+
+        lock = self.__get_lock(key)
+        # Callers holding a token that has not expired yet do not wait for the refresh.
+        cached = self.__tokens.get(key)
+        if not lock.acquire(blocking = cached is None or cached.expires_on <= time.time()):
+            return cached
+        try:
+            token = self.__get_cached_token(key)
+            if token is None:
+                token = self.credential.get_token(*scopes, tenant_id=tenant_id, **kwargs)
+                self.__tokens[key] = token
+            return token
+        finally:
+            lock.release()
+
+    def is_cached(self, *scopes: str, tenant_id: Optional[str] = None) -> bool:
+        """
+        Indicates whether a token for the specified scopes is cached and does not need to be refreshed.
+        """
+        return self.__get_cached_token((scopes, tenant_id)) is not None
+
+    def close(self):
+        # The shared credential outlives the clients using it.
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def __get_cached_token(self, key: Tuple) -> Optional[AccessToken]:
+        token = self.__tokens.get(key)
+        if token is not None and token.expires_on - self.refresh_margin_seconds > time.time():
+            return token
+        return None
+
+    def __get_lock(self, key: Tuple) -> threading.Lock:
+        with self.__locks_lock:
+            return self.__locks.setdefault(key, threading.Lock())
+
+class AsyncCachingTokenCredential:
+    """
+    Asynchronous view of a CachingTokenCredential, for use with the asynchronous Azure SDK clients.
+    Cached tokens are returned without blocking the event loop; tokens are acquired on a worker thread.
+    """
+    def __init__(self, credential: CachingTokenCredential):
+        self.credential = credential
+
+    async def get_token(
+        self,
+        *scopes: str,
+        claims: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        **kwargs) -> AccessToken:
+        """
+        Gets a token for the specified scopes from the cache, acquiring it on a worker thread if needed.
+        """
+        if not claims and self.credential.is_cached(*scopes, tenant_id=tenant_id):
+            return self.credential.get_token(*scopes, tenant_id=tenant_id, **kwargs)
+        return await asyncio.to_thread(
+            self.credential.get_token, *scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+
+    async def close(self):
+        # The shared credential outlives the clients using it.
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+class AzureCredentialManager:
+    """
+    Shares the Azure credentials and their cached tokens across the process.
+
+    Creating a DefaultAzureCredential walks the credential chain and every new instance
+    acquires its own tokens. The credentials returned by this class are created once per
+    process and cache their tokens per scope, so token acquisition only happens when a
+    token is about to expire.
+    """
+    refresh_margin_seconds : float = DEFAULT_REFRESH_MARGIN_SECONDS
+    __lock = threading.Lock()
+    # The shared credentials, keyed by whether they exclude the environment credential.
+    __credentials: Dict[bool, CachingTokenCredential] = {}
+    __developer_credential: Optional[CachingTokenCredential] = None
+    __async_credentials: Dict[bool, AsyncCachingTokenCredential] = {}
+
+    @staticmethod
+    def get_credential(exclude_environment_credential: bool = True) -> CachingTokenCredential:
+        """
+        Gets the shared DefaultAzureCredential.
+
+        Parameters
+        ----------
+        exclude_environment_credential : bool
+            Whether the credential chain skips the service principal set in the environment variables.
+            Each value has its own shared credential and token cache.
+
+        Returns
+        -------
+        CachingTokenCredential
+            The shared credential.
+        """
+        credential = AzureCredentialManager.__credentials.get(exclude_environment_credential)
+        if credential is None:
+            with AzureCredentialManager.__lock:
+                credential = AzureCredentialManager.__credentials.get(exclude_environment_credential)
+                if credential is None:
+                    credential = CachingTokenCredential(
+                        DefaultAzureCredential(exclude_environment_credential=exclude_environment_credential),
+                        AzureCredentialManager.refresh_margin_seconds)
+                    AzureCredentialManager.__credentials[exclude_environment_credential] = credential
+        return credential
+
+    @staticmethod
+    def get_developer_credential() -> CachingTokenCredential:
+        """
+        Gets the shared credential used when FOUNDATIONALLM_CONTEXT is set to DEBUG,
+        which only uses the Azure CLI and Azure Developer CLI credentials.
+        Otherwise, gets the shared DefaultAzureCredential.
+
+        Returns
+        -------
+        CachingTokenCredential
+            The shared credential.
+        """
+        if os.getenv('FOUNDATIONALLM_CONTEXT', 'NONE') != 'DEBUG':
+            return AzureCredentialManager.get_credential()
+
+        if AzureCredentialManager.__developer_credential is None:
+            with AzureCredentialManager.__lock:
+                if AzureCredentialManager.__developer_credential is None:
+                    AzureCredentialManager.__developer_credential = CachingTokenCredential(
+                        DefaultAzureCredential(
+                            exclude_workload_identity_credentials=True,
+                            exclude_developer_cli_credential=False,
+                            exclude_cli_credential=False,
+                            exclude_environment_credential=True,
+                            exclude_managed_identity_credential=True,
+                            exclude_powershell_credential=True,
+                            exclude_visual_studio_code_credential=True,
+                            exclude_shared_token_cache_credentials=True,
+                            exclude_interactive_browser_credential=True),
+                        AzureCredentialManager.refresh_margin_seconds)
+        return AzureCredentialManager.__developer_credential
+
+    @staticmethod
+    def get_async_credential(exclude_environment_credential: bool = True) -> AsyncCachingTokenCredential:
+        """
+        Gets the shared credential for the asynchronous Azure SDK clients.
+        It shares the token cache of the credential returned by get_credential().
+
+        Parameters
+        ----------
+        exclude_environment_credential : bool
+            Whether the credential chain skips the service principal set in the environment variables.
+
+        Returns
+        -------
+        AsyncCachingTokenCredential
+            The shared asynchronous credential.
+        """
+        async_credential = AzureCredentialManager.__async_credentials.get(exclude_environment_credential)
+        if async_credential is None:
+            credential = AzureCredentialManager.get_credential(exclude_environment_credential)
+            with AzureCredentialManager.__lock:
+                async_credential = AzureCredentialManager.__async_credentials.setdefault(
+                    exclude_environment_credential,
+                    AsyncCachingTokenCredential(credential))
+        return async_credential
+
+    @staticmethod
+    def get_token(scope: str) -> AccessToken:
+        """
+        Gets a token for the specified scope using the shared credential.
+
+        Parameters
+        ----------
+        scope : str
+            The scope of the token.
+
+        Returns
+        -------
+        AccessToken
+            The access token.
+        """
+        return AzureCredentialManager.get_credential().get_token(scope)
+
+    @staticmethod
+    def get_bearer_token_provider(scope: str = DEFAULT_COGNITIVE_SERVICES_SCOPE) -> Callable[[], str]:
+        """
+        Gets a callable returning a bearer token for the specified scope, for use as
+        the azure_ad_token_provider of the OpenAI clients.
+
+        Parameters
+        ----------
+        scope : str
+            The scope of the tokens.
+
+        Returns
+        -------
+        Callable[[], str]
+            The bearer token provider.
+        """
+        credential = AzureCredentialManager.get_credential()
+        def token_provider() -> str:
+            return credential.get_token(scope).token
+        return token_provider
@@ -1,6 +1,13 @@
 """ 
 Configuration classes for FoundationaLLM Python SDK
 """
+from .configuration_providers import (
+    AppConfigurationProvider,
+    ConfigurationProvider,
+    ConfigurationSnapshot,
+    FileConfigurationProvider
+)
 from .configuration import Configuration
+from .configuration_settings import read_setting, read_settings
 from .user_identity import UserIdentity
 from .context import Context
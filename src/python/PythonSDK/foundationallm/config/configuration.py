@@ -1,40 +1,103 @@
 import os
 import logging
 import json
-from tenacity import retry, wait_random_exponential, stop_after_attempt, RetryError
-from azure.appconfiguration.provider import (
-    AzureAppConfigurationKeyVaultOptions,
-    load
+import threading
+from typing import Optional
+from .configuration_providers import (
+    AppConfigurationProvider,
+    ConfigurationProvider,
+    FileConfigurationProvider
 )
-from azure.identity import DefaultAzureCredential
+from .environment_variables import (
+    FOUNDATIONALLM_APP_CONFIGURATION_URI,
+    FOUNDATIONALLM_CONFIGURATION_FILE,
+    FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS,
+    FOUNDATIONALLM_CONFIGURATION_REFRESH_SENTINEL_KEY
+)
+
+# The refresh interval used when a sentinel key is set without an explicit interval.
+DEFAULT_SENTINEL_REFRESH_INTERVAL_SECONDS = 30
 
 class Configuration():
-    def __init__(self):
-        """Init"""
-        try:
-            app_config_uri = os.environ['FOUNDATIONALLM_APP_CONFIGURATION_URI']
-        except Exception as e:
-            raise e
+    def __init__(
+        self,
+        provider: Optional[ConfigurationProvider] = None,
+        initial_provider: Optional[ConfigurationProvider] = None):
+        """
+        Init
 
-        credential = DefaultAzureCredential(
-            exclude_environment_credential=True)
+        Parameters
+        ----------
+        - provider : ConfigurationProvider
+            The source of the configuration settings. Defaults to the local snapshot file set in
+            FOUNDATIONALLM_CONFIGURATION_FILE when no App Configuration URI is set, and to
+            Azure App Configuration otherwise.
+        - initial_provider : ConfigurationProvider
+            A fast source, such as a snapshot file baked into the container, serving the settings
+            until the provider is loaded in the background. Defaults to the snapshot file set in
+            FOUNDATIONALLM_CONFIGURATION_FILE when an App Configuration URI is also set.
+        """
+        # The environment is read once; get_value() is called on hot paths.
+        self.__allow_env_vars = False
+        if "foundationallm-configuration-allow-environment-variables" in os.environ:
+            self.__allow_env_vars = bool(os.environ[
+                    "foundationallm-configuration-allow-environment-variables"
+                    ])
 
-        # Connect to Azure App Configuration.
-        self.__config = load(endpoint=app_config_uri, credential=credential,
-                             key_vault_options=
-                                AzureAppConfigurationKeyVaultOptions(credential=credential))
+        sentinel_key = os.environ.get(FOUNDATIONALLM_CONFIGURATION_REFRESH_SENTINEL_KEY)
+        default_refresh_interval_seconds = DEFAULT_SENTINEL_REFRESH_INTERVAL_SECONDS if sentinel_key else 0
+        try:
+            self.__refresh_interval_seconds = float(os.environ.get(
+                FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS,
+                default_refresh_interval_seconds))
+        except Exception:
+            logging.warning(
+                f'The {FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS} environment variable is invalid. Using the default value {default_refresh_interval_seconds}.')
+            self.__refresh_interval_seconds = default_refresh_interval_seconds
+
+        if provider is None:
+            configuration_file = os.environ.get(FOUNDATIONALLM_CONFIGURATION_FILE)
+            if configuration_file and FOUNDATIONALLM_APP_CONFIGURATION_URI not in os.environ:
+                provider = FileConfigurationProvider(configuration_file)
+            else:
+                try:
+                    app_config_uri = os.environ[FOUNDATIONALLM_APP_CONFIGURATION_URI]
+                except Exception as e:
+                    raise e
+                provider = AppConfigurationProvider(
+                    app_config_uri,
+                    sentinel_key = sentinel_key if self.__refresh_interval_seconds > 0 else None,
+                    refresh_interval_seconds = self.__refresh_interval_seconds)
+                if initial_provider is None and configuration_file:
+                    initial_provider = FileConfigurationProvider(configuration_file)
+        self.__provider = provider
+
+        if initial_provider is not None:
+            # Start from the fast source and load the provider in the background.
+            self.__snapshot = initial_provider.load()
+        else:
+            self.__snapshot = self.__provider.load()
+
+        self.__stop_refresh = threading.Event()
+        if initial_provider is not None or self.__refresh_interval_seconds > 0:
+            threading.Thread(
+                target=self.__refresh_loop,
+                args=(initial_provider is not None,),
+                name='foundationallm-configuration-refresh',
+                daemon=True).start()
 
     def get_value(self, key: str) -> str:
         """
-        Retrieves the value from Azure App Configuration.
+        Retrieves the value from the in-memory snapshot of the configuration settings.
         Otherwise, retrieves the value from the environment variable.
         If the value is not found the method raises an exception.
+        The method performs no I/O; the snapshot is refreshed in the background.
 
         Parameters
         ----------
         - key : str
             The key name of the configuration setting to retrieve.
-        
+
         Returns
         -------
         The configuration value
@@ -47,25 +110,17 @@ class Configuration():
         value = None
 
         # will have future usage with Azure App Configuration
-        # if foundationallm-configuration-allow-environment-variables exists and is True, 
+        # if foundationallm-configuration-allow-environment-variables exists and is True,
         #   then the environment variables will be checked first, then KV
-        # if foundationallm-configuration-allow-environment-variables does not exist 
-        #   OR foundationallm-configuration-allow-environment-variables is False, 
+        # if foundationallm-configuration-allow-environment-variables does not exist
+        #   OR foundationallm-configuration-allow-environment-variables is False,
         #   then check App config and then KV
-        allow_env_vars = False
-        if "foundationallm-configuration-allow-environment-variables" in os.environ:
-            allow_env_vars = bool(os.environ[
-                    "foundationallm-configuration-allow-environment-variables"
-                    ])
-
-        if allow_env_vars is True:
+        if self.__allow_env_vars is True:
             value = os.environ.get(key)
 
         if value is None:
-            try:
-                value = self.__get_config_with_retry(name=key)
-            except Exception as e:
-                pass
+            # The snapshot holds every setting, so a missing key is known to be missing without a lookup in App Configuration.
+            value = self.__snapshot.values.get(key)
 
         if value is not None:
             return value
@@ -74,7 +129,7 @@ class Configuration():
 
     def get_feature_flag(self, key: str) -> bool:
         """
-        Retrieves the feature flag from Azure App Configuration.
+        Retrieves the feature flag from the in-memory snapshot of the configuration settings.
         If the value is not found, returns false.
         Otherwise, retrieves the enabled value of the feature flag.
 
@@ -82,51 +137,67 @@ class Configuration():
         ----------
         - key : str
             The key name of the feature flag to retrieve.
-        
+
         Returns
         -------
         The enabled value of the feature flag
-        
+
         """
         if key is None:
             raise KeyError('The key parameter is required for Configuration.get_feature_flag().')
 
-        value = False
+        return self.__snapshot.feature_flags.get(key, False)
 
-        if "FeatureManagementFeatureFlags" in self.__config.keys():
-            if key in self.__config["FeatureManagementFeatureFlags"].keys():
-                try:
-                    feature_flag_setting = self.__config["FeatureManagementFeatureFlags"][key]
-                    obj = json.loads(feature_flag_setting)
-                    value = obj["enabled"]
-                except Exception as e:
-                    pass
-
-        return value
-
-    def __retry_before_sleep(self, retry_state):
-        # Log the outcome of each retry attempt.
-        message = f"""Retrying {retry_state.fn}:
-                        attempt {retry_state.attempt_number}
-                        ended with: {retry_state.outcome}"""
-        if retry_state.outcome.failed:
-            ex = retry_state.outcome.exception()
-            message += f"; Exception: {ex.__class__.__name__}: {ex}"
-        if retry_state.attempt_number < 1:
-            logging.info(message)
-        else:
-            logging.warning(message)
-
-    # Retry with jitter on transient errors. Initially up to 2^x * 1 seconds between each retry
-    # until the range reaches 30 seconds, then randomly up to 60 seconds afterwards.
-    # Stop after five retry attempts.
-    @retry(
-        wait=wait_random_exponential(multiplier=1, max=5),
-        stop=stop_after_attempt(5),
-        before_sleep=__retry_before_sleep
-    )
-    def __get_config_with_retry(self, name):
-        try:
-            return self.__config[name]
-        except RetryError:
-            pass
+    def refresh(self):
+        """
+        Refreshes the configuration snapshot if the configuration settings changed.
+        This method performs I/O and is called from the background refresh thread.
+        """
+        snapshot = self.__provider.refresh()
+        if snapshot is not None:
+            self.__snapshot = snapshot
+
+    def close(self):
+        """
+        Stops the background refresh of the configuration snapshot.
+        The current snapshot keeps being served.
+        """
+        self.__stop_refresh.set()
+
+    def export_snapshot(self, path: str):
+        """
+        Writes the current configuration settings to a local snapshot file that can be loaded
+        with FOUNDATIONALLM_CONFIGURATION_FILE. The file contains the resolved Key Vault secrets
+        and must be protected accordingly.
+
+        Parameters
+        ----------
+        - path : str
+            The path of the JSON (.json) or YAML (.yaml, .yml) file to write.
+        """
+        values = self.__snapshot.values
+        extension = os.path.splitext(path)[1].lower()
+        with open(path, 'w', encoding='utf-8') as file:
+            if extension in ['.yaml', '.yml']:
+                import yaml
+                yaml.safe_dump(values, file, sort_keys=True, allow_unicode=True)
+            else:
+                json.dump(values, file, indent=2, sort_keys=True, default=str)
+
+    def __refresh_loop(self, load_provider: bool):
+        if load_provider and not self.__stop_refresh.is_set():
+            try:
+                self.__snapshot = self.__provider.load()
+            except Exception as e:
+                # Keep serving the initial snapshot; the provider is loaded by the next refresh.
+                logging.warning(f'The configuration could not be loaded: {e}')
+
+        if self.__refresh_interval_seconds <= 0:
+            return
+
+        while not self.__stop_refresh.wait(self.__refresh_interval_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the current snapshot until the next refresh succeeds.
+                logging.warning(f'The configuration could not be refreshed: {e}')
@@ -0,0 +1,198 @@
+"""
+Configuration providers loading the settings served by the Configuration class.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+from azure.appconfiguration.provider import (
+    AzureAppConfigurationKeyVaultOptions,
+    WatchKey,
+    load
+)
+from azure.identity import DefaultAzureCredential
+
+# The key holding the feature flags, keyed by feature flag name.
+FEATURE_FLAGS_KEY = "FeatureManagementFeatureFlags"
+
+class ConfigurationSnapshot():
+    """
+    Immutable in-memory copy of the configuration settings and feature flags.
+    A new snapshot replaces the current one when the configuration is refreshed.
+    """
+    def __init__(self, values: Dict[str, Any], feature_flags: Dict[str, bool]):
+        self.values = values
+        self.feature_flags = feature_flags
+
+    @staticmethod
+    def from_values(values: Dict[str, Any]) -> 'ConfigurationSnapshot':
+        """
+        Creates a snapshot from the configuration settings, parsing the feature flags they contain.
+
+        Parameters
+        ----------
+        values : Dict[str, Any]
+            The configuration settings, keyed by setting name.
+
+        Returns
+        -------
+        ConfigurationSnapshot
+            The configuration snapshot.
+        """
+        feature_flag_settings = values.get(FEATURE_FLAGS_KEY) or {}
+        if isinstance(feature_flag_settings, str):
+            # Settings loaded from .env files are not parsed.
+            try:
+                feature_flag_settings = json.loads(feature_flag_settings)
+            except Exception as e:
+                feature_flag_settings = {}
+
+        feature_flags = {}
+        for key, feature_flag_setting in feature_flag_settings.items():
+            try:
+                feature_flags[key] = json.loads(feature_flag_setting)["enabled"]
+            except Exception as e:
+                pass
+
+        return ConfigurationSnapshot(values, feature_flags)
+
+class ConfigurationProvider(ABC):
+    """
+    Base class for the sources of configuration settings.
+    """
+    @abstractmethod
+    def load(self) -> ConfigurationSnapshot:
+        """
+        Loads all the configuration settings.
+
+        Returns
+        -------
+        ConfigurationSnapshot
+            The configuration snapshot.
+        """
+
+    @abstractmethod
+    def refresh(self) -> Optional[ConfigurationSnapshot]:
+        """
+        Reloads the configuration settings if they changed since they were last loaded.
+
+        Returns
+        -------
+        ConfigurationSnapshot
+            The new configuration snapshot, or None if the settings did not change.
+        """
+
+class AppConfigurationProvider(ConfigurationProvider):
+    """
+    Loads the configuration settings from Azure App Configuration, resolving the Key Vault references.
+    """
+    def __init__(self, app_config_uri: str, sentinel_key: Optional[str] = None, refresh_interval_seconds: float = 0):
+        """
+        Initializes the Azure App Configuration provider.
+
+        Parameters
+        ----------
+        app_config_uri : str
+            The URI of the Azure App Configuration instance.
+        sentinel_key : str
+            The key watched to detect configuration changes. Without a sentinel key,
+            all the settings are reloaded on every refresh.
+        refresh_interval_seconds : float
+            The minimum interval between two checks of the sentinel key.
+        """
+        credential = DefaultAzureCredential(
+            exclude_environment_credential=True)
+
+        self.__load_options = {
+            'endpoint': app_config_uri,
+            'credential': credential,
+            'key_vault_options': AzureAppConfigurationKeyVaultOptions(credential=credential)
+        }
+        if sentinel_key:
+            # Reload all the settings when the sentinel key changes.
+            self.__load_options['refresh_on'] = [WatchKey(sentinel_key)]
+            self.__load_options['refresh_interval'] = refresh_interval_seconds
+            self.__load_options['on_refresh_success'] = self.__on_refresh_success
+        self.__config = None
+        self.__refreshed = False
+
+    def load(self) -> ConfigurationSnapshot:
+        # Connect to Azure App Configuration.
+        self.__config = load(**self.__load_options)
+        return ConfigurationSnapshot.from_values(dict(self.__config.items()))
+
+    def refresh(self) -> Optional[ConfigurationSnapshot]:
+        if self.__config is None or 'refresh_on' not in self.__load_options:
+            return self.load()
+
+        self.__refreshed = False
+        self.__config.refresh()
+        return ConfigurationSnapshot.from_values(dict(self.__config.items())) if self.__refreshed else None
+
+    def __on_refresh_success(self):
+        self.__refreshed = True
+
+class FileConfigurationProvider(ConfigurationProvider):
+    """
+    Loads the configuration settings from a local snapshot file.
+
+    JSON and YAML files contain a mapping of setting names to values, as written by
+    Configuration.export_snapshot(). .env files contain one KEY=VALUE setting per line;
+    a double underscore in a key is read as the ':' separator of setting names.
+    """
+    def __init__(self, path: str):
+        """
+        Initializes the file configuration provider.
+
+        Parameters
+        ----------
+        path : str
+            The path of the JSON (.json), YAML (.yaml, .yml) or .env snapshot file.
+        """
+        self.path = path
+        self.__modified_time = None
+
+    def load(self) -> ConfigurationSnapshot:
+        self.__modified_time = os.path.getmtime(self.path)
+        with open(self.path, 'r', encoding='utf-8') as file:
+            content = file.read()
+
+        extension = os.path.splitext(self.path)[1].lower()
+        if extension == '.json':
+            values = json.loads(content)
+        elif extension in ['.yaml', '.yml']:
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError('Loading the configuration from a YAML file requires the PyYAML package.') from e
+            values = yaml.safe_load(content) or {}
+        elif extension == '.env' or os.path.basename(self.path).startswith('.env'):
+            values = self.__parse_env_file(content)
+        else:
+            raise ValueError(f'The configuration file {self.path} is not a JSON, YAML or .env file.')
+
+        if not isinstance(values, dict):
+            raise ValueError(f'The configuration file {self.path} must contain a mapping of setting names to values.')
+
+        return ConfigurationSnapshot.from_values(values)
+
+    def refresh(self) -> Optional[ConfigurationSnapshot]:
+        if self.__modified_time is not None and os.path.getmtime(self.path) == self.__modified_time:
+            return None
+        return self.load()
+
+    def __parse_env_file(self, content: str) -> Dict[str, str]:
+        values = {}
+        for line in content.splitlines():
+            line = line.strip()
+            if line == '' or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            key = key.strip()
+            if key.startswith('export '):
+                key = key[len('export '):].strip()
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in ['"', "'"]:
+                value = value[1:-1]
+            values[key.replace('__', ':')] = value
+        return values
@@ -0,0 +1,76 @@
+"""
+Functions: read_setting, read_settings
+Description: Reads optional configuration settings, falling back to their default values.
+"""
+from logging import Logger
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from .configuration import Configuration
+
+def read_setting(
+    config: Configuration,
+    key: str,
+    convert: Callable[[Any], Any],
+    default: Any,
+    logger: Logger,
+    minimum: Optional[float] = None,
+    fallback_message: Optional[str] = None) -> Any:
+    """
+    Reads an optional configuration setting.
+    A setting that is missing, cannot be converted, or is lower than the minimum falls back to its default value.
+
+    Parameters
+    ----------
+    config : Configuration
+        The application configuration.
+    key : str
+        The key of the setting.
+    convert : Callable
+        Converts the configuration value to the type of the setting.
+    default : Any
+        The value used when the setting is missing or invalid.
+    logger : Logger
+        The logger recording the use of the default value.
+    minimum : float
+        The lowest valid value of the setting, if any.
+    fallback_message : str
+        Describes the effect of the default value in the log. Defaults to the default value itself.
+
+    Returns
+    -------
+    Any
+        The value of the setting.
+    """
+    try:
+        value = convert(config.get_value(key))
+        if minimum is not None and value < minimum:
+            raise ValueError(f'The {key} setting must be at least {minimum}.')
+        return value
+    except Exception:
+        logger.info(f'The {key} setting is not set or is invalid. {fallback_message or f"Using the default value {default}."}')
+        return default
+
+def read_settings(
+    config: Configuration,
+    settings: Iterable[Tuple],
+    logger: Logger) -> Dict[str, Any]:
+    """
+    Reads several optional configuration settings with read_setting.
+
+    Parameters
+    ----------
+    config : Configuration
+        The application configuration.
+    settings : Iterable[Tuple]
+        The (key, convert, default) or (key, convert, default, minimum) tuples of the settings.
+    logger : Logger
+        The logger recording the use of default values.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The values of the settings, by key.
+    """
+    return {
+        setting[0]: read_setting(config, *setting[:3], logger, *setting[3:])
+        for setting in settings
+    }
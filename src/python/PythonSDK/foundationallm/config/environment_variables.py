@@ -12,3 +12,27 @@ The build version of the container. This is also used for the app version used
 to validate the minimum version of the app required to use certain configuration entries.
 """
 FOUNDATIONALLM_VERSION = "FOUNDATIONALLM_VERSION"
+
+"""
+The URI of the Azure App Configuration instance.
+"""
+FOUNDATIONALLM_APP_CONFIGURATION_URI = "FOUNDATIONALLM_APP_CONFIGURATION_URI"
+
+"""
+The App Configuration key watched to detect configuration changes.
+When the value of the key changes, all the configuration settings are reloaded.
+"""
+FOUNDATIONALLM_CONFIGURATION_REFRESH_SENTINEL_KEY = "FOUNDATIONALLM_CONFIGURATION_REFRESH_SENTINEL_KEY"
+
+"""
+The interval, in seconds, at which the configuration settings are refreshed in the background.
+Without a sentinel key, all the settings are reloaded at this interval. Zero disables the refresh.
+"""
+FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS = "FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS"
+
+"""
+The path of a local JSON, YAML or .env configuration snapshot file.
+When the App Configuration URI is also set, the application starts from the file and
+loads the settings from App Configuration in the background.
+"""
+FOUNDATIONALLM_CONFIGURATION_FILE = "FOUNDATIONALLM_CONFIGURATION_FILE"
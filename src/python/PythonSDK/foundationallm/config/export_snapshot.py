@@ -0,0 +1,16 @@
+"""
+Exports the configuration settings to a local snapshot file, so containers can start
+from the file and load Azure App Configuration in the background.
+
+Usage: python -m foundationallm.config.export_snapshot <path>.json|<path>.yaml
+"""
+import sys
+from foundationallm.config import Configuration
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    Configuration().export_snapshot(sys.argv[1])
+    print(f'The configuration snapshot was written to {sys.argv[1]}.')
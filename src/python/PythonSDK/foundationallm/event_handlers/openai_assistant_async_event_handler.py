@@ -34,6 +34,9 @@ class OpenAIAssistantAsyncEventHandler(AsyncAssistantEventHandler):
         )
         self.image_service = image_service
         self.client = client
+        # Interim results are coalesced so long answers don't produce a State API write per update.
+        self.result_writer = operations_manager.create_result_writer(request.operation_id, request.instance_id) \
+            if operations_manager is not None else None
 
     @override
     async def on_event(self, event: AssistantStreamEvent) -> None:
@@ -123,6 +126,8 @@ class OpenAIAssistantAsyncEventHandler(AsyncAssistantEventHandler):
             time.sleep(2)
 
     async def update_state_api_analysis_results_async(self):
+        if self.result_writer is None:
+            return
         self.interim_result.analysis_results = [] # Clear the analysis results list before adding new results.
         for k, v in self.run_steps.items():
             if not v:
@@ -130,12 +135,21 @@ class OpenAIAssistantAsyncEventHandler(AsyncAssistantEventHandler):
             analysis_result = OpenAIAssistantsHelpers.parse_run_step(v)
             if analysis_result:
                 self.interim_result.analysis_results.append(analysis_result)
-        await self.operations_manager.set_operation_result_async(self.request.operation_id, self.request.instance_id, self.interim_result)
+        self.result_writer.submit(self.interim_result)
 
     async def update_state_api_content_async(self):
+        if self.result_writer is None:
+            return
         self.interim_result.content = [] # Clear the content list before adding new messages.
         for k, v in self.messages.items():
             content_items = OpenAIAssistantsHelpers.parse_message(v)
             self.interim_result.content.extend(content_items)
 
-        await self.operations_manager.set_operation_result_async(self.request.operation_id, self.request.instance_id, self.interim_result)
+        self.result_writer.submit(self.interim_result)
+
+    async def flush_async(self):
+        """
+        Writes the final interim result and waits for the pending State API writes to complete.
+        """
+        if self.result_writer is not None:
+            await self.result_writer.flush_async()
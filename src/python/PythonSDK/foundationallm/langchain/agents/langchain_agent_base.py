@@ -1,11 +1,12 @@
 from abc import abstractmethod
-from typing import List
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from typing import Awaitable, Callable, List, Optional
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage
 from openai import AsyncAzureOpenAI as async_aoi
+from foundationallm.authentication import AzureCredentialManager
 from foundationallm.config import Configuration, UserIdentity
 from foundationallm.langchain.exceptions import LangChainException
+from foundationallm.langchain.language_models import LanguageModelFactory
 from foundationallm.operations import OperationsManager
 from foundationallm.models.messages import MessageHistoryItem
 from foundationallm.models.orchestration import (
@@ -14,6 +15,7 @@ from foundationallm.models.orchestration import (
 )
 from foundationallm.models.resource_providers.configuration import APIEndpointConfiguration
 from foundationallm.plugins import PluginManager
+from foundationallm.resilience import RetryStrategyRegistry
 from foundationallm.telemetry import Telemetry
 from foundationallm.utils.object_utils import ObjectUtils
 
@@ -41,11 +43,18 @@ class LangChainAgentBase():
         self.has_indexing_profiles = False
         self.has_retriever = False
         self.operations_manager = operations_manager
+        # Language model clients and the last validated request are kept so that requests
+        # sharing the same agent and objects, such as the items of a batch, reuse them.
+        self.language_models = {}
+        self.validated_request = None
 
         self.tracer = Telemetry.get_tracer('langchain-agent-base')
 
     @abstractmethod
-    async def invoke_async(self, request: CompletionRequestBase) -> CompletionResponse:
+    async def invoke_async(
+        self,
+        request: CompletionRequestBase,
+        stream_handler: Optional[Callable[[str], Awaitable[None]]] = None) -> CompletionResponse:
         """
         Gets the completion for the request using an async request.
 
@@ -53,6 +62,8 @@ class LangChainAgentBase():
         ----------
         request : CompletionRequestBase
             The completion request to execute.
+        stream_handler : Callable[[str], Awaitable[None]]
+            Optional coroutine receiving the generated text as it is streamed from the language model.
 
         Returns
         -------
@@ -161,13 +172,17 @@ class LangChainAgentBase():
         api_endpoint = ObjectUtils.get_object_by_id(api_endpoint_object_id, objects, APIEndpointConfiguration)        
         scope = api_endpoint.authentication_parameters.get('scope', 'https://cognitiveservices.azure.com/.default')
         # Set up a Azure AD token provider.
-        token_provider = get_bearer_token_provider(
-            DefaultAzureCredential(exclude_environment_credential=True),
-            scope
-        )
+        token_provider = AzureCredentialManager.get_bearer_token_provider(scope)
+        # The shared HTTP client retries the requests with the retry strategy of the endpoint
+        # and sends them through the rate limiter and the circuit breaker of the endpoint.
+        _, http_async_client = LanguageModelFactory(objects, self.config).client_registry.get_http_clients(
+            api_endpoint.url,
+            RetryStrategyRegistry.get_strategy(api_endpoint.retry_strategy_name))
 
         return async_aoi(
             azure_endpoint=api_endpoint.url,
             api_version=api_endpoint.api_version,
             azure_ad_token_provider=token_provider,
+            max_retries=0,
+            http_client=http_async_client
         )
@@ -1,6 +1,8 @@
 ﻿import uuid
+from typing import Any, Awaitable, Callable, Optional
 from langchain_community.callbacks import get_openai_callback
-from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
@@ -119,6 +121,54 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
                 retriever = retriever_factory.get_retriever()
         return retriever
 
+    def _get_language_model(
+        self,
+        objects: dict,
+        ai_model_object_id: str,
+        override_operation_type: OperationTypes = None) -> BaseLanguageModel:
+        """
+        Gets the language model client for an AI model, creating it on first use.
+        Requests executed by the same agent, such as the items of a batch, share the client.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects dictionary of the completion request.
+        ai_model_object_id : str
+            The object identifier of the AI model.
+        override_operation_type : OperationTypes
+            Internally overrides the operation type for the API endpoint.
+
+        Returns
+        -------
+        BaseLanguageModel
+            The language model client.
+        """
+        key = (ai_model_object_id, override_operation_type)
+        if key not in self.language_models:
+            self.language_models[key] = LanguageModelFactory(objects, self.config).get_language_model(
+                ai_model_object_id,
+                override_operation_type=override_operation_type)
+        return self.language_models[key]
+
+    def _validate_request_once(self, request: KnowledgeManagementCompletionRequest):
+        """
+        Validates the completion request unless the agent already validated a request
+        sharing the same agent and objects, as the items of a batch do.
+
+        Parameters
+        ----------
+        request : KnowledgeManagementCompletionRequest
+            The completion request to validate.
+        """
+        if self.validated_request is not None \
+            and request.agent is self.validated_request.agent \
+            and request.objects is self.validated_request.objects:
+            return
+
+        self._validate_request(request)
+        self.validated_request = request
+
     def _get_prompt_template(
         self,
         prompt: MultipartPrompt,
@@ -263,7 +313,84 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
 
         self._validate_conversation_history(request.agent.conversation_history_settings)
 
-    async def invoke_async(self, request: KnowledgeManagementCompletionRequest) -> CompletionResponse:
+    def _get_chunk_text(self, chunk: Any) -> str:
+        """
+        Gets the text carried by a streamed chunk.
+
+        Parameters
+        ----------
+        chunk : Any
+            A string or message chunk produced while streaming.
+
+        Returns
+        -------
+        str
+            The text of the chunk, or an empty string if the chunk does not carry text.
+        """
+        content = chunk.content if isinstance(chunk, BaseMessage) else chunk
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            return ''.join(
+                item if isinstance(item, str) else item.get('text', '')
+                for item in content
+                if isinstance(item, str) or (isinstance(item, dict) and item.get('type') == 'text'))
+        return ''
+
+    def _get_streaming_language_model(self, llm: BaseLanguageModel) -> BaseLanguageModel:
+        """
+        Gets a copy of the language model that reports token usage when streaming.
+
+        Parameters
+        ----------
+        llm : BaseLanguageModel
+            The language model used for the completion request.
+
+        Returns
+        -------
+        BaseLanguageModel
+            The language model to use when streaming.
+        """
+        if hasattr(llm, 'stream_usage'):
+            return llm.model_copy(update={'stream_usage': True})
+        return llm
+
+    async def _invoke_chain_async(
+        self,
+        chain,
+        user_prompt: str,
+        stream_handler: Optional[Callable[[str], Awaitable[None]]]):
+        """
+        Invokes the LCEL chain, streaming the generated text to the stream handler if one is provided.
+
+        Parameters
+        ----------
+        chain : Runnable
+            The LCEL chain to invoke.
+        user_prompt : str
+            The user prompt passed to the chain.
+        stream_handler : Callable[[str], Awaitable[None]]
+            Optional coroutine receiving each generated text chunk.
+
+        Returns
+        -------
+        The output of the chain, aggregated from the streamed chunks when streaming.
+        """
+        if stream_handler is None:
+            return await chain.ainvoke(user_prompt)
+
+        completion = None
+        async for chunk in chain.astream(user_prompt):
+            completion = chunk if completion is None else completion + chunk
+            text = self._get_chunk_text(chunk)
+            if text:
+                await stream_handler(text)
+        return completion
+
+    async def invoke_async(
+        self,
+        request: KnowledgeManagementCompletionRequest,
+        stream_handler: Optional[Callable[[str], Awaitable[None]]] = None) -> CompletionResponse:
         """
         Executes an async completion request.
         If a vector index exists, it will be queryied with the user prompt.
@@ -272,6 +399,10 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
         ----------
         request : KnowledgeManagementCompletionRequest
             The completion request to execute.
+        stream_handler : Callable[[str], Awaitable[None]]
+            Optional coroutine receiving the generated text as it is streamed from the language model.
+            Only the LangChain Expression Language and LangGraph ReAct workflows stream text;
+            the other workflows return the completion without streaming.
 
         Returns
         -------
@@ -279,7 +410,7 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
             Returns a CompletionResponse with the generated summary, the user_prompt,
             generated full prompt with context and token utilization and execution cost details.
         """
-        self._validate_request(request)
+        self._validate_request_once(request)
 
         agent = request.agent
         ai_model_object_properties = request.agent.workflow.get_resource_object_id_properties(
@@ -297,8 +428,9 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
         )
         prompt_object_id = prompt_object_properties.object_id
         prompt = ObjectUtils.get_object_by_id(prompt_object_id, request.objects, MultipartPrompt)
-        language_model_factory = LanguageModelFactory(request.objects, self.config)
-        llm = language_model_factory.get_language_model(ai_model_object_id)
+        llm = self._get_language_model(request.objects, ai_model_object_id)
+        if stream_handler is not None:
+            llm = self._get_streaming_language_model(llm)
 
         # Used by image analysis and LCEL chain only
         ai_model = ObjectUtils.get_object_by_id(ai_model_object_id, request.objects, AIModelBase)
@@ -309,7 +441,7 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
         # Get image attachments that are images with URL file paths.
         image_attachments = [attachment for attachment in request.attachments if (attachment.provider == AttachmentProviders.FOUNDATIONALLM_ATTACHMENT and attachment.content_type.startswith('image/'))] if request.attachments is not None else []
         if len(image_attachments) > 0:
-            image_client = language_model_factory.get_language_model(ai_model_object_id, override_operation_type=OperationTypes.IMAGE_SERVICES)
+            image_client = self._get_language_model(request.objects, ai_model_object_id, override_operation_type=OperationTypes.IMAGE_SERVICES)
             image_svc = ImageService(config=self.config, client=image_client, deployment_name=ai_model.deployment_name)
             image_analysis_results, usage = await image_svc.analyze_images_async(image_attachments)
             if usage is not None:
@@ -330,7 +462,7 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
             operation_type_override = OperationTypes.ASSISTANTS_API
             # create the service
             assistant_svc = OpenAIAssistantsApiService(
-                azure_openai_client=language_model_factory.get_language_model(ai_model_object_id, override_operation_type=OperationTypes.ASSISTANTS_API),
+                azure_openai_client=self._get_language_model(request.objects, ai_model_object_id, override_operation_type=OperationTypes.ASSISTANTS_API),
                 operations_manager=self.operations_manager
             )
 
@@ -469,10 +601,20 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
 
             messages.append(HumanMessage(content=parsed_user_prompt))
 
-            response = await graph.ainvoke(
-                {'messages': messages},
-                config={"configurable": {"original_user_prompt": parsed_user_prompt, **({"recursion_limit": agent.workflow.graph_recursion_limit} if agent.workflow.graph_recursion_limit is not None else {})}}
-            )
+            graph_input = {'messages': messages}
+            graph_config = {"configurable": {"original_user_prompt": parsed_user_prompt, **({"recursion_limit": agent.workflow.graph_recursion_limit} if agent.workflow.graph_recursion_limit is not None else {})}}
+            if stream_handler is None:
+                response = await graph.ainvoke(graph_input, config=graph_config)
+            else:
+                response = None
+                async for event in graph.astream_events(graph_input, config=graph_config, version='v2'):
+                    if event['event'] == 'on_chat_model_stream':
+                        text = self._get_chunk_text(event['data']['chunk'])
+                        if text:
+                            await stream_handler(text)
+                    elif event['event'] == 'on_chain_end' and len(event.get('parent_ids', [])) == 0:
+                        # The end event of the root run carries the final graph state.
+                        response = event['data']['output']
             # TODO: process tool messages with analysis results AIMessage with content='' but has addition_kwargs={'tool_calls';[...]}
 
             # Get ContentArtifact items from ToolMessages
@@ -487,6 +629,7 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
                                 content_artifacts.append(item)
 
             final_message = response["messages"][-1]
+            final_message_usage = final_message.usage_metadata or {}
             response_content = OpenAITextMessageContentItem(
                 value = final_message.content,
                 agent_capability_category = AgentCapabilityCategories.FOUNDATIONALLM_KNOWLEDGE_MANAGEMENT
@@ -498,9 +641,9 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
                         user_prompt = request.user_prompt,
                         user_prompt_rewrite = request.user_prompt_rewrite,
                         full_prompt = prompt.prefix,
-                        completion_tokens = final_message.usage_metadata["output_tokens"] or 0,
-                        prompt_tokens = final_message.usage_metadata["input_tokens"] or 0,
-                        total_tokens = final_message.usage_metadata["total_tokens"] or 0,
+                        completion_tokens = final_message_usage.get("output_tokens") or 0,
+                        prompt_tokens = final_message_usage.get("input_tokens") or 0,
+                        total_tokens = final_message_usage.get("total_tokens") or 0,
                         total_cost = 0,
                         is_error = False
                     )
@@ -523,13 +666,17 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
                 for tool in agent.tools:
                     tools.append(tool_factory.get_tool(agent.name, tool, request.objects, self.user_identity, self.config))
 
-            request.objects['message_history'] = request.message_history[:agent.conversation_history_settings.max_history*2]
+            # Copy the objects so requests sharing the same objects dictionary don't overwrite each other's history.
+            workflow_objects = {
+                **request.objects,
+                'message_history': request.message_history[:agent.conversation_history_settings.max_history*2]
+            }
 
             # create the workflow
             workflow_factory = WorkflowFactory(self.plugin_manager)
             workflow = workflow_factory.get_workflow(
                 agent.workflow,
-                request.objects,
+                workflow_objects,
                 tools,
                 self.user_identity,
                 self.config)
@@ -580,11 +727,17 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
         else:
             chain_context = { "context": RunnablePassthrough() }
 
+        # Record the full prompt of this request locally; the agent can execute several requests concurrently.
+        full_prompts = []
+        def record_full_prompt(prompt):
+            full_prompts.append(prompt)
+            return self._record_full_prompt(prompt)
+
         # Compose LCEL chain
         chain = (
             chain_context
             | prompt_template
-            | RunnableLambda(self._record_full_prompt)
+            | RunnableLambda(record_full_prompt)
             | llm
         )
 
@@ -597,10 +750,7 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
                 chain = chain | StrOutputParser()
                 try:
                     with self.tracer.start_as_current_span('langchain_invoke_lcel_workflow', kind=SpanKind.SERVER):
-                        if self.has_retriever:
-                            completion = chain.invoke(request.user_prompt)
-                        else:
-                            completion = await chain.ainvoke(request.user_prompt)
+                        completion = await self._invoke_chain_async(chain, request.user_prompt, stream_handler)
 
                     response_content = OpenAITextMessageContentItem(
                         value = completion,
@@ -611,7 +761,7 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
                         content = [response_content],
                         user_prompt = request.user_prompt,
                         user_prompt_rewrite = request.user_prompt_rewrite,
-                        full_prompt = self.full_prompt.text,
+                        full_prompt = full_prompts[-1].text,
                         completion_tokens = cb.completion_tokens + image_analysis_token_usage.completion_tokens,
                         prompt_tokens = cb.prompt_tokens + image_analysis_token_usage.prompt_tokens,
                         total_tokens = cb.total_tokens + image_analysis_token_usage.total_tokens,
@@ -621,10 +771,7 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
                     raise LangChainException(f"An unexpected exception occurred when executing the completion request: {str(e)}", 500)
         else:
             with self.tracer.start_as_current_span('langchain_invoke_lcel_workflow', kind=SpanKind.SERVER):
-                if self.has_retriever:
-                    completion = chain.invoke(request.user_prompt)
-                else:
-                    completion = await chain.ainvoke(request.user_prompt)
+                completion = await self._invoke_chain_async(chain, request.user_prompt, stream_handler)
             response_content = OpenAITextMessageContentItem(
                 value = completion.content,
                 agent_capability_category = AgentCapabilityCategories.FOUNDATIONALLM_KNOWLEDGE_MANAGEMENT
@@ -634,7 +781,7 @@ class LangChainKnowledgeManagementAgent(LangChainAgentBase):
                 content = [response_content],
                 user_prompt = request.user_prompt,
                 user_prompt_rewrite = request.user_prompt_rewrite,
-                full_prompt = self.full_prompt.text,
+                full_prompt = full_prompts[-1].text,
                 completion_tokens = completion.usage_metadata["output_tokens"] + image_analysis_token_usage.completion_tokens,
                 prompt_tokens = completion.usage_metadata["input_tokens"] + image_analysis_token_usage.prompt_tokens,
                 total_tokens = completion.usage_metadata["total_tokens"] + image_analysis_token_usage.total_tokens,
@@ -6,7 +6,6 @@ Description: FoundationaLLM base class for tools that uses the AgentTool model f
 from typing import List, Dict
 
 # Platform imports
-from azure.identity import DefaultAzureCredential
 from logging import Logger
 from opentelemetry.trace import Tracer
 
@@ -14,6 +13,7 @@ from opentelemetry.trace import Tracer
 from langchain_core.tools import BaseTool
 
 # FoundationaLLM imports
+from foundationallm.authentication import AzureCredentialManager
 from foundationallm.config import Configuration, UserIdentity
 from foundationallm.models.agents import AgentTool
 from foundationallm.telemetry import Telemetry
@@ -38,7 +38,7 @@ class FoundationaLLMToolBase(BaseTool):
 
         self.logger: Logger = Telemetry.get_logger(self.name)
         self.tracer: Tracer = Telemetry.get_tracer(self.name)
-        self.default_credential = DefaultAzureCredential(exclude_environment_credential=True)
+        self.default_credential = AzureCredentialManager.get_credential()
 
     class Config:
         """ Pydantic configuration for FoundationaLLMToolBase. """
@@ -5,8 +5,8 @@ Description: FoundationaLLM base class for tools that uses the agent workflow mo
 from abc import ABC, abstractmethod
 from typing import List, Optional
 
-from azure.identity import DefaultAzureCredential
 
+from foundationallm.authentication import AzureCredentialManager
 from foundationallm.config import Configuration, UserIdentity
 from foundationallm.models.agents import ExternalAgentWorkflow
 from foundationallm.models.messages.message_history_item import MessageHistoryItem
@@ -48,7 +48,7 @@ class FoundationaLLMWorkflowBase(ABC):
         self.config = config
         self.logger = Telemetry.get_logger(self.workflow_config.name)
         self.tracer = Telemetry.get_tracer(self.workflow_config.name)
-        self.default_credential = DefaultAzureCredential(exclude_environment_credential=True)
+        self.default_credential = AzureCredentialManager.get_credential()
 
     @abstractmethod
     async def invoke_async(self,
@@ -1,2 +1,15 @@
 """Language model module"""
 from .language_model_factory import LanguageModelFactory
+from .language_model_client_registry import LanguageModelClientRegistry
+from .language_model_load_balancer import (
+    AsyncLoadBalancingTransport,
+    LanguageModelLoadBalancer,
+    LoadBalancedDeployment,
+    LoadBalancingTransport
+)
+from .language_model_rate_limiter import (
+    AsyncRateLimitingTransport,
+    LanguageModelRateLimiter,
+    RateLimitingTransport,
+    TokenBucket
+)
@@ -0,0 +1,142 @@
+"""
+Class: BedrockClientCache
+Description: Process-wide cache of the AWS credentials and Bedrock runtime clients used with Azure identity federation.
+"""
+import threading
+from typing import Any, Dict, Tuple
+import boto3
+import botocore.session
+from botocore.config import Config
+from botocore.credentials import CredentialProvider, DeferredRefreshableCredentials
+from foundationallm.authentication import AzureCredentialManager
+from foundationallm.resilience import RetryStrategy
+
+class AssumeRoleWithAzureIdentityProvider(CredentialProvider):
+    """
+    Provides AWS credentials by assuming a role with a web identity token issued by Azure.
+
+    The credentials are refreshable: botocore refreshes them shortly before they expire,
+    with a single caller performing the refresh while the others keep using the current
+    credentials until they reach the mandatory refresh window.
+    """
+    METHOD = 'assume-role-with-azure-identity'
+    CANONICAL_NAME = 'AssumeRoleWithAzureIdentity'
+
+    def __init__(self, role_arn: str, scope: str, sts_client: Any):
+        """
+        Initializes the credential provider.
+
+        Parameters
+        ----------
+        role_arn : str
+            The ARN of the AWS role to assume.
+        scope : str
+            The scope of the Azure token used as web identity token.
+        sts_client : Any
+            The AWS STS client used to assume the role.
+        """
+        super().__init__()
+        self.role_arn = role_arn
+        self.scope = scope
+        self.sts_client = sts_client
+
+    def load(self) -> DeferredRefreshableCredentials:
+        return DeferredRefreshableCredentials(refresh_using=self.__fetch_credentials, method=self.METHOD)
+
+    def __fetch_credentials(self) -> dict:
+        # Get Azure token for designated scope.
+        azure_token = AzureCredentialManager.get_token(self.scope)
+
+        # Get AWS STS credentials using Azure token.
+        sts_response = self.sts_client.assume_role_with_web_identity(
+            RoleArn=self.role_arn,
+            RoleSessionName='assume-role',
+            WebIdentityToken=azure_token.token
+        )
+        creds = sts_response['Credentials']
+        return {
+            'access_key': creds['AccessKeyId'],
+            'secret_key': creds['SecretAccessKey'],
+            'token': creds['SessionToken'],
+            'expiry_time': creds['Expiration'].isoformat()
+        }
+
+class BedrockClientCache:
+    """
+    Shares the AWS sessions and Bedrock runtime clients that authenticate with Azure identity federation.
+
+    One boto3 session with refreshable assumed-role credentials is kept per role ARN and scope,
+    and one Bedrock runtime client is kept per session and region. The STS role is only assumed
+    again when the credentials are about to expire.
+    """
+    __lock = threading.Lock()
+    __sts_client: Any = None
+    __sessions: Dict[Tuple[str, str], boto3.Session] = {}
+    __runtime_clients: Dict[Tuple[str, str, str, str], Any] = {}
+
+    @staticmethod
+    def get_session(role_arn: str, scope: str) -> boto3.Session:
+        """
+        Gets the shared boto3 session using the credentials of the assumed role.
+
+        Parameters
+        ----------
+        role_arn : str
+            The ARN of the AWS role to assume.
+        scope : str
+            The scope of the Azure token used as web identity token.
+
+        Returns
+        -------
+        boto3.Session
+            The shared session.
+        """
+        key = (role_arn, scope)
+        with BedrockClientCache.__lock:
+            session = BedrockClientCache.__sessions.get(key)
+            if session is None:
+                if BedrockClientCache.__sts_client is None:
+                    BedrockClientCache.__sts_client = boto3.client('sts')
+
+                botocore_session = botocore.session.get_session()
+                botocore_session.get_component('credential_provider').insert_before(
+                    'env',
+                    AssumeRoleWithAzureIdentityProvider(role_arn, scope, BedrockClientCache.__sts_client))
+                session = boto3.Session(botocore_session=botocore_session)
+                BedrockClientCache.__sessions[key] = session
+            return session
+
+    @staticmethod
+    def get_runtime_client(region: str, role_arn: str, scope: str, retry_strategy: RetryStrategy = None) -> Any:
+        """
+        Gets the shared Bedrock runtime client for a region, using the credentials of the assumed role.
+
+        Parameters
+        ----------
+        region : str
+            The AWS region of the Bedrock runtime endpoint.
+        role_arn : str
+            The ARN of the AWS role to assume.
+        scope : str
+            The scope of the Azure token used as web identity token.
+        retry_strategy : RetryStrategy
+            The retry strategy of the client. Clients with different retry strategies are not shared.
+
+        Returns
+        -------
+        Any
+            The shared Bedrock runtime client.
+        """
+        key = (role_arn, scope, region, retry_strategy.name if retry_strategy is not None else None)
+        client = BedrockClientCache.__runtime_clients.get(key)
+        if client is None:
+            session = BedrockClientCache.get_session(role_arn, scope)
+            with BedrockClientCache.__lock:
+                client = BedrockClientCache.__runtime_clients.get(key)
+                if client is None:
+                    client = session.client(
+                        'bedrock-runtime',
+                        region_name=region,
+                        config=Config(retries=retry_strategy.get_botocore_retry_options()) if retry_strategy is not None else None)
+                    BedrockClientCache.__runtime_clients[key] = client
+        return client
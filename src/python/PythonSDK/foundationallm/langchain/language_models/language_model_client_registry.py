@@ -0,0 +1,231 @@
+"""
+Class: LanguageModelClientRegistry
+Description: Bounded, process-wide LRU registry of language model clients.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+from foundationallm.config import Configuration, read_setting
+from foundationallm.resilience import AsyncRetryTransport, RetryStrategy, RetryTransport
+from foundationallm.telemetry import Telemetry
+from .language_model_load_balancer import AsyncLoadBalancingTransport, LoadBalancedDeployment, LoadBalancingTransport
+from .language_model_rate_limiter import AsyncRateLimitingTransport, RateLimitingTransport
+
+LANGUAGE_MODELS_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:LanguageModels'
+LANGUAGE_MODELS_CLIENT_CACHE_SIZE = f'{LANGUAGE_MODELS_CONFIGURATION_NAMESPACE}:ClientCacheSize'
+
+DEFAULT_CLIENT_CACHE_SIZE = 64
+
+def get_fingerprint(*values: Any) -> str:
+    """
+    Gets a fingerprint of the specified values, used in client keys so that secrets
+    are not kept in memory as dictionary keys.
+    """
+    return hashlib.sha256('\x1f'.join(str(value) for value in values).encode('utf-8')).hexdigest()
+
+class LanguageModelClientRegistry:
+    """
+    Keeps the language model clients created by the LanguageModelFactory so they are
+    reused across requests instead of being created, with a new connection pool, for
+    every completion.
+
+    Clients are keyed by endpoint, deployment, authentication and operation type. The
+    least recently used client is evicted when the registry is full, and all the clients
+    of an API endpoint are evicted when the configuration of the endpoint changes.
+    The OpenAI clients of an endpoint share one pair of HTTP connection pools, which retry
+    the requests with the retry strategy of the endpoint and send them through the rate
+    limiter of their deployment and the circuit breaker of the endpoint. The OpenAI clients
+    of an AI model with several deployments share one pair of load balancing HTTP clients.
+    """
+    def __init__(self, max_size: int = DEFAULT_CLIENT_CACHE_SIZE):
+        """
+        Initializes the client registry.
+
+        Parameters
+        ----------
+        max_size : int
+            The maximum number of clients kept in the registry.
+        """
+        if max_size < 1:
+            raise ValueError('The max_size parameter must be greater than zero.')
+
+        self.max_size = max_size
+        self.__clients: OrderedDict[Tuple, Any] = OrderedDict()
+        self.__endpoint_fingerprints: Dict[str, str] = {}
+        self.__http_clients: Dict[Tuple[str, Optional[str]], Tuple[DefaultHttpxClient, DefaultAsyncHttpxClient]] = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def from_config(config: Configuration) -> 'LanguageModelClientRegistry':
+        """
+        Creates a client registry using the LangChainAPI configuration settings.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+
+        Returns
+        -------
+        LanguageModelClientRegistry
+            The configured client registry.
+        """
+        return LanguageModelClientRegistry(read_setting(
+            config, LANGUAGE_MODELS_CLIENT_CACHE_SIZE, int, DEFAULT_CLIENT_CACHE_SIZE, Telemetry.get_logger(__name__), minimum=1))
+
+    @property
+    def size(self) -> int:
+        """The number of clients in the registry."""
+        return len(self.__clients)
+
+    def get_or_create(
+        self,
+        key: Tuple,
+        endpoint_object_id: str,
+        endpoint_fingerprint: str,
+        create: Callable[[], Any]) -> Any:
+        """
+        Gets the client registered with the specified key, creating it if needed.
+
+        Parameters
+        ----------
+        key : Tuple
+            The key of the client. It must identify the endpoint, deployment, credentials
+            and operation type the client is created for.
+        endpoint_object_id : str
+            The object identifier of the API endpoint used by the client.
+        endpoint_fingerprint : str
+            The fingerprint of the API endpoint configuration. When it changes, all the clients
+            of the API endpoint are evicted.
+        create : Callable[[], Any]
+            Creates the client if it is not registered.
+
+        Returns
+        -------
+        Any
+            The shared client. It must not be modified by the caller.
+        """
+        key = (endpoint_object_id,) + tuple(key)
+        with self.__lock:
+            if self.__endpoint_fingerprints.get(endpoint_object_id) != endpoint_fingerprint:
+                self.__evict_endpoint(endpoint_object_id)
+                self.__endpoint_fingerprints[endpoint_object_id] = endpoint_fingerprint
+
+            client = self.__clients.get(key)
+            if client is not None:
+                self.__clients.move_to_end(key)
+                return client
+
+            client = create()
+            self.__clients[key] = client
+            if len(self.__clients) > self.max_size:
+                # Evicted clients may still be used by in-flight requests, so they are not closed.
+                self.__clients.popitem(last=False)
+            return client
+
+    def get_http_clients(
+        self,
+        url: str,
+        retry_strategy: Optional[RetryStrategy] = None) -> Tuple[DefaultHttpxClient, DefaultAsyncHttpxClient]:
+        """
+        Gets the synchronous and asynchronous HTTP clients shared by the OpenAI clients of an endpoint.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the endpoint.
+        retry_strategy : RetryStrategy
+            The retry strategy of the endpoint. The OpenAI clients using the HTTP clients must be created with max_retries=0.
+
+        Returns
+        -------
+        Tuple[DefaultHttpxClient, DefaultAsyncHttpxClient]
+            The shared HTTP clients.
+        """
+        return self.__get_or_create_http_clients(
+            url,
+            retry_strategy,
+            lambda: (RateLimitingTransport(), AsyncRateLimitingTransport()))
+
+    def get_load_balanced_http_clients(
+        self,
+        key: str,
+        deployments: List[LoadBalancedDeployment],
+        retry_strategy: Optional[RetryStrategy] = None) -> Tuple[DefaultHttpxClient, DefaultAsyncHttpxClient]:
+        """
+        Gets the synchronous and asynchronous HTTP clients spreading the requests over the deployments of an AI model.
+
+        Parameters
+        ----------
+        key : str
+            The key of the HTTP clients. It must identify the deployments and their credentials.
+        deployments : List[LoadBalancedDeployment]
+            The deployments the requests are spread over.
+        retry_strategy : RetryStrategy
+            The retry strategy of the AI model endpoint. Each retry fails over the deployments again.
+            The OpenAI clients using the HTTP clients must be created with max_retries=0.
+
+        Returns
+        -------
+        Tuple[DefaultHttpxClient, DefaultAsyncHttpxClient]
+            The shared HTTP clients.
+        """
+        return self.__get_or_create_http_clients(
+            key,
+            retry_strategy,
+            lambda: (LoadBalancingTransport(deployments), AsyncLoadBalancingTransport(deployments)))
+
+    def invalidate(self, endpoint_object_id: Optional[str] = None):
+        """
+        Evicts the clients of an API endpoint, or all the clients.
+
+        Parameters
+        ----------
+        endpoint_object_id : str
+            The object identifier of the API endpoint. If not set, all the clients are evicted.
+        """
+        with self.__lock:
+            if endpoint_object_id is None:
+                self.__clients.clear()
+                self.__endpoint_fingerprints.clear()
+            else:
+                self.__evict_endpoint(endpoint_object_id)
+                self.__endpoint_fingerprints.pop(endpoint_object_id, None)
+
+    async def aclose(self):
+        """
+        Evicts all the clients and closes the shared HTTP clients.
+        """
+        self.invalidate()
+        with self.__lock:
+            http_clients = list(self.__http_clients.values())
+            self.__http_clients.clear()
+        for client, async_client in http_clients:
+            client.close()
+            await async_client.aclose()
+
+    def __get_or_create_http_clients(
+        self,
+        key: str,
+        retry_strategy: Optional[RetryStrategy],
+        create_transports: Callable[[], Tuple[Any, Any]]) -> Tuple[DefaultHttpxClient, DefaultAsyncHttpxClient]:
+        key = (key, retry_strategy.name if retry_strategy is not None else None)
+        with self.__lock:
+            http_clients = self.__http_clients.get(key)
+            if http_clients is None:
+                transport, async_transport = create_transports()
+                if retry_strategy is not None:
+                    transport = RetryTransport(retry_strategy, transport)
+                    async_transport = AsyncRetryTransport(retry_strategy, async_transport)
+                http_clients = (
+                    DefaultHttpxClient(transport=transport),
+                    DefaultAsyncHttpxClient(transport=async_transport))
+                self.__http_clients[key] = http_clients
+            return http_clients
+
+    def __evict_endpoint(self, endpoint_object_id: str):
+        for key in [key for key in self.__clients.keys() if key[0] == endpoint_object_id]:
+            del self.__clients[key]
@@ -1,12 +1,14 @@
-import boto3
+import copy
 import json
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from botocore.config import Config
 from google.oauth2 import service_account
 from langchain_core.language_models import BaseLanguageModel
 from langchain_aws import ChatBedrockConverse
 from langchain_google_vertexai import ChatVertexAI
 from langchain_openai import AzureChatOpenAI, ChatOpenAI, OpenAI
 from openai import AsyncAzureOpenAI as async_aoi
+from pydantic import BaseModel
+from foundationallm.authentication import AzureCredentialManager
 from foundationallm.config import Configuration
 from foundationallm.langchain.exceptions import LangChainException
 from foundationallm.models.authentication import AuthenticationTypes
@@ -14,13 +16,26 @@ from foundationallm.models.language_models import LanguageModelProvider
 from foundationallm.models.operations import OperationTypes
 from foundationallm.models.resource_providers.ai_models import AIModelBase
 from foundationallm.models.resource_providers.configuration import APIEndpointConfiguration
+from foundationallm.resilience import RetryStrategy, RetryStrategyRegistry
 from foundationallm.utils import ObjectUtils
+from .bedrock_client_cache import BedrockClientCache
+from .language_model_client_registry import LanguageModelClientRegistry, get_fingerprint
+from .language_model_load_balancer import LoadBalancedDeployment
+from .language_model_rate_limiter import LanguageModelRateLimiter
 
 class LanguageModelFactory:
-   
-    def __init__(self, objects:dict, config: Configuration):
+
+    # The clients shared by all the factories of the process.
+    client_registry: LanguageModelClientRegistry = None
+
+    def __init__(self, objects:dict, config: Configuration, client_registry: LanguageModelClientRegistry = None):
         self.objects = objects
         self.config = config
+        if client_registry is None:
+            if LanguageModelFactory.client_registry is None:
+                LanguageModelFactory.client_registry = LanguageModelClientRegistry.from_config(config)
+            client_registry = LanguageModelFactory.client_registry
+        self.client_registry = client_registry
     
     def get_language_model(self,
                            ai_model_object_id:str,
@@ -28,6 +43,10 @@ class LanguageModelFactory:
                           ) -> BaseLanguageModel:
         """
         Create a language model using the specified endpoint settings.
+        The underlying client is shared across requests; the model parameters of the AI model
+        are applied to a shallow copy that reuses the connection pool of the shared client.
+        The Azure OpenAI clients of an AI model with additional deployments spread the requests
+        over all the deployments of the model.
 
         override_operation_type : OperationTypes - internally override the operation type for the API endpoint.
 
@@ -46,6 +65,12 @@ class LanguageModelFactory:
         api_endpoint = ObjectUtils.get_object_by_id(ai_model.endpoint_object_id, self.objects, APIEndpointConfiguration)        
         if api_endpoint is None:
             raise LangChainException("API endpoint configuration settings are missing.", 400)
+
+        # The clients retry transient failures with the retry strategy of the API endpoint.
+        # The HTTP clients of the OpenAI clients retry within the retry budget and deadline of the
+        # current operation, so the OpenAI clients do not retry themselves. The Bedrock (botocore)
+        # and Vertex AI clients retry with their own policies, outside the budget and deadline.
+        retry_strategy = RetryStrategyRegistry.get_strategy(api_endpoint.retry_strategy_name)
         
         match api_endpoint.provider:
             case LanguageModelProvider.MICROSOFT:
@@ -56,26 +81,36 @@ class LanguageModelFactory:
                     try:
                         scope = api_endpoint.authentication_parameters.get('scope', 'https://cognitiveservices.azure.com/.default')
                         # Set up a Azure AD token provider.
-                        token_provider = get_bearer_token_provider(
-                            DefaultAzureCredential(exclude_environment_credential=True),
-                            scope
-                        )
+                        token_provider = AzureCredentialManager.get_bearer_token_provider(scope)
                         
+                        http_client, http_async_client, deployments_fingerprint = self.__get_azure_openai_http_clients(ai_model, api_endpoint, op_type, retry_strategy)
+
                         if op_type == OperationTypes.CHAT:
-                            language_model = AzureChatOpenAI(
-                                azure_endpoint=api_endpoint.url,
-                                api_version=api_endpoint.api_version,
-                                openai_api_type='azure_ad',
-                                azure_ad_token_provider=token_provider,
-                                azure_deployment=ai_model.deployment_name
-                            )
+                            language_model = self.__get_client(
+                                api_endpoint,
+                                (op_type, ai_model.deployment_name, scope, deployments_fingerprint),
+                                lambda: AzureChatOpenAI(
+                                    azure_endpoint=api_endpoint.url,
+                                    api_version=api_endpoint.api_version,
+                                    openai_api_type='azure_ad',
+                                    azure_ad_token_provider=token_provider,
+                                    azure_deployment=ai_model.deployment_name,
+                                    max_retries=0,
+                                    http_client=http_client,
+                                    http_async_client=http_async_client
+                                ))
                         elif op_type == OperationTypes.ASSISTANTS_API or op_type == OperationTypes.IMAGE_SERVICES:                            
                             # Assistants API clients can't have deployment as that is assigned at the assistant level.
-                            language_model = async_aoi(
-                                azure_endpoint=api_endpoint.url,
-                                api_version=api_endpoint.api_version,                                
-                                azure_ad_token_provider=token_provider
-                            )
+                            language_model = self.__get_client(
+                                api_endpoint,
+                                (op_type, scope, deployments_fingerprint),
+                                lambda: async_aoi(
+                                    azure_endpoint=api_endpoint.url,
+                                    api_version=api_endpoint.api_version,                                
+                                    azure_ad_token_provider=token_provider,
+                                    max_retries=0,
+                                    http_client=http_async_client
+                                ))
                         else:
                             raise LangChainException(f"Unsupported operation type: {op_type}", 400)
 
@@ -90,20 +125,33 @@ class LanguageModelFactory:
                     if api_key is None:
                         raise LangChainException("API key is missing from the configuration settings.", 400)
                     
+                    http_client, http_async_client, deployments_fingerprint = self.__get_azure_openai_http_clients(ai_model, api_endpoint, op_type, retry_strategy)
+
                     if op_type == OperationTypes.CHAT:
-                        language_model = AzureChatOpenAI(
-                            azure_endpoint=api_endpoint.url,
-                            api_key=api_key,
-                            api_version=api_endpoint.api_version,
-                            azure_deployment=ai_model.deployment_name
-                        )
+                        language_model = self.__get_client(
+                            api_endpoint,
+                            (op_type, ai_model.deployment_name, get_fingerprint(api_key), deployments_fingerprint),
+                            lambda: AzureChatOpenAI(
+                                azure_endpoint=api_endpoint.url,
+                                api_key=api_key,
+                                api_version=api_endpoint.api_version,
+                                azure_deployment=ai_model.deployment_name,
+                                max_retries=0,
+                                http_client=http_client,
+                                http_async_client=http_async_client
+                            ))
                     elif op_type == OperationTypes.ASSISTANTS_API or op_type == OperationTypes.IMAGE_SERVICES:
                         # Assistants API clients can't have deployment as that is assigned at the assistant level.
-                        language_model = async_aoi(
-                            azure_endpoint=api_endpoint.url,
-                            api_key=api_key,
-                            api_version=api_endpoint.api_version,
-                        )
+                        language_model = self.__get_client(
+                            api_endpoint,
+                            (op_type, get_fingerprint(api_key), deployments_fingerprint),
+                            lambda: async_aoi(
+                                azure_endpoint=api_endpoint.url,
+                                api_key=api_key,
+                                api_version=api_endpoint.api_version,
+                                max_retries=0,
+                                http_client=http_async_client
+                            ))
                     else:
                         raise LangChainException(f"Unsupported operation type: {op_type}", 400)
             case LanguageModelProvider.OPENAI:
@@ -115,11 +163,15 @@ class LanguageModelFactory:
                 if api_key is None:
                     raise LangChainException("API key is missing from the configuration settings.", 400)
 
-                language_model = (
-                    ChatOpenAI(base_url=api_endpoint.url, api_key=api_key)
-                    if api_endpoint.operation_type == OperationTypes.CHAT
-                    else OpenAI(base_url=api_endpoint.url, api_key=api_key)
-                )
+                http_client, http_async_client = self.client_registry.get_http_clients(api_endpoint.url, retry_strategy)
+                language_model = self.__get_client(
+                    api_endpoint,
+                    (api_endpoint.operation_type, get_fingerprint(api_key)),
+                    lambda: (
+                        ChatOpenAI(base_url=api_endpoint.url, api_key=api_key, max_retries=0, http_client=http_client, http_async_client=http_async_client)
+                        if api_endpoint.operation_type == OperationTypes.CHAT
+                        else OpenAI(base_url=api_endpoint.url, api_key=api_key, max_retries=0, http_client=http_client, http_async_client=http_async_client)
+                    ))
             case LanguageModelProvider.BEDROCK:
                 if api_endpoint.authentication_type == AuthenticationTypes.AZURE_IDENTITY:
                     # Get Azure scope for federated authentication as well as the AWS role ARN (Amazon Resource Name).
@@ -139,28 +191,17 @@ class LanguageModelFactory:
                     if role_arn is None:
                         raise LangChainException("Role ARN is missing from the configuration settings.", 400)
 
-                    # Get Azure token for designated scope.
-                    az_creds = DefaultAzureCredential(exclude_environment_credential=True)
-                    azure_token = az_creds.get_token(scope)
-
-                    # Get AWS STS credentials using Azure token.
-                    sts_client = boto3.client('sts')
-                    sts_response = sts_client.assume_role_with_web_identity(
-                        RoleArn=role_arn,
-                        RoleSessionName='assume-role',
-                        WebIdentityToken=azure_token.token
-                    )
-                    creds = sts_response['Credentials']
-
                     # parse region from the URL, ex: https://bedrock-runtime.us-east-1.amazonaws.com/
                     region = api_endpoint.url.split('.')[1]
-                    language_model = ChatBedrockConverse(
-                        model= ai_model.deployment_name,
-                        region_name = region,
-                        aws_access_key_id = creds["AccessKeyId"],
-                        aws_secret_access_key = creds["SecretAccessKey"],
-                        aws_session_token= creds["SessionToken"]
-                    )
+                    # The runtime client assumes the role with an Azure token and refreshes the AWS STS credentials before they expire.
+                    language_model = self.__get_client(
+                        api_endpoint,
+                        (ai_model.deployment_name, region, role_arn, scope),
+                        lambda: ChatBedrockConverse(
+                            model= ai_model.deployment_name,
+                            region_name = region,
+                            client = BedrockClientCache.get_runtime_client(region, role_arn, scope, retry_strategy)
+                        ))
                 else: # Key-based authentication
                     try:
                         access_key = self.config.get_value(api_endpoint.authentication_parameters.get('access_key'))
@@ -180,36 +221,122 @@ class LanguageModelFactory:
 
                     # parse region from the URL, ex: https://bedrock-runtime.us-east-1.amazonaws.com/
                     region = api_endpoint.url.split('.')[1]
-                    language_model = ChatBedrockConverse(
-                        model= ai_model.deployment_name,
-                        region_name = region,
-                        aws_access_key_id = access_key,
-                        aws_secret_access_key = secret_key
-                    )
+                    language_model = self.__get_client(
+                        api_endpoint,
+                        (ai_model.deployment_name, region, get_fingerprint(access_key, secret_key)),
+                        lambda: ChatBedrockConverse(
+                            model= ai_model.deployment_name,
+                            region_name = region,
+                            aws_access_key_id = access_key,
+                            aws_secret_access_key = secret_key,
+                            config = Config(retries=retry_strategy.get_botocore_retry_options())
+                        ))
             case LanguageModelProvider.VERTEXAI:
                 # Only supports service account authentication via JSON credentials stored in key vault. 
                 # Uses the authentication parameter: service_account_credentials to get the application configuration key for this value.
                 try:
-                    service_account_credentials_definition = json.loads(self.config.get_value(api_endpoint.authentication_parameters.get('service_account_credentials')))
+                    service_account_credentials_value = self.config.get_value(api_endpoint.authentication_parameters.get('service_account_credentials'))
+                    service_account_credentials_definition = json.loads(service_account_credentials_value)
                 except Exception as e:
                     raise LangChainException(f"Failed to retrieve service account credentials: {str(e)}", 500)
 
                 if not service_account_credentials_definition:
                     raise LangChainException("Service account credentials are missing from the configuration settings.", 400)
 
-                service_account_credentials = service_account.Credentials.from_service_account_info(service_account_credentials_definition)                
-                language_model = ChatVertexAI(                   
-                    model=ai_model.deployment_name,
-                    temperature=0,
-                    max_tokens=None,
-                    max_retries=6,
-                    stop=None,
-                    credentials=service_account_credentials
-                )
-
-        # Set model parameters.
-        for key, value in ai_model.model_parameters.items():
-            if hasattr(language_model, key):
-                setattr(language_model, key, value)
-        
+                language_model = self.__get_client(
+                    api_endpoint,
+                    (ai_model.deployment_name, get_fingerprint(service_account_credentials_value)),
+                    lambda: ChatVertexAI(                   
+                        model=ai_model.deployment_name,
+                        temperature=0,
+                        max_tokens=None,
+                        max_retries=retry_strategy.max_retries,
+                        stop=None,
+                        credentials=service_account.Credentials.from_service_account_info(service_account_credentials_definition)
+                    ))
+
+        return self.__apply_model_parameters(language_model, ai_model.model_parameters)
+
+    def __get_azure_openai_http_clients(self, ai_model: AIModelBase, api_endpoint: APIEndpointConfiguration, op_type: str, retry_strategy: RetryStrategy):
+        """
+        Gets the HTTP clients of an Azure OpenAI client, with the fingerprint of the deployments they use.
+        When the AI model has additional deployments, the requests are load balanced over the deployment
+        of the AI model and the additional deployments, failing over from one to the next.
+        Assistants are bound to the Azure OpenAI resource that created them and are not load balanced.
+        The tokens-per-minute rate limits of the deployments are registered with the rate limiter
+        used by the HTTP clients, which retry the requests with the retry strategy of the API endpoint.
+        """
+        if ai_model.tokens_per_minute:
+            LanguageModelRateLimiter.set_tokens_per_minute(api_endpoint.url, ai_model.deployment_name, ai_model.tokens_per_minute)
+
+        if not ai_model.deployments or op_type == OperationTypes.ASSISTANTS_API:
+            return self.client_registry.get_http_clients(api_endpoint.url, retry_strategy) + (None,)
+
+        # The requests carry the credentials of the API endpoint of the AI model.
+        deployments = [LoadBalancedDeployment(api_endpoint.url, ai_model.deployment_name, api_version=api_endpoint.api_version)]
+        fingerprint_values = [api_endpoint.model_dump_json(), ai_model.deployment_name]
+        for deployment in ai_model.deployments:
+            deployment_endpoint = ObjectUtils.get_object_by_id(deployment.endpoint_object_id, self.objects, APIEndpointConfiguration)
+            if deployment_endpoint is None:
+                raise LangChainException(f"The API endpoint configuration settings of the {deployment.deployment_name} deployment are missing.", 400)
+            if deployment_endpoint.provider != LanguageModelProvider.MICROSOFT:
+                raise LangChainException(f"The API endpoint of the {deployment.deployment_name} deployment must use the {LanguageModelProvider.MICROSOFT.value} provider.", 400)
+
+            if deployment_endpoint.authentication_type == AuthenticationTypes.AZURE_IDENTITY:
+                scope = deployment_endpoint.authentication_parameters.get('scope', 'https://cognitiveservices.azure.com/.default')
+                token_provider = AzureCredentialManager.get_bearer_token_provider(scope)
+                get_auth_headers = lambda token_provider=token_provider: {'Authorization': f'Bearer {token_provider()}'}
+                fingerprint_values.append(scope)
+            else:
+                try:
+                    api_key = self.config.get_value(deployment_endpoint.authentication_parameters.get('api_key_configuration_name'))
+                except Exception as e:
+                    raise LangChainException(f"Failed to retrieve API key: {str(e)}", 500)
+
+                if api_key is None:
+                    raise LangChainException("API key is missing from the configuration settings.", 400)
+                get_auth_headers = lambda api_key=api_key: {'api-key': api_key}
+                fingerprint_values.append(api_key)
+
+            if deployment.tokens_per_minute:
+                LanguageModelRateLimiter.set_tokens_per_minute(deployment_endpoint.url, deployment.deployment_name, deployment.tokens_per_minute)
+
+            deployments.append(LoadBalancedDeployment(
+                deployment_endpoint.url,
+                deployment.deployment_name,
+                weight=deployment.weight,
+                api_version=deployment_endpoint.api_version,
+                get_auth_headers=get_auth_headers))
+            fingerprint_values.extend([deployment_endpoint.model_dump_json(), deployment.deployment_name, deployment.weight])
+
+        fingerprint = get_fingerprint(*fingerprint_values)
+        return self.client_registry.get_load_balanced_http_clients(f'deployments:{fingerprint}', deployments, retry_strategy) + (fingerprint,)
+
+    def __get_client(self, api_endpoint: APIEndpointConfiguration, key: tuple, create):
+        """
+        Gets the shared client for the API endpoint, creating it if needed.
+        The key identifies the client within the endpoint; the provider, URL,
+        API version and authentication type are added to it.
+        """
+        return self.client_registry.get_or_create(
+            (api_endpoint.provider, api_endpoint.url, api_endpoint.api_version, api_endpoint.authentication_type) + key,
+            api_endpoint.object_id,
+            get_fingerprint(api_endpoint.model_dump_json()),
+            create)
+
+    def __apply_model_parameters(self, language_model, model_parameters: dict):
+        """
+        Applies the model parameters to a shallow copy of the shared client.
+        The copy reuses the underlying HTTP client and connection pool.
+        """
+        parameters = {key: value for key, value in (model_parameters or {}).items() if hasattr(language_model, key)}
+        if len(parameters) == 0:
+            return language_model
+
+        if isinstance(language_model, BaseModel):
+            return language_model.model_copy(update=parameters)
+
+        language_model = copy.copy(language_model)
+        for key, value in parameters.items():
+            setattr(language_model, key, value)
         return language_model
@@ -0,0 +1,345 @@
+"""
+Class: LanguageModelLoadBalancer
+Description: Client-side load balancing and failover across the deployments of an AI model.
+"""
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+from foundationallm.resilience import CircuitBreakerRegistry, CircuitBreakerStates
+from foundationallm.resilience.circuit_breaker import FAILURE_STATUS_CODES
+from foundationallm.resilience.retry_strategy import get_retry_after_seconds
+from foundationallm.telemetry import Telemetry
+from .language_model_rate_limiter import (
+    AsyncRateLimitingTransport,
+    LanguageModelRateLimiter,
+    RateLimitingTransport,
+    get_deployment_key
+)
+
+# The status codes returned by a deployment that make the request fail over to the next deployment.
+FAILOVER_STATUS_CODES = FAILURE_STATUS_CODES | {429}
+
+# The weight of the last response in the moving average of the latency of a deployment.
+LATENCY_SMOOTHING_FACTOR = 0.2
+
+# The rate limits of Azure OpenAI deployments are enforced per minute, so older rate limit headers are ignored.
+RATE_LIMIT_WINDOW_SECONDS = 60.0
+
+# The time a deployment is avoided after a 429 response without a Retry-After header.
+DEFAULT_THROTTLE_SECONDS = 10.0
+
+DEPLOYMENT_PATH_PATTERN = re.compile(r'/deployments/[^/]+/')
+
+class LoadBalancedDeployment:
+    """
+    A member of a load balanced pool of Azure OpenAI deployments.
+    """
+    def __init__(
+        self,
+        url: str,
+        deployment_name: str,
+        weight: float = 1.0,
+        api_version: Optional[str] = None,
+        get_auth_headers: Optional[Callable[[], Dict[str, str]]] = None):
+        """
+        Initializes the deployment.
+
+        Parameters
+        ----------
+        url : str
+            The base URL of the API endpoint hosting the deployment.
+        deployment_name : str
+            The name of the deployment.
+        weight : float
+            The relative share of the traffic sent to the deployment when all the deployments have capacity.
+        api_version : str
+            The API version used with the endpoint. If not set, the API version of the request is kept.
+        get_auth_headers : Callable[[], Dict[str, str]]
+            Gets the authentication headers of the endpoint. If not set, the authentication headers
+            of the request are kept.
+        """
+        if weight <= 0:
+            raise ValueError('The weight parameter must be greater than zero.')
+
+        parts = urlsplit(url)
+        self.url = url
+        self.origin = f'{parts.scheme}://{parts.netloc}'
+        self.path_prefix = parts.path.rstrip('/')
+        self.deployment_name = deployment_name
+        self.weight = weight
+        self.api_version = api_version
+        self.get_auth_headers = get_auth_headers
+        self.key = get_deployment_key(url, deployment_name)
+
+    def get_request(self, request: httpx.Request) -> httpx.Request:
+        """
+        Gets a copy of a request sent to this deployment instead of the deployment it targets.
+        The content of the request must have been read.
+        """
+        path = request.url.path
+        index = path.find('/openai/')
+        if index >= 0:
+            path = self.path_prefix + DEPLOYMENT_PATH_PATTERN.sub(
+                f'/deployments/{self.deployment_name}/', path[index:], count=1)
+
+        params = request.url.params
+        if self.api_version is not None and 'api-version' in params:
+            params = params.set('api-version', self.api_version)
+
+        headers = request.headers.copy()
+        # The Host header is set from the new URL.
+        headers.pop('host', None)
+        if self.get_auth_headers is not None:
+            headers.pop('api-key', None)
+            headers.pop('authorization', None)
+            headers.update(self.get_auth_headers())
+
+        return httpx.Request(
+            request.method,
+            httpx.URL(f'{self.origin}{path}', params=params),
+            headers=headers,
+            content=request.content,
+            extensions=request.extensions)
+
+class DeploymentStatistics:
+    """
+    The state of a deployment observed from its responses.
+    """
+    def __init__(self):
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.peak_remaining_requests: Optional[int] = None
+        self.peak_remaining_tokens: Optional[int] = None
+        self.latency_seconds: Optional[float] = None
+        self.throttled_until = 0.0
+        self.updated_at = 0.0
+
+    def get_capacity(self, now: float) -> float:
+        """
+        Gets the share, between 0 and 1, of the rate limits of the deployment that is still available.
+        Deployments without recent rate limit headers are assumed to have full capacity.
+        """
+        if now - self.updated_at > RATE_LIMIT_WINDOW_SECONDS:
+            return 1.0
+
+        capacity = 1.0
+        for remaining, peak in [
+            (self.remaining_requests, self.peak_remaining_requests),
+            (self.remaining_tokens, self.peak_remaining_tokens)]:
+            if remaining is not None and peak:
+                capacity = min(capacity, remaining / peak)
+        return capacity
+
+class LanguageModelLoadBalancer:
+    """
+    Orders the deployments of an AI model for each request.
+
+    The remaining requests and tokens reported by the x-ratelimit-remaining-requests and
+    x-ratelimit-remaining-tokens response headers, the tokens left in the client-side rate
+    limiter and a moving average of the latency are tracked for every deployment of the
+    process. Deployments with more remaining capacity and lower latency receive a larger
+    share of the traffic. Deployments that
+    returned a 429 are avoided until their Retry-After expires, and deployments whose
+    circuit breaker is open are avoided until the breaker lets a probe through; both are
+    only used when no other deployment is available.
+    """
+    __lock = threading.Lock()
+    __statistics: Dict[Tuple[str, str], DeploymentStatistics] = {}
+    __failovers = None
+
+    @staticmethod
+    def get_ordered_deployments(deployments: List[LoadBalancedDeployment]) -> List[LoadBalancedDeployment]:
+        """
+        Gets the order in which the deployments are tried for a request.
+
+        Parameters
+        ----------
+        deployments : List[LoadBalancedDeployment]
+            The deployments of the AI model.
+
+        Returns
+        -------
+        List[LoadBalancedDeployment]
+            The deployments, starting with the one selected for the request.
+        """
+        now = time.monotonic()
+        available: List[Tuple[float, LoadBalancedDeployment]] = []
+        unavailable: List[Tuple[float, LoadBalancedDeployment]] = []
+        latencies: Dict[Tuple[str, str], Optional[float]] = {}
+
+        with LanguageModelLoadBalancer.__lock:
+            for deployment in deployments:
+                statistics = LanguageModelLoadBalancer.__get_statistics(deployment)
+                if statistics.throttled_until > now \
+                    or CircuitBreakerRegistry.get_breaker(deployment.url).state == CircuitBreakerStates.OPEN:
+                    unavailable.append((statistics.throttled_until, deployment))
+                else:
+                    available.append((statistics.get_capacity(now), deployment))
+                    latencies[deployment.key] = statistics.latency_seconds
+
+        # The capacity left by the client-side rate limiter of a deployment also limits its share of the traffic.
+        available = [
+            (min(capacity, LanguageModelRateLimiter.get_available_share(deployment.key)), deployment)
+            for capacity, deployment in available
+        ]
+
+        known_latencies = [latency for latency in latencies.values() if latency is not None]
+        default_latency = sum(known_latencies) / len(known_latencies) if known_latencies else 1.0
+        scored = [
+            # Deployments without capacity keep a small score so they are still probed.
+            (deployment.weight * max(capacity, 0.01) / max(latencies[deployment.key] or default_latency, 0.001), deployment)
+            for capacity, deployment in available
+        ]
+
+        ordered: List[LoadBalancedDeployment] = []
+        if len(scored) > 0:
+            # The first deployment is chosen at random in proportion to its score, so that
+            # concurrent requests spread over the deployments instead of all using the best one.
+            selected = random.choices(range(len(scored)), weights=[score for score, _ in scored])[0]
+            ordered.append(scored.pop(selected)[1])
+            ordered.extend(deployment for _, deployment in sorted(scored, key=lambda item: item[0], reverse=True))
+        ordered.extend(deployment for _, deployment in sorted(unavailable, key=lambda item: item[0]))
+        return ordered
+
+    @staticmethod
+    def record_response(deployment: LoadBalancedDeployment, response: httpx.Response, latency_seconds: float):
+        """
+        Records the rate limits and latency reported by a response of a deployment.
+
+        Parameters
+        ----------
+        deployment : LoadBalancedDeployment
+            The deployment that returned the response.
+        response : httpx.Response
+            The response, before its content is read.
+        latency_seconds : float
+            The time it took to receive the response headers.
+        """
+        now = time.monotonic()
+        remaining_requests = LanguageModelLoadBalancer.__get_int_header(response, 'x-ratelimit-remaining-requests')
+        remaining_tokens = LanguageModelLoadBalancer.__get_int_header(response, 'x-ratelimit-remaining-tokens')
+
+        with LanguageModelLoadBalancer.__lock:
+            statistics = LanguageModelLoadBalancer.__get_statistics(deployment)
+            if now - statistics.updated_at > RATE_LIMIT_WINDOW_SECONDS:
+                statistics.peak_remaining_requests = None
+                statistics.peak_remaining_tokens = None
+
+            if response.status_code == 429:
+                # The response is read like an exception carrying the response headers.
+                retry_after = get_retry_after_seconds(response)
+                statistics.throttled_until = now + (retry_after if retry_after is not None else DEFAULT_THROTTLE_SECONDS)
+                statistics.remaining_requests = 0 if remaining_requests is None else remaining_requests
+                statistics.remaining_tokens = 0 if remaining_tokens is None else remaining_tokens
+            else:
+                statistics.remaining_requests = remaining_requests
+                statistics.remaining_tokens = remaining_tokens
+                if response.status_code < 400:
+                    statistics.latency_seconds = latency_seconds if statistics.latency_seconds is None \
+                        else LATENCY_SMOOTHING_FACTOR * latency_seconds + (1 - LATENCY_SMOOTHING_FACTOR) * statistics.latency_seconds
+
+            if remaining_requests is not None:
+                statistics.peak_remaining_requests = max(statistics.peak_remaining_requests or 0, remaining_requests)
+            if remaining_tokens is not None:
+                statistics.peak_remaining_tokens = max(statistics.peak_remaining_tokens or 0, remaining_tokens)
+            statistics.updated_at = now
+
+    @staticmethod
+    def record_failover(deployment: LoadBalancedDeployment, reason: str):
+        """
+        Records that a request failed over from a deployment to the next one.
+        """
+        Telemetry.get_logger(__name__).info(
+            f'The request to the {deployment.deployment_name} deployment of {deployment.origin} failed ({reason}). Failing over to the next deployment.')
+
+        if LanguageModelLoadBalancer.__failovers is None:
+            LanguageModelLoadBalancer.__failovers = Telemetry.get_meter(__name__).create_counter(
+                'foundationallm.load_balancer.failovers',
+                description='The number of requests that failed over to another deployment of an AI model.')
+        LanguageModelLoadBalancer.__failovers.add(1, {'endpoint': deployment.origin, 'deployment': deployment.deployment_name})
+
+    @staticmethod
+    def __get_statistics(deployment: LoadBalancedDeployment) -> DeploymentStatistics:
+        statistics = LanguageModelLoadBalancer.__statistics.get(deployment.key)
+        if statistics is None:
+            statistics = DeploymentStatistics()
+            LanguageModelLoadBalancer.__statistics[deployment.key] = statistics
+        return statistics
+
+    @staticmethod
+    def __get_int_header(response: httpx.Response, name: str) -> Optional[int]:
+        try:
+            value = response.headers.get(name)
+            return int(value) if value is not None else None
+        except ValueError:
+            return None
+
+class LoadBalancingTransport(httpx.BaseTransport):
+    """
+    httpx transport sending each request to the deployment selected by the load balancer,
+    and to the next deployments when it fails with a 429, a 5xx or a connection error.
+    The response of the last deployment tried is returned.
+    """
+    def __init__(self, deployments: List[LoadBalancedDeployment], transport: httpx.BaseTransport = None):
+        self.deployments = deployments
+        self.transport = transport or RateLimitingTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        deployments = LanguageModelLoadBalancer.get_ordered_deployments(self.deployments)
+        for index, deployment in enumerate(deployments):
+            is_last = index == len(deployments) - 1
+            start = time.monotonic()
+            try:
+                response = self.transport.handle_request(deployment.get_request(request))
+            except httpx.TransportError as e:
+                if is_last:
+                    raise
+                LanguageModelLoadBalancer.record_failover(deployment, type(e).__name__)
+                continue
+
+            LanguageModelLoadBalancer.record_response(deployment, response, time.monotonic() - start)
+            if is_last or response.status_code not in FAILOVER_STATUS_CODES:
+                return response
+            response.close()
+            LanguageModelLoadBalancer.record_failover(deployment, f'status code {response.status_code}')
+
+    def close(self):
+        self.transport.close()
+
+class AsyncLoadBalancingTransport(httpx.AsyncBaseTransport):
+    """
+    Asynchronous httpx transport sending each request to the deployment selected by the load balancer,
+    and to the next deployments when it fails with a 429, a 5xx or a connection error.
+    The response of the last deployment tried is returned.
+    """
+    def __init__(self, deployments: List[LoadBalancedDeployment], transport: httpx.AsyncBaseTransport = None):
+        self.deployments = deployments
+        self.transport = transport or AsyncRateLimitingTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        deployments = LanguageModelLoadBalancer.get_ordered_deployments(self.deployments)
+        for index, deployment in enumerate(deployments):
+            is_last = index == len(deployments) - 1
+            start = time.monotonic()
+            try:
+                response = await self.transport.handle_async_request(deployment.get_request(request))
+            except httpx.TransportError as e:
+                if is_last:
+                    raise
+                LanguageModelLoadBalancer.record_failover(deployment, type(e).__name__)
+                continue
+
+            LanguageModelLoadBalancer.record_response(deployment, response, time.monotonic() - start)
+            if is_last or response.status_code not in FAILOVER_STATUS_CODES:
+                return response
+            await response.aclose()
+            LanguageModelLoadBalancer.record_failover(deployment, f'status code {response.status_code}')
+
+    async def aclose(self):
+        await self.transport.aclose()
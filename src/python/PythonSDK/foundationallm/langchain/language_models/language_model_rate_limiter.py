@@ -0,0 +1,507 @@
+"""
+Class: LanguageModelRateLimiter
+Description: Client-side tokens-per-minute rate limiting of the requests sent to Azure OpenAI deployments.
+"""
+import asyncio
+import json
+import math
+import re
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+from foundationallm.config import Configuration, read_setting
+from foundationallm.resilience import AsyncCircuitBreakerTransport, CircuitBreakerTransport
+from foundationallm.telemetry import Telemetry
+
+RATE_LIMITER_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:LanguageModels:RateLimiter'
+RATE_LIMITER_MAX_QUEUE_SECONDS = f'{RATE_LIMITER_CONFIGURATION_NAMESPACE}:MaxQueueSeconds'
+RATE_LIMITER_MAX_SYNC_QUEUE_SECONDS = f'{RATE_LIMITER_CONFIGURATION_NAMESPACE}:MaxSyncQueueSeconds'
+
+DEFAULT_MAX_QUEUE_SECONDS = 10.0
+
+# Synchronous requests hold a worker thread while they wait, so they wait for a shorter time.
+DEFAULT_MAX_SYNC_QUEUE_SECONDS = 1.0
+
+# Azure OpenAI estimates the tokens of a request from its characters, at about four characters per token.
+CHARACTERS_PER_TOKEN = 4
+
+# The tokens counted for each message and each image of a request.
+MESSAGE_TOKEN_ESTIMATE = 4
+IMAGE_TOKEN_ESTIMATE = 765
+
+# The completion tokens counted when a request does not set max_tokens.
+DEFAULT_COMPLETION_TOKEN_ESTIMATE = 1000
+
+REQUEST_DEPLOYMENT_PATTERN = re.compile(r'^(.*?)/openai/deployments/([^/]+)/')
+
+def get_deployment_key(url: str, deployment_name: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """
+    Gets the key identifying an Azure OpenAI deployment.
+
+    Parameters
+    ----------
+    url : str
+        The base URL of the API endpoint hosting the deployment, or the URL of a request sent to the deployment.
+    deployment_name : str
+        The name of the deployment. If not set, it is read from the path of the request URL.
+
+    Returns
+    -------
+    Tuple[str, str]
+        The base URL of the API endpoint and the name of the deployment, or None if the
+        request URL does not target a deployment.
+    """
+    parts = urlsplit(url)
+    if deployment_name is None:
+        match = REQUEST_DEPLOYMENT_PATTERN.match(parts.path)
+        if match is None:
+            return None
+        prefix, deployment_name = match.groups()
+    else:
+        prefix = parts.path.rstrip('/')
+    return (f'{parts.scheme}://{parts.netloc}{prefix}', deployment_name)
+
+def estimate_completion_tokens(body: dict) -> int:
+    """
+    Estimates the completion tokens counted against the rate limit of a deployment for a request:
+    the tokens requested with max_tokens for each of the n completions.
+    """
+    if 'messages' not in body and 'max_tokens' not in body:
+        return 0
+    max_tokens = body.get('max_completion_tokens') or body.get('max_tokens') or DEFAULT_COMPLETION_TOKEN_ESTIMATE
+    return max_tokens * (body.get('n') or 1)
+
+def estimate_tokens(body: dict) -> int:
+    """
+    Estimates the tokens counted against the rate limit of a deployment for a request:
+    the tokens of the prompt, estimated from its characters, and the completion tokens
+    requested with max_tokens.
+    """
+    characters = 0
+    tokens = 0
+
+    for message in body.get('messages') or []:
+        tokens += MESSAGE_TOKEN_ESTIMATE
+        content = message.get('content') if isinstance(message, dict) else None
+        if isinstance(content, str):
+            characters += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                if not isinstance(part, dict):
+                    continue
+                if part.get('type') == 'image_url':
+                    tokens += IMAGE_TOKEN_ESTIMATE
+                else:
+                    text = part.get('text') or part.get('content')
+                    characters += len(text) if isinstance(text, str) else 0
+
+    for name in ['prompt', 'input']:
+        value = body.get(name)
+        if isinstance(value, str):
+            characters += len(value)
+        elif isinstance(value, list):
+            characters += sum(len(item) for item in value if isinstance(item, str))
+
+    if body.get('tools'):
+        characters += len(json.dumps(body['tools']))
+
+    return tokens + estimate_completion_tokens(body) + math.ceil(characters / CHARACTERS_PER_TOKEN)
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at the tokens-per-minute rate of a deployment.
+
+    Requests reserve their tokens when they are dispatched. When the bucket does not hold
+    enough tokens, the reservation is still made and the request waits until the bucket is
+    refilled, so waiting requests are dispatched in the order they arrived.
+    """
+    def __init__(self, tokens_per_minute: int):
+        """
+        Initializes the token bucket, full.
+
+        Parameters
+        ----------
+        tokens_per_minute : int
+            The rate at which the bucket is refilled, which is also its capacity.
+        """
+        if tokens_per_minute < 1:
+            raise ValueError('The tokens_per_minute parameter must be greater than zero.')
+
+        self.tokens_per_minute = tokens_per_minute
+        self.__tokens = float(tokens_per_minute)
+        self.__updated_at = time.monotonic()
+        self.__lock = threading.Lock()
+
+    @property
+    def available_share(self) -> float:
+        """The share, between 0 and 1, of the capacity of the bucket holding tokens."""
+        with self.__lock:
+            self.__refill()
+            return max(0.0, self.__tokens) / self.tokens_per_minute
+
+    def reserve(self, tokens: int, max_wait_seconds: float) -> Optional[float]:
+        """
+        Reserves tokens for a request.
+
+        Parameters
+        ----------
+        tokens : int
+            The tokens of the request. Requests larger than the bucket reserve its full capacity.
+        max_wait_seconds : float
+            The longest the request can wait for the bucket to be refilled.
+
+        Returns
+        -------
+        float
+            The time the request must wait before it is dispatched, or None if the tokens were not
+            reserved because the request would wait longer than max_wait_seconds.
+        """
+        tokens = min(tokens, self.tokens_per_minute)
+        with self.__lock:
+            self.__refill()
+            wait_seconds = max(0.0, (tokens - self.__tokens) * 60 / self.tokens_per_minute)
+            if wait_seconds > max_wait_seconds:
+                return None
+            self.__tokens -= tokens
+            return wait_seconds
+
+    def get_wait_seconds(self, tokens: int) -> float:
+        """
+        Gets the time until the bucket holds the specified number of tokens.
+        """
+        tokens = min(tokens, self.tokens_per_minute)
+        with self.__lock:
+            self.__refill()
+            return max(0.0, (tokens - self.__tokens) * 60 / self.tokens_per_minute)
+
+    def release(self, tokens: int):
+        """
+        Returns tokens to the bucket, or takes additional tokens when negative.
+        """
+        with self.__lock:
+            self.__refill()
+            self.__tokens = min(float(self.tokens_per_minute), self.__tokens + tokens)
+
+    def __refill(self):
+        now = time.monotonic()
+        self.__tokens = min(
+            float(self.tokens_per_minute),
+            self.__tokens + (now - self.__updated_at) * self.tokens_per_minute / 60)
+        self.__updated_at = now
+
+class LanguageModelRateLimiter:
+    """
+    Keeps the token buckets of the Azure OpenAI deployments whose AI models set tokens_per_minute.
+
+    The buckets are shared by all the clients of the process. A request waits for at most
+    max_queue_seconds, or max_sync_queue_seconds for synchronous requests, for its deployment
+    to have enough tokens; past that, it is not sent and a 429 response is returned to the
+    client, which retries it or, for AI models with several deployments, fails over to
+    another deployment.
+    """
+    __lock = threading.Lock()
+    __buckets: Dict[Tuple[str, str], TokenBucket] = {}
+    __rejections = None
+    max_queue_seconds: float = DEFAULT_MAX_QUEUE_SECONDS
+    max_sync_queue_seconds: float = DEFAULT_MAX_SYNC_QUEUE_SECONDS
+
+    @staticmethod
+    def configure(config: Configuration):
+        """
+        Reads the settings of the rate limiter.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+        """
+        logger = Telemetry.get_logger(__name__)
+        LanguageModelRateLimiter.max_queue_seconds = read_setting(
+            config, RATE_LIMITER_MAX_QUEUE_SECONDS, float, DEFAULT_MAX_QUEUE_SECONDS, logger, minimum=0)
+        LanguageModelRateLimiter.max_sync_queue_seconds = read_setting(
+            config, RATE_LIMITER_MAX_SYNC_QUEUE_SECONDS, float, DEFAULT_MAX_SYNC_QUEUE_SECONDS, logger, minimum=0)
+
+    @staticmethod
+    def set_tokens_per_minute(url: str, deployment_name: str, tokens_per_minute: int):
+        """
+        Sets the tokens-per-minute rate limit of a deployment, replacing the bucket of the
+        deployment if the rate limit changed.
+
+        Parameters
+        ----------
+        url : str
+            The base URL of the API endpoint hosting the deployment.
+        deployment_name : str
+            The name of the deployment.
+        tokens_per_minute : int
+            The tokens-per-minute rate limit of the deployment.
+        """
+        key = get_deployment_key(url, deployment_name)
+        bucket = LanguageModelRateLimiter.__buckets.get(key)
+        if bucket is not None and bucket.tokens_per_minute == tokens_per_minute:
+            return
+
+        with LanguageModelRateLimiter.__lock:
+            bucket = LanguageModelRateLimiter.__buckets.get(key)
+            if bucket is None or bucket.tokens_per_minute != tokens_per_minute:
+                LanguageModelRateLimiter.__buckets[key] = TokenBucket(tokens_per_minute)
+
+    @staticmethod
+    def get_bucket(key: Optional[Tuple[str, str]]) -> Optional[TokenBucket]:
+        """
+        Gets the token bucket of a deployment, or None if the deployment is not rate limited.
+        """
+        return LanguageModelRateLimiter.__buckets.get(key) if key is not None else None
+
+    @staticmethod
+    def get_available_share(key: Tuple[str, str]) -> float:
+        """
+        Gets the share, between 0 and 1, of the rate limit of a deployment that is available.
+        """
+        bucket = LanguageModelRateLimiter.get_bucket(key)
+        return bucket.available_share if bucket is not None else 1.0
+
+    @staticmethod
+    def get_rejected_response(request: httpx.Request, key: Tuple[str, str], wait_seconds: float) -> httpx.Response:
+        """
+        Creates the 429 response returned instead of sending a request that would wait too long for its deployment.
+        """
+        Telemetry.get_logger(__name__).warning(
+            f'The tokens-per-minute rate limit of the {key[1]} deployment of {key[0]} is reached. The request is retried in {wait_seconds:.1f} seconds.')
+        if LanguageModelRateLimiter.__rejections is None:
+            LanguageModelRateLimiter.__rejections = Telemetry.get_meter(__name__).create_counter(
+                'foundationallm.rate_limiter.rejections',
+                description='The number of requests not sent because the tokens-per-minute rate limit of their deployment was reached.')
+        LanguageModelRateLimiter.__rejections.add(1, {'endpoint': key[0], 'deployment': key[1]})
+
+        return httpx.Response(
+            status_code=429,
+            headers={
+                'content-type': 'application/json',
+                'retry-after': str(max(1, math.ceil(wait_seconds))),
+                'retry-after-ms': str(int(wait_seconds * 1000))
+            },
+            content=json.dumps({'error': {
+                'code': 'ClientRateLimitExceeded',
+                'message': f'The tokens-per-minute rate limit of the {key[1]} deployment is reached.'
+            }}).encode('utf-8'),
+            request=request)
+
+def _get_request_tokens(request: httpx.Request) -> Tuple[Optional[TokenBucket], int, Optional[int]]:
+    """
+    Gets the token bucket of the deployment targeted by a request, the estimated tokens of the
+    request and, if its response is streamed, the estimated completion tokens of the request.
+    The content of the request must have been read.
+    """
+    key = get_deployment_key(str(request.url))
+    bucket = LanguageModelRateLimiter.get_bucket(key)
+    if bucket is None:
+        return None, 0, None
+    try:
+        body = json.loads(request.content)
+    except ValueError:
+        return None, 0, None
+    if not isinstance(body, dict):
+        return None, 0, None
+    return bucket, estimate_tokens(body), estimate_completion_tokens(body) if body.get('stream') else None
+
+def _get_usage_tokens(response: httpx.Response) -> Optional[int]:
+    """
+    Gets the total tokens reported by the usage of a response, if any. The content of the response must have been read.
+    """
+    try:
+        return int(response.json()['usage']['total_tokens'])
+    except Exception:
+        return None
+
+class _StreamUsage:
+    """
+    Reconciles the tokens reserved for a streamed response once the stream is closed.
+
+    The usage is read from the final chunk of the stream, sent when the request sets
+    stream_options.include_usage. Without it, the completion tokens are estimated from the
+    characters of the streamed content and replace the completion tokens that were reserved.
+    """
+    def __init__(self, bucket: TokenBucket, tokens: int, completion_tokens: int):
+        self.bucket = bucket
+        self.tokens = tokens
+        self.completion_tokens = completion_tokens
+        self.usage_tokens: Optional[int] = None
+        self.characters = 0
+        self.__buffer = b''
+        self.__completed = False
+
+    def add(self, chunk: bytes):
+        """
+        Reads the server-sent events of a chunk of the stream.
+        """
+        lines = (self.__buffer + chunk).split(b'\n')
+        self.__buffer = lines.pop()
+        for line in lines:
+            self.__read_event(line)
+
+    def complete(self):
+        """
+        Releases the tokens reserved but not used by the response. Only the first call has an effect.
+        """
+        if self.__completed:
+            return
+        self.__completed = True
+        self.__read_event(self.__buffer)
+
+        if self.usage_tokens is not None:
+            self.bucket.release(self.tokens - self.usage_tokens)
+        else:
+            self.bucket.release(self.completion_tokens - math.ceil(self.characters / CHARACTERS_PER_TOKEN))
+
+    def __read_event(self, line: bytes):
+        line = line.strip()
+        if not line.startswith(b'data:'):
+            return
+        try:
+            event = json.loads(line[5:])
+        except ValueError:
+            # The [DONE] event, or an incomplete event of a stream that was closed early.
+            return
+        if not isinstance(event, dict):
+            return
+
+        usage = event.get('usage')
+        if isinstance(usage, dict) and isinstance(usage.get('total_tokens'), int):
+            self.usage_tokens = usage['total_tokens']
+        for choice in event.get('choices') or []:
+            delta = choice.get('delta') or {}
+            for text in [delta.get('content'), choice.get('text')]:
+                if isinstance(text, str):
+                    self.characters += len(text)
+
+class _UsageTrackingStream(httpx.SyncByteStream):
+    """
+    Stream of a streamed response reconciling its reserved tokens when it is closed.
+    """
+    def __init__(self, stream: httpx.SyncByteStream, usage: _StreamUsage):
+        self.stream = stream
+        self.usage = usage
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.stream:
+            self.usage.add(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            self.usage.complete()
+
+class _AsyncUsageTrackingStream(httpx.AsyncByteStream):
+    """
+    Asynchronous stream of a streamed response reconciling its reserved tokens when it is closed.
+    """
+    def __init__(self, stream: httpx.AsyncByteStream, usage: _StreamUsage):
+        self.stream = stream
+        self.usage = usage
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            self.usage.add(chunk)
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self.stream.aclose()
+        finally:
+            self.usage.complete()
+
+class RateLimitingTransport(httpx.BaseTransport):
+    """
+    httpx transport holding the requests sent to rate limited deployments until their token bucket
+    holds enough tokens. The estimated tokens are reconciled with the usage reported by the response,
+    or by the stream once it is closed, and released when the response is not successful.
+    Synchronous requests wait for at most max_sync_queue_seconds, since they block their thread.
+    """
+    def __init__(self, transport: httpx.BaseTransport = None):
+        self.transport = transport or CircuitBreakerTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        bucket, tokens, stream_completion_tokens = _get_request_tokens(request)
+        if bucket is None:
+            return self.transport.handle_request(request)
+
+        wait_seconds = bucket.reserve(tokens, min(
+            LanguageModelRateLimiter.max_queue_seconds, LanguageModelRateLimiter.max_sync_queue_seconds))
+        if wait_seconds is None:
+            return LanguageModelRateLimiter.get_rejected_response(
+                request, get_deployment_key(str(request.url)), bucket.get_wait_seconds(tokens))
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+        try:
+            response = self.transport.handle_request(request)
+        except BaseException:
+            # The request did not reach the deployment.
+            bucket.release(tokens)
+            raise
+
+        if not response.is_success:
+            # Throttled, rejected and failed requests do not consume the quota of the deployment.
+            bucket.release(tokens)
+        elif response.status_code == 200 and stream_completion_tokens is not None:
+            response.stream = _UsageTrackingStream(response.stream, _StreamUsage(bucket, tokens, stream_completion_tokens))
+        elif response.status_code == 200:
+            response.read()
+            usage_tokens = _get_usage_tokens(response)
+            if usage_tokens is not None:
+                bucket.release(tokens - usage_tokens)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+class AsyncRateLimitingTransport(httpx.AsyncBaseTransport):
+    """
+    Asynchronous httpx transport holding the requests sent to rate limited deployments until their token bucket
+    holds enough tokens. The estimated tokens are reconciled with the usage reported by the response,
+    or by the stream once it is closed, and released when the response is not successful.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport = None):
+        self.transport = transport or AsyncCircuitBreakerTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        bucket, tokens, stream_completion_tokens = _get_request_tokens(request)
+        if bucket is None:
+            return await self.transport.handle_async_request(request)
+
+        wait_seconds = bucket.reserve(tokens, LanguageModelRateLimiter.max_queue_seconds)
+        if wait_seconds is None:
+            return LanguageModelRateLimiter.get_rejected_response(
+                request, get_deployment_key(str(request.url)), bucket.get_wait_seconds(tokens))
+
+        try:
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            # The request did not reach the deployment.
+            bucket.release(tokens)
+            raise
+
+        if not response.is_success:
+            # Throttled, rejected and failed requests do not consume the quota of the deployment.
+            bucket.release(tokens)
+        elif response.status_code == 200 and stream_completion_tokens is not None:
+            response.stream = _AsyncUsageTrackingStream(response.stream, _StreamUsage(bucket, tokens, stream_completion_tokens))
+        elif response.status_code == 200:
+            await response.aread()
+            usage_tokens = _get_usage_tokens(response)
+            if usage_tokens is not None:
+                bucket.release(tokens - usage_tokens)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -1 +1,2 @@
 from .orchestration_manager import OrchestrationManager
+from .completion_scheduler import CompletionScheduler
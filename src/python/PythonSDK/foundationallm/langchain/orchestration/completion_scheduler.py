@@ -0,0 +1,283 @@
+"""
+Class: CompletionScheduler
+Description: Weighted fair scheduler for completion requests executed by the OrchestrationManager.
+"""
+import asyncio
+import json
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+from foundationallm.config import Configuration, read_settings
+from foundationallm.models.orchestration import CompletionPriorityClasses
+from foundationallm.telemetry import Telemetry
+
+SCHEDULING_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:Scheduling'
+SCHEDULING_INSTANCE_WEIGHTS = f'{SCHEDULING_CONFIGURATION_NAMESPACE}:InstanceWeights'
+SCHEDULING_USER_WEIGHTS = f'{SCHEDULING_CONFIGURATION_NAMESPACE}:UserWeights'
+SCHEDULING_AGENT_PRIORITY_CLASSES = f'{SCHEDULING_CONFIGURATION_NAMESPACE}:AgentPriorityClasses'
+SCHEDULING_MAX_BATCH_CONCURRENCY = f'{SCHEDULING_CONFIGURATION_NAMESPACE}:MaxBatchConcurrency'
+
+# Priority classes in the order in which they are served.
+PRIORITY_CLASS_ORDER = [CompletionPriorityClasses.INTERACTIVE, CompletionPriorityClasses.BATCH]
+
+class _Flow:
+    """
+    A flow tracked by a fair queue. A flow either holds child flows or waiting requests.
+    """
+    def __init__(self, weight: float, leaf: bool):
+        self.weight = weight
+        self.start_tag = 0.0
+        self.finish_tag = 0.0
+        self.pending = 0
+        self.children: Optional[_FairQueue] = None if leaf else _FairQueue()
+        self.waiters: Optional[Deque[asyncio.Future]] = deque() if leaf else None
+
+class _FairQueue:
+    """
+    Start-time fair queue: serves the backlogged flow with the smallest start tag and
+    advances its tags by the inverse of its weight after each request it is served.
+    """
+    def __init__(self):
+        self.virtual_time = 0.0
+        self.flows: Dict[str, _Flow] = {}
+
+    def push(self, key: str, weight: float, leaf: bool) -> _Flow:
+        flow = self.flows.get(key)
+        if flow is None:
+            flow = self.flows[key] = _Flow(weight, leaf)
+        flow.weight = weight
+        if flow.pending == 0:
+            # A flow that becomes backlogged does not get credit for the time it was idle.
+            flow.start_tag = max(self.virtual_time, flow.finish_tag)
+        flow.pending += 1
+        return flow
+
+    def withdraw(self, flow: _Flow):
+        """
+        Withdraws a request that was pushed to a flow and will no longer be served.
+        """
+        flow.pending -= 1
+
+    def pop(self) -> Optional[_Flow]:
+        backlogged = [flow for flow in self.flows.values() if flow.pending > 0]
+        if len(backlogged) == 0:
+            return None
+        flow = min(backlogged, key=lambda f: f.start_tag)
+        self.virtual_time = flow.start_tag
+        flow.finish_tag = flow.start_tag + 1.0 / flow.weight
+        flow.pending -= 1
+        if flow.pending > 0:
+            flow.start_tag = flow.finish_tag
+
+        # Forget idle flows that no longer carry any scheduling history.
+        for key in [k for k, f in self.flows.items() if f.pending == 0 and f.finish_tag <= self.virtual_time]:
+            del self.flows[key]
+        return flow
+
+class CompletionScheduler:
+    """
+    Schedules completion requests using weighted fair queuing.
+
+    Requests are first ordered by priority class; interactive requests are always
+    dispatched before batch requests. Within a priority class, execution slots are
+    shared fairly between instances according to the instance weights and, within
+    an instance, between users according to the user weights.
+    """
+    def __init__(
+        self,
+        max_concurrency: int,
+        instance_weights: Optional[Dict[str, float]] = None,
+        user_weights: Optional[Dict[str, float]] = None,
+        agent_priority_classes: Optional[Dict[str, str]] = None,
+        max_batch_concurrency: Optional[int] = None):
+        """
+        Initializes the completion scheduler.
+
+        Parameters
+        ----------
+        max_concurrency : int
+            The maximum number of completion requests executing at the same time.
+        instance_weights : Dict[str, float]
+            The relative weights of FoundationaLLM instances. Instances not listed have a weight of 1.
+        user_weights : Dict[str, float]
+            The relative weights of users, keyed by user principal name. Users not listed have a weight of 1.
+        agent_priority_classes : Dict[str, str]
+            The priority classes of agents, keyed by agent name. Agents not listed are interactive.
+        max_batch_concurrency : int
+            The maximum number of batch requests executing at the same time.
+            Defaults to half of max_concurrency so interactive requests always find free slots.
+        """
+        if max_concurrency < 1:
+            raise ValueError('The max_concurrency parameter must be greater than zero.')
+
+        self.max_concurrency = max_concurrency
+        self.instance_weights = self.__validate_weights(instance_weights or {})
+        self.user_weights = self.__validate_weights(user_weights or {})
+        self.agent_priority_classes = {
+            agent_name: CompletionPriorityClasses(priority_class)
+            for agent_name, priority_class in (agent_priority_classes or {}).items()
+        }
+        self.max_class_concurrency = {
+            CompletionPriorityClasses.INTERACTIVE: max_concurrency,
+            CompletionPriorityClasses.BATCH: max(1, min(max_concurrency, max_batch_concurrency or max_concurrency // 2))
+        }
+        self.running = 0
+        self.running_by_class = {priority_class: 0 for priority_class in PRIORITY_CLASS_ORDER}
+        self.__queues = {priority_class: _FairQueue() for priority_class in PRIORITY_CLASS_ORDER}
+        self.logger = Telemetry.get_logger(__name__)
+
+    @staticmethod
+    def from_config(config: Configuration, max_concurrency: int) -> 'CompletionScheduler':
+        """
+        Creates a completion scheduler using the LangChainAPI scheduling configuration settings.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+        max_concurrency : int
+            The maximum number of completion requests executing at the same time.
+
+        Returns
+        -------
+        CompletionScheduler
+            The configured completion scheduler.
+        """
+        settings = read_settings(config, [
+            (SCHEDULING_INSTANCE_WEIGHTS, json.loads, None),
+            (SCHEDULING_USER_WEIGHTS, json.loads, None),
+            (SCHEDULING_AGENT_PRIORITY_CLASSES, json.loads, None),
+            (SCHEDULING_MAX_BATCH_CONCURRENCY, json.loads, None)], Telemetry.get_logger(__name__))
+
+        return CompletionScheduler(
+            max_concurrency = max_concurrency,
+            instance_weights = settings[SCHEDULING_INSTANCE_WEIGHTS],
+            user_weights = settings[SCHEDULING_USER_WEIGHTS],
+            agent_priority_classes = settings[SCHEDULING_AGENT_PRIORITY_CLASSES],
+            max_batch_concurrency = settings[SCHEDULING_MAX_BATCH_CONCURRENCY]
+        )
+
+    def get_priority_class(self, agent_name: Optional[str]) -> CompletionPriorityClasses:
+        """
+        Retrieves the priority class assigned to an agent.
+
+        Parameters
+        ----------
+        agent_name : str
+            The name of the agent.
+
+        Returns
+        -------
+        CompletionPriorityClasses
+            The priority class of the agent.
+        """
+        return self.agent_priority_classes.get(agent_name, CompletionPriorityClasses.INTERACTIVE)
+
+    @property
+    def queued(self) -> int:
+        """The number of completion requests waiting for an execution slot."""
+        return sum(
+            user_flow.pending
+            for queue in self.__queues.values()
+            for instance_flow in queue.flows.values()
+            for user_flow in instance_flow.children.flows.values())
+
+    @asynccontextmanager
+    async def schedule(
+        self,
+        instance_id: str,
+        user_id: Optional[str],
+        agent_name: Optional[str] = None,
+        priority_class: Optional[CompletionPriorityClasses] = None):
+        """
+        Waits until the completion request is granted an execution slot and holds the
+        slot for the duration of the context.
+
+        Parameters
+        ----------
+        instance_id : str
+            The unique identifier of the FoundationaLLM instance.
+        user_id : str
+            The user principal name of the user who submitted the request.
+        agent_name : str
+            The name of the agent executing the request. Used to determine the priority class.
+        priority_class : CompletionPriorityClasses
+            Overrides the priority class assigned to the agent.
+        """
+        priority_class = CompletionPriorityClasses(priority_class) if priority_class is not None \
+            else self.get_priority_class(agent_name)
+
+        waiter = asyncio.get_running_loop().create_future()
+        instance_flow = self.__queues[priority_class].push(
+            instance_id,
+            self.instance_weights.get(instance_id, 1.0),
+            leaf=False)
+        user_flow = instance_flow.children.push(
+            user_id or '',
+            self.user_weights.get(user_id, 1.0),
+            leaf=True)
+        user_flow.waiters.append(waiter)
+        self.__dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before the cancellation.
+                self.__release(priority_class)
+            else:
+                waiter.cancel()
+                if waiter in user_flow.waiters:
+                    # Withdraw the request so it is no longer counted as queued.
+                    user_flow.waiters.remove(waiter)
+                    instance_flow.children.withdraw(user_flow)
+                    self.__queues[priority_class].withdraw(instance_flow)
+            raise
+
+        try:
+            yield
+        finally:
+            self.__release(priority_class)
+
+    def __release(self, priority_class: CompletionPriorityClasses):
+        self.running -= 1
+        self.running_by_class[priority_class] -= 1
+        self.__dispatch()
+
+    def __dispatch(self):
+        """
+        Grants free execution slots to waiting requests in priority and fair-share order.
+        """
+        while self.running < self.max_concurrency:
+            waiter = None
+            for priority_class in PRIORITY_CLASS_ORDER:
+                if self.running_by_class[priority_class] >= self.max_class_concurrency[priority_class]:
+                    continue
+                waiter = self.__pop_waiter(self.__queues[priority_class])
+                if waiter is not None:
+                    self.running += 1
+                    self.running_by_class[priority_class] += 1
+                    waiter.set_result(None)
+                    break
+            if waiter is None:
+                return
+
+    def __pop_waiter(self, queue: _FairQueue) -> Optional[asyncio.Future]:
+        while True:
+            instance_flow = queue.pop()
+            if instance_flow is None:
+                return None
+            user_flow = instance_flow.children.pop()
+            waiter = user_flow.waiters.popleft()
+            # Skip requests that were cancelled but not yet withdrawn.
+            if not waiter.done():
+                return waiter
+
+    def __validate_weights(self, weights: Dict[str, float]) -> Dict[str, float]:
+        validated = {}
+        for key, weight in weights.items():
+            if float(weight) <= 0:
+                raise ValueError(f'The scheduling weight for {key} must be greater than zero.')
+            validated[key] = float(weight)
+        return validated
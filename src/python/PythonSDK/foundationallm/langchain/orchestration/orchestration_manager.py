@@ -1,7 +1,11 @@
+import asyncio
+from contextlib import nullcontext
+from typing import AsyncContextManager, AsyncIterator, Callable, List, Optional, Union
 from foundationallm.config import Configuration, UserIdentity
 from foundationallm.langchain.agents import AgentFactory, LangChainAgentBase
 from foundationallm.operations import OperationsManager
 from foundationallm.plugins import PluginManager
+from foundationallm.resilience import RetryContext
 from foundationallm.models.orchestration import (
     CompletionRequestBase,
     CompletionResponse
@@ -34,6 +38,7 @@ class OrchestrationManager:
         operations_manager : OperationsManager
             The operations manager object for allowing an agent to interact with the State API.
         """
+        self.config = configuration
         self.agent = self.__create_agent(
             completion_request = completion_request,
             config = configuration,
@@ -74,5 +79,81 @@ class OrchestrationManager:
         CompletionResponse
             Object containing the completion response and token usage details.
         """
-        completion_response = await self.agent.invoke_async(request)
+        # The retries of the calls made by the agent share the retry budget of the request.
+        with RetryContext.from_config(self.config):
+            completion_response = await self.agent.invoke_async(request)
         return completion_response
+
+    async def invoke_batch_async(
+        self,
+        requests: List[CompletionRequestBase],
+        max_concurrency: int,
+        schedule: Optional[Callable[[], AsyncContextManager]] = None) -> List[Union[CompletionResponse, Exception]]:
+        """
+        Executes a batch of completion requests using the LangChain agent assembled by the OrchestrationManager.
+        The requests share the agent, so validation and the language model clients are set up once for the batch.
+
+        Parameters
+        ----------
+        requests : List[CompletionRequestBase]
+            The completion requests to execute. The requests must share the same agent and objects.
+        max_concurrency : int
+            The maximum number of requests executing at the same time.
+        schedule : Callable[[], AsyncContextManager]
+            Creates the context that holds the execution slot of a request, such as a slot of the
+            completion scheduler. The requests are executed without waiting for a slot if not set.
+
+        Returns
+        -------
+        List[Union[CompletionResponse, Exception]]
+            The completion response of each request, in request order, or the exception raised while executing it.
+        """
+        if max_concurrency < 1:
+            raise ValueError('The max_concurrency parameter must be greater than zero.')
+
+        results: List[Union[CompletionResponse, Exception]] = [None] * len(requests)
+        indexes = iter(range(len(requests)))
+
+        async def invoke_items_async():
+            # The workers share the iterator, so each request is executed by a single worker.
+            for index in indexes:
+                try:
+                    async with schedule() if schedule is not None else nullcontext():
+                        with RetryContext.from_config(self.config):
+                            results[index] = await self.agent.invoke_async(requests[index])
+                except Exception as e:
+                    results[index] = e
+
+        await asyncio.gather(*[invoke_items_async() for _ in range(min(max_concurrency, len(requests)))])
+        return results
+
+    async def stream_async(self, request: CompletionRequestBase) -> AsyncIterator[Union[str, CompletionResponse]]:
+        """
+        Executes an async completion request and streams the generated text as it is produced.
+
+        Parameters
+        ----------
+        request : CompletionRequestBase
+            The completion request to execute.
+
+        Returns
+        -------
+        AsyncIterator[Union[str, CompletionResponse]]
+            Yields the generated text chunks followed by the final CompletionResponse.
+            Workflows that do not support streaming only yield the final CompletionResponse.
+        """
+        chunks = asyncio.Queue()
+        # The task copies the current context, including the retry context of the request.
+        with RetryContext.from_config(self.config):
+            completion_task = asyncio.create_task(
+                self.agent.invoke_async(request, stream_handler=chunks.put))
+        # A None item marks the end of the stream.
+        completion_task.add_done_callback(lambda _: chunks.put_nowait(None))
+
+        try:
+            while (chunk := await chunks.get()) is not None:
+                yield chunk
+            yield await completion_task
+        finally:
+            if not completion_task.done():
+                completion_task.cancel()
@@ -2,8 +2,9 @@
 Class: AzureAISearchServiceRetriever
 Description: LangChain retriever for Azure AI Search.
 """
+import asyncio
 import json
-from typing import List, Optional, Any
+from typing import ClassVar, List, Optional, Any
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.callbacks import (
     AsyncCallbackManagerForRetrieverRun,
@@ -12,14 +13,29 @@ from langchain_core.callbacks import (
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.search.documents.models import VectorizedQuery
-from azure.identity import DefaultAzureCredential
+from foundationallm.authentication import AzureCredentialManager
+from foundationallm.config import Configuration, read_setting
 from foundationallm.models.orchestration import ContentArtifact
 from foundationallm.models.vectors import VectorDocument
+from foundationallm.resilience import (
+    AsyncCircuitBreakerPolicy,
+    CircuitBreakerPolicy,
+    RetryContext,
+    RetryStrategyRegistry
+)
 from foundationallm.services.gateway_text_embedding import GatewayTextEmbeddingService
+from foundationallm.telemetry import Telemetry
 from .content_artifact_retrieval_base import ContentArtifactRetrievalBase
 from foundationallm.models.agents import KnowledgeManagementIndexConfiguration
 
+AZURE_AI_SEARCH_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:AzureAISearch'
+AZURE_AI_SEARCH_INDEX_TIMEOUT_SECONDS = f'{AZURE_AI_SEARCH_CONFIGURATION_NAMESPACE}:IndexTimeoutSeconds'
+
+# The time an asynchronous search waits for the results of each index, retries included.
+DEFAULT_INDEX_TIMEOUT_SECONDS = 10.0
+
 class AzureAISearchServiceRetriever(BaseRetriever, ContentArtifactRetrievalBase):
     """
     LangChain retriever for Azure AI Search.
@@ -31,6 +47,8 @@ class AzureAISearchServiceRetriever(BaseRetriever, ContentArtifactRetrievalBase)
             -> Service for retrieving text embeddings
 
     Searches embedding and text fields in the index for the top_n most relevant documents.
+    Asynchronous searches query all the indexes concurrently; an index that fails or does not
+    respond within the index timeout is left out of the results, unless all the indexes fail.
 
     Default FFLM document structure (overridable by setting the embedding and text field names):
         {
@@ -43,6 +61,9 @@ class AzureAISearchServiceRetriever(BaseRetriever, ContentArtifactRetrievalBase)
             "IsReference": "true/false if the document is a reference document"
         }
     """
+    # The time an asynchronous search waits for the results of each index.
+    index_timeout_seconds: ClassVar[float] = DEFAULT_INDEX_TIMEOUT_SECONDS
+
     config : Any
     index_configurations: List[KnowledgeManagementIndexConfiguration]
     gateway_text_embedding_service: GatewayTextEmbeddingService
@@ -50,13 +71,107 @@ class AzureAISearchServiceRetriever(BaseRetriever, ContentArtifactRetrievalBase)
     query_type: Optional[str] = "simple"
     semantic_configuration_name: Optional[str] = None
     top_n_override: Optional[int] = None
-    
+
+    @staticmethod
+    def configure(config: Configuration):
+        """
+        Reads the search settings shared by all the retrievers.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+        """
+        AzureAISearchServiceRetriever.index_timeout_seconds = read_setting(
+            config, AZURE_AI_SEARCH_INDEX_TIMEOUT_SECONDS, float, DEFAULT_INDEX_TIMEOUT_SECONDS,
+            Telemetry.get_logger(__name__), minimum=0.001)
+
     def __get_embeddings(self, text: str) -> List[float]:
         """
         Returns embeddings vector for a given text.
+        The vector is kept as float32 values by the embedding service and its cache; the
+        search client serializes vector queries to JSON, so it gets the vector as a list.
         """
         embedding_response = self.gateway_text_embedding_service.get_embedding(text)
-        return embedding_response.embedding_vector
+        return embedding_response.embedding_vector.tolist()
+
+    async def __aget_embeddings(self, text: str) -> List[float]:
+        """
+        Asynchronously returns embeddings vector for a given text.
+        """
+        embedding_response = await self.gateway_text_embedding_service.aget_embedding(text)
+        return embedding_response.embedding_vector.tolist()
+
+    def __get_top_n(self, index_config: KnowledgeManagementIndexConfiguration) -> int:
+        """
+        Returns the number of documents to retrieve from an index.
+        """
+        if self.top_n_override:
+            return self.top_n_override
+        return int(index_config.indexing_profile.settings.top_n)
+
+    def __get_search_client_arguments(self, index_config: KnowledgeManagementIndexConfiguration) -> dict:
+        """
+        Returns the endpoint, index name and retry options of the search client of an index.
+        """
+        retry_strategy = RetryStrategyRegistry.get_strategy(index_config.api_endpoint_configuration.retry_strategy_name)
+        return {
+            'endpoint': index_config.api_endpoint_configuration.url,
+            'index_name': index_config.indexing_profile.settings.index_name,
+            **retry_strategy.get_azure_core_retry_options()
+        }
+
+    def __get_search_arguments(
+        self,
+        index_config: KnowledgeManagementIndexConfiguration,
+        query: str,
+        vector: List[float]) -> dict:
+        """
+        Returns the arguments of the hybrid search of an index.
+        """
+        vector_query = VectorizedQuery(vector=vector,
+                                        k_nearest_neighbors=3,
+                                        fields=index_config.indexing_profile.settings.embedding_field_name)
+        return {
+            'search_text': query,
+            'filter': index_config.indexing_profile.settings.filters,
+            'vector_queries': [vector_query],
+            'query_type': self.query_type,
+            'semantic_configuration_name': self.semantic_configuration_name,
+            'top': self.__get_top_n(index_config)
+        }
+
+    def __get_vector_document(self, index_config: KnowledgeManagementIndexConfiguration, result: dict) -> VectorDocument:
+        """
+        Loads a search result into a VectorDocument object for score processing.
+        """
+        metadata = {}
+        if index_config.indexing_profile.settings.metadata_field_name in result:
+            try:
+                metadata = json.loads(result[index_config.indexing_profile.settings.metadata_field_name])
+            except Exception as e:
+                metadata = {}
+
+        return VectorDocument(
+                id=result[index_config.indexing_profile.settings.id_field_name],
+                page_content=result[index_config.indexing_profile.settings.text_field_name],
+                metadata=metadata,
+                score=result["@search.score"],
+                rerank_score=result.get("@search.reranker_score", 0.0)
+        )
+
+    def __set_search_results(self, documents: List[VectorDocument], rerank_available: bool, top_n: int) -> List[Document]:
+        """
+        Sorts the documents retrieved from all the indexes by score and keeps the top n.
+        """
+        if rerank_available:
+            documents.sort(key=lambda x: (x.rerank_score, x.score), reverse=True)
+        else:
+            documents.sort(key=lambda x: x.score, reverse=True)
+
+        self.search_results = documents[:top_n]
+        return self.search_results
 
     def _get_relevant_documents(
         self, query: str, *, run_manager: CallbackManagerForRetrieverRun
@@ -64,85 +179,87 @@ class AzureAISearchServiceRetriever(BaseRetriever, ContentArtifactRetrievalBase)
         """
         Performs a synchronous hybrid search on Azure AI Search index
         """
+        documents = []
+        rerank_available = False
+        top_n = 0
+        vector = self.__get_embeddings(query)
 
-        self.search_results.clear()
-        
         #search each indexing profile
         for index_config in self.index_configurations:
 
-            credential_type = index_config.api_endpoint_configuration.authentication_type
-
             credential = None
-            if credential_type == "AzureIdentity":
-                credential = DefaultAzureCredential()
-
-            endpoint = index_config.api_endpoint_configuration.url
-
-            if self.top_n_override:
-                top_n = self.top_n_override
-            else:
-                top_n = int(index_config.indexing_profile.settings.top_n)
+            if index_config.api_endpoint_configuration.authentication_type == "AzureIdentity":
+                # Azure AI Search accepts the service principal set in the environment variables.
+                credential = AzureCredentialManager.get_credential(exclude_environment_credential=False)
 
+            search_client = SearchClient(
+                credential=credential,
+                per_retry_policies=[CircuitBreakerPolicy()],
+                **self.__get_search_client_arguments(index_config))
+            results = search_client.search(**self.__get_search_arguments(index_config, query, vector))
 
-            search_client = SearchClient(endpoint, index_config.indexing_profile.settings.index_name, credential)
-            vector_query = VectorizedQuery(vector=self.__get_embeddings(query),
-                                            k_nearest_neighbors=3,
-                                            fields=index_config.indexing_profile.settings.embedding_field_name)
-
-            results = search_client.search(
-                search_text=query,
-                filter=index_config.indexing_profile.settings.filters,
-                vector_queries=[vector_query],
-                query_type=self.query_type,
-                semantic_configuration_name = self.semantic_configuration_name,
-                top=top_n                
-            )
-
-            rerank_available = False
-
-            #load search results into VectorDocument objects for score processing
             for result in results:
-                metadata = {}              
-                
-                if index_config.indexing_profile.settings.metadata_field_name in result:
-                    
-                    try:
-                        metadata = json.loads(result[index_config.indexing_profile.settings.metadata_field_name]) if index_config.indexing_profile.settings.metadata_field_name in result else {}
-                    except Exception as e:
-                        metadata = {}
-
-                document = VectorDocument(
-                        id=result[index_config.indexing_profile.settings.id_field_name],
-                        page_content=result[index_config.indexing_profile.settings.text_field_name],
-                        metadata=metadata,
-                        score=result["@search.score"],
-                        rerank_score=result.get("@search.reranker_score", 0.0)
-                )
-                if('@search.reranker_score' in result):                    
+                if '@search.reranker_score' in result:
                     rerank_available = True
-                    
-                document.score = result["@search.score"]
-                self.search_results.append(document)
+                documents.append(self.__get_vector_document(index_config, result))
+            top_n = self.__get_top_n(index_config)
 
-        #sort search results by score
-        if(rerank_available):
-            self.search_results.sort(key=lambda x: (x.rerank_score, x.score), reverse=True)
-        else:
-            self.search_results.sort(key=lambda x: x.score, reverse=True)
+        return self.__set_search_results(documents, rerank_available, top_n)
 
-        #take top n of search_results          
-        self.search_results = self.search_results[:top_n]
+    async def __asearch_index(
+        self,
+        index_config: KnowledgeManagementIndexConfiguration,
+        query: str,
+        vector: List[float]) -> List[dict]:
+        """
+        Asynchronously performs the hybrid search of an index.
+        """
+        credential = None
+        if index_config.api_endpoint_configuration.authentication_type == "AzureIdentity":
+            credential = AzureCredentialManager.get_async_credential(exclude_environment_credential=False)
 
-        return self.search_results
+        async with AsyncSearchClient(
+            credential=credential,
+            per_retry_policies=[AsyncCircuitBreakerPolicy()],
+            **self.__get_search_client_arguments(index_config)) as search_client:
+            results = await search_client.search(**self.__get_search_arguments(index_config, query, vector))
+            return [result async for result in results]
 
     async def _aget_relevant_documents(
         self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
     ) -> List[Document]:
         """
-        Performs an asynchronous hybrid search on Azure AI Search index
-        NOTE: This functionality is not currently supported in the underlying Azure SDK.
+        Performs an asynchronous hybrid search on Azure AI Search index.
+        The indexes are searched concurrently, each within the index timeout. The indexes
+        that fail are left out of the results; the search fails if all the indexes fail.
         """
-        raise Exception(f"Asynchronous search not supported.")
+        vector = await self.__aget_embeddings(query)
+        timeout_seconds = RetryContext.get_timeout_seconds(AzureAISearchServiceRetriever.index_timeout_seconds)
+        index_results = await asyncio.gather(
+            *[asyncio.wait_for(self.__asearch_index(index_config, query, vector), timeout_seconds)
+                for index_config in self.index_configurations],
+            return_exceptions=True)
+
+        documents = []
+        rerank_available = False
+        top_n = 0
+        failures = []
+        for index_config, results in zip(self.index_configurations, index_results):
+            if isinstance(results, BaseException):
+                Telemetry.get_logger(__name__).warning(
+                    f'The search of the {index_config.indexing_profile.settings.index_name} index failed: {repr(results)}')
+                failures.append(results)
+                continue
+            for result in results:
+                if '@search.reranker_score' in result:
+                    rerank_available = True
+                documents.append(self.__get_vector_document(index_config, result))
+            top_n = self.__get_top_n(index_config)
+
+        if failures and len(failures) == len(self.index_configurations):
+            raise failures[0]
+
+        return self.__set_search_results(documents, rerank_available, top_n)
 
     def get_document_content_artifacts(self) -> List[ContentArtifact]:
         """
@@ -1,12 +1,12 @@
 import json
 from enum import Enum
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.tools import ToolException
 from openai import AsyncAzureOpenAI
 from pydantic import BaseModel, Field
 from typing import Optional, Type
 
+from foundationallm.authentication import AzureCredentialManager
 from foundationallm.langchain.common import FoundationaLLMToolBase
 from foundationallm.config import Configuration, UserIdentity
 from foundationallm.models.agents import AgentTool
@@ -143,10 +143,7 @@ class DALLEImageGenerationTool(FoundationaLLMToolBase):
         """
         scope = self.api_endpoint.authentication_parameters.get('scope', 'https://cognitiveservices.azure.com/.default')
         # Set up a Azure AD token provider.
-        token_provider = get_bearer_token_provider(
-            DefaultAzureCredential(exclude_environment_credential=True),
-            scope
-        )
+        token_provider = AzureCredentialManager.get_bearer_token_provider(scope)
         return AsyncAzureOpenAI(
             azure_endpoint = self.api_endpoint.url,
             api_version = self.api_endpoint.api_version,
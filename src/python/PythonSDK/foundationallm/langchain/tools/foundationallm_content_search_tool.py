@@ -48,8 +48,7 @@ class FoundationaLLMContentSearchTool(FoundationaLLMToolBase):
             prompt: str,           
             run_manager: Optional[AsyncCallbackManagerForToolRun] = None):
         """ Retrieves documents from an index based on the proximity to the prompt to answer the prompt."""
-        # Azure AI Search retriever only supports synchronous execution.
-        docs = self.retriever.invoke(prompt)
+        docs = await self.retriever.ainvoke(prompt)
         context = self.retriever.format_docs(docs)
         rag_prompt = f"Answer the question using only the context provided.\n\nContext:\n{context}\n\nQuestion:{prompt}"
         
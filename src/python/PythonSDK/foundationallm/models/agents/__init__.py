@@ -12,5 +12,6 @@ from .agent_workflows.langgraph_react_agent_workflow import LangGraphReactAgentW
 from .agent_base import AgentBase
 from .knowledge_management_agent import KnowledgeManagementAgent
 from .knowledge_management_completion_request import KnowledgeManagementCompletionRequest
+from .knowledge_management_batch_completion_request import KnowledgeManagementBatchCompletionRequest
 from .knowledge_management_index_configuration import KnowledgeManagementIndexConfiguration
 from .resource_object_ids_model_base import ResourceObjectIdsModelBase
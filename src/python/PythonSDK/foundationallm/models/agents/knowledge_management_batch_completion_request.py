@@ -0,0 +1,42 @@
+"""
+Class Name: KnowledgeManagementBatchCompletionRequest
+Description: Encapsulates a batch of knowledge management completion requests executed by the same agent.
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from .agent_workflows.azure_openai_assistants_agent_workflow import AzureOpenAIAssistantsAgentWorkflow
+from .knowledge_management_agent import KnowledgeManagementAgent
+from .knowledge_management_completion_request import KnowledgeManagementCompletionRequest
+
+class KnowledgeManagementBatchCompletionRequest(BaseModel):
+    """
+    The batch completion request received from the Orchestration API.
+    The agent and objects are sent once and shared by all the completion requests of the batch.
+    """
+    operation_id: str = Field(description="The operation ID for the batch.")
+    agent: Optional[KnowledgeManagementAgent] = None
+    objects: dict = {}
+    max_concurrency: Optional[int] = Field(None, description="The maximum number of completion requests of the batch executing at the same time.")
+    items: List[KnowledgeManagementCompletionRequest] = Field(description="The completion requests of the batch.")
+
+    def get_completion_requests(self) -> List[KnowledgeManagementCompletionRequest]:
+        """
+        Gets the completion requests of the batch, sharing the agent and objects of the batch.
+        Agents using the Azure OpenAI Assistants workflow are not supported: the completion requests
+        would share the assistant thread of the batch, and the Assistants API only runs one request
+        per thread at a time.
+
+        Returns
+        -------
+        List[KnowledgeManagementCompletionRequest]
+            The completion requests of the batch.
+        """
+        if self.agent is not None and isinstance(self.agent.workflow, AzureOpenAIAssistantsAgentWorkflow):
+            raise ValueError(f'The agent {self.agent.name} uses the Azure OpenAI Assistants workflow, which does not support batch completion requests.')
+        for item in self.items:
+            if item.agent is not None and self.agent is not None and item.agent.name != self.agent.name:
+                raise ValueError(f'The completion request {item.operation_id} targets the agent {item.agent.name} instead of the batch agent {self.agent.name}.')
+        return [
+            item.model_copy(update={'agent': self.agent, 'objects': self.objects})
+            for item in self.items
+        ]
@@ -11,6 +11,8 @@ from .openai_file_path_message_content_item import OpenAIFilePathMessageContentI
 from .openai_image_file_message_content_item import OpenAIImageFileMessageContentItem
 from .openai_text_message_content_item import OpenAITextMessageContentItem
 
+from .completion_priority_classes import CompletionPriorityClasses
 from .completion_request_object_keys import CompletionRequestObjectKeys
 from .completion_request_base import CompletionRequestBase
 from .completion_response import CompletionResponse
+from .batch_completion_response import BatchCompletionItemResult, BatchCompletionResponse
@@ -0,0 +1,23 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from foundationallm.models.operations.operation_status import OperationStatus
+from .completion_response import CompletionResponse
+
+class BatchCompletionItemResult(BaseModel):
+    """
+    The result of a single completion request of a batch.
+    """
+    index: int = Field(description="The position of the completion request in the batch.")
+    operation_id: str = Field(description="The operation ID of the completion request.")
+    status: OperationStatus = Field(description="The status of the completion request, either Completed or Failed.")
+    completion_response: Optional[CompletionResponse] = Field(None, description="The completion response, if one was generated.")
+    errors: Optional[List[str]] = Field([], description="The errors that occurred while executing the completion request.")
+
+class BatchCompletionResponse(BaseModel):
+    """
+    Response to a batch of completion requests.
+    """
+    operation_id: str = Field(description="The operation ID of the batch.")
+    items: List[BatchCompletionItemResult] = Field([], description="The results of the completion requests, in request order.")
+    completed_count: int = Field(0, description="The number of completion requests that completed successfully.")
+    failed_count: int = Field(0, description="The number of completion requests that failed.")
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class CompletionPriorityClasses(str, Enum):
+    """Enumerator of the priority classes used when scheduling completion requests."""
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
@@ -1,3 +1,4 @@
+from .ai_model_deployment import AIModelDeployment
 from .ai_model_base import AIModelBase
 from .ai_model_types import AIModelTypes
 from .completion_ai_model import CompletionAIModel
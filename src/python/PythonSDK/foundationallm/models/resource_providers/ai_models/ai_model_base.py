@@ -1,6 +1,7 @@
 from pydantic import Field
-from typing import Any, Self, Optional
+from typing import Any, List, Self, Optional
 from foundationallm.models.resource_providers import ResourceBase
+from .ai_model_deployment import AIModelDeployment
 from foundationallm.utils import ObjectUtils
 from foundationallm.langchain.exceptions import LangChainException
 
@@ -12,6 +13,8 @@ class AIModelBase(ResourceBase):
     version: Optional[str] = Field(description="The version of the AI model.")
     deployment_name: Optional[str] = Field(description="The deployment name for the AI model.")
     model_parameters: Optional[dict] = Field(default={}, description="A dictionary containing default values for model parameters.")
+    tokens_per_minute: Optional[int] = Field(default=None, description="The tokens-per-minute rate limit enforced by the client for the deployment of the AI model.")
+    deployments: Optional[List[AIModelDeployment]] = Field(default=[], description="Additional deployments of the AI model, possibly on other API endpoints, sharing the traffic of the deployment referenced by endpoint_object_id and deployment_name.")
 
     @staticmethod
     def from_object(obj: Any) -> Self:
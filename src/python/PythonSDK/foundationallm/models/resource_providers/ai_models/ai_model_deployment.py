@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class AIModelDeployment(BaseModel):
+    """
+    A deployment of an AI model that shares the traffic of the model.
+    """
+    endpoint_object_id: str = Field(description="The object ID of the APIEndpointConfiguration object providing the configuration for the API endpoint hosting the deployment.")
+    deployment_name: str = Field(description="The name of the deployment.")
+    weight: float = Field(default=1.0, description="The relative share of the traffic sent to the deployment when all the deployments have capacity.")
+    tokens_per_minute: Optional[int] = Field(default=None, description="The tokens-per-minute rate limit enforced by the client for the deployment.")
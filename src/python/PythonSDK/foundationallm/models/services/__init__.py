@@ -1,3 +1,4 @@
+from .embedding_vector import EmbeddingVector, to_embedding_vector
 from .openai_assistants_request import OpenAIAssistantsAPIRequest
 from .openai_assistants_response import OpenAIAssistantsAPIResponse
 from .gateway_text_embedding_response import GatewayTextEmbeddingResponse
@@ -0,0 +1,29 @@
+"""
+Type: EmbeddingVector
+Description: Embedding vector stored as a contiguous buffer of float32 values.
+"""
+from array import array
+from typing import Annotated, Any
+from pydantic import PlainSerializer, PlainValidator, WithJsonSchema
+
+def to_embedding_vector(value: Any) -> array:
+    """
+    Converts a sequence of numbers, or the bytes of packed float32 values, to an embedding vector.
+    The conversion is a single pass in native code instead of the validation of each element.
+    """
+    if isinstance(value, array) and value.typecode == 'f':
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        vector = array('f')
+        vector.frombytes(value)
+        return vector
+    return array('f', value)
+
+# An embedding vector uses 4 bytes per dimension instead of the 32 bytes of a list of Python floats.
+# It serializes to a list of numbers.
+EmbeddingVector = Annotated[
+    array,
+    PlainValidator(to_embedding_vector),
+    PlainSerializer(lambda vector: vector.tolist(), return_type=list),
+    WithJsonSchema({'type': 'array', 'items': {'type': 'number'}})
+]
@@ -2,12 +2,12 @@
 Class:GatewayTextEmbeddingResponse
 Description:  Class representing the response from the Gateway API service for text embedding.
 """
-from typing import List
 from pydantic import BaseModel
+from .embedding_vector import EmbeddingVector
 
 class GatewayTextEmbeddingResponse(BaseModel):
     """
     Class representing an embedding vector operation result.
     """
-    embedding_vector: List[float]
+    embedding_vector: EmbeddingVector
     tokens_count: int
@@ -2,3 +2,5 @@
 Operations module for FoundationaLLM package.
 """
 from .operations_manager import OperationsManager
+from .operation_result_writer import OperationResultWriter
+from .operations_outbox import OperationsOutbox, OutboxDeliveryRejectedException, OutboxEntry, OutboxWriteTypes
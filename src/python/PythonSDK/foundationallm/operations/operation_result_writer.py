@@ -0,0 +1,217 @@
+"""
+Class: OperationResultWriter
+Description: Coalescing, rate-limited writer for the interim results of an operation.
+"""
+import asyncio
+import time
+from logging import Logger
+from typing import Callable, List, Optional
+from foundationallm.models.orchestration import CompletionResponse
+from foundationallm.telemetry import Telemetry
+
+DEFAULT_FLUSH_INTERVAL_SECONDS = 1.0
+DEFAULT_MAX_PENDING_UPDATES = 50
+
+# The list properties of a CompletionResponse that are sent incrementally.
+DELTA_PROPERTIES = ['content', 'analysis_results']
+
+def _get_list_delta(previous: List[dict], current: List[dict]) -> dict:
+    """
+    Gets the changes between two versions of a list of items.
+    Text appended to the string properties of an item is sent as an append; other changes replace the item.
+    """
+    updates = []
+    for index, item in enumerate(current):
+        previous_item = previous[index] if index < len(previous) else None
+        if item == previous_item:
+            continue
+        if isinstance(item, dict) and isinstance(previous_item, dict) and item.keys() == previous_item.keys():
+            changed_keys = [key for key in item.keys() if item[key] != previous_item[key]]
+            if all(
+                isinstance(item[key], str) and isinstance(previous_item[key], str) and item[key].startswith(previous_item[key])
+                for key in changed_keys):
+                updates.append({'index': index, 'append': {key: item[key][len(previous_item[key]):] for key in changed_keys}})
+                continue
+        updates.append({'index': index, 'item': item})
+    return {'length': len(current), 'updates': updates}
+
+class OperationResultWriter:
+    """
+    Writes the interim results of an operation to the State API.
+
+    Only the latest submitted result is kept (latest wins) and at most one write is in flight.
+    A write starts when the flush interval has elapsed since the previous write started, or
+    sooner when the number of coalesced updates reaches max_pending_updates.
+
+    In delta mode, writes send the full result with a sequence number until the State API
+    accepts one of them; the following writes only send the text appended and the items
+    changed since the previous write. When the writes go through the outbox, the State API
+    accepts them after they were submitted; a write that fails or is discarded by the outbox
+    makes the next write send the full result again.
+    """
+    def __init__(
+        self,
+        operations_manager,
+        operation_id: str,
+        instance_id: str,
+        flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        max_pending_updates: int = DEFAULT_MAX_PENDING_UPDATES,
+        delta_updates: bool = False,
+        logger: Logger = None):
+        """
+        Initializes the operation result writer.
+
+        Parameters
+        ----------
+        operations_manager : OperationsManager
+            The operations manager used to write the results.
+        operation_id : str
+            The unique identifier for the operation.
+        instance_id : str
+            The unique identifier for the FLLM instance.
+        flush_interval_seconds : float
+            The minimum time between the start of two writes.
+        max_pending_updates : int
+            The number of coalesced updates that triggers a write before the flush interval elapses.
+        delta_updates : bool
+            Indicates whether writes after the first one only send the changes to the result.
+        logger : Logger
+            The logger used to report failed writes.
+        """
+        if flush_interval_seconds < 0:
+            raise ValueError('The flush_interval_seconds parameter cannot be negative.')
+        if max_pending_updates < 1:
+            raise ValueError('The max_pending_updates parameter must be greater than zero.')
+
+        self.operations_manager = operations_manager
+        self.operation_id = operation_id
+        self.instance_id = instance_id
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending_updates = max_pending_updates
+        self.delta_updates = delta_updates
+        self.logger = logger or Telemetry.get_logger(__name__)
+
+        self.__latest: Optional[CompletionResponse] = None
+        self.__pending_updates = 0
+        self.__last_write_started = float('-inf')
+        self.__flush_requested = asyncio.Event()
+        self.__writer_task: Optional[asyncio.Task] = None
+        self.__sequence_number = 0
+        # The sequence number of the last full result, which is the base of the deltas once accepted.
+        self.__full_result_sequence_number = 0
+        # The result the next delta is based on, or None if the next write sends the full result.
+        self.__acknowledged: Optional[dict] = None
+
+    def submit(self, result: CompletionResponse):
+        """
+        Submits the current interim result. The result is serialized when it is written,
+        so later changes to the same object are included in the write.
+
+        Parameters
+        ----------
+        result : CompletionResponse
+            The interim result of the operation.
+        """
+        self.__latest = result
+        self.__pending_updates += 1
+        if self.__pending_updates >= self.max_pending_updates:
+            self.__flush_requested.set()
+
+        if self.__writer_task is None or self.__writer_task.done():
+            self.__writer_task = asyncio.create_task(self.__write_loop_async())
+
+    async def flush_async(self):
+        """
+        Writes the latest submitted result, if it was not written yet, and waits until all writes complete.
+        """
+        self.__flush_requested.set()
+        if self.__writer_task is not None:
+            await self.__writer_task
+        if self.__latest is not None:
+            # A result was submitted while the writer task was finishing.
+            await self.__write_latest_async()
+
+    async def __write_loop_async(self):
+        while self.__latest is not None:
+            delay = self.__last_write_started + self.flush_interval_seconds - time.monotonic()
+            if delay > 0 and not self.__flush_requested.is_set():
+                try:
+                    await asyncio.wait_for(self.__flush_requested.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            await self.__write_latest_async()
+
+    async def __write_latest_async(self):
+        result = self.__latest
+        self.__latest = None
+        self.__pending_updates = 0
+        self.__flush_requested.clear()
+        self.__last_write_started = time.monotonic()
+        try:
+            if not self.delta_updates:
+                await self.operations_manager.set_operation_result_async(self.operation_id, self.instance_id, result)
+                return
+
+            snapshot = result.model_dump(include=set(DELTA_PROPERTIES))
+            sequence_number = self.__sequence_number + 1
+            if self.__acknowledged is None:
+                delivery = await self.operations_manager.set_operation_result_async(
+                    self.operation_id,
+                    self.instance_id,
+                    result,
+                    sequence_number = sequence_number)
+                self.__sequence_number = sequence_number
+                self.__full_result_sequence_number = sequence_number
+                self.__on_delivery(
+                    delivery,
+                    lambda delivered: self.__acknowledge_full_result(sequence_number, snapshot, delivered))
+            else:
+                result_delta = {
+                    'operation_id': self.operation_id,
+                    'sequence_number': sequence_number,
+                    'base_sequence_number': self.__sequence_number
+                }
+                for property_name in DELTA_PROPERTIES:
+                    result_delta[property_name] = _get_list_delta(
+                        self.__acknowledged.get(property_name) or [],
+                        snapshot.get(property_name) or [])
+                if all(
+                    len(result_delta[property_name]['updates']) == 0
+                    and result_delta[property_name]['length'] == len(self.__acknowledged.get(property_name) or [])
+                    for property_name in DELTA_PROPERTIES):
+                    # Nothing changed since the last acknowledged write.
+                    return
+                delivery = await self.operations_manager.set_operation_result_delta_async(self.operation_id, self.instance_id, result_delta)
+                # The writes of an operation are delivered in order, so the next delta can be based on this one.
+                self.__sequence_number = sequence_number
+                self.__acknowledged = snapshot
+                self.__on_delivery(delivery, self.__check_delta)
+        except Exception as e:
+            # Interim results are best effort; the final result is written when the operation completes.
+            self.__acknowledged = None
+            self.logger.warning(f'The interim result of operation {self.operation_id} could not be written: {e}')
+
+    def __on_delivery(self, delivery: Optional[asyncio.Future], callback: Callable[[bool], None]):
+        if delivery is None:
+            # The write was sent directly and accepted.
+            callback(True)
+            return
+
+        def on_done(future: asyncio.Future):
+            if not future.cancelled():
+                callback(future.result())
+        delivery.add_done_callback(on_done)
+
+    def __acknowledge_full_result(self, sequence_number: int, snapshot: dict, delivered: bool):
+        if not delivered:
+            self.logger.warning(f'The interim result {sequence_number} of operation {self.operation_id} was discarded.')
+            return
+        if sequence_number == self.__full_result_sequence_number and self.__acknowledged is None:
+            # No other write was submitted since this full result, so the next write can send a delta.
+            self.__acknowledged = snapshot
+
+    def __check_delta(self, delivered: bool):
+        if not delivered:
+            # The State API does not have the result the following deltas are based on.
+            self.logger.warning(f'An incremental result of operation {self.operation_id} was discarded, the next write sends the full result.')
+            self.__acknowledged = None
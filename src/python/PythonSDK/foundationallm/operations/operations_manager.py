@@ -1,22 +1,45 @@
+import asyncio
 from aiohttp import ClientSession
 import json
 import os
-from typing import List, Optional
-from foundationallm.config import Configuration
+from typing import List, Optional, Union
+from foundationallm.config import Configuration, read_settings
 from foundationallm.models.operations import (
     LongRunningOperation,
     LongRunningOperationLogEntry,
     OperationStatus
 )
-from foundationallm.models.orchestration import CompletionResponse
+from foundationallm.models.orchestration import BatchCompletionResponse, CompletionResponse
 from foundationallm.telemetry import Telemetry
 from logging import Logger
+from .operation_result_writer import (
+    DEFAULT_FLUSH_INTERVAL_SECONDS,
+    DEFAULT_MAX_PENDING_UPDATES,
+    OperationResultWriter
+)
+from .operations_outbox import (
+    OperationsOutbox,
+    OutboxDeliveryRejectedException,
+    OutboxEntry,
+    OutboxWriteTypes
+)
+
+INTERIM_RESULTS_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:InterimResults'
+INTERIM_RESULTS_FLUSH_INTERVAL_SECONDS = f'{INTERIM_RESULTS_CONFIGURATION_NAMESPACE}:FlushIntervalSeconds'
+INTERIM_RESULTS_MAX_PENDING_UPDATES = f'{INTERIM_RESULTS_CONFIGURATION_NAMESPACE}:MaxPendingUpdates'
+INTERIM_RESULTS_DELTA_UPDATES = f'{INTERIM_RESULTS_CONFIGURATION_NAMESPACE}:DeltaUpdates'
 
 class OperationsManager():
     """
     Class for managing long running operations via calls to the StateAPI.
     """
-    def __init__(self, config: Configuration, http_client_session: ClientSession = None, logger: Logger = None):
+    # The interim result settings are read once per process, as an operations manager is created for each request.
+    __interim_result_settings = None
+
+    def __init__(self, config: Configuration, http_client_session: ClientSession = None, logger: Logger = None, outbox: OperationsOutbox = None):
+        self.config = config
+        # When an outbox is provided, status and result writes are stored locally and delivered in the background.
+        self.outbox = outbox
         self.http_client_session = http_client_session or ClientSession()
         self.logger = logger or Telemetry.get_logger(__name__)
         # Retrieve the State API configuration settings.
@@ -104,6 +127,7 @@ class OperationsManager():
         -------
         Optional[LongRunningOperation]
             Object representing the operation if successful, None if not found.
+            When an outbox is used, the operation update that was stored in the outbox.
         """
         try:
             operation = LongRunningOperation(
@@ -112,20 +136,12 @@ class OperationsManager():
                 status_message = status_message,
                 upn = self.__get_upn_from_user_identity(user_identity)
             )
-            
-            # Call the State API to create a new operation.
-            async with self.http_client_session.put(
-                f'{self.state_api_url}/instances/{instance_id}/operations/{operation_id}',
-                json = operation.model_dump(exclude_unset=True),
-                headers = self.__get_standard_headers(),
-                ssl = self.use_ssl
-            ) as response:
-                if response.status == 404:
-                    return None
-                if response.status != 200:
-                    raise Exception(f'An error occurred while updating the status of operation {operation_id}: ({response.status}) {await response.text()}')
 
-                return LongRunningOperation(**await response.json())
+            if self.outbox is not None:
+                await self.outbox.enqueue_async(operation_id, instance_id, OutboxWriteTypes.STATUS, operation.model_dump(exclude_unset=True))
+                return operation
+
+            return await self.__put_operation_async(operation_id, instance_id, operation.model_dump(exclude_unset=True))
         except Exception as e:
             self.logger.exception(f'An error occurred while updating the status of operation {operation_id}: {e}')
             raise
@@ -173,7 +189,8 @@ class OperationsManager():
         self,
         operation_id: str,
         instance_id: str,
-        completion_response: CompletionResponse):
+        completion_response: Union[CompletionResponse, BatchCompletionResponse],
+        sequence_number: Optional[int] = None) -> Optional[asyncio.Future]:
         """
         Sets the result of a completion operation through the State API.
 
@@ -185,25 +202,65 @@ class OperationsManager():
             The unique identifier for the operation.
         instance_id : str
             The unique identifier for the FLLM instance.
-        completion_response : CompletionResponse
+        completion_response : Union[CompletionResponse, BatchCompletionResponse]
             The result of the operation.
+        sequence_number : int
+            The version of the result, used as the base of the following incremental updates.
+
+        Returns
+        -------
+        Optional[asyncio.Future]
+            When an outbox is used, resolves to True when the State API accepts the result
+            or to False when the result is discarded. None when the result was written directly.
         """
         try:
-            # Call the State API to create a new operation.
-            async with self.http_client_session.post(
-                f'{self.state_api_url}/instances/{instance_id}/operations/{operation_id}/result',
-                json = completion_response.model_dump(),
-                headers = self.__get_standard_headers(),
-                ssl = self.use_ssl
-            ) as response:
-                if response.status == 404:
-                    return None
-                if response.status != 200:
-                    raise Exception(f'An error occurred while submitting the result of operation {operation_id}: ({response.status}) {await response.text()}')
+            body = completion_response.model_dump()
+            if sequence_number is not None:
+                body['sequence_number'] = sequence_number
+
+            if self.outbox is not None:
+                return await self.outbox.enqueue_async(operation_id, instance_id, OutboxWriteTypes.RESULT, body)
+
+            await self.__post_operation_result_async(operation_id, instance_id, body)
         except Exception as e:
             self.logger.exception(f'An error occurred while submitting the result of operation {operation_id}: {e}')
             raise
 
+    async def set_operation_result_delta_async(
+        self,
+        operation_id: str,
+        instance_id: str,
+        result_delta: dict) -> Optional[asyncio.Future]:
+        """
+        Applies an incremental update to the result of a completion operation through the State API.
+
+        POST {state_api_url}/instances/{instanceId}/operations/{operationId}/result/delta
+
+        Parameters
+        ----------
+        operation_id : str
+            The unique identifier for the operation.
+        instance_id : str
+            The unique identifier for the FLLM instance.
+        result_delta : dict
+            The sequence numbers of the update and of the result it is based on, and the changes
+            to the content and analysis results since that result.
+
+        Returns
+        -------
+        Optional[asyncio.Future]
+            When an outbox is used, resolves to True when the State API applies the update
+            or to False when the update is discarded. None when the update was applied directly.
+        """
+        try:
+            if self.outbox is not None:
+                return await self.outbox.enqueue_async(operation_id, instance_id, OutboxWriteTypes.RESULT_DELTA, result_delta)
+
+            await self.__post_operation_result_delta_async(operation_id, instance_id, result_delta)
+        except Exception as e:
+            self.logger.exception(f'An error occurred while submitting the incremental result of operation {operation_id}: {e}')
+            raise
+
     async def get_operation_result_async(
         self,
         operation_id: str,
@@ -282,6 +339,112 @@ class OperationsManager():
             self.logger.exception(f'An error occurred while retrieving the log for operation {operation_id}: {e}')
             raise
 
+    async def deliver_outbox_entry_async(self, entry: OutboxEntry):
+        """
+        Sends a write stored in the outbox to the State API.
+
+        Parameters
+        ----------
+        entry : OutboxEntry
+            The write to send.
+        """
+        if entry.write_type == OutboxWriteTypes.STATUS:
+            await self.__put_operation_async(entry.operation_id, entry.instance_id, entry.payload)
+        elif entry.write_type == OutboxWriteTypes.RESULT:
+            await self.__post_operation_result_async(entry.operation_id, entry.instance_id, entry.payload)
+        elif entry.write_type == OutboxWriteTypes.RESULT_DELTA:
+            await self.__post_operation_result_delta_async(entry.operation_id, entry.instance_id, entry.payload)
+        else:
+            raise ValueError(f'The outbox write type {entry.write_type} is not supported.')
+
+    async def __put_operation_async(self, operation_id: str, instance_id: str, body: dict) -> Optional[LongRunningOperation]:
+        """
+        PUT {state_api_url}/instances/{instanceId}/operations/{operationId} -> LongRunningOperation
+        """
+        async with self.http_client_session.put(
+            f'{self.state_api_url}/instances/{instance_id}/operations/{operation_id}',
+            json = body,
+            headers = self.__get_standard_headers(),
+            ssl = self.use_ssl
+        ) as response:
+            if response.status == 404:
+                return None
+            if response.status != 200:
+                raise Exception(f'An error occurred while updating the status of operation {operation_id}: ({response.status}) {await response.text()}')
+
+            return LongRunningOperation(**await response.json())
+
+    async def __post_operation_result_async(self, operation_id: str, instance_id: str, body: dict):
+        """
+        POST {state_api_url}/instances/{instanceId}/operations/{operationId}/result
+        """
+        async with self.http_client_session.post(
+            f'{self.state_api_url}/instances/{instance_id}/operations/{operation_id}/result',
+            json = body,
+            headers = self.__get_standard_headers(),
+            ssl = self.use_ssl
+        ) as response:
+            if response.status == 404:
+                return None
+            if response.status != 200:
+                raise Exception(f'An error occurred while submitting the result of operation {operation_id}: ({response.status}) {await response.text()}')
+
+    async def __post_operation_result_delta_async(self, operation_id: str, instance_id: str, body: dict):
+        """
+        POST {state_api_url}/instances/{instanceId}/operations/{operationId}/result/delta
+        """
+        async with self.http_client_session.post(
+            f'{self.state_api_url}/instances/{instance_id}/operations/{operation_id}/result/delta',
+            json = body,
+            headers = self.__get_standard_headers(),
+            ssl = self.use_ssl
+        ) as response:
+            if response.status in [400, 404, 409]:
+                # The update does not apply to the stored result; retrying it would fail again.
+                raise OutboxDeliveryRejectedException(f'The incremental result of operation {operation_id} was rejected: ({response.status}) {await response.text()}')
+            if response.status != 200:
+                raise Exception(f'An error occurred while submitting the incremental result of operation {operation_id}: ({response.status}) {await response.text()}')
+
+    def create_result_writer(self, operation_id: str, instance_id: str) -> OperationResultWriter:
+        """
+        Creates a coalescing, rate-limited writer for the interim results of an operation.
+
+        Parameters
+        ----------
+        operation_id : str
+            The unique identifier for the operation.
+        instance_id : str
+            The unique identifier for the FLLM instance.
+
+        Returns
+        -------
+        OperationResultWriter
+            The writer for the interim results of the operation.
+        """
+        settings = self.__get_interim_result_settings()
+        return OperationResultWriter(
+            self,
+            operation_id,
+            instance_id,
+            flush_interval_seconds = settings[INTERIM_RESULTS_FLUSH_INTERVAL_SECONDS],
+            max_pending_updates = settings[INTERIM_RESULTS_MAX_PENDING_UPDATES],
+            delta_updates = settings[INTERIM_RESULTS_DELTA_UPDATES],
+            logger = self.logger
+        )
+
+    def __get_interim_result_settings(self) -> dict:
+        """
+        Retrieves the interim result writer settings, falling back to the default values
+        for settings that are missing or invalid.
+        """
+        if OperationsManager.__interim_result_settings is None:
+            OperationsManager.__interim_result_settings = read_settings(self.config, [
+                (INTERIM_RESULTS_FLUSH_INTERVAL_SECONDS, float, DEFAULT_FLUSH_INTERVAL_SECONDS),
+                (INTERIM_RESULTS_MAX_PENDING_UPDATES, int, DEFAULT_MAX_PENDING_UPDATES),
+                # Requires a State API version that accepts incremental result updates.
+                (INTERIM_RESULTS_DELTA_UPDATES, lambda value: str(value).lower() == 'true', False)], self.logger)
+        return OperationsManager.__interim_result_settings
+
     def __get_standard_headers(self):
         """
         Retrieves the standard headers for interacting with the State API.
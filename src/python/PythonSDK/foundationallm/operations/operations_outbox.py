@@ -0,0 +1,367 @@
+"""
+Class: OperationsOutbox
+Description: Durable local outbox for the operation status and result writes sent to the State API.
+"""
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from logging import Logger
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from foundationallm.config import Configuration, read_settings
+from foundationallm.telemetry import Telemetry
+
+OUTBOX_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:Outbox'
+OUTBOX_PATH = f'{OUTBOX_CONFIGURATION_NAMESPACE}:Path'
+OUTBOX_MAX_ATTEMPTS = f'{OUTBOX_CONFIGURATION_NAMESPACE}:MaxAttempts'
+OUTBOX_MAX_BACKOFF_SECONDS = f'{OUTBOX_CONFIGURATION_NAMESPACE}:MaxBackoffSeconds'
+
+DEFAULT_OUTBOX_PATH = os.path.join(tempfile.gettempdir(), 'foundationallm', 'operations-outbox.db')
+DEFAULT_MAX_ATTEMPTS = 12
+DEFAULT_INITIAL_BACKOFF_SECONDS = 0.5
+DEFAULT_MAX_BACKOFF_SECONDS = 60.0
+DEFAULT_STOP_TIMEOUT_SECONDS = 5.0
+
+class OutboxWriteTypes:
+    """The types of writes stored in the outbox."""
+    STATUS = 'status'
+    RESULT = 'result'
+    RESULT_DELTA = 'result_delta'
+
+class OutboxDeliveryRejectedException(Exception):
+    """
+    Raised when the State API rejects a write that would be rejected again if it was retried.
+    The write is discarded.
+    """
+
+class OutboxEntry:
+    """
+    A State API write stored in the outbox.
+    """
+    def __init__(self, id: int, operation_id: str, instance_id: str, write_type: str, payload: dict, attempts: int, next_attempt_at: float):
+        self.id = id
+        self.operation_id = operation_id
+        self.instance_id = instance_id
+        self.write_type = write_type
+        self.payload = payload
+        self.attempts = attempts
+        self.next_attempt_at = next_attempt_at
+
+class OperationsOutbox:
+    """
+    Stores operation status and result writes in a local SQLite database and delivers them
+    to the State API in the background.
+
+    Writes are accepted immediately. Each operation with pending writes has its own delivery
+    worker: the writes of an operation are delivered in the order they were accepted, and a
+    slow or failing operation does not delay the writes of the other operations. Failed
+    deliveries are retried with exponential backoff and jitter, and writes that were not
+    delivered before the process stopped are replayed when the outbox is started again.
+    The database is only accessed from worker threads, never from the event loop.
+
+    The default database path is in the temporary directory, which does not survive the
+    replacement of the container. Set the Outbox:Path setting to a path on a persistent
+    volume for the writes to be replayed by the next container.
+    """
+    def __init__(
+        self,
+        path: str = DEFAULT_OUTBOX_PATH,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        initial_backoff_seconds: float = DEFAULT_INITIAL_BACKOFF_SECONDS,
+        max_backoff_seconds: float = DEFAULT_MAX_BACKOFF_SECONDS,
+        logger: Logger = None):
+        """
+        Initializes the outbox, creating the database if it does not exist.
+
+        Parameters
+        ----------
+        path : str
+            The path of the SQLite database file. Mount a persistent volume at this path
+            to replay the writes after the container is replaced.
+        max_attempts : int
+            The number of delivery attempts after which a write is discarded.
+        initial_backoff_seconds : float
+            The delay before the first retry of a failed delivery.
+        max_backoff_seconds : float
+            The maximum delay between two delivery attempts.
+        logger : Logger
+            The logger used to report failed deliveries.
+        """
+        if max_attempts < 1:
+            raise ValueError('The max_attempts parameter must be greater than zero.')
+
+        self.path = path
+        self.max_attempts = max_attempts
+        self.initial_backoff_seconds = initial_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.logger = logger or Telemetry.get_logger(__name__)
+
+        if path == DEFAULT_OUTBOX_PATH:
+            self.logger.warning(
+                f'The outbox is stored in the temporary directory ({path}) and does not survive the replacement of the container. '
+                + f'Set {OUTBOX_PATH} to a path on a persistent volume.')
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The connection is used from the threads of asyncio.to_thread, one at a time.
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        self.__connection.execute(
+            '''CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                operation_id TEXT NOT NULL,
+                instance_id TEXT NOT NULL,
+                write_type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0
+            )''')
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS ix_outbox_operation_id ON outbox (operation_id, id)')
+
+        # The ids of the writes being sent, which are not replaced by later result writes.
+        self.__delivering: Set[int] = set()
+        # The delivery worker of each operation with pending writes.
+        self.__workers: Dict[str, asyncio.Task] = {}
+        # The operations that received writes since their worker last looked for pending writes.
+        self.__enqueued: Set[str] = set()
+        self.__replay_task: Optional[asyncio.Task] = None
+        # The futures resolved when the writes are delivered or discarded, by write id.
+        self.__deliveries: Dict[int, List[asyncio.Future]] = {}
+        self.__send: Optional[Callable[[OutboxEntry], Awaitable[None]]] = None
+
+    @staticmethod
+    def from_config(config: Configuration) -> 'OperationsOutbox':
+        """
+        Creates an outbox using the LangChainAPI configuration settings.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+
+        Returns
+        -------
+        OperationsOutbox
+            The configured outbox.
+        """
+        logger = Telemetry.get_logger(__name__)
+        settings = read_settings(config, [
+            (OUTBOX_PATH, str, DEFAULT_OUTBOX_PATH),
+            (OUTBOX_MAX_ATTEMPTS, int, DEFAULT_MAX_ATTEMPTS),
+            (OUTBOX_MAX_BACKOFF_SECONDS, float, DEFAULT_MAX_BACKOFF_SECONDS)], logger)
+
+        return OperationsOutbox(
+            path = settings[OUTBOX_PATH],
+            max_attempts = settings[OUTBOX_MAX_ATTEMPTS],
+            max_backoff_seconds = settings[OUTBOX_MAX_BACKOFF_SECONDS],
+            logger = logger
+        )
+
+    async def get_pending_async(self) -> int:
+        """
+        Gets the number of writes that were not delivered yet.
+        """
+        return (await asyncio.to_thread(self.__execute, 'SELECT COUNT(*) FROM outbox'))[0][0]
+
+    async def enqueue_async(self, operation_id: str, instance_id: str, write_type: str, payload: dict) -> asyncio.Future:
+        """
+        Stores a write in the outbox and starts the delivery worker of the operation.
+        A result write replaces the previous result write of the operation if that write
+        is the last pending write of the operation and is not being delivered.
+
+        Parameters
+        ----------
+        operation_id : str
+            The unique identifier for the operation.
+        instance_id : str
+            The unique identifier for the FLLM instance.
+        write_type : str
+            The type of write, one of the OutboxWriteTypes values.
+        payload : dict
+            The JSON body of the State API request.
+
+        Returns
+        -------
+        asyncio.Future
+            Resolves to True when the State API accepts the write, or to False when the write is discarded.
+            A result write that replaced a previous one resolves with it.
+        """
+        delivery = asyncio.get_running_loop().create_future()
+        await asyncio.to_thread(self.__store, operation_id, instance_id, write_type, payload, delivery)
+        self.__enqueued.add(operation_id)
+        self.__start_worker(operation_id)
+        return delivery
+
+    def start(self, send: Callable[[OutboxEntry], Awaitable[None]]):
+        """
+        Starts delivering the writes stored in the outbox, including the writes left over by a previous process.
+
+        Parameters
+        ----------
+        send : Callable[[OutboxEntry], Awaitable[None]]
+            Sends a write to the State API. Raises an exception if the write was not accepted.
+        """
+        self.__send = send
+        if self.__replay_task is None or self.__replay_task.done():
+            self.__replay_task = asyncio.create_task(self.__replay_async())
+
+    async def stop_async(self, timeout_seconds: float = DEFAULT_STOP_TIMEOUT_SECONDS):
+        """
+        Tries to deliver the pending writes until the timeout elapses, then stops the delivery.
+        Writes that were not delivered remain in the outbox and are replayed on the next start.
+
+        Parameters
+        ----------
+        timeout_seconds : float
+            The maximum time to spend delivering the pending writes.
+        """
+        deadline = time.monotonic() + timeout_seconds
+        if self.__replay_task is not None:
+            await asyncio.wait([self.__replay_task], timeout=timeout_seconds)
+        while self.__workers and time.monotonic() < deadline:
+            await asyncio.wait(list(self.__workers.values()), timeout=deadline - time.monotonic())
+
+        self.__send = None
+        tasks = list(self.__workers.values()) + ([self.__replay_task] if self.__replay_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        with self.__lock:
+            deliveries = [delivery for write_deliveries in self.__deliveries.values() for delivery in write_deliveries]
+            self.__deliveries.clear()
+        for delivery in deliveries:
+            delivery.cancel()
+
+        pending = await self.get_pending_async()
+        if pending > 0:
+            self.logger.warning(f'{pending} State API writes were not delivered and will be replayed on the next start.')
+        with self.__lock:
+            self.__connection.close()
+
+    def __start_worker(self, operation_id: str):
+        if self.__send is None:
+            # The writes are delivered when the outbox is started.
+            return
+        worker = self.__workers.get(operation_id)
+        if worker is None or worker.done():
+            self.__workers[operation_id] = asyncio.create_task(self.__deliver_operation_async(operation_id))
+
+    async def __replay_async(self):
+        rows = await asyncio.to_thread(self.__execute, 'SELECT operation_id, COUNT(*) FROM outbox GROUP BY operation_id')
+        pending = sum(row[1] for row in rows)
+        if pending > 0:
+            self.logger.info(f'Replaying {pending} State API writes of {len(rows)} operations stored in the outbox.')
+        for row in rows:
+            self.__start_worker(row[0])
+
+    async def __deliver_operation_async(self, operation_id: str):
+        """
+        Delivers the writes of an operation in order until none is pending.
+        """
+        try:
+            while True:
+                self.__enqueued.discard(operation_id)
+                entry = await asyncio.to_thread(self.__take_next, operation_id)
+                if entry is None:
+                    if operation_id in self.__enqueued:
+                        # A write was stored while the worker was looking for pending writes.
+                        continue
+                    return
+
+                delay = entry.next_attempt_at - time.time()
+                if delay > 0:
+                    # Later writes of the operation wait for this one to preserve the order.
+                    await asyncio.sleep(delay)
+                    continue
+
+                await self.__deliver_async(entry)
+        finally:
+            if self.__workers.get(operation_id) is asyncio.current_task():
+                del self.__workers[operation_id]
+
+    async def __deliver_async(self, entry: OutboxEntry):
+        try:
+            await self.__send(entry)
+        except asyncio.CancelledError:
+            self.__delivering.discard(entry.id)
+            raise
+        except OutboxDeliveryRejectedException as e:
+            self.logger.error(f'Discarding the {entry.write_type} write of operation {entry.operation_id} rejected by the State API: {e}')
+            self.__resolve(await asyncio.to_thread(self.__delete, entry.id), False)
+            return
+        except Exception as e:
+            entry.attempts += 1
+            if entry.attempts >= self.max_attempts:
+                self.logger.error(f'Discarding the {entry.write_type} write of operation {entry.operation_id} after {entry.attempts} failed attempts: {e}')
+                self.__resolve(await asyncio.to_thread(self.__delete, entry.id), False)
+                return
+
+            backoff = min(self.max_backoff_seconds, self.initial_backoff_seconds * (2 ** (entry.attempts - 1)))
+            await asyncio.to_thread(self.__reschedule, entry.id, entry.attempts, time.time() + random.uniform(backoff / 2, backoff))
+            return
+
+        self.__resolve(await asyncio.to_thread(self.__delete, entry.id), True)
+
+    def __resolve(self, deliveries: List[asyncio.Future], delivered: bool):
+        for delivery in deliveries:
+            if not delivery.done():
+                delivery.set_result(delivered)
+
+    def __execute(self, sql: str, parameters: tuple = ()) -> List[tuple]:
+        with self.__lock:
+            return self.__connection.execute(sql, parameters).fetchall()
+
+    def __store(self, operation_id: str, instance_id: str, write_type: str, payload: dict, delivery: asyncio.Future):
+        serialized_payload = json.dumps(payload, default=str)
+        with self.__lock:
+            if write_type == OutboxWriteTypes.RESULT:
+                last = self.__connection.execute(
+                    'SELECT id, write_type FROM outbox WHERE operation_id = ? ORDER BY id DESC LIMIT 1',
+                    (operation_id,)).fetchone()
+                if last is not None and last[1] == OutboxWriteTypes.RESULT and last[0] not in self.__delivering:
+                    self.__connection.execute('UPDATE outbox SET payload = ? WHERE id = ?', (serialized_payload, last[0]))
+                    self.__deliveries.setdefault(last[0], []).append(delivery)
+                    return
+
+            id = self.__connection.execute(
+                'INSERT INTO outbox (operation_id, instance_id, write_type, payload) VALUES (?, ?, ?, ?)',
+                (operation_id, instance_id, write_type, serialized_payload)).lastrowid
+            self.__deliveries[id] = [delivery]
+
+    def __take_next(self, operation_id: str) -> Optional[OutboxEntry]:
+        """
+        Reads the first pending write of an operation, marking it as being delivered if it is due.
+        """
+        with self.__lock:
+            row = self.__connection.execute(
+                '''SELECT id, operation_id, instance_id, write_type, payload, attempts, next_attempt_at
+                FROM outbox WHERE operation_id = ? ORDER BY id LIMIT 1''',
+                (operation_id,)).fetchone()
+            if row is None:
+                return None
+            if row[6] <= time.time():
+                self.__delivering.add(row[0])
+        return OutboxEntry(row[0], row[1], row[2], row[3], json.loads(row[4]), row[5], row[6])
+
+    def __delete(self, id: int) -> List[asyncio.Future]:
+        """
+        Deletes a delivered or discarded write and returns the futures to resolve.
+        """
+        with self.__lock:
+            self.__connection.execute('DELETE FROM outbox WHERE id = ?', (id,))
+            self.__delivering.discard(id)
+            return self.__deliveries.pop(id, [])
+
+    def __reschedule(self, id: int, attempts: int, next_attempt_at: float):
+        with self.__lock:
+            self.__connection.execute(
+                'UPDATE outbox SET attempts = ?, next_attempt_at = ? WHERE id = ?',
+                (attempts, next_attempt_at, id))
+            self.__delivering.discard(id)
@@ -0,0 +1,17 @@
+from .retry_strategy import RetryStrategy
+from .retry_strategy_registry import RetryStrategyRegistry
+from .retry_context import RetryContext
+from .retry_executor import RetryExecutor
+from .retry_policies import AsyncRetryTransport, RetryTransport
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerOpenException,
+    CircuitBreakerRegistry,
+    CircuitBreakerStates
+)
+from .circuit_breaker_policies import (
+    AsyncCircuitBreakerPolicy,
+    AsyncCircuitBreakerTransport,
+    CircuitBreakerPolicy,
+    CircuitBreakerTransport
+)
@@ -0,0 +1,320 @@
+"""
+Class: CircuitBreaker
+Description: Per-endpoint circuit breakers failing calls fast while a dependency is unhealthy.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+from urllib.parse import urlsplit
+from foundationallm.config import Configuration, read_settings
+from foundationallm.telemetry import Telemetry
+from .retry_strategy import TRANSIENT_EXCEPTION_NAMES, get_status_code
+
+CIRCUIT_BREAKER_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:CircuitBreaker'
+CIRCUIT_BREAKER_FAILURE_RATE_THRESHOLD = f'{CIRCUIT_BREAKER_CONFIGURATION_NAMESPACE}:FailureRateThreshold'
+CIRCUIT_BREAKER_MINIMUM_THROUGHPUT = f'{CIRCUIT_BREAKER_CONFIGURATION_NAMESPACE}:MinimumThroughput'
+CIRCUIT_BREAKER_SAMPLING_WINDOW_SECONDS = f'{CIRCUIT_BREAKER_CONFIGURATION_NAMESPACE}:SamplingWindowSeconds'
+CIRCUIT_BREAKER_BREAK_DURATION_SECONDS = f'{CIRCUIT_BREAKER_CONFIGURATION_NAMESPACE}:BreakDurationSeconds'
+
+DEFAULT_FAILURE_RATE_THRESHOLD = 0.5
+DEFAULT_MINIMUM_THROUGHPUT = 10
+DEFAULT_SAMPLING_WINDOW_SECONDS = 30.0
+DEFAULT_BREAK_DURATION_SECONDS = 30.0
+
+# The status codes reporting an unhealthy dependency. Throttling (429) is not a failure of the dependency.
+FAILURE_STATUS_CODES = {408, 500, 502, 503, 504}
+
+T = TypeVar('T')
+
+class CircuitBreakerStates(str, Enum):
+    """The states of a circuit breaker."""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+class CircuitBreakerOpenException(Exception):
+    """
+    Raised instead of calling a dependency while its circuit breaker is open.
+    """
+    def __init__(self, name: str, retry_after_seconds: float):
+        super().__init__(f'The circuit breaker of {name} is open. The call was not attempted; retry in {retry_after_seconds:.1f} seconds.')
+        self.name = name
+        self.retry_after_seconds = retry_after_seconds
+        # Reported like a 503 response by the API.
+        self.status_code = 503
+
+def is_failure(exception: Exception) -> bool:
+    """
+    Indicates whether an exception reports that the dependency is unhealthy, as opposed to a rejected request.
+    """
+    if isinstance(exception, CircuitBreakerOpenException):
+        return False
+    if isinstance(exception, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    if any(cls.__name__ in TRANSIENT_EXCEPTION_NAMES for cls in type(exception).__mro__):
+        return True
+    return get_status_code(exception) in FAILURE_STATUS_CODES
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of the calls made to a dependency and fails calls fast while
+    the dependency is unhealthy.
+
+    The breaker opens when, over the sampling window, at least minimum_throughput calls
+    were made and the share of failed calls reaches the failure rate threshold. While
+    open, calls fail immediately with a CircuitBreakerOpenException. After the break
+    duration, the breaker becomes half-open and lets a single probe call through: the
+    breaker closes if the probe succeeds and opens again if it fails.
+    """
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = DEFAULT_FAILURE_RATE_THRESHOLD,
+        minimum_throughput: int = DEFAULT_MINIMUM_THROUGHPUT,
+        sampling_window_seconds: float = DEFAULT_SAMPLING_WINDOW_SECONDS,
+        break_duration_seconds: float = DEFAULT_BREAK_DURATION_SECONDS,
+        on_state_change: Callable[['CircuitBreaker', CircuitBreakerStates, CircuitBreakerStates], None] = None):
+        """
+        Initializes the circuit breaker.
+
+        Parameters
+        ----------
+        name : str
+            The name of the dependency, usually its base URL.
+        failure_rate_threshold : float
+            The share of failed calls, between 0 and 1, that opens the breaker.
+        minimum_throughput : int
+            The minimum number of calls in the sampling window before the breaker can open.
+        sampling_window_seconds : float
+            The period over which the failure rate is computed.
+        break_duration_seconds : float
+            The time the breaker stays open before a probe call is let through.
+        on_state_change : Callable[[CircuitBreaker, CircuitBreakerStates, CircuitBreakerStates], None]
+            Called with the breaker, the previous state and the new state when the state changes.
+        """
+        if not 0 < failure_rate_threshold <= 1:
+            raise ValueError('The failure_rate_threshold parameter must be greater than 0 and at most 1.')
+        if minimum_throughput < 1:
+            raise ValueError('The minimum_throughput parameter must be greater than zero.')
+
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_throughput = minimum_throughput
+        self.sampling_window_seconds = sampling_window_seconds
+        self.break_duration_seconds = break_duration_seconds
+        self.on_state_change = on_state_change
+        self.state = CircuitBreakerStates.CLOSED
+
+        # One bucket of [second, successes, failures] per second of the sampling window.
+        self.__buckets: Deque[List[int]] = deque()
+        self.__opened_at = 0.0
+        self.__probe_in_flight = False
+        self.__lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """
+        Checks whether a call can be made, raising a CircuitBreakerOpenException otherwise.
+        Every call allowed must be followed by a call to after_call().
+
+        Returns
+        -------
+        bool
+            True if the call is the probe call of a half-open breaker.
+        """
+        with self.__lock:
+            if self.state == CircuitBreakerStates.CLOSED:
+                return False
+
+            now = time.monotonic()
+            if self.state == CircuitBreakerStates.OPEN:
+                remaining = self.__opened_at + self.break_duration_seconds - now
+                if remaining > 0:
+                    raise CircuitBreakerOpenException(self.name, remaining)
+                self.__set_state(CircuitBreakerStates.HALF_OPEN)
+
+            if self.__probe_in_flight:
+                raise CircuitBreakerOpenException(self.name, self.break_duration_seconds)
+            self.__probe_in_flight = True
+            return True
+
+    def after_call(self, is_probe: bool, exception: Optional[Exception] = None, failed: Optional[bool] = None, cancelled: bool = False):
+        """
+        Records the outcome of a call.
+
+        Parameters
+        ----------
+        is_probe : bool
+            The value returned by before_call().
+        exception : Exception
+            The exception raised by the call, if any.
+        failed : bool
+            Overrides the outcome derived from the exception, for callers that inspect responses.
+        cancelled : bool
+            Indicates that the call was cancelled. Cancelled calls say nothing about the health
+            of the dependency and are not recorded.
+        """
+        if failed is None:
+            failed = exception is not None and is_failure(exception)
+
+        with self.__lock:
+            if is_probe:
+                self.__probe_in_flight = False
+                if cancelled:
+                    return
+                if self.state == CircuitBreakerStates.HALF_OPEN:
+                    if failed:
+                        self.__open()
+                    else:
+                        self.__buckets.clear()
+                        self.__set_state(CircuitBreakerStates.CLOSED)
+                    return
+
+            if cancelled:
+                return
+            bucket = self.__get_bucket()
+            bucket[2 if failed else 1] += 1
+            if failed and self.state == CircuitBreakerStates.CLOSED:
+                successes = sum(b[1] for b in self.__buckets)
+                failures = sum(b[2] for b in self.__buckets)
+                total = successes + failures
+                if total >= self.minimum_throughput and failures / total >= self.failure_rate_threshold:
+                    self.__open()
+
+    def execute(self, call: Callable[[], T]) -> T:
+        """
+        Executes a synchronous call through the circuit breaker.
+        """
+        is_probe = self.before_call()
+        try:
+            result = call()
+        except Exception as e:
+            self.after_call(is_probe, e)
+            raise
+        except BaseException:
+            self.after_call(is_probe, cancelled=True)
+            raise
+        self.after_call(is_probe)
+        return result
+
+    async def execute_async(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Executes an asynchronous call through the circuit breaker.
+        """
+        is_probe = self.before_call()
+        try:
+            result = await call()
+        except Exception as e:
+            self.after_call(is_probe, e)
+            raise
+        except BaseException:
+            self.after_call(is_probe, cancelled=True)
+            raise
+        self.after_call(is_probe)
+        return result
+
+    def __get_bucket(self) -> List[int]:
+        second = int(time.monotonic())
+        while len(self.__buckets) > 0 and self.__buckets[0][0] <= second - self.sampling_window_seconds:
+            self.__buckets.popleft()
+        if len(self.__buckets) == 0 or self.__buckets[-1][0] != second:
+            self.__buckets.append([second, 0, 0])
+        return self.__buckets[-1]
+
+    def __open(self):
+        self.__opened_at = time.monotonic()
+        self.__buckets.clear()
+        self.__set_state(CircuitBreakerStates.OPEN)
+
+    def __set_state(self, state: CircuitBreakerStates):
+        previous_state = self.state
+        self.state = state
+        if self.on_state_change is not None and previous_state != state:
+            self.on_state_change(self, previous_state, state)
+
+class CircuitBreakerRegistry:
+    """
+    Shares one circuit breaker per dependency, keyed by the scheme and host of its URL,
+    across the process. State changes are logged and counted in the
+    foundationallm.circuit_breaker.state_changes metric.
+    """
+    __lock = threading.Lock()
+    __breakers: Dict[str, CircuitBreaker] = {}
+    __settings: Dict[str, float] = None
+    __state_changes = None
+
+    @staticmethod
+    def configure(config: Configuration):
+        """
+        Reads the settings of the circuit breakers created after the call.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+        """
+        CircuitBreakerRegistry.__settings = read_settings(config, [
+            (CIRCUIT_BREAKER_FAILURE_RATE_THRESHOLD, float, DEFAULT_FAILURE_RATE_THRESHOLD),
+            (CIRCUIT_BREAKER_MINIMUM_THROUGHPUT, int, DEFAULT_MINIMUM_THROUGHPUT),
+            (CIRCUIT_BREAKER_SAMPLING_WINDOW_SECONDS, float, DEFAULT_SAMPLING_WINDOW_SECONDS),
+            (CIRCUIT_BREAKER_BREAK_DURATION_SECONDS, float, DEFAULT_BREAK_DURATION_SECONDS)], Telemetry.get_logger(__name__))
+
+    @staticmethod
+    def get_breaker(url: str) -> CircuitBreaker:
+        """
+        Gets the circuit breaker of the dependency at the specified URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the dependency. Only the scheme and host are used.
+
+        Returns
+        -------
+        CircuitBreaker
+            The shared circuit breaker.
+        """
+        parts = urlsplit(url)
+        name = f'{parts.scheme}://{parts.netloc}' if parts.netloc else url
+        breaker = CircuitBreakerRegistry.__breakers.get(name)
+        if breaker is not None:
+            return breaker
+
+        with CircuitBreakerRegistry.__lock:
+            breaker = CircuitBreakerRegistry.__breakers.get(name)
+            if breaker is None:
+                settings = CircuitBreakerRegistry.__settings or {}
+                breaker = CircuitBreaker(
+                    name,
+                    failure_rate_threshold = settings.get(CIRCUIT_BREAKER_FAILURE_RATE_THRESHOLD, DEFAULT_FAILURE_RATE_THRESHOLD),
+                    minimum_throughput = settings.get(CIRCUIT_BREAKER_MINIMUM_THROUGHPUT, DEFAULT_MINIMUM_THROUGHPUT),
+                    sampling_window_seconds = settings.get(CIRCUIT_BREAKER_SAMPLING_WINDOW_SECONDS, DEFAULT_SAMPLING_WINDOW_SECONDS),
+                    break_duration_seconds = settings.get(CIRCUIT_BREAKER_BREAK_DURATION_SECONDS, DEFAULT_BREAK_DURATION_SECONDS),
+                    on_state_change = CircuitBreakerRegistry.__on_state_change)
+                CircuitBreakerRegistry.__breakers[name] = breaker
+            return breaker
+
+    @staticmethod
+    def get_states() -> Dict[str, CircuitBreakerStates]:
+        """
+        Gets the state of every circuit breaker, keyed by dependency.
+        """
+        return {name: breaker.state for name, breaker in list(CircuitBreakerRegistry.__breakers.items())}
+
+    @staticmethod
+    def __on_state_change(breaker: CircuitBreaker, previous_state: CircuitBreakerStates, state: CircuitBreakerStates):
+        logger = Telemetry.get_logger(__name__)
+        message = f'The circuit breaker of {breaker.name} changed from {previous_state.value} to {state.value}.'
+        if state == CircuitBreakerStates.OPEN:
+            logger.warning(message)
+        else:
+            logger.info(message)
+
+        if CircuitBreakerRegistry.__state_changes is None:
+            CircuitBreakerRegistry.__state_changes = Telemetry.get_meter(__name__).create_counter(
+                'foundationallm.circuit_breaker.state_changes',
+                description='The number of state changes of the circuit breakers of the dependencies.')
+        CircuitBreakerRegistry.__state_changes.add(1, {'dependency': breaker.name, 'state': state.value})
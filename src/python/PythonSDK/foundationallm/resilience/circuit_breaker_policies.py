@@ -0,0 +1,124 @@
+"""
+Circuit breaker integrations for the HTTP pipelines of the OpenAI (httpx) and Azure SDK (azure-core) clients.
+"""
+import json
+import httpx
+from azure.core.pipeline import PipelineRequest, PipelineResponse
+from azure.core.pipeline.policies import AsyncHTTPPolicy, HTTPPolicy
+from .circuit_breaker import (
+    FAILURE_STATUS_CODES,
+    CircuitBreakerOpenException,
+    CircuitBreakerRegistry
+)
+
+# The connection limits of the default OpenAI HTTP clients, which do not apply when a transport is set.
+DEFAULT_CONNECTION_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+
+def _get_open_circuit_response(request: httpx.Request, exception: CircuitBreakerOpenException) -> httpx.Response:
+    """
+    Creates the 503 response returned instead of calling a dependency whose circuit breaker is open.
+    The x-should-retry header prevents the OpenAI clients from retrying the call.
+    """
+    return httpx.Response(
+        status_code=503,
+        headers={
+            'content-type': 'application/json',
+            'retry-after': str(max(1, int(exception.retry_after_seconds))),
+            'x-should-retry': 'false'
+        },
+        content=json.dumps({'error': {'code': 'CircuitBreakerOpen', 'message': str(exception)}}).encode('utf-8'),
+        request=request)
+
+class CircuitBreakerTransport(httpx.BaseTransport):
+    """
+    httpx transport sending the requests through the circuit breaker of their host.
+    """
+    def __init__(self, transport: httpx.BaseTransport = None):
+        self.transport = transport or httpx.HTTPTransport(limits=DEFAULT_CONNECTION_LIMITS)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        breaker = CircuitBreakerRegistry.get_breaker(str(request.url))
+        try:
+            is_probe = breaker.before_call()
+        except CircuitBreakerOpenException as e:
+            return _get_open_circuit_response(request, e)
+
+        try:
+            response = self.transport.handle_request(request)
+        except Exception as e:
+            breaker.after_call(is_probe, e)
+            raise
+        except BaseException:
+            breaker.after_call(is_probe, cancelled=True)
+            raise
+        breaker.after_call(is_probe, failed=response.status_code in FAILURE_STATUS_CODES)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+class AsyncCircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """
+    Asynchronous httpx transport sending the requests through the circuit breaker of their host.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport = None):
+        self.transport = transport or httpx.AsyncHTTPTransport(limits=DEFAULT_CONNECTION_LIMITS)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        breaker = CircuitBreakerRegistry.get_breaker(str(request.url))
+        try:
+            is_probe = breaker.before_call()
+        except CircuitBreakerOpenException as e:
+            return _get_open_circuit_response(request, e)
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception as e:
+            breaker.after_call(is_probe, e)
+            raise
+        except BaseException:
+            breaker.after_call(is_probe, cancelled=True)
+            raise
+        breaker.after_call(is_probe, failed=response.status_code in FAILURE_STATUS_CODES)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+class CircuitBreakerPolicy(HTTPPolicy):
+    """
+    azure-core pipeline policy sending the requests through the circuit breaker of their host.
+    Add it to the per_retry_policies of a client so that every attempt is recorded.
+    """
+    def send(self, request: PipelineRequest) -> PipelineResponse:
+        breaker = CircuitBreakerRegistry.get_breaker(request.http_request.url)
+        is_probe = breaker.before_call()
+        try:
+            response = self.next.send(request)
+        except Exception as e:
+            breaker.after_call(is_probe, e)
+            raise
+        except BaseException:
+            breaker.after_call(is_probe, cancelled=True)
+            raise
+        breaker.after_call(is_probe, failed=response.http_response.status_code in FAILURE_STATUS_CODES)
+        return response
+
+class AsyncCircuitBreakerPolicy(AsyncHTTPPolicy):
+    """
+    Asynchronous azure-core pipeline policy sending the requests through the circuit breaker of their host.
+    Add it to the per_retry_policies of a client so that every attempt is recorded.
+    """
+    async def send(self, request: PipelineRequest) -> PipelineResponse:
+        breaker = CircuitBreakerRegistry.get_breaker(request.http_request.url)
+        is_probe = breaker.before_call()
+        try:
+            response = await self.next.send(request)
+        except Exception as e:
+            breaker.after_call(is_probe, e)
+            raise
+        except BaseException:
+            breaker.after_call(is_probe, cancelled=True)
+            raise
+        breaker.after_call(is_probe, failed=response.http_response.status_code in FAILURE_STATUS_CODES)
+        return response
@@ -0,0 +1,148 @@
+"""
+Class: RetryContext
+Description: Retry budget and deadline shared by all the calls made while executing an operation.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from foundationallm.config import Configuration, read_setting
+from foundationallm.telemetry import Telemetry
+
+RETRY_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:Retry'
+RETRY_OPERATION_BUDGET = f'{RETRY_CONFIGURATION_NAMESPACE}:OperationRetryBudget'
+RETRY_OPERATION_TIMEOUT_SECONDS = f'{RETRY_CONFIGURATION_NAMESPACE}:OperationTimeoutSeconds'
+
+DEFAULT_OPERATION_RETRY_BUDGET = 10
+
+_current_retry_context: ContextVar[Optional['RetryContext']] = ContextVar('foundationallm_retry_context', default=None)
+
+class RetryContext:
+    """
+    Limits the retries of an operation, such as a completion request, across all the
+    calls the operation makes to its dependencies.
+
+    The context is active for the code running inside a 'with' block, including the tasks
+    and worker threads started from it. Retries are denied once the retry budget of the
+    operation is spent or when the delay before the retry would overrun the deadline of
+    the operation, so a failing dependency cannot make an operation run much longer than
+    its callers wait for it.
+    """
+    # The settings read from the configuration, shared by all the operations.
+    __settings = None
+
+    def __init__(self, retry_budget: int = DEFAULT_OPERATION_RETRY_BUDGET, timeout_seconds: Optional[float] = None):
+        """
+        Initializes the retry context.
+
+        Parameters
+        ----------
+        retry_budget : int
+            The maximum number of retries across all the calls of the operation.
+        timeout_seconds : float
+            The time after which the operation is abandoned by its callers. Not set for operations without a deadline.
+        """
+        if retry_budget < 0:
+            raise ValueError('The retry_budget parameter cannot be negative.')
+
+        self.retry_budget = retry_budget
+        self.retries = 0
+        self.deadline = time.monotonic() + timeout_seconds if timeout_seconds is not None and timeout_seconds > 0 else None
+        self.__lock = threading.Lock()
+        self.__tokens = []
+
+    @staticmethod
+    def from_config(config: Configuration) -> 'RetryContext':
+        """
+        Creates a retry context using the LangChainAPI configuration settings.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+
+        Returns
+        -------
+        RetryContext
+            The retry context of a new operation.
+        """
+        retry_budget, timeout_seconds = RetryContext.__get_settings(config)
+        return RetryContext(retry_budget, timeout_seconds)
+
+    @staticmethod
+    def current() -> Optional['RetryContext']:
+        """
+        Gets the retry context of the operation being executed, if any.
+        """
+        return _current_retry_context.get()
+
+    @staticmethod
+    def get_timeout_seconds(timeout_seconds: Optional[float]) -> Optional[float]:
+        """
+        Caps a call timeout to the time left before the deadline of the current operation.
+
+        Parameters
+        ----------
+        timeout_seconds : float
+            The timeout of the call.
+
+        Returns
+        -------
+        float
+            The timeout to use for the call.
+        """
+        context = RetryContext.current()
+        remaining = context.remaining_seconds() if context is not None else None
+        if remaining is None:
+            return timeout_seconds
+        if timeout_seconds is None:
+            return max(remaining, 0.001)
+        return max(min(timeout_seconds, remaining), 0.001)
+
+    def remaining_seconds(self) -> Optional[float]:
+        """
+        The time left before the deadline, or None if the operation has no deadline.
+        """
+        return self.deadline - time.monotonic() if self.deadline is not None else None
+
+    def try_acquire_retry(self, delay_seconds: float) -> bool:
+        """
+        Reserves a retry from the budget if the retry can complete before the deadline.
+
+        Parameters
+        ----------
+        delay_seconds : float
+            The delay before the retry.
+
+        Returns
+        -------
+        bool
+            True if the retry is allowed.
+        """
+        remaining = self.remaining_seconds()
+        if remaining is not None and delay_seconds >= remaining:
+            return False
+        with self.__lock:
+            if self.retries >= self.retry_budget:
+                return False
+            self.retries += 1
+            return True
+
+    def __enter__(self) -> 'RetryContext':
+        self.__tokens.append(_current_retry_context.set(self))
+        return self
+
+    def __exit__(self, *args):
+        _current_retry_context.reset(self.__tokens.pop())
+
+    @staticmethod
+    def __get_settings(config: Configuration):
+        # The settings are read once per process; they are read for every operation.
+        if RetryContext.__settings is None:
+            logger = Telemetry.get_logger(__name__)
+            RetryContext.__settings = (
+                read_setting(config, RETRY_OPERATION_BUDGET, int, DEFAULT_OPERATION_RETRY_BUDGET, logger),
+                read_setting(config, RETRY_OPERATION_TIMEOUT_SECONDS, float, None, logger,
+                    fallback_message='Operations have no deadline.'))
+        return RetryContext.__settings
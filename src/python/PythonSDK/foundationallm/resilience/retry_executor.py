@@ -0,0 +1,117 @@
+"""
+Class: RetryExecutor
+Description: Executes calls to an API endpoint, retrying transient failures according to a retry strategy.
+"""
+import asyncio
+import time
+from logging import Logger
+from typing import Awaitable, Callable, Optional, TypeVar
+from foundationallm.telemetry import Telemetry
+from .retry_context import RetryContext
+from .retry_strategy import RetryStrategy, get_status_code
+
+T = TypeVar('T')
+
+class RetryExecutor:
+    """
+    Executes calls with the retries allowed by a retry strategy and by the retry context
+    of the current operation. The exception of the last attempt is raised when a call
+    cannot be retried.
+    """
+    def __init__(self, strategy: RetryStrategy, target: str = None, logger: Logger = None):
+        """
+        Initializes the retry executor.
+
+        Parameters
+        ----------
+        strategy : RetryStrategy
+            The retry strategy.
+        target : str
+            The name of the called endpoint, used in the log messages.
+        logger : Logger
+            The logger used to report the retries.
+        """
+        self.strategy = strategy
+        self.target = target or strategy.name
+        self.logger = logger or Telemetry.get_logger(__name__)
+
+    def execute(self, call: Callable[[], T], idempotent: bool = True) -> T:
+        """
+        Executes a synchronous call.
+
+        Parameters
+        ----------
+        call : Callable[[], T]
+            The call to execute. It is invoked again for each retry.
+        idempotent : bool
+            Indicates whether the call can be executed more than once. Calls that are not
+            idempotent are only retried when their request was not processed.
+
+        Returns
+        -------
+        T
+            The result of the call.
+        """
+        retry = 0
+        while True:
+            try:
+                return call()
+            except Exception as e:
+                retry += 1
+                delay = self.__get_retry_delay(retry, e, idempotent)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+    async def execute_async(self, call: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        """
+        Executes an asynchronous call.
+
+        Parameters
+        ----------
+        call : Callable[[], Awaitable[T]]
+            Creates the awaitable executing the call. It is invoked again for each retry.
+        idempotent : bool
+            Indicates whether the call can be executed more than once. Calls that are not
+            idempotent are only retried when their request was not processed.
+
+        Returns
+        -------
+        T
+            The result of the call.
+        """
+        retry = 0
+        while True:
+            try:
+                return await call()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                retry += 1
+                delay = self.__get_retry_delay(retry, e, idempotent)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    def __get_retry_delay(self, retry: int, exception: Exception, idempotent: bool) -> Optional[float]:
+        """
+        Gets the delay before the retry, or None if the call must not be retried.
+        """
+        if retry > self.strategy.max_retries or not self.strategy.is_transient(exception, idempotent):
+            return None
+
+        delay = self.strategy.get_delay_seconds(retry, exception)
+        if delay is None:
+            self.logger.warning(f'The call to {self.target} was throttled for longer than the retry strategy allows.')
+            return None
+
+        context = RetryContext.current()
+        if context is not None and not context.try_acquire_retry(delay):
+            self.logger.warning(f'The call to {self.target} is not retried: the retry budget or the deadline of the operation is exhausted.')
+            return None
+
+        status_code = get_status_code(exception)
+        self.logger.info(
+            f'Retrying the call to {self.target} in {delay:.2f} seconds (retry {retry} of {self.strategy.max_retries}) after '
+            + (f'status code {status_code}.' if status_code is not None else f'{type(exception).__name__}.'))
+        return delay
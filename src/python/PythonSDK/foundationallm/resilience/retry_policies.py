@@ -0,0 +1,83 @@
+"""
+Retry integrations for the HTTP pipelines of the OpenAI (httpx) clients.
+"""
+import httpx
+from .retry_executor import RetryExecutor
+from .retry_strategy import RetryStrategy
+
+class _RetryableResponseException(Exception):
+    """
+    Carries a response whose status code is retried by the retry strategy.
+    """
+    def __init__(self, response: httpx.Response):
+        super().__init__(f'The request failed with status code {response.status_code}.')
+        self.response = response
+        self.status_code = response.status_code
+
+def _is_retryable_response(strategy: RetryStrategy, response: httpx.Response) -> bool:
+    """
+    Indicates whether a response is retried. Responses with the x-should-retry: false header,
+    such as the responses of an open circuit breaker, are never retried.
+    """
+    return response.status_code in strategy.retry_status_codes \
+        and response.headers.get('x-should-retry', '').lower() != 'false'
+
+class RetryTransport(httpx.BaseTransport):
+    """
+    httpx transport retrying the requests that fail transiently with the retry strategy of
+    their API endpoint, within the retry budget and deadline of the current operation.
+    The OpenAI clients using it must be created with max_retries=0.
+
+    Model inference requests have no side effects, so they are retried as idempotent calls.
+    The response of the last attempt is returned.
+    """
+    def __init__(self, strategy: RetryStrategy, transport: httpx.BaseTransport):
+        self.strategy = strategy
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        def send() -> httpx.Response:
+            response = self.transport.handle_request(request)
+            if _is_retryable_response(self.strategy, response):
+                response.read()
+                response.close()
+                raise _RetryableResponseException(response)
+            return response
+
+        try:
+            return RetryExecutor(self.strategy, target=request.url.host).execute(send)
+        except _RetryableResponseException as e:
+            return e.response
+
+    def close(self):
+        self.transport.close()
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """
+    Asynchronous httpx transport retrying the requests that fail transiently with the retry strategy
+    of their API endpoint, within the retry budget and deadline of the current operation.
+    The OpenAI clients using it must be created with max_retries=0.
+
+    Model inference requests have no side effects, so they are retried as idempotent calls.
+    The response of the last attempt is returned.
+    """
+    def __init__(self, strategy: RetryStrategy, transport: httpx.AsyncBaseTransport):
+        self.strategy = strategy
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        async def send() -> httpx.Response:
+            response = await self.transport.handle_async_request(request)
+            if _is_retryable_response(self.strategy, response):
+                await response.aread()
+                await response.aclose()
+                raise _RetryableResponseException(response)
+            return response
+
+        try:
+            return await RetryExecutor(self.strategy, target=request.url.host).execute_async(send)
+        except _RetryableResponseException as e:
+            return e.response
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,229 @@
+"""
+Class: RetryStrategy
+Description: Named retry policy applied to the calls made to an API endpoint.
+"""
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+
+# The status codes retried by default, matching the common HTTP retry strategy of the .NET services.
+DEFAULT_RETRY_STATUS_CODES = [429, 502, 503]
+
+# The names of the exception classes raised by the HTTP and SDK clients when a connection fails or times out.
+TRANSIENT_EXCEPTION_NAMES = {
+    'APIConnectionError',
+    'APITimeoutError',
+    'ClientConnectionError',
+    'ClientOSError',
+    'ConnectError',
+    'ConnectTimeout',
+    'ConnectTimeoutError',
+    'EndpointConnectionError',
+    'PoolTimeout',
+    'ReadError',
+    'ReadTimeout',
+    'ReadTimeoutError',
+    'RemoteProtocolError',
+    'ServerDisconnectedError',
+    'ServerTimeoutError',
+    'ServiceRequestError',
+    'ServiceResponseError',
+    'WriteError',
+    'WriteTimeout'
+}
+
+# The names of the exception classes raised when a connection cannot be established, before a request is sent.
+CONNECTION_EXCEPTION_NAMES = {
+    'ClientConnectorError',
+    'ConnectError',
+    'ConnectTimeout',
+    'ConnectTimeoutError',
+    'ConnectionTimeoutError',
+    'EndpointConnectionError',
+    'NewConnectionError',
+    'PoolTimeout',
+    'ServiceRequestError'
+}
+
+# The status codes of the responses returned before a request was processed.
+UNPROCESSED_STATUS_CODES = {429, 503}
+
+# The names of the exception classes reporting failures that must not be retried, whatever their status code.
+# A call refused by an open circuit breaker fails fast; the breaker decides when the endpoint is called again.
+NON_TRANSIENT_EXCEPTION_NAMES = {
+    'CircuitBreakerOpenException'
+}
+
+def get_status_code(exception: Exception) -> Optional[int]:
+    """
+    Gets the HTTP status code carried by an exception raised by requests, aiohttp, openai,
+    the Azure SDK or botocore, if any.
+    """
+    for status_code in [
+        getattr(exception, 'status_code', None),
+        getattr(exception, 'status', None),
+        getattr(getattr(exception, 'response', None), 'status_code', None)]:
+        if isinstance(status_code, int):
+            return status_code
+
+    # botocore.exceptions.ClientError
+    response = getattr(exception, 'response', None)
+    if isinstance(response, dict):
+        status_code = response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+        if isinstance(status_code, int):
+            return status_code
+    return None
+
+def get_retry_after_seconds(exception: Exception) -> Optional[float]:
+    """
+    Gets the delay requested by the server with the retry-after-ms, x-ms-retry-after-ms
+    or Retry-After headers of the response that caused an exception, if any.
+    """
+    headers = getattr(getattr(exception, 'response', None), 'headers', None) or getattr(exception, 'headers', None)
+    if headers is None:
+        return None
+
+    try:
+        for header_name in ['retry-after-ms', 'x-ms-retry-after-ms']:
+            value = headers.get(header_name)
+            if value is not None:
+                return float(value) / 1000
+
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+class RetryStrategy:
+    """
+    Retry policy using exponential backoff with jitter.
+
+    Transient failures are retried: connection errors, timeouts and the configured HTTP
+    status codes. A Retry-After requested by the server replaces the computed delay when
+    it is longer; a Retry-After longer than max_retry_after_seconds is not waited out and
+    the failure is returned to the caller.
+    """
+    def __init__(
+        self,
+        name: str,
+        max_retries: int = 5,
+        initial_delay_seconds: float = 1.0,
+        max_delay_seconds: float = 30.0,
+        backoff_multiplier: float = 2.0,
+        use_jitter: bool = True,
+        retry_status_codes: List[int] = None,
+        max_retry_after_seconds: float = 60.0):
+        """
+        Initializes the retry strategy.
+
+        Parameters
+        ----------
+        name : str
+            The name of the strategy, referenced by the retry_strategy_name of the API endpoints.
+        max_retries : int
+            The maximum number of retries after the first attempt.
+        initial_delay_seconds : float
+            The delay before the first retry.
+        max_delay_seconds : float
+            The maximum delay between two attempts.
+        backoff_multiplier : float
+            The factor applied to the delay after each retry. Use 1 for a constant delay.
+        use_jitter : bool
+            Indicates whether the delays are randomized to spread the retries of concurrent callers.
+        retry_status_codes : List[int]
+            The HTTP status codes that are retried.
+        max_retry_after_seconds : float
+            The longest Retry-After that is waited out.
+        """
+        if max_retries < 0:
+            raise ValueError('The max_retries parameter cannot be negative.')
+
+        self.name = name
+        self.max_retries = max_retries
+        self.initial_delay_seconds = initial_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.backoff_multiplier = backoff_multiplier
+        self.use_jitter = use_jitter
+        self.retry_status_codes = set(retry_status_codes if retry_status_codes is not None else DEFAULT_RETRY_STATUS_CODES)
+        self.max_retry_after_seconds = max_retry_after_seconds
+
+    @staticmethod
+    def from_dict(name: str, settings: dict) -> 'RetryStrategy':
+        """
+        Creates a retry strategy from its settings, using the parameter names of the constructor.
+        """
+        return RetryStrategy(name, **settings)
+
+    def is_transient(self, exception: Exception, idempotent: bool = True) -> bool:
+        """
+        Indicates whether the failure reported by an exception is transient and can be retried.
+
+        A call that is not idempotent is only retried when its request was not processed: the
+        connection could not be established, or the response is a 429 or a 503. Retrying it
+        after a read timeout or a dropped connection could execute it twice.
+        """
+        exception_names = {cls.__name__ for cls in type(exception).__mro__}
+        if exception_names & NON_TRANSIENT_EXCEPTION_NAMES:
+            return False
+        if not idempotent:
+            return bool(exception_names & CONNECTION_EXCEPTION_NAMES) \
+                or get_status_code(exception) in (self.retry_status_codes & UNPROCESSED_STATUS_CODES)
+        if isinstance(exception, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+            return True
+        if exception_names & TRANSIENT_EXCEPTION_NAMES:
+            return True
+        return get_status_code(exception) in self.retry_status_codes
+
+    def get_delay_seconds(self, retry: int, exception: Exception = None) -> Optional[float]:
+        """
+        Gets the delay before a retry.
+
+        Parameters
+        ----------
+        retry : int
+            The number of the retry, starting at 1.
+        exception : Exception
+            The exception raised by the previous attempt.
+
+        Returns
+        -------
+        float
+            The delay in seconds, or None if the Retry-After requested by the server is too long.
+        """
+        delay = min(self.max_delay_seconds, self.initial_delay_seconds * (self.backoff_multiplier ** (retry - 1)))
+        if self.use_jitter:
+            delay = random.uniform(delay / 2, delay)
+
+        retry_after = get_retry_after_seconds(exception) if exception is not None else None
+        if retry_after is not None:
+            if retry_after > self.max_retry_after_seconds:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+    def get_azure_core_retry_options(self) -> dict:
+        """
+        Gets the keyword arguments configuring the retry policy of the Azure SDK clients.
+        """
+        return {
+            'retry_total': self.max_retries,
+            'retry_backoff_factor': self.initial_delay_seconds,
+            'retry_backoff_max': self.max_delay_seconds
+        }
+
+    def get_botocore_retry_options(self) -> dict:
+        """
+        Gets the retries settings of a botocore client configuration.
+        """
+        return {'total_max_attempts': self.max_retries + 1, 'mode': 'adaptive'}
+
+    def __repr__(self) -> str:
+        return f'RetryStrategy(name={self.name!r}, max_retries={self.max_retries})'
+
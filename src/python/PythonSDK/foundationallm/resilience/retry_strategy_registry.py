@@ -0,0 +1,85 @@
+"""
+Class: RetryStrategyRegistry
+Description: Registry of the retry strategies referenced by the retry_strategy_name of the API endpoints.
+"""
+import json
+import threading
+from typing import Dict, Optional
+from foundationallm.config import Configuration, read_setting
+from foundationallm.telemetry import Telemetry
+from .retry_strategy import RetryStrategy
+
+RETRY_STRATEGIES = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:Retry:Strategies'
+
+DEFAULT_RETRY_STRATEGY_NAME = 'ExponentialBackoff'
+
+class RetryStrategyRegistry:
+    """
+    Resolves retry strategies by name.
+
+    The built-in strategies are ExponentialBackoff (5 retries with exponential backoff and
+    jitter), FixedDelay (3 retries one second apart) and NoRetry. Additional strategies, or
+    overrides of the built-in ones, are read from a JSON setting mapping strategy names to
+    RetryStrategy parameters, for example:
+        {"Interactive": {"max_retries": 2, "initial_delay_seconds": 0.5, "max_delay_seconds": 4}}
+    Unknown names resolve to the ExponentialBackoff strategy.
+    """
+    __lock = threading.Lock()
+    __strategies: Dict[str, RetryStrategy] = {
+        'ExponentialBackoff': RetryStrategy('ExponentialBackoff'),
+        'FixedDelay': RetryStrategy('FixedDelay', max_retries=3, backoff_multiplier=1.0, use_jitter=False),
+        'NoRetry': RetryStrategy('NoRetry', max_retries=0)
+    }
+
+    @staticmethod
+    def configure(config: Configuration):
+        """
+        Registers the retry strategies defined in the configuration settings.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+        """
+        logger = Telemetry.get_logger(__name__)
+        strategies = read_setting(config, RETRY_STRATEGIES, json.loads, {}, logger,
+            fallback_message='Using the built-in retry strategies.')
+
+        for name, settings in strategies.items():
+            try:
+                RetryStrategyRegistry.register(RetryStrategy.from_dict(name, settings))
+            except Exception as e:
+                logger.warning(f'The retry strategy {name} is invalid and was not registered: {e}')
+
+    @staticmethod
+    def register(strategy: RetryStrategy):
+        """
+        Registers a retry strategy, replacing the strategy with the same name.
+
+        Parameters
+        ----------
+        strategy : RetryStrategy
+            The retry strategy.
+        """
+        with RetryStrategyRegistry.__lock:
+            RetryStrategyRegistry.__strategies[strategy.name] = strategy
+
+    @staticmethod
+    def get_strategy(name: Optional[str]) -> RetryStrategy:
+        """
+        Gets a retry strategy by name.
+
+        Parameters
+        ----------
+        name : str
+            The name of the strategy, usually the retry_strategy_name of an API endpoint.
+
+        Returns
+        -------
+        RetryStrategy
+            The retry strategy, or the ExponentialBackoff strategy if the name is not registered.
+        """
+        strategy = RetryStrategyRegistry.__strategies.get(name) if name else None
+        if strategy is None:
+            strategy = RetryStrategyRegistry.__strategies[DEFAULT_RETRY_STRATEGY_NAME]
+        return strategy
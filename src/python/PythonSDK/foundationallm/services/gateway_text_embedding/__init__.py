@@ -1 +1,3 @@
 from .gateway_text_embedding_service import GatewayTextEmbeddingService
+from .text_embedding_cache import TextEmbeddingCache
+from .text_embedding_batcher import TextEmbeddingBatcher
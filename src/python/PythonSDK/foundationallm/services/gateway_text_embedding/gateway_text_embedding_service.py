@@ -4,84 +4,284 @@ Description:  Class responsible for obtaining text embedding vectors from the Ga
 """
 import asyncio
 import time
-from foundationallm.config import Configuration, UserIdentity
+from typing import Dict, List, Optional
+from foundationallm.config import Configuration, UserIdentity, read_settings
 from foundationallm.models.resource_providers.configuration import APIEndpointConfiguration
 from foundationallm.models.services import GatewayTextEmbeddingResponse
+from foundationallm.resilience import RetryContext
 from foundationallm.services import HttpClientService
+from foundationallm.telemetry import Telemetry
 from .text_chunk import TextChunk
+from .text_embedding_batcher import TextEmbeddingBatcher
+from .text_embedding_cache import TextEmbeddingCache
 from .text_embedding_request import TextEmbeddingRequest
 from .text_embedding_response import TextEmbeddingResponse
 
+GATEWAY_TEXT_EMBEDDING_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:GatewayTextEmbedding'
+GATEWAY_TEXT_EMBEDDING_MAX_BATCH_SIZE = f'{GATEWAY_TEXT_EMBEDDING_CONFIGURATION_NAMESPACE}:MaxBatchSize'
+GATEWAY_TEXT_EMBEDDING_POLLING_INITIAL_DELAY_SECONDS = f'{GATEWAY_TEXT_EMBEDDING_CONFIGURATION_NAMESPACE}:PollingInitialDelaySeconds'
+GATEWAY_TEXT_EMBEDDING_POLLING_MAX_DELAY_SECONDS = f'{GATEWAY_TEXT_EMBEDDING_CONFIGURATION_NAMESPACE}:PollingMaxDelaySeconds'
+GATEWAY_TEXT_EMBEDDING_OPERATION_TIMEOUT_SECONDS = f'{GATEWAY_TEXT_EMBEDDING_CONFIGURATION_NAMESPACE}:OperationTimeoutSeconds'
+GATEWAY_TEXT_EMBEDDING_MICRO_BATCH_DELAY_MILLISECONDS = f'{GATEWAY_TEXT_EMBEDDING_CONFIGURATION_NAMESPACE}:MicroBatchDelayMilliseconds'
+
+# The Gateway API splits the text chunks of an operation into requests that fit the input limits of the
+# embedding deployments, so the batch size only bounds the size of a single operation.
+DEFAULT_MAX_BATCH_SIZE = 64
+
+# Operations that are not completed when they are started are polled after a short delay, which doubles
+# after each poll up to the maximum delay, so that fast operations are not held for a full second.
+DEFAULT_POLLING_INITIAL_DELAY_SECONDS = 0.05
+DEFAULT_POLLING_MAX_DELAY_SECONDS = 1.0
+POLLING_DELAY_MULTIPLIER = 2.0
+DEFAULT_OPERATION_TIMEOUT_SECONDS = 120.0
+
+# The time the concurrent asynchronous embedding requests of the process are collected into one operation.
+# Zero disables the micro-batching.
+DEFAULT_MICRO_BATCH_DELAY_MILLISECONDS = 5.0
+
 class GatewayTextEmbeddingService():
     """
     Class for obtaining embedding vectors from the Gateway API.
+    Embedding vectors are cached per embedding model and text; cached vectors are returned
+    without calling the Gateway API. The texts embedded concurrently with aget_embedding for
+    the same embedding model are sent in batched operations.
+
+    The operations of a batch are sent with the user identity of the service that started
+    the batch; the Gateway API does not use the identity to process embedding operations.
     """
+    # The embedding vectors cached for all the services of the process.
+    cache: TextEmbeddingCache = None
+    # The maximum number of texts sent in a single Gateway API operation.
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    # The polling schedule of the operations that are not completed when they are started.
+    polling_initial_delay_seconds: float = DEFAULT_POLLING_INITIAL_DELAY_SECONDS
+    polling_max_delay_seconds: float = DEFAULT_POLLING_MAX_DELAY_SECONDS
+    operation_timeout_seconds: float = DEFAULT_OPERATION_TIMEOUT_SECONDS
+    # The batcher combining the concurrent asynchronous embedding requests, if enabled.
+    batcher: TextEmbeddingBatcher = None
+
     def __init__(self,
                  instance_id:str,
                  user_identity:UserIdentity,
                  gateway_api_endpoint_configuration: APIEndpointConfiguration,
                  model_name:str,
-                 config: Configuration):
+                 config: Configuration,
+                 cache: TextEmbeddingCache = None):
         self.http_client = HttpClientService(gateway_api_endpoint_configuration, user_identity, config)
         self.model_name = model_name
         self.config = config
         self.url =  f'/instances/{instance_id}/embeddings'
+        if cache is None:
+            if GatewayTextEmbeddingService.cache is None:
+                GatewayTextEmbeddingService.configure(config)
+            cache = GatewayTextEmbeddingService.cache
+        self.cache = cache
+
+    @staticmethod
+    def configure(config: Configuration):
+        """
+        Creates the embedding cache and reads the batching and polling settings shared by all the services.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+        """
+        settings = read_settings(config, [
+            (GATEWAY_TEXT_EMBEDDING_MAX_BATCH_SIZE, int, DEFAULT_MAX_BATCH_SIZE, 1),
+            (GATEWAY_TEXT_EMBEDDING_POLLING_INITIAL_DELAY_SECONDS, float, DEFAULT_POLLING_INITIAL_DELAY_SECONDS, 0.001),
+            (GATEWAY_TEXT_EMBEDDING_POLLING_MAX_DELAY_SECONDS, float, DEFAULT_POLLING_MAX_DELAY_SECONDS, 0.001),
+            (GATEWAY_TEXT_EMBEDDING_OPERATION_TIMEOUT_SECONDS, float, DEFAULT_OPERATION_TIMEOUT_SECONDS, 0.001),
+            (GATEWAY_TEXT_EMBEDDING_MICRO_BATCH_DELAY_MILLISECONDS, float, DEFAULT_MICRO_BATCH_DELAY_MILLISECONDS, 0)],
+            Telemetry.get_logger(__name__))
+
+        GatewayTextEmbeddingService.max_batch_size = settings[GATEWAY_TEXT_EMBEDDING_MAX_BATCH_SIZE]
+        GatewayTextEmbeddingService.polling_initial_delay_seconds = settings[GATEWAY_TEXT_EMBEDDING_POLLING_INITIAL_DELAY_SECONDS]
+        GatewayTextEmbeddingService.polling_max_delay_seconds = settings[GATEWAY_TEXT_EMBEDDING_POLLING_MAX_DELAY_SECONDS]
+        GatewayTextEmbeddingService.operation_timeout_seconds = settings[GATEWAY_TEXT_EMBEDDING_OPERATION_TIMEOUT_SECONDS]
+        GatewayTextEmbeddingService.cache = TextEmbeddingCache.from_config(config)
+
+        micro_batch_delay_milliseconds = settings[GATEWAY_TEXT_EMBEDDING_MICRO_BATCH_DELAY_MILLISECONDS]
+        GatewayTextEmbeddingService.batcher = TextEmbeddingBatcher(
+            GatewayTextEmbeddingService.max_batch_size,
+            micro_batch_delay_milliseconds / 1000) if micro_batch_delay_milliseconds > 0 else None
 
     def get_embedding(self, text: str) -> GatewayTextEmbeddingResponse:
         """
         Get the embedding vector for a given text.
         """
+        return self.get_embeddings([text])[0]
+
+    async def aget_embedding(self, text: str) -> GatewayTextEmbeddingResponse:
+        """
+        Asynchronously get the embedding vector for a given text.
+        Texts that are not cached are sent in the current batch of the embedding model when micro-batching is enabled.
+        """
+        if GatewayTextEmbeddingService.batcher is None or (text == None) or (len(text) == 0):
+            return (await self.aget_embeddings([text]))[0]
+
+        cached_embedding = await self.cache.aget(self.model_name, text)
+        if cached_embedding is not None:
+            return cached_embedding
+        return await GatewayTextEmbeddingService.batcher.aget_embedding(self, text)
+
+    def get_embeddings(self, texts: List[str]) -> List[GatewayTextEmbeddingResponse]:
+        """
+        Get the embedding vectors for a list of texts.
+        The texts that are not cached are sent in batches of at most max_batch_size texts per Gateway API operation.
+
+        Parameters
+        ----------
+        texts : List[str]
+            The texts to embed.
+
+        Returns
+        -------
+        List[GatewayTextEmbeddingResponse]
+            The embedding vectors, in the order of the texts.
+        """
+        embeddings = self.cache.get_many(self.model_name, self._get_distinct_texts(texts))
+        for batch in self._get_missing_batches(embeddings):
+            for text, embedding in zip(batch, self._run_operation(batch)):
+                embeddings[text] = embedding
+        return [embeddings[text] for text in texts]
+
+    async def aget_embeddings(self, texts: List[str]) -> List[GatewayTextEmbeddingResponse]:
+        """
+        Asynchronously get the embedding vectors for a list of texts.
+        The texts that are not cached are sent in batches of at most max_batch_size texts per Gateway API operation,
+        and the batches are processed concurrently.
+
+        Parameters
+        ----------
+        texts : List[str]
+            The texts to embed.
+
+        Returns
+        -------
+        List[GatewayTextEmbeddingResponse]
+            The embedding vectors, in the order of the texts.
+        """
+        embeddings = await self.cache.aget_many(self.model_name, self._get_distinct_texts(texts))
+        batches = self._get_missing_batches(embeddings)
+        results = await asyncio.gather(*[self._arun_operation(batch) for batch in batches])
+        for batch, batch_embeddings in zip(batches, results):
+            for text, embedding in zip(batch, batch_embeddings):
+                embeddings[text] = embedding
+        return [embeddings[text] for text in texts]
 
-        if (text == None) or (len(text) == 0):
-            raise Exception("Text is empty or None")
+    def _get_distinct_texts(self, texts: List[str]) -> List[str]:
+        """
+        Gets the distinct texts to embed, in order.
+        """
+        if (texts == None) or (len(texts) == 0):
+            raise Exception("Texts are empty or None")
 
+        for text in texts:
+            if (text == None) or (len(text) == 0):
+                raise Exception("Text is empty or None")
+        return list(dict.fromkeys(texts))
+
+    def _get_missing_batches(self, embeddings: Dict[str, Optional[GatewayTextEmbeddingResponse]]) -> List[List[str]]:
+        """
+        Gets the batches of the texts that are not cached.
+        """
+        missing_texts = [text for text, embedding in embeddings.items() if embedding is None]
+        batches = [
+            missing_texts[index:index + self.max_batch_size]
+            for index in range(0, len(missing_texts), self.max_batch_size)
+        ]
+        return batches
+
+    def _run_operation(self, texts: List[str]) -> List[GatewayTextEmbeddingResponse]:
+        """
+        Runs a Gateway API embedding operation for a batch of texts.
+        """
         # create the text embedding request
-        text_embedding_request = self._create_text_embedding_request(text)
+        text_embedding_request = self._create_text_embedding_request(texts)
 
         # start the operation
         request_json = text_embedding_request.model_dump_json(by_alias=True)
 
+        deadline = self._get_operation_deadline()
         resp = self.http_client.post(self.url, data=request_json)
         response = TextEmbeddingResponse.model_validate(resp)
         # poll until completion
+        poll = 0
         while response.in_progress and not response.failed:
-            # delay for a second in between polling
-            time.sleep(1)
+            time.sleep(self._get_polling_delay(poll, response, deadline))
+            poll += 1
             get_resp = self.http_client.get(self.url + f'?operationId={response.operation_id}')
             response = TextEmbeddingResponse.model_validate(get_resp)
 
-        if response.failed:
-            raise Exception(f"Text embedding operation failed: {response.error_message}")
-
-        return GatewayTextEmbeddingResponse(
-            embedding_vector=response.text_chunks[0].embedding,
-            tokens_count=response.text_chunks[0].tokens_count)
+        embeddings = self._get_embeddings_from_response(texts, response)
+        self.cache.set_many(self.model_name, dict(zip(texts, embeddings)))
+        return embeddings
 
-    async def aget_embedding(self, text: str) -> GatewayTextEmbeddingResponse:
+    async def _arun_operation(self, texts: List[str]) -> List[GatewayTextEmbeddingResponse]:
         """
-        Asynchronously get the embedding vector for a given text.
+        Asynchronously runs a Gateway API embedding operation for a batch of texts.
         """
-
-        text_embedding_request = self._create_text_embedding_request(text)
+        text_embedding_request = self._create_text_embedding_request(texts)
 
         # start the operation
         request_json = text_embedding_request.model_dump_json(by_alias=True)
 
         # Send asynchronous POST request to start the operation
+        deadline = self._get_operation_deadline()
         response = TextEmbeddingResponse.model_validate(await self.http_client.post_async(self.url, data=request_json))
 
         # Poll until operation is complete
+        poll = 0
         while response.in_progress and not response.failed:
-            await asyncio.sleep(1)  # Use asyncio.sleep for non-blocking delay
+            await asyncio.sleep(self._get_polling_delay(poll, response, deadline))  # Use asyncio.sleep for non-blocking delay
+            poll += 1
             response = TextEmbeddingResponse.model_validate(await self.http_client.get_async(self.url + f'?operationId={response.operation_id}'))
 
+        embeddings = self._get_embeddings_from_response(texts, response)
+        await self.cache.aset_many(self.model_name, dict(zip(texts, embeddings)))
+        return embeddings
+
+    def _get_operation_deadline(self) -> float:
+        """
+        Gets the monotonic time by which an operation must be completed, capped to the deadline of the current operation.
+        """
+        return time.monotonic() + RetryContext.get_timeout_seconds(self.operation_timeout_seconds)
+
+    def _get_polling_delay(self, poll: int, response: TextEmbeddingResponse, deadline: float) -> float:
+        """
+        Gets the delay before the next poll of an operation, raising a TimeoutError if the operation is past its deadline.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Text embedding operation {response.operation_id} did not complete in time.")
+
+        delay = min(
+            self.polling_max_delay_seconds,
+            self.polling_initial_delay_seconds * (POLLING_DELAY_MULTIPLIER ** poll))
+        return min(delay, remaining)
+
+    def _get_embeddings_from_response(self, texts: List[str], response: TextEmbeddingResponse) -> List[GatewayTextEmbeddingResponse]:
+        """
+        Gets the embedding vectors of a completed operation in the order of its texts.
+        """
         if response.failed:
             raise Exception(f"Text embedding operation failed: {response.error_message}")
 
-        return GatewayTextEmbeddingResponse(
-            embedding_vector=response.text_chunks[0].embedding,
-            tokens_count=response.text_chunks[0].tokens_count)
+        # The text chunks are matched to the texts by their one-based position.
+        text_chunks = {text_chunk.position: text_chunk for text_chunk in response.text_chunks or []}
+        embeddings = []
+        for position in range(1, len(texts) + 1):
+            text_chunk = text_chunks.get(position)
+            if text_chunk is None or text_chunk.embedding is None:
+                raise Exception(f"Text embedding operation {response.operation_id} did not return the embedding of the text chunk at position {position}.")
+            embedding = GatewayTextEmbeddingResponse(
+                embedding_vector=text_chunk.embedding,
+                tokens_count=text_chunk.tokens_count)
+            embeddings.append(embedding)
+        return embeddings
 
-    def _create_text_embedding_request(self, text: str) -> TextEmbeddingRequest:
-        text_chunk = TextChunk(content=text)
-        return TextEmbeddingRequest(text_chunks=[text_chunk], embedding_model_name=self.model_name, prioritized=True)
+    def _create_text_embedding_request(self, texts: List[str]) -> TextEmbeddingRequest:
+        text_chunks = [TextChunk(position=position, content=text) for position, text in enumerate(texts, start=1)]
+        return TextEmbeddingRequest(text_chunks=text_chunks, embedding_model_name=self.model_name, prioritized=True)
@@ -3,7 +3,8 @@ Class: TextChunk
 Description:  Class representing a text chunk in an embedding vector operation.
 """
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional
+from foundationallm.models.services import EmbeddingVector
 
 class TextChunk(BaseModel):
     """
@@ -12,5 +13,5 @@ class TextChunk(BaseModel):
     operation_id: Optional[str] = None
     position: Optional[int] = 1 # position is one-based
     content: Optional[str] = None # comes back empty on the reponse
-    embedding: Optional[List[float]] = None
+    embedding: Optional[EmbeddingVector] = None # decoded to float32 without validating each element
     tokens_count: Optional[int] = 0
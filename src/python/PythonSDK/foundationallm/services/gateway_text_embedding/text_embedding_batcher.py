@@ -0,0 +1,134 @@
+"""
+Class: TextEmbeddingBatcher
+Description: Combines the concurrent embedding requests of a process into batched Gateway API operations.
+"""
+import asyncio
+import contextvars
+from typing import Any, Dict, List, Set, Tuple
+from foundationallm.models.services import GatewayTextEmbeddingResponse
+from foundationallm.resilience import RetryContext
+from foundationallm.telemetry import Telemetry
+
+class PendingTextEmbeddingBatch:
+    """
+    The texts collected for a batch that has not been sent yet.
+    """
+    def __init__(self, service: Any):
+        # The service sending the batch, which is the service of the first text of the batch.
+        self.service = service
+        # The futures waiting for the embedding of each distinct text.
+        self.futures: Dict[str, List[asyncio.Future]] = {}
+        self.timer: asyncio.TimerHandle = None
+
+class TextEmbeddingBatcher:
+    """
+    Collects the texts embedded concurrently with the same embedding model and Gateway API
+    endpoint, and sends them in one batched operation, fanning the embedding vectors back
+    out to the callers.
+
+    A batch is sent when it holds max_batch_size distinct texts or max_delay_seconds after
+    its first text arrived, whichever comes first. A failed operation fails all the callers
+    of its batch. Batches are collected per event loop.
+
+    The operations run outside the context of the callers, so that no caller's retry budget
+    and deadline apply to the batches shared with other callers; each caller only waits for
+    its embedding until its own deadline.
+    """
+    def __init__(self, max_batch_size: int, max_delay_seconds: float):
+        """
+        Initializes the batcher.
+
+        Parameters
+        ----------
+        max_batch_size : int
+            The maximum number of distinct texts in a batch.
+        max_delay_seconds : float
+            The longest the first text of a batch waits for other texts.
+        """
+        if max_batch_size < 1:
+            raise ValueError('The max_batch_size parameter must be greater than zero.')
+
+        self.max_batch_size = max_batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self.__pending: Dict[Tuple, PendingTextEmbeddingBatch] = {}
+        # Keeps a reference to the tasks sending the batches until they complete.
+        self.__tasks: Set[asyncio.Task] = set()
+
+        meter = Telemetry.get_meter(__name__)
+        self.__batches = meter.create_counter(
+            'foundationallm.embedding_batcher.batches',
+            description='The number of batched embedding operations sent to the Gateway API.')
+        self.__texts = meter.create_counter(
+            'foundationallm.embedding_batcher.texts',
+            description='The number of distinct texts sent in batched embedding operations.')
+
+    async def aget_embedding(self, service: Any, text: str) -> GatewayTextEmbeddingResponse:
+        """
+        Gets the embedding vector of a text, sending it in the batch of its embedding model and endpoint.
+
+        Parameters
+        ----------
+        service : GatewayTextEmbeddingService
+            The service of the caller, identifying the embedding model and Gateway API endpoint.
+        text : str
+            The text to embed.
+
+        Returns
+        -------
+        GatewayTextEmbeddingResponse
+            The embedding vector of the text.
+        """
+        loop = asyncio.get_running_loop()
+        key = (id(loop), service.http_client.base_url, service.url, service.model_name)
+        batch = self.__pending.get(key)
+        if batch is None:
+            batch = PendingTextEmbeddingBatch(service)
+            self.__pending[key] = batch
+            batch.timer = loop.call_later(self.max_delay_seconds, self.__flush, key, batch)
+
+        future = loop.create_future()
+        batch.futures.setdefault(text, []).append(future)
+        if len(batch.futures) >= self.max_batch_size:
+            self.__flush(key, batch)
+
+        timeout_seconds = RetryContext.get_timeout_seconds(None)
+        if timeout_seconds is None:
+            return await future
+        # The future of the caller is cancelled on timeout; the batch still completes for the other callers.
+        return await asyncio.wait_for(future, timeout_seconds)
+
+    def __flush(self, key: Tuple, batch: PendingTextEmbeddingBatch):
+        if self.__pending.get(key) is not batch:
+            return
+        del self.__pending[key]
+        batch.timer.cancel()
+
+        # The task runs in an empty context rather than in the context of the caller that filled the batch.
+        task = contextvars.Context().run(asyncio.ensure_future, self.__send(batch))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __send(self, batch: PendingTextEmbeddingBatch):
+        texts = list(batch.futures.keys())
+        self.__batches.add(1, {'model': batch.service.model_name})
+        self.__texts.add(len(texts), {'model': batch.service.model_name})
+        try:
+            # The texts were looked up in the cache before they were added to the batch.
+            embeddings = await batch.service._arun_operation(texts)
+        except asyncio.CancelledError:
+            for futures in batch.futures.values():
+                for future in futures:
+                    future.cancel()
+            raise
+        except Exception as e:
+            for futures in batch.futures.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for text, embedding in zip(texts, embeddings):
+            for future in batch.futures[text]:
+                # The futures of callers that were cancelled are already done.
+                if not future.done():
+                    future.set_result(embedding)
@@ -0,0 +1,396 @@
+"""
+Class: TextEmbeddingCache
+Description: Process-wide cache of the embedding vectors obtained from the Gateway API.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from foundationallm.config import Configuration, read_setting, read_settings
+from foundationallm.models.services import GatewayTextEmbeddingResponse
+from foundationallm.telemetry import Telemetry
+
+EMBEDDING_CACHE_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:EmbeddingCache'
+EMBEDDING_CACHE_MAX_SIZE_MEGABYTES = f'{EMBEDDING_CACHE_CONFIGURATION_NAMESPACE}:MaxSizeMegabytes'
+EMBEDDING_CACHE_TIME_TO_LIVE_SECONDS = f'{EMBEDDING_CACHE_CONFIGURATION_NAMESPACE}:TimeToLiveSeconds'
+EMBEDDING_CACHE_DIRECTORY = f'{EMBEDDING_CACHE_CONFIGURATION_NAMESPACE}:Directory'
+EMBEDDING_CACHE_MAX_DISK_SIZE_MEGABYTES = f'{EMBEDDING_CACHE_CONFIGURATION_NAMESPACE}:MaxDiskSizeMegabytes'
+
+DEFAULT_MAX_SIZE_MEGABYTES = 64.0
+DEFAULT_TIME_TO_LIVE_SECONDS = 3600.0
+DEFAULT_MAX_DISK_SIZE_MEGABYTES = 1024.0
+
+# The minimum time between two sweeps of the disk tier.
+DISK_SWEEP_INTERVAL_SECONDS = 300.0
+
+# The memory used by each dimension of a vector, held as float32 values, and by the rest of a cache entry.
+BYTES_PER_DIMENSION = 4
+BYTES_PER_ENTRY = 512
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def get_cache_key(model_name: str, text: str) -> str:
+    """
+    Gets the cache key of the embedding of a text: the hash of the model name and of the
+    text, normalized to NFC with its whitespace collapsed.
+    """
+    normalized_text = WHITESPACE_PATTERN.sub(' ', unicodedata.normalize('NFC', text)).strip()
+    return hashlib.sha256(f'{model_name}\x1f{normalized_text}'.encode('utf-8')).hexdigest()
+
+class TextEmbeddingCache:
+    """
+    Two-tier cache of embedding vectors keyed by embedding model and normalized text.
+
+    The memory tier is an LRU bounded by the estimated size of the vectors it holds. The
+    optional disk tier keeps one file per vector in a directory shared by the processes of
+    the host. Entries of both tiers expire after the time to live. The disk tier is swept
+    periodically when vectors are written: expired files are removed, then the oldest files
+    until the directory fits in its maximum size.
+
+    The asynchronous methods access the disk tier from a worker thread.
+    """
+    def __init__(
+        self,
+        max_size_megabytes: float = DEFAULT_MAX_SIZE_MEGABYTES,
+        time_to_live_seconds: float = DEFAULT_TIME_TO_LIVE_SECONDS,
+        directory: Optional[str] = None,
+        max_disk_size_megabytes: float = DEFAULT_MAX_DISK_SIZE_MEGABYTES):
+        """
+        Initializes the cache.
+
+        Parameters
+        ----------
+        max_size_megabytes : float
+            The maximum estimated size of the vectors held in memory.
+        time_to_live_seconds : float
+            The time after which a cached vector expires.
+        directory : str
+            The directory of the disk tier. If not set, vectors are only cached in memory.
+        max_disk_size_megabytes : float
+            The maximum size of the files of the disk tier.
+        """
+        if max_size_megabytes <= 0:
+            raise ValueError('The max_size_megabytes parameter must be greater than zero.')
+
+        self.max_size_bytes = int(max_size_megabytes * 1024 * 1024)
+        self.time_to_live_seconds = time_to_live_seconds
+        self.directory = directory
+        self.max_disk_size_bytes = int(max_disk_size_megabytes * 1024 * 1024)
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        # The entries are (expires_at, size_bytes, response), expires_at being a wall-clock timestamp.
+        self.__entries: OrderedDict[str, Tuple[float, int, GatewayTextEmbeddingResponse]] = OrderedDict()
+        self.__size_bytes = 0
+        self.__lock = threading.Lock()
+        # The first write sweeps the files left over by previous processes.
+        self.__next_sweep_at = 0.0
+
+        meter = Telemetry.get_meter(__name__)
+        self.__hits = meter.create_counter(
+            'foundationallm.embedding_cache.hits',
+            description='The number of embedding vectors found in the cache.')
+        self.__misses = meter.create_counter(
+            'foundationallm.embedding_cache.misses',
+            description='The number of embedding vectors not found in the cache.')
+
+    @staticmethod
+    def from_config(config: Configuration) -> 'TextEmbeddingCache':
+        """
+        Creates a cache using the LangChainAPI configuration settings.
+        Settings that are missing or invalid fall back to their default values.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+
+        Returns
+        -------
+        TextEmbeddingCache
+            The configured cache.
+        """
+        logger = Telemetry.get_logger(__name__)
+        settings = read_settings(config, [
+            (EMBEDDING_CACHE_MAX_SIZE_MEGABYTES, float, DEFAULT_MAX_SIZE_MEGABYTES, 0.001),
+            (EMBEDDING_CACHE_TIME_TO_LIVE_SECONDS, float, DEFAULT_TIME_TO_LIVE_SECONDS),
+            (EMBEDDING_CACHE_MAX_DISK_SIZE_MEGABYTES, float, DEFAULT_MAX_DISK_SIZE_MEGABYTES, 0)], logger)
+
+        return TextEmbeddingCache(
+            settings[EMBEDDING_CACHE_MAX_SIZE_MEGABYTES],
+            settings[EMBEDDING_CACHE_TIME_TO_LIVE_SECONDS],
+            read_setting(config, EMBEDDING_CACHE_DIRECTORY, lambda value: value or None, None, logger,
+                fallback_message='Embedding vectors are only cached in memory.'),
+            settings[EMBEDDING_CACHE_MAX_DISK_SIZE_MEGABYTES])
+
+    @property
+    def size_bytes(self) -> int:
+        """The estimated size of the vectors held in memory."""
+        return self.__size_bytes
+
+    def get(self, model_name: str, text: str) -> Optional[GatewayTextEmbeddingResponse]:
+        """
+        Gets the cached embedding of a text.
+
+        Parameters
+        ----------
+        model_name : str
+            The name of the embedding model.
+        text : str
+            The embedded text.
+
+        Returns
+        -------
+        GatewayTextEmbeddingResponse
+            The cached embedding, or None if the text is not cached or its embedding expired.
+        """
+        return self.get_many(model_name, [text])[text]
+
+    async def aget(self, model_name: str, text: str) -> Optional[GatewayTextEmbeddingResponse]:
+        """
+        Asynchronously gets the cached embedding of a text.
+        """
+        return (await self.aget_many(model_name, [text]))[text]
+
+    def get_many(self, model_name: str, texts: List[str]) -> Dict[str, Optional[GatewayTextEmbeddingResponse]]:
+        """
+        Gets the cached embeddings of distinct texts.
+
+        Parameters
+        ----------
+        model_name : str
+            The name of the embedding model.
+        texts : List[str]
+            The embedded texts.
+
+        Returns
+        -------
+        Dict[str, Optional[GatewayTextEmbeddingResponse]]
+            The cached embeddings by text, None for the texts that are not cached or whose embedding expired.
+        """
+        embeddings, missing_texts = self.__get_from_memory(model_name, texts)
+        if len(missing_texts) > 0:
+            embeddings.update(self.__get_from_disk(model_name, missing_texts))
+        return embeddings
+
+    async def aget_many(self, model_name: str, texts: List[str]) -> Dict[str, Optional[GatewayTextEmbeddingResponse]]:
+        """
+        Asynchronously gets the cached embeddings of distinct texts.
+        """
+        embeddings, missing_texts = self.__get_from_memory(model_name, texts)
+        if len(missing_texts) > 0:
+            embeddings.update(await asyncio.to_thread(self.__get_from_disk, model_name, missing_texts))
+        return embeddings
+
+    def set(self, model_name: str, text: str, response: GatewayTextEmbeddingResponse):
+        """
+        Caches the embedding of a text.
+
+        Parameters
+        ----------
+        model_name : str
+            The name of the embedding model.
+        text : str
+            The embedded text.
+        response : GatewayTextEmbeddingResponse
+            The embedding of the text.
+        """
+        self.set_many(model_name, {text: response})
+
+    def set_many(self, model_name: str, embeddings: Dict[str, GatewayTextEmbeddingResponse]):
+        """
+        Caches the embeddings of texts.
+
+        Parameters
+        ----------
+        model_name : str
+            The name of the embedding model.
+        embeddings : Dict[str, GatewayTextEmbeddingResponse]
+            The embeddings by text.
+        """
+        entries = self.__add_to_memory(model_name, embeddings)
+        if self.directory is not None:
+            self.__write_files(entries)
+
+    async def aset_many(self, model_name: str, embeddings: Dict[str, GatewayTextEmbeddingResponse]):
+        """
+        Asynchronously caches the embeddings of texts.
+        """
+        entries = self.__add_to_memory(model_name, embeddings)
+        if self.directory is not None:
+            await asyncio.to_thread(self.__write_files, entries)
+
+    def sweep_directory(self):
+        """
+        Removes the expired files of the disk tier, then the oldest files until the disk tier fits in its maximum size.
+        """
+        if self.directory is None:
+            return
+
+        now = time.time()
+        files = []
+        size_bytes = 0
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+                # Files are written when the vectors are cached; temporary files are left over by interrupted writes.
+                if stat.st_mtime + self.time_to_live_seconds <= now \
+                    or (entry.name.endswith('.tmp') and stat.st_mtime + DISK_SWEEP_INTERVAL_SECONDS <= now):
+                    os.remove(entry.path)
+                    continue
+            except FileNotFoundError:
+                # The file was removed by another process.
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            size_bytes += stat.st_size
+
+        if size_bytes <= self.max_disk_size_bytes:
+            return
+        files.sort()
+        for _, file_size_bytes, path in files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size_bytes -= file_size_bytes
+            if size_bytes <= self.max_disk_size_bytes:
+                break
+
+    def clear(self):
+        """
+        Removes all the vectors held in memory.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__size_bytes = 0
+
+    def __get_from_memory(self, model_name: str, texts: List[str]) -> Tuple[Dict[str, GatewayTextEmbeddingResponse], List[str]]:
+        """
+        Gets the embeddings held in memory, and the texts that are not.
+        """
+        now = time.time()
+        embeddings = {}
+        missing_texts = []
+        with self.__lock:
+            for text in texts:
+                key = get_cache_key(model_name, text)
+                entry = self.__entries.get(key)
+                if entry is not None:
+                    if entry[0] > now:
+                        self.__entries.move_to_end(key)
+                        embeddings[text] = entry[2]
+                        continue
+                    self.__remove(key)
+                missing_texts.append(text)
+        if len(embeddings) > 0:
+            self.__hits.add(len(embeddings), {'model': model_name, 'tier': 'memory'})
+        return embeddings, missing_texts
+
+    def __get_from_disk(self, model_name: str, texts: List[str]) -> Dict[str, Optional[GatewayTextEmbeddingResponse]]:
+        """
+        Gets the embeddings stored on disk, keeping them in memory, or None for the texts that are not cached.
+        """
+        embeddings = {text: None for text in texts}
+        if self.directory is not None:
+            now = time.time()
+            for text in texts:
+                key = get_cache_key(model_name, text)
+                entry = self.__read_file(key, now)
+                if entry is not None:
+                    with self.__lock:
+                        self.__add(key, entry[0], entry[1])
+                    embeddings[text] = entry[1]
+
+        hits = sum(1 for embedding in embeddings.values() if embedding is not None)
+        if hits > 0:
+            self.__hits.add(hits, {'model': model_name, 'tier': 'disk'})
+        if hits < len(texts):
+            self.__misses.add(len(texts) - hits, {'model': model_name})
+        return embeddings
+
+    def __add_to_memory(self, model_name: str, embeddings: Dict[str, GatewayTextEmbeddingResponse]) -> List[Tuple[str, float, GatewayTextEmbeddingResponse]]:
+        """
+        Adds embeddings to the memory tier and returns the entries to write to the disk tier.
+        """
+        expires_at = time.time() + self.time_to_live_seconds
+        entries = [(get_cache_key(model_name, text), expires_at, response) for text, response in embeddings.items()]
+        with self.__lock:
+            for key, _, response in entries:
+                self.__add(key, expires_at, response)
+        return entries
+
+    def __write_files(self, entries: List[Tuple[str, float, GatewayTextEmbeddingResponse]]):
+        for key, expires_at, response in entries:
+            self.__write_file(key, expires_at, response)
+
+        now = time.monotonic()
+        with self.__lock:
+            sweep = now >= self.__next_sweep_at
+            if sweep:
+                self.__next_sweep_at = now + DISK_SWEEP_INTERVAL_SECONDS
+        if sweep:
+            try:
+                self.sweep_directory()
+            except Exception as e:
+                Telemetry.get_logger(__name__).warning(f'The embedding cache directory {self.directory} could not be swept: {str(e)}')
+
+    def __add(self, key: str, expires_at: float, response: GatewayTextEmbeddingResponse):
+        size_bytes = len(response.embedding_vector) * BYTES_PER_DIMENSION + BYTES_PER_ENTRY
+        if size_bytes > self.max_size_bytes:
+            return
+        if key in self.__entries:
+            self.__remove(key)
+        self.__entries[key] = (expires_at, size_bytes, response)
+        self.__size_bytes += size_bytes
+        while self.__size_bytes > self.max_size_bytes:
+            self.__remove(next(iter(self.__entries)))
+
+    def __remove(self, key: str):
+        entry = self.__entries.pop(key)
+        self.__size_bytes -= entry[1]
+
+    def __get_file_path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def __read_file(self, key: str, now: float) -> Optional[Tuple[float, GatewayTextEmbeddingResponse]]:
+        path = self.__get_file_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                content = json.load(file)
+            if content['expires_at'] <= now:
+                os.remove(path)
+                return None
+            embedding_vector = content['embedding_vector']
+            if isinstance(embedding_vector, str):
+                embedding_vector = base64.b64decode(embedding_vector)
+            return content['expires_at'], GatewayTextEmbeddingResponse(
+                embedding_vector=embedding_vector,
+                tokens_count=content['tokens_count'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            Telemetry.get_logger(__name__).warning(f'The cached embedding vector {path} could not be read: {str(e)}')
+            return None
+
+    def __write_file(self, key: str, expires_at: float, response: GatewayTextEmbeddingResponse):
+        path = self.__get_file_path(key)
+        try:
+            # Write to a temporary file first so that concurrent readers never see a partial file.
+            temporary_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                json.dump({
+                    'expires_at': expires_at,
+                    # The float32 values are written as base64 rather than as a list of numbers.
+                    'embedding_vector': base64.b64encode(response.embedding_vector.tobytes()).decode('ascii'),
+                    'tokens_count': response.tokens_count
+                }, file)
+            os.replace(temporary_path, path)
+        except Exception as e:
+            Telemetry.get_logger(__name__).warning(f'The embedding vector could not be cached in {path}: {str(e)}')
@@ -1,16 +1,54 @@
+import asyncio
 import os
+from http.cookiejar import DefaultCookiePolicy
+import threading
 import requests
 import aiohttp
-from foundationallm.config import Configuration, UserIdentity
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from foundationallm.config import Configuration, UserIdentity, read_settings
 from foundationallm.models.authentication import AuthenticationTypes, AuthenticationParametersKeys
 from foundationallm.models.resource_providers.configuration import APIEndpointConfiguration
+from foundationallm.resilience import CircuitBreakerRegistry, RetryContext, RetryExecutor, RetryStrategyRegistry
+from foundationallm.telemetry import Telemetry
+
+HTTP_CLIENT_CONFIGURATION_NAMESPACE = 'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:HttpClient'
+HTTP_CLIENT_MAX_CONNECTIONS = f'{HTTP_CLIENT_CONFIGURATION_NAMESPACE}:MaxConnections'
+HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST = f'{HTTP_CLIENT_CONFIGURATION_NAMESPACE}:MaxConnectionsPerHost'
+HTTP_CLIENT_KEEP_ALIVE_SECONDS = f'{HTTP_CLIENT_CONFIGURATION_NAMESPACE}:KeepAliveSeconds'
+HTTP_CLIENT_DNS_CACHE_SECONDS = f'{HTTP_CLIENT_CONFIGURATION_NAMESPACE}:DnsCacheSeconds'
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 20
+DEFAULT_KEEP_ALIVE_SECONDS = 30.0
+DEFAULT_DNS_CACHE_SECONDS = 300
 
 class HttpClientService:
     """
     Class for creating an HTTP client session based on an API endpoint configuration.
+
+    The sessions are long-lived and shared by all the instances of the class that target
+    the same base URL, so requests reuse pooled keep-alive connections. Asynchronous
+    sessions are bound to an event loop and are shared per base URL and event loop.
+    The sessions keep no cookies, so cookies set for one user are never sent on behalf of another.
+    Call close_sessions_async() when the application shuts down.
+
+    Transient failures are retried with the retry strategy of the API endpoint; POST requests
+    are only retried when they were not processed, unless the caller marks them idempotent. The
+    timeouts of the calls are capped to the deadline of the current operation. Each attempt
+    goes through the circuit breaker of the base URL and fails fast while it is open.
     """
+    # The connection settings shared by all the sessions.
+    __settings: Dict[str, float] = None
+    __sessions: Dict[str, requests.Session] = {}
+    __async_sessions: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+    __lock = threading.Lock()
+
     def __init__(self, api_endpoint_configuration: APIEndpointConfiguration, user_identity: UserIdentity, config: Configuration):
         self.config = config
+        if HttpClientService.__settings is None:
+            HttpClientService.configure(config)
         self.user_identity = user_identity
         self.api_endpoint_configuration = api_endpoint_configuration
         self.base_url = self.api_endpoint_configuration.url.rstrip('/')
@@ -41,45 +79,131 @@ class HttpClientService:
                 break
 
         self.headers = headers
+        self.retry_executor = RetryExecutor(
+            RetryStrategyRegistry.get_strategy(self.api_endpoint_configuration.retry_strategy_name),
+            target=self.base_url)
+        self.circuit_breaker = CircuitBreakerRegistry.get_breaker(self.base_url)
+
+    @staticmethod
+    def configure(config: Configuration):
+        """
+        Reads the connection settings shared by all the sessions.
+        Settings that are missing or invalid fall back to their default values.
+        Sessions created before the call keep their settings.
+
+        Parameters
+        ----------
+        config : Configuration
+            The application configuration.
+        """
+        HttpClientService.__settings = read_settings(config, [
+            (HTTP_CLIENT_MAX_CONNECTIONS, int, DEFAULT_MAX_CONNECTIONS),
+            (HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST, int, DEFAULT_MAX_CONNECTIONS_PER_HOST),
+            (HTTP_CLIENT_KEEP_ALIVE_SECONDS, float, DEFAULT_KEEP_ALIVE_SECONDS),
+            (HTTP_CLIENT_DNS_CACHE_SECONDS, int, DEFAULT_DNS_CACHE_SECONDS)], Telemetry.get_logger(__name__))
+
+    @staticmethod
+    async def close_sessions_async():
+        """
+        Closes all the shared sessions.
+        """
+        with HttpClientService.__lock:
+            sessions = list(HttpClientService.__sessions.values())
+            async_sessions = list(HttpClientService.__async_sessions.values())
+            HttpClientService.__sessions.clear()
+            HttpClientService.__async_sessions.clear()
+
+        for session in sessions:
+            session.close()
+        current_loop = asyncio.get_running_loop()
+        for loop, session in async_sessions:
+            # Sessions bound to other event loops can only be closed by their own loop.
+            if loop is current_loop:
+                await session.close()
 
     def get(self, endpoint: str):
         """
         Execute a synchronous GET request.
         """
-        with requests.Session() as session:
-            session.headers.update(self.headers)
-            url = self.base_url + endpoint
-            response = session.get(url, timeout=self.time_out, verify=self.verify_certs)
+        url = self.base_url + endpoint
+        def get():
+            response = self.__get_session().get(url, headers=self.headers, timeout=RetryContext.get_timeout_seconds(self.time_out), verify=self.verify_certs)
             response.raise_for_status()
             return response.json()
+        return self.retry_executor.execute(lambda: self.circuit_breaker.execute(get))
 
-    def post(self, endpoint: str, data = None):
+    def post(self, endpoint: str, data = None, idempotent: bool = False):
         """
         Execute a synchronous POST request.
+        Unless the request is idempotent, it is only retried when it was not processed by the endpoint.
         """        
-        with requests.Session() as session:
-            session.headers.update(self.headers)
-            url = self.base_url + endpoint            
-            response = session.post(url, data=data, timeout=self.time_out, verify=self.verify_certs)            
+        url = self.base_url + endpoint            
+        def post():
+            response = self.__get_session().post(url, data=data, headers=self.headers, timeout=RetryContext.get_timeout_seconds(self.time_out), verify=self.verify_certs)            
             response.raise_for_status()
             return response.json()
+        return self.retry_executor.execute(lambda: self.circuit_breaker.execute(post), idempotent)
 
     async def get_async(self, endpoint: str):
         """
         Execute an asynchronous GET request.
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            url = self.base_url + endpoint
-            async with session.get(url, timeout=self.time_out, ssl=self.verify_certs) as response:
+        url = self.base_url + endpoint
+        async def get_async():
+            async with self.__get_async_session().get(url, headers=self.headers, timeout=aiohttp.ClientTimeout(total=RetryContext.get_timeout_seconds(self.time_out)), ssl=self.verify_certs) as response:
                 response.raise_for_status()
                 return await response.json()
+        return await self.retry_executor.execute_async(lambda: self.circuit_breaker.execute_async(get_async))
 
-    async def post_async(self, endpoint: str, data = None):
+    async def post_async(self, endpoint: str, data = None, idempotent: bool = False):
         """
         Execute an asynchronous POST request.
+        Unless the request is idempotent, it is only retried when it was not processed by the endpoint.
         """
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            url = self.base_url + endpoint
-            async with session.post(url, data=data, timeout=self.time_out, ssl=self.verify_certs) as response:
+        url = self.base_url + endpoint
+        async def post_async():
+            async with self.__get_async_session().post(url, data=data, headers=self.headers, timeout=aiohttp.ClientTimeout(total=RetryContext.get_timeout_seconds(self.time_out)), ssl=self.verify_certs) as response:
                 response.raise_for_status()
                 return await response.json()
+        return await self.retry_executor.execute_async(lambda: self.circuit_breaker.execute_async(post_async), idempotent)
+
+    def __get_session_key(self) -> str:
+        url = urlsplit(self.base_url)
+        return f'{url.scheme}://{url.netloc}'
+
+    def __get_session(self) -> requests.Session:
+        key = self.__get_session_key()
+        with HttpClientService.__lock:
+            session = HttpClientService.__sessions.get(key)
+            if session is None:
+                settings = HttpClientService.__settings
+                session = requests.Session()
+                # The session is shared by all users; the cookies set by the endpoint are discarded.
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_maxsize=settings[HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST])
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                HttpClientService.__sessions[key] = session
+            return session
+
+    def __get_async_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        key = (self.__get_session_key(), id(loop))
+        with HttpClientService.__lock:
+            entry = HttpClientService.__async_sessions.get(key)
+            if entry is None or entry[0] is not loop or entry[1].closed:
+                # Drop the sessions of event loops that were closed, such as the loops of asyncio.run().
+                for stale_key in [k for k, (l, _) in HttpClientService.__async_sessions.items() if l.is_closed()]:
+                    del HttpClientService.__async_sessions[stale_key]
+                settings = HttpClientService.__settings
+                session = aiohttp.ClientSession(
+                    # The session is shared by all users; the cookies set by the endpoint are discarded.
+                    cookie_jar=aiohttp.DummyCookieJar(),
+                    connector=aiohttp.TCPConnector(
+                        limit=settings[HTTP_CLIENT_MAX_CONNECTIONS],
+                        limit_per_host=settings[HTTP_CLIENT_MAX_CONNECTIONS_PER_HOST],
+                        keepalive_timeout=settings[HTTP_CLIENT_KEEP_ALIVE_SECONDS],
+                        ttl_dns_cache=settings[HTTP_CLIENT_DNS_CACHE_SECONDS]))
+                entry = (loop, session)
+                HttpClientService.__async_sessions[key] = entry
+            return entry[1]
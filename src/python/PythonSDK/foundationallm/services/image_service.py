@@ -20,7 +20,8 @@ class ImageService:
         config : Configuration
             Application configuration class for retrieving configuration settings.
         client : Union[AzureOpenAI, AsyncAzureOpenAI]
-            The Azure OpenAI client to use for image analysis.
+            The Azure OpenAI client to use for image analysis. The clients created by the LanguageModelFactory
+            hold the requests until the tokens-per-minute rate limit of the deployment allows them.
         deployment_model : str
             The deployment model to use for the Azure OpenAI client.
         image_generator_tool_description : str
@@ -93,14 +93,19 @@ class OpenAIAssistantsApiService:
 
         # Create and execute the run
         run = None
-        async with self.client.beta.threads.runs.stream(
-            thread_id = request.thread_id,
-            assistant_id = request.assistant_id,
-            event_handler = OpenAIAssistantAsyncEventHandler(self.client, self.operations_manager, request, image_service),
-            additional_instructions = "If you generate an image, return the image inline using markdown, along with a detailed description of it.\n\nIMPORTANT: Never display the image more than once in your response!"
-        ) as stream:
-            await stream.until_done()
-            run = await stream.get_final_run()
+        event_handler = OpenAIAssistantAsyncEventHandler(self.client, self.operations_manager, request, image_service)
+        try:
+            async with self.client.beta.threads.runs.stream(
+                thread_id = request.thread_id,
+                assistant_id = request.assistant_id,
+                event_handler = event_handler,
+                additional_instructions = "If you generate an image, return the image inline using markdown, along with a detailed description of it.\n\nIMPORTANT: Never display the image more than once in your response!"
+            ) as stream:
+                await stream.until_done()
+                run = await stream.get_final_run()
+        finally:
+            # Write the final interim state before the completion result is written.
+            await event_handler.flush_async()
 
         #if run.status != "completed":
         #    run = await self.client.beta.threads.runs.retrieve(run_id = run.id, thread_id = request.thread_id)
@@ -3,7 +3,7 @@ import fnmatch
 import os
 from azure.storage.blob import BlobServiceClient
 from foundationallm.storage import StorageManagerBase
-from azure.identity import DefaultAzureCredential
+from foundationallm.authentication import AzureCredentialManager
 
 class BlobStorageManager(StorageManagerBase):
     """
@@ -25,18 +25,7 @@ class BlobStorageManager(StorageManagerBase):
             if account_name is None or account_name == '':
                 raise ValueError('The account_name parameter must be set to a valid account name.')
 
-            credential = \
-                DefaultAzureCredential(
-                    exclude_workload_identity_credentials=True,
-                    exclude_developer_cli_credential=False,
-                    exclude_cli_credential=False,
-                    exclude_environment_credential=True,
-                    exclude_managed_identity_credential=True,
-                    exclude_powershell_credential=True,
-                    exclude_visual_studio_code_credential=True,
-                    exclude_shared_token_cache_credentials=True,
-                    exclude_interactive_browser_credential=True) if os.getenv('FOUNDATIONALLM_CONTEXT', 'NONE') == 'DEBUG' \
-                else DefaultAzureCredential(exclude_environment_credential=True)
+            credential = AzureCredentialManager.get_developer_credential()
             
             blob_service_client = BlobServiceClient(account_url=f"https://{account_name}.blob.core.windows.net", credential=credential)
         else:
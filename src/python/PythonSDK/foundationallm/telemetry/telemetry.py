@@ -3,7 +3,8 @@ import platform
 import foundationallm
 
 from azure.monitor.opentelemetry import configure_azure_monitor
-from opentelemetry import trace
+from opentelemetry import metrics, trace
+from opentelemetry.metrics import Meter
 from opentelemetry.sdk.resources import SERVICE_NAME, Resource, SERVICE_INSTANCE_ID, SERVICE_VERSION, SERVICE_NAMESPACE
 from opentelemetry.trace import Span, Status, StatusCode, Tracer
 from foundationallm.config import Configuration
@@ -56,7 +57,7 @@ class Telemetry:
         configure_azure_monitor(
             connection_string=Telemetry.telemetry_connection_string,
             disable_offline_storage=True,
-            disable_metrics=True,
+            disable_metrics=False,
             disable_tracing=False,
             disable_logging=False,
             resource=resource
@@ -103,6 +104,23 @@ class Telemetry:
         """
         return trace.get_tracer(name)
 
+    @staticmethod
+    def get_meter(name: str) -> Meter:
+        """
+        Creates an OpenTelemetry meter with the specified name.
+
+        Parameters
+        ----------
+        name : str
+            The name to assign to the meter.
+
+        Returns
+        -------
+        Meter
+            Returns an OpenTelemetry meter for creating metric instruments.
+        """
+        return metrics.get_meter(name)
+
     @staticmethod
     def record_exception(span: Span, ex: Exception):
         """
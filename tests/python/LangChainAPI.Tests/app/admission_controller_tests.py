@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from app.admission_controller import AdmissionController, AdmissionRejectedException
+from foundationallm.langchain.orchestration import CompletionScheduler
+
+@pytest.fixture
+def test_admission_controller():
+    return AdmissionController(CompletionScheduler(max_concurrency=1), max_queue_size=1, retry_after_seconds=7)
+
+class AdmissionControllerTests:
+    """
+    AdmissionControllerTests is responsible for testing the admission of completion requests.
+    """
+
+    def test_admit_rejects_with_429_when_at_capacity(self, test_admission_controller):
+        test_admission_controller.admit('instance', 'user1')
+        test_admission_controller.admit('instance', 'user2')
+
+        with pytest.raises(AdmissionRejectedException) as e:
+            test_admission_controller.admit('instance', 'user3')
+
+        assert e.value.status_code == 429
+        assert e.value.retry_after_seconds == 7
+        assert test_admission_controller.queued == 2
+
+    def test_admit_rejects_with_503_after_close(self, test_admission_controller):
+        test_admission_controller.close()
+
+        with pytest.raises(AdmissionRejectedException) as e:
+            test_admission_controller.admit('instance', 'user1')
+
+        assert e.value.status_code == 503
+        assert e.value.retry_after_seconds == 7
+        assert test_admission_controller.queued == 0
+
+    def test_release_frees_the_queue_slot(self, test_admission_controller):
+        ticket = test_admission_controller.admit('instance', 'user1')
+        test_admission_controller.admit('instance', 'user2')
+
+        test_admission_controller.release(ticket)
+        test_admission_controller.release(ticket)
+
+        assert test_admission_controller.queued == 1
+        test_admission_controller.admit('instance', 'user3')
+
+    def test_run_moves_the_request_from_the_queue_to_in_flight(self, test_admission_controller):
+        async def run():
+            ticket = test_admission_controller.admit('instance', 'user1')
+            async with test_admission_controller.run(ticket):
+                assert (test_admission_controller.queued, test_admission_controller.in_flight) == (0, 1)
+            assert (test_admission_controller.queued, test_admission_controller.in_flight) == (0, 0)
+
+        asyncio.run(run())
+
+    def test_closed_controller_still_runs_admitted_requests(self, test_admission_controller):
+        async def run():
+            ticket = test_admission_controller.admit('instance', 'user1')
+            test_admission_controller.close()
+            async with test_admission_controller.run(ticket):
+                assert test_admission_controller.in_flight == 1
+
+        asyncio.run(run())
@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from app.admission_controller import AdmissionRejectedException
+from app.background_task_manager import BackgroundTaskManager
+from foundationallm.models.operations import OperationStatus
+
+class FakeOperationsManager:
+    """
+    Replaces the OperationsManager, recording the State API calls.
+    """
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.calls = []
+
+    async def set_operation_result_async(self, operation_id, instance_id, completion_response):
+        if self.error is not None:
+            raise self.error
+        self.calls.append(('result', operation_id, completion_response.is_error))
+
+    async def update_operation_async(self, operation_id, instance_id, status, status_message, user_identity):
+        if self.error is not None:
+            raise self.error
+        self.calls.append(('status', operation_id, status))
+
+class BackgroundTaskManagerTests:
+    """
+    BackgroundTaskManagerTests is responsible for testing the draining of the LangChainAPI background tasks.
+    """
+
+    def test_drain_waits_for_tasks_that_finish_in_time(self):
+        async def run():
+            manager = BackgroundTaskManager(drain_timeout_seconds=1)
+            operations_manager = FakeOperationsManager()
+            finished = []
+
+            async def work():
+                await asyncio.sleep(0.01)
+                finished.append(True)
+
+            manager.start(work(), operation_id='operation', instance_id='instance', operations_manager=operations_manager)
+            assert manager.pending == 1
+            await manager.drain_async()
+            return manager, operations_manager, finished
+
+        manager, operations_manager, finished = asyncio.run(run())
+        assert finished == [True]
+        assert manager.pending == 0
+        assert operations_manager.calls == []
+
+    def test_drain_cancels_late_tasks_and_fails_their_operations(self):
+        async def run():
+            manager = BackgroundTaskManager(drain_timeout_seconds=0.01)
+            operations_manager = FakeOperationsManager()
+            cancelled = []
+
+            async def work():
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+
+            manager.start(work(), operation_id='operation', instance_id='instance', operations_manager=operations_manager)
+            # Tasks without an operation are cancelled without State API calls.
+            manager.start(work())
+            await manager.drain_async()
+            return manager, operations_manager, cancelled
+
+        manager, operations_manager, cancelled = asyncio.run(run())
+        assert cancelled == [True, True]
+        assert manager.pending == 0
+        assert sorted(operations_manager.calls) == [
+            ('result', 'operation', True),
+            ('status', 'operation', OperationStatus.FAILED)
+        ]
+
+    def test_start_is_refused_with_503_once_draining(self):
+        async def run():
+            manager = BackgroundTaskManager()
+            manager.begin_drain()
+            started = []
+
+            async def work():
+                started.append(True)
+
+            coroutine = work()
+            with pytest.raises(AdmissionRejectedException) as exception:
+                manager.start(coroutine)
+            return manager, coroutine, started, exception.value
+
+        manager, coroutine, started, exception = asyncio.run(run())
+        assert exception.status_code == 503
+        assert manager.pending == 0
+        assert started == []
+        # The refused coroutine is closed, so it is never reported as not awaited.
+        assert coroutine.cr_frame is None
+
+    def test_drain_logs_operations_that_cannot_be_marked_as_failed(self):
+        async def run():
+            manager = BackgroundTaskManager(drain_timeout_seconds=0)
+            failing_operations_manager = FakeOperationsManager(error=Exception('The State API is not available.'))
+            operations_manager = FakeOperationsManager()
+
+            manager.start(asyncio.sleep(10), operation_id='operation1', instance_id='instance', operations_manager=failing_operations_manager)
+            manager.start(asyncio.sleep(10), operation_id='operation2', instance_id='instance', operations_manager=operations_manager)
+            await manager.drain_async()
+            return operations_manager
+
+        operations_manager = asyncio.run(run())
+        assert sorted(operations_manager.calls) == [
+            ('result', 'operation2', True),
+            ('status', 'operation2', OperationStatus.FAILED)
+        ]
@@ -0,0 +1,264 @@
+import asyncio
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.admission_controller import AdmissionController
+from app.dependencies import validate_api_key_header
+from app.lifespan_manager import (
+    get_admission_controller,
+    get_background_task_manager,
+    get_config,
+    get_http_client_session,
+    get_operations_outbox,
+    get_plugin_manager
+)
+from app.routers import completions
+from foundationallm.langchain.orchestration import CompletionScheduler, OrchestrationManager
+from foundationallm.models.operations import OperationStatus
+from foundationallm.models.orchestration import CompletionPriorityClasses, CompletionResponse
+
+USER_IDENTITY = json.dumps({'name': 'User', 'user_name': 'user', 'upn': 'user@contoso.com'})
+
+COMPLETION_REQUEST = {
+    'operation_id': 'operation',
+    'user_prompt': 'Hello',
+    'agent': {'name': 'agent', 'type': 'knowledge-management'}
+}
+
+class FakeOrchestrationManager:
+    """
+    Replaces the OrchestrationManager, streaming the words of a fixed answer.
+    Batches are executed by the OrchestrationManager, with the fake acting as the agent.
+    """
+    answer = ['Hello', ' there']
+    error: Exception = None
+    instances = []
+    # The scheduler whose batch slots are recorded when each completion request starts.
+    scheduler: CompletionScheduler = None
+    batch_slots = []
+
+    def __init__(self, **kwargs):
+        self.config = kwargs['configuration']
+        self.operations_manager = kwargs['operations_manager']
+        self.agent = self
+        FakeOrchestrationManager.instances.append(self)
+
+    invoke_batch_async = OrchestrationManager.invoke_batch_async
+
+    async def invoke_async(self, completion_request):
+        if FakeOrchestrationManager.scheduler is not None:
+            FakeOrchestrationManager.batch_slots.append(
+                FakeOrchestrationManager.scheduler.running_by_class[CompletionPriorityClasses.BATCH])
+            await asyncio.sleep(0)
+        if FakeOrchestrationManager.error is not None:
+            raise FakeOrchestrationManager.error
+        return self.get_response(completion_request)
+
+    async def stream_async(self, completion_request):
+        for token in FakeOrchestrationManager.answer:
+            yield token
+        if FakeOrchestrationManager.error is not None:
+            raise FakeOrchestrationManager.error
+        yield self.get_response(completion_request)
+
+    def get_response(self, completion_request):
+        return CompletionResponse(
+            operation_id = completion_request.operation_id,
+            user_prompt = completion_request.user_prompt,
+            content = [{'type': 'text', 'value': ''.join(FakeOrchestrationManager.answer)}])
+
+class FakeOperationsManager:
+    """
+    Replaces the OperationsManager, recording the State API calls.
+    """
+    calls = []
+
+    def __init__(self, *args):
+        pass
+
+    async def create_operation_async(self, operation_id, instance_id, user_identity):
+        FakeOperationsManager.calls.append(('create', operation_id))
+
+    async def set_operation_result_async(self, operation_id, instance_id, completion_response):
+        FakeOperationsManager.calls.append(('result', completion_response.content[0].value))
+
+    async def update_operation_async(self, operation_id, instance_id, status, status_message, user_identity):
+        FakeOperationsManager.calls.append(('status', status))
+
+class FakeBackgroundTaskManager:
+    """
+    Replaces the BackgroundTaskManager, keeping the coroutines instead of starting them.
+    """
+    def __init__(self):
+        self.coroutines = []
+
+    def start(self, coroutine, **kwargs):
+        self.coroutines.append(coroutine)
+
+def parse_server_sent_events(body: str) -> list:
+    """
+    Returns the (event, data) pairs of a text/event-stream body.
+    """
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+@pytest.fixture
+def test_admission_controller():
+    return AdmissionController(CompletionScheduler(max_concurrency=1), max_queue_size=1, retry_after_seconds=7)
+
+@pytest.fixture
+def test_background_task_manager():
+    return FakeBackgroundTaskManager()
+
+@pytest.fixture
+def test_client(test_admission_controller, test_background_task_manager, monkeypatch):
+    FakeOrchestrationManager.error = None
+    FakeOrchestrationManager.instances = []
+    FakeOrchestrationManager.scheduler = None
+    FakeOrchestrationManager.batch_slots = []
+    FakeOperationsManager.calls = []
+    monkeypatch.setattr(completions, 'OrchestrationManager', FakeOrchestrationManager)
+    monkeypatch.setattr(completions, 'OperationsManager', FakeOperationsManager)
+
+    app = FastAPI()
+    app.include_router(completions.router)
+    app.dependency_overrides[validate_api_key_header] = lambda: True
+    app.dependency_overrides[get_config] = lambda: None
+    app.dependency_overrides[get_plugin_manager] = lambda: None
+    app.dependency_overrides[get_admission_controller] = lambda: test_admission_controller
+    app.dependency_overrides[get_background_task_manager] = lambda: test_background_task_manager
+    app.dependency_overrides[get_http_client_session] = lambda: None
+    app.dependency_overrides[get_operations_outbox] = lambda: None
+    return TestClient(app)
+
+class CompletionsTests:
+    """
+    CompletionsTests is responsible for testing the completion endpoints of the LangChainAPI.
+    """
+
+    def test_stream_sends_token_events_then_the_completion(self, test_client, test_admission_controller):
+        response = test_client.post(
+            '/instances/instance/completions/stream',
+            json = COMPLETION_REQUEST,
+            headers = {'X-USER-IDENTITY': USER_IDENTITY})
+
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/event-stream')
+        events = parse_server_sent_events(response.text)
+        assert events[:2] == [('token', {'value': 'Hello'}), ('token', {'value': ' there'})]
+        assert events[2][0] == 'completion'
+        assert events[2][1]['operation_id'] == 'operation'
+        assert events[2][1]['content'][0]['value'] == 'Hello there'
+        # Streamed completions do not use the State API.
+        assert FakeOrchestrationManager.instances[0].operations_manager is None
+        assert (test_admission_controller.queued, test_admission_controller.in_flight) == (0, 0)
+
+    def test_stream_ends_with_an_error_event_when_the_completion_fails(self, test_client, test_admission_controller):
+        FakeOrchestrationManager.error = Exception('The model is not available.')
+
+        response = test_client.post(
+            '/instances/instance/completions/stream',
+            json = COMPLETION_REQUEST,
+            headers = {'X-USER-IDENTITY': USER_IDENTITY})
+
+        assert response.status_code == 200
+        events = parse_server_sent_events(response.text)
+        assert [event for event, _ in events] == ['token', 'token', 'error']
+        assert events[2][1] == {'errors': ['The model is not available.']}
+        assert (test_admission_controller.queued, test_admission_controller.in_flight) == (0, 0)
+
+    def test_stream_is_rejected_with_429_when_at_capacity(self, test_client, test_admission_controller):
+        test_admission_controller.admit('instance', 'user1')
+        test_admission_controller.admit('instance', 'user2')
+
+        response = test_client.post(
+            '/instances/instance/completions/stream',
+            json = COMPLETION_REQUEST,
+            headers = {'X-USER-IDENTITY': USER_IDENTITY})
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '7'
+        assert len(FakeOrchestrationManager.instances) == 0
+
+    def test_completion_is_returned_without_state_api_calls(self, test_client, test_admission_controller, test_background_task_manager):
+        response = test_client.post(
+            '/instances/instance/completions',
+            json = COMPLETION_REQUEST,
+            headers = {'X-USER-IDENTITY': USER_IDENTITY})
+
+        assert response.status_code == 200
+        assert response.json()['content'][0]['value'] == 'Hello there'
+        assert FakeOrchestrationManager.instances[0].operations_manager is None
+        assert FakeOperationsManager.calls == []
+        assert test_background_task_manager.coroutines == []
+        assert (test_admission_controller.queued, test_admission_controller.in_flight) == (0, 0)
+
+    def test_completion_is_persisted_in_the_background_when_requested(self, test_client, test_background_task_manager):
+        response = test_client.post(
+            '/instances/instance/completions?persist_result=true',
+            json = COMPLETION_REQUEST,
+            headers = {'X-USER-IDENTITY': USER_IDENTITY})
+
+        assert response.status_code == 200
+        # The result is only persisted once the background task runs.
+        assert FakeOperationsManager.calls == []
+        assert len(test_background_task_manager.coroutines) == 1
+
+        asyncio.run(test_background_task_manager.coroutines[0])
+        assert FakeOperationsManager.calls[0] == ('create', 'operation')
+        assert sorted(FakeOperationsManager.calls[1:]) == [('result', 'Hello there'), ('status', OperationStatus.COMPLETED)]
+
+    def test_completion_failure_returns_500(self, test_client, test_admission_controller):
+        FakeOrchestrationManager.error = Exception('The model is not available.')
+
+        response = test_client.post(
+            '/instances/instance/completions',
+            json = COMPLETION_REQUEST,
+            headers = {'X-USER-IDENTITY': USER_IDENTITY})
+
+        assert response.status_code == 500
+        assert response.json()['detail'] == 'The model is not available.'
+        assert (test_admission_controller.queued, test_admission_controller.in_flight) == (0, 0)
+
+    def test_completion_is_rejected_with_429_when_at_capacity(self, test_client, test_admission_controller):
+        test_admission_controller.admit('instance', 'user1')
+        test_admission_controller.admit('instance', 'user2')
+
+        response = test_client.post(
+            '/instances/instance/completions',
+            json = COMPLETION_REQUEST,
+            headers = {'X-USER-IDENTITY': USER_IDENTITY})
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '7'
+        assert len(FakeOrchestrationManager.instances) == 0
+
+    def test_batch_requests_each_hold_a_batch_slot(self, test_client):
+        # Four slots leave two to batch requests.
+        admission_controller = AdmissionController(CompletionScheduler(max_concurrency=4), max_queue_size=1)
+        test_client.app.dependency_overrides[get_admission_controller] = lambda: admission_controller
+        FakeOrchestrationManager.scheduler = admission_controller.scheduler
+
+        response = test_client.post(
+            '/instances/instance/batch-completions',
+            json = {
+                'operation_id': 'batch',
+                'agent': COMPLETION_REQUEST['agent'],
+                'items': [{'operation_id': f'operation{index}', 'user_prompt': 'Hello'} for index in range(5)]
+            },
+            headers = {'X-USER-IDENTITY': USER_IDENTITY})
+
+        assert response.status_code == 200
+        assert response.json()['completed_count'] == 5
+        assert [item['operation_id'] for item in response.json()['items']] == [f'operation{index}' for index in range(5)]
+        # The agent is set up once for the batch.
+        assert len(FakeOrchestrationManager.instances) == 1
+        assert len(FakeOrchestrationManager.batch_slots) == 5
+        assert min(FakeOrchestrationManager.batch_slots) >= 1
+        assert max(FakeOrchestrationManager.batch_slots) == 2
+        assert admission_controller.scheduler.running == 0
+        assert (admission_controller.queued, admission_controller.in_flight) == (0, 0)
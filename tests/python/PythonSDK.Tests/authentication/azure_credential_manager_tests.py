@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+import pytest
+from azure.core.credentials import AccessToken
+from foundationallm.authentication import azure_credential_manager
+from foundationallm.authentication.azure_credential_manager import (
+    AsyncCachingTokenCredential,
+    AzureCredentialManager,
+    CachingTokenCredential
+)
+
+SCOPE = 'https://search.azure.com/.default'
+
+class FakeCredential:
+    """
+    Issues numbered tokens valid for the configured lifetime, recording the requests.
+    """
+    def __init__(self, lifetime_seconds: float = 3600, **kwargs):
+        self.lifetime_seconds = lifetime_seconds
+        self.kwargs = kwargs
+        self.requests = []
+        self.release = None
+
+    def get_token(self, *scopes, claims=None, tenant_id=None, **kwargs):
+        if self.release is not None:
+            self.release.wait(5)
+        self.requests.append((scopes, claims, tenant_id))
+        return AccessToken(f'token{len(self.requests)}', int(time.time() + self.lifetime_seconds))
+
+@pytest.fixture
+def test_credential_manager(monkeypatch):
+    """
+    Clears the shared credentials and replaces DefaultAzureCredential, returning the created credentials.
+    """
+    created = []
+
+    def create_credential(**kwargs):
+        credential = FakeCredential(**kwargs)
+        created.append(credential)
+        return credential
+
+    monkeypatch.setattr(azure_credential_manager, 'DefaultAzureCredential', create_credential)
+    monkeypatch.setattr(AzureCredentialManager, '_AzureCredentialManager__credentials', {})
+    monkeypatch.setattr(AzureCredentialManager, '_AzureCredentialManager__async_credentials', {})
+    return created
+
+class AzureCredentialManagerTests:
+    """
+    AzureCredentialManagerTests is responsible for testing the shared Azure credentials and their token cache.
+    """
+
+    def test_tokens_are_cached_per_scope_and_tenant(self):
+        fake_credential = FakeCredential()
+        credential = CachingTokenCredential(fake_credential)
+
+        first = credential.get_token(SCOPE)
+        assert credential.get_token(SCOPE) is first
+        credential.get_token('https://cognitiveservices.azure.com/.default')
+        credential.get_token(SCOPE, tenant_id='tenant')
+
+        assert len(fake_credential.requests) == 3
+        assert credential.is_cached(SCOPE)
+        assert credential.is_cached(SCOPE, tenant_id='tenant')
+
+    def test_tokens_are_refreshed_within_the_refresh_margin(self):
+        fake_credential = FakeCredential(lifetime_seconds=60)
+        credential = CachingTokenCredential(fake_credential, refresh_margin_seconds=300)
+
+        assert credential.get_token(SCOPE).token == 'token1'
+        assert credential.get_token(SCOPE).token == 'token2'
+        assert not credential.is_cached(SCOPE)
+
+    def test_tokens_requested_with_claims_are_not_cached(self):
+        fake_credential = FakeCredential()
+        credential = CachingTokenCredential(fake_credential)
+        credential.get_token(SCOPE)
+
+        assert credential.get_token(SCOPE, claims='{"access_token": {}}').token == 'token2'
+        assert credential.get_token(SCOPE).token == 'token1'
+
+    def test_callers_keep_the_unexpired_token_while_it_is_refreshed(self):
+        fake_credential = FakeCredential(lifetime_seconds=60)
+        credential = CachingTokenCredential(fake_credential, refresh_margin_seconds=300)
+        credential.get_token(SCOPE)
+
+        # The second token request blocks until released.
+        fake_credential.release = threading.Event()
+        refresh = threading.Thread(target=credential.get_token, args=(SCOPE,))
+        refresh.start()
+        while not credential._CachingTokenCredential__locks[((SCOPE,), None)].locked():
+            time.sleep(0.001)
+
+        assert credential.get_token(SCOPE).token == 'token1'
+        fake_credential.release.set()
+        refresh.join()
+        assert [token for token, _ in credential._CachingTokenCredential__tokens.values()] == ['token2']
+
+    def test_async_credential_shares_the_token_cache(self):
+        fake_credential = FakeCredential()
+        credential = CachingTokenCredential(fake_credential)
+        async_credential = AsyncCachingTokenCredential(credential)
+
+        async def get_tokens():
+            return [await async_credential.get_token(SCOPE) for _ in range(3)]
+
+        tokens = asyncio.run(get_tokens())
+
+        assert {token.token for token in tokens} == {'token1'}
+        assert credential.get_token(SCOPE).token == 'token1'
+        assert len(fake_credential.requests) == 1
+
+    def test_credentials_are_shared_per_environment_credential_setting(self, test_credential_manager):
+        credential = AzureCredentialManager.get_credential()
+        assert AzureCredentialManager.get_credential() is credential
+        environment_credential = AzureCredentialManager.get_credential(exclude_environment_credential=False)
+
+        assert environment_credential is not credential
+        assert [created.kwargs for created in test_credential_manager] == [
+            {'exclude_environment_credential': True},
+            {'exclude_environment_credential': False}
+        ]
+
+    def test_async_credentials_wrap_the_shared_credentials(self, test_credential_manager):
+        async_credential = AzureCredentialManager.get_async_credential(exclude_environment_credential=False)
+
+        assert AzureCredentialManager.get_async_credential(exclude_environment_credential=False) is async_credential
+        assert async_credential.credential is AzureCredentialManager.get_credential(exclude_environment_credential=False)
+        assert AzureCredentialManager.get_async_credential() is not async_credential
+
+    def test_bearer_token_provider_uses_the_shared_credential(self, test_credential_manager):
+        token_provider = AzureCredentialManager.get_bearer_token_provider(SCOPE)
+
+        assert token_provider() == 'token1'
+        assert token_provider() == 'token1'
+        assert AzureCredentialManager.get_token(SCOPE).token == 'token1'
+        assert len(test_credential_manager) == 1
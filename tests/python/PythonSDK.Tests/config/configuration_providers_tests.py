@@ -0,0 +1,176 @@
+import json
+import os
+import pytest
+import yaml
+from foundationallm.config import (
+    AppConfigurationProvider,
+    Configuration,
+    ConfigurationProvider,
+    ConfigurationSnapshot,
+    FileConfigurationProvider
+)
+from foundationallm.config import configuration_providers
+
+SETTINGS = {
+    'FoundationaLLM:Test:Setting': 'Value',
+    'FoundationaLLM:Test:OtherSetting': '42'
+}
+
+class FakeAzureAppConfiguration:
+    """
+    Replaces the settings loaded from Azure App Configuration.
+    """
+    def __init__(self, values: dict, on_refresh_success = None):
+        self.values = values
+        self.on_refresh_success = on_refresh_success
+        self.changed = False
+        self.refreshes = 0
+
+    def items(self):
+        return self.values.items()
+
+    def refresh(self):
+        self.refreshes += 1
+        if self.changed and self.on_refresh_success is not None:
+            self.on_refresh_success()
+
+class ConfigurationSnapshotProvider(ConfigurationProvider):
+    """
+    Serves fixed configuration settings without reading a file.
+    """
+    def __init__(self, values: dict):
+        self.values = values
+
+    def load(self):
+        return ConfigurationSnapshot.from_values(dict(self.values))
+
+    def refresh(self):
+        return None
+
+@pytest.fixture
+def app_configuration(monkeypatch):
+    """
+    Replaces the Azure App Configuration load function, returning the loaded settings and the load options.
+    """
+    loaded = []
+
+    def load(**kwargs):
+        configuration = FakeAzureAppConfiguration(dict(SETTINGS), kwargs.get('on_refresh_success'))
+        loaded.append((configuration, kwargs))
+        return configuration
+
+    monkeypatch.setattr(configuration_providers, 'load', load)
+    monkeypatch.setattr(configuration_providers, 'DefaultAzureCredential', lambda **kwargs: object())
+    return loaded
+
+class ConfigurationProvidersTests:
+    """
+    ConfigurationProvidersTests is responsible for testing the sources of the configuration settings.
+    """
+
+    def test_snapshot_parses_feature_flags(self):
+        snapshot = ConfigurationSnapshot.from_values({
+            'FeatureManagementFeatureFlags': {
+                'Enabled': '{"enabled": true}',
+                'Disabled': '{"enabled": false}',
+                'Invalid': 'not json'
+            }
+        })
+
+        assert snapshot.feature_flags == {'Enabled': True, 'Disabled': False}
+
+    def test_snapshot_parses_feature_flags_serialized_as_a_string(self):
+        snapshot = ConfigurationSnapshot.from_values({
+            'FeatureManagementFeatureFlags': json.dumps({'Enabled': '{"enabled": true}'})
+        })
+
+        assert snapshot.feature_flags == {'Enabled': True}
+
+    @pytest.mark.parametrize('file_name', ['settings.json', 'settings.yaml', 'settings.yml'])
+    def test_file_provider_loads_json_and_yaml_files(self, tmp_path, file_name):
+        path = tmp_path / file_name
+        with open(path, 'w', encoding='utf-8') as file:
+            if file_name.endswith('.json'):
+                json.dump(SETTINGS, file)
+            else:
+                yaml.safe_dump(SETTINGS, file)
+
+        snapshot = FileConfigurationProvider(str(path)).load()
+
+        assert snapshot.values == SETTINGS
+
+    def test_file_provider_loads_env_files(self, tmp_path):
+        path = tmp_path / '.env'
+        path.write_text(
+            '# Local settings\n'
+            'FoundationaLLM__Test__Setting=Value\n'
+            'export FoundationaLLM__Test__OtherSetting="42"\n'
+            '\n'
+            'not a setting\n',
+            encoding='utf-8')
+
+        snapshot = FileConfigurationProvider(str(path)).load()
+
+        assert snapshot.values == SETTINGS
+
+    def test_file_provider_rejects_unsupported_files(self, tmp_path):
+        unsupported_path = tmp_path / 'settings.txt'
+        unsupported_path.write_text('FoundationaLLM:Test:Setting', encoding='utf-8')
+        list_path = tmp_path / 'settings.json'
+        list_path.write_text('["FoundationaLLM:Test:Setting"]', encoding='utf-8')
+
+        with pytest.raises(ValueError, match='not a JSON, YAML or .env file'):
+            FileConfigurationProvider(str(unsupported_path)).load()
+        with pytest.raises(ValueError, match='must contain a mapping'):
+            FileConfigurationProvider(str(list_path)).load()
+
+    def test_file_provider_refreshes_only_when_the_file_changed(self, tmp_path):
+        path = tmp_path / 'settings.json'
+        path.write_text(json.dumps(SETTINGS), encoding='utf-8')
+        provider = FileConfigurationProvider(str(path))
+        provider.load()
+
+        assert provider.refresh() is None
+
+        path.write_text(json.dumps({'FoundationaLLM:Test:Setting': 'Changed'}), encoding='utf-8')
+        modified_time = os.path.getmtime(path) + 1
+        os.utime(path, (modified_time, modified_time))
+        snapshot = provider.refresh()
+
+        assert snapshot.values == {'FoundationaLLM:Test:Setting': 'Changed'}
+        assert provider.refresh() is None
+
+    @pytest.mark.parametrize('file_name', ['settings.json', 'settings.yaml'])
+    def test_exported_snapshot_is_loaded_by_the_file_provider(self, tmp_path, file_name):
+        path = str(tmp_path / file_name)
+        Configuration(ConfigurationSnapshotProvider(SETTINGS)).export_snapshot(path)
+
+        config = Configuration(FileConfigurationProvider(path))
+
+        assert config.get_value('FoundationaLLM:Test:Setting') == 'Value'
+        assert config.get_value('FoundationaLLM:Test:OtherSetting') == '42'
+
+    def test_app_configuration_provider_reloads_without_a_sentinel_key(self, app_configuration):
+        provider = AppConfigurationProvider('https://appconfig.azconfig.io')
+
+        assert provider.load().values == SETTINGS
+        assert provider.refresh().values == SETTINGS
+        assert len(app_configuration) == 2
+        assert 'refresh_on' not in app_configuration[0][1]
+
+    def test_app_configuration_provider_refreshes_when_the_sentinel_key_changed(self, app_configuration):
+        provider = AppConfigurationProvider('https://appconfig.azconfig.io', sentinel_key='Sentinel', refresh_interval_seconds=30)
+        provider.load()
+        configuration, load_options = app_configuration[0]
+
+        assert load_options['refresh_interval'] == 30
+        assert provider.refresh() is None
+
+        configuration.values['FoundationaLLM:Test:Setting'] = 'Changed'
+        configuration.changed = True
+        snapshot = provider.refresh()
+
+        assert snapshot.values['FoundationaLLM:Test:Setting'] == 'Changed'
+        assert configuration.refreshes == 2
+        # The settings are refreshed in place, not reloaded.
+        assert len(app_configuration) == 1
@@ -0,0 +1,161 @@
+import threading
+import time
+import pytest
+from foundationallm.config import Configuration, ConfigurationProvider, ConfigurationSnapshot
+from foundationallm.config.environment_variables import FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS
+
+class FakeConfigurationProvider(ConfigurationProvider):
+    """
+    Serves the configuration settings set by the test, counting the loads and refreshes.
+    """
+    def __init__(self, values: dict, error: Exception = None):
+        self.values = values
+        self.error = error
+        self.changed = False
+        self.loads = 0
+        self.refreshes = 0
+        self.loaded = threading.Event()
+        self.refreshed = threading.Event()
+
+    def load(self):
+        self.loads += 1
+        if self.error is not None:
+            raise self.error
+        self.loaded.set()
+        return ConfigurationSnapshot.from_values(dict(self.values))
+
+    def refresh(self):
+        self.refreshes += 1
+        try:
+            if self.error is not None:
+                raise self.error
+            if not self.changed:
+                return None
+            self.changed = False
+            return ConfigurationSnapshot.from_values(dict(self.values))
+        finally:
+            self.refreshed.set()
+
+def wait_for(condition, timeout: float = 5):
+    """
+    Waits for a condition set by the refresh thread.
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'The condition was not met in time.'
+        time.sleep(0.005)
+
+@pytest.fixture(autouse=True)
+def test_environment(monkeypatch):
+    monkeypatch.delenv(FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS, raising=False)
+    monkeypatch.delenv('foundationallm-configuration-allow-environment-variables', raising=False)
+
+class ConfigurationSnapshotTests:
+    """
+    ConfigurationSnapshotTests is responsible for testing the in-memory configuration snapshot and its background refresh.
+    """
+
+    def test_values_are_served_from_the_snapshot(self):
+        provider = FakeConfigurationProvider({
+            'FoundationaLLM:Test:Setting': 'Value',
+            'FeatureManagementFeatureFlags': {'Feature': '{"enabled": true}'}
+        })
+        config = Configuration(provider)
+
+        for _ in range(3):
+            assert config.get_value('FoundationaLLM:Test:Setting') == 'Value'
+        assert config.get_feature_flag('Feature') is True
+        assert config.get_feature_flag('MissingFeature') is False
+        with pytest.raises(Exception, match='was not found'):
+            config.get_value('FoundationaLLM:Test:MissingSetting')
+        # The provider is loaded once and not called by the lookups.
+        assert (provider.loads, provider.refreshes) == (1, 0)
+
+    def test_refresh_replaces_the_snapshot_only_when_the_settings_changed(self):
+        provider = FakeConfigurationProvider({'FoundationaLLM:Test:Setting': 'Original'})
+        config = Configuration(provider)
+
+        provider.values['FoundationaLLM:Test:Setting'] = 'Changed'
+        config.refresh()
+        assert config.get_value('FoundationaLLM:Test:Setting') == 'Original'
+
+        provider.changed = True
+        config.refresh()
+        assert config.get_value('FoundationaLLM:Test:Setting') == 'Changed'
+
+    def test_refresh_thread_picks_up_changed_settings(self, monkeypatch):
+        monkeypatch.setenv(FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS, '0.01')
+        provider = FakeConfigurationProvider({'FoundationaLLM:Test:Setting': 'Original'})
+        config = Configuration(provider)
+        try:
+            provider.values['FoundationaLLM:Test:Setting'] = 'Changed'
+            provider.changed = True
+            wait_for(lambda: config.get_value('FoundationaLLM:Test:Setting') == 'Changed')
+        finally:
+            config.close()
+
+    def test_failed_refresh_keeps_serving_the_current_snapshot(self, monkeypatch):
+        monkeypatch.setenv(FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS, '0.01')
+        provider = FakeConfigurationProvider({'FoundationaLLM:Test:Setting': 'Original'})
+        config = Configuration(provider)
+        try:
+            provider.error = Exception('App Configuration is not available.')
+            wait_for(lambda: provider.refreshes >= 2)
+            assert config.get_value('FoundationaLLM:Test:Setting') == 'Original'
+
+            # The next successful refresh is applied.
+            provider.error = None
+            provider.values['FoundationaLLM:Test:Setting'] = 'Changed'
+            provider.changed = True
+            wait_for(lambda: config.get_value('FoundationaLLM:Test:Setting') == 'Changed')
+        finally:
+            config.close()
+
+    def test_close_stops_the_refresh_thread(self, monkeypatch):
+        monkeypatch.setenv(FOUNDATIONALLM_CONFIGURATION_REFRESH_INTERVAL_SECONDS, '0.01')
+        provider = FakeConfigurationProvider({'FoundationaLLM:Test:Setting': 'Original'})
+        config = Configuration(provider)
+        assert provider.refreshed.wait(5)
+
+        config.close()
+        time.sleep(0.05)
+        refreshes = provider.refreshes
+        time.sleep(0.05)
+        assert provider.refreshes == refreshes
+
+    def test_refresh_is_disabled_by_default(self):
+        provider = FakeConfigurationProvider({'FoundationaLLM:Test:Setting': 'Original'})
+        config = Configuration(provider)
+
+        time.sleep(0.05)
+        assert provider.refreshes == 0
+        config.close()
+
+    def test_initial_provider_serves_until_the_provider_is_loaded(self):
+        initial_provider = FakeConfigurationProvider({'FoundationaLLM:Test:Setting': 'Snapshot'})
+        provider = FakeConfigurationProvider({'FoundationaLLM:Test:Setting': 'Loaded'})
+        # Hold the background load until the snapshot has been checked.
+        release = threading.Event()
+        load = provider.load
+        provider.load = lambda: release.wait(5) and load()
+
+        config = Configuration(provider, initial_provider=initial_provider)
+        try:
+            assert config.get_value('FoundationaLLM:Test:Setting') == 'Snapshot'
+            release.set()
+            assert provider.loaded.wait(5)
+            wait_for(lambda: config.get_value('FoundationaLLM:Test:Setting') == 'Loaded')
+        finally:
+            config.close()
+
+    def test_initial_snapshot_is_kept_when_the_provider_fails_to_load(self):
+        initial_provider = FakeConfigurationProvider({'FoundationaLLM:Test:Setting': 'Snapshot'})
+        provider = FakeConfigurationProvider({}, error=Exception('App Configuration is not available.'))
+
+        config = Configuration(provider, initial_provider=initial_provider)
+        try:
+            wait_for(lambda: provider.loads == 1)
+            time.sleep(0.01)
+            assert config.get_value('FoundationaLLM:Test:Setting') == 'Snapshot'
+        finally:
+            config.close()
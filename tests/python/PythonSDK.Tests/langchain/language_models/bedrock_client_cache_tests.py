@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from azure.core.credentials import AccessToken
+from foundationallm.authentication import AzureCredentialManager
+from foundationallm.langchain.language_models.bedrock_client_cache import (
+    AssumeRoleWithAzureIdentityProvider,
+    BedrockClientCache
+)
+from foundationallm.resilience import RetryStrategy
+
+ROLE_ARN = 'arn:aws:iam::123456789012:role/bedrock'
+SCOPE = 'api://bedrock/.default'
+
+class FakeStsClient:
+    """
+    Replaces the AWS STS client, issuing numbered credentials valid for the configured lifetime.
+    """
+    def __init__(self, lifetime: timedelta = timedelta(hours=1)):
+        self.lifetime = lifetime
+        self.requests = []
+
+    def assume_role_with_web_identity(self, RoleArn, RoleSessionName, WebIdentityToken):
+        self.requests.append((RoleArn, WebIdentityToken))
+        return {
+            'Credentials': {
+                'AccessKeyId': f'key{len(self.requests)}',
+                'SecretAccessKey': 'secret',
+                'SessionToken': 'session',
+                'Expiration': datetime.now(timezone.utc) + self.lifetime
+            }
+        }
+
+@pytest.fixture
+def test_sts_client(monkeypatch):
+    """
+    Clears the shared sessions and clients and replaces the Azure token and the STS client.
+    """
+    sts_client = FakeStsClient()
+    monkeypatch.setattr(AzureCredentialManager, 'get_token', staticmethod(lambda scope: AccessToken(f'azure-token:{scope}', 0)))
+    monkeypatch.setattr(BedrockClientCache, '_BedrockClientCache__sts_client', sts_client)
+    monkeypatch.setattr(BedrockClientCache, '_BedrockClientCache__sessions', {})
+    monkeypatch.setattr(BedrockClientCache, '_BedrockClientCache__runtime_clients', {})
+    return sts_client
+
+class BedrockClientCacheTests:
+    """
+    BedrockClientCacheTests is responsible for testing the caching of the Bedrock assumed-role credentials and runtime clients.
+    """
+
+    def test_role_is_assumed_once_while_the_credentials_are_valid(self, test_sts_client):
+        credentials = AssumeRoleWithAzureIdentityProvider(ROLE_ARN, SCOPE, test_sts_client).load()
+
+        assert credentials.get_frozen_credentials().access_key == 'key1'
+        assert credentials.get_frozen_credentials().access_key == 'key1'
+        assert test_sts_client.requests == [(ROLE_ARN, f'azure-token:{SCOPE}')]
+
+    def test_role_is_assumed_again_when_the_credentials_are_about_to_expire(self, test_sts_client):
+        # Credentials within the mandatory refresh window of botocore are refreshed on every use.
+        test_sts_client.lifetime = timedelta(minutes=1)
+        credentials = AssumeRoleWithAzureIdentityProvider(ROLE_ARN, SCOPE, test_sts_client).load()
+
+        assert credentials.get_frozen_credentials().access_key == 'key1'
+        test_sts_client.lifetime = timedelta(hours=1)
+        assert credentials.get_frozen_credentials().access_key == 'key2'
+        assert credentials.get_frozen_credentials().access_key == 'key2'
+
+    def test_sessions_are_shared_per_role_and_scope(self, test_sts_client):
+        session = BedrockClientCache.get_session(ROLE_ARN, SCOPE)
+
+        assert BedrockClientCache.get_session(ROLE_ARN, SCOPE) is session
+        assert BedrockClientCache.get_session(ROLE_ARN, 'api://other/.default') is not session
+        assert session.get_credentials().get_frozen_credentials().access_key == 'key1'
+        assert session.get_credentials().get_frozen_credentials().access_key == 'key1'
+        assert len(test_sts_client.requests) == 1
+
+    def test_runtime_clients_are_shared_per_region_and_retry_strategy(self, test_sts_client):
+        retry_strategy = RetryStrategy('bedrock', max_retries=2)
+        client = BedrockClientCache.get_runtime_client('us-east-1', ROLE_ARN, SCOPE, retry_strategy)
+
+        assert BedrockClientCache.get_runtime_client('us-east-1', ROLE_ARN, SCOPE, retry_strategy) is client
+        assert BedrockClientCache.get_runtime_client('us-west-2', ROLE_ARN, SCOPE, retry_strategy) is not client
+        assert BedrockClientCache.get_runtime_client('us-east-1', ROLE_ARN, SCOPE) is not client
+        assert client.meta.region_name == 'us-east-1'
+        assert client.meta.config.retries['total_max_attempts'] == 3
+        # Creating the clients does not assume the role.
+        assert test_sts_client.requests == []
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from foundationallm.langchain.language_models import LanguageModelClientRegistry
+from foundationallm.langchain.language_models.language_model_client_registry import (
+    DEFAULT_CLIENT_CACHE_SIZE,
+    LANGUAGE_MODELS_CLIENT_CACHE_SIZE,
+    get_fingerprint
+)
+
+class FakeConfiguration:
+    """
+    Serves the configuration settings set by the test.
+    """
+    def __init__(self, values: dict):
+        self.values = values
+
+    def get_value(self, key: str):
+        if key not in self.values:
+            raise Exception(f'The configuration variable {key} was not found.')
+        return self.values[key]
+
+def get_client(registry: LanguageModelClientRegistry, endpoint: str, deployment: str, fingerprint: str = 'v1'):
+    """
+    Gets a client from the registry, creating a new object if it is not registered.
+    """
+    return registry.get_or_create((deployment,), endpoint, fingerprint, lambda: object())
+
+class LanguageModelClientRegistryTests:
+    """
+    LanguageModelClientRegistryTests is responsible for testing the reuse and eviction of the language model clients.
+    """
+
+    def test_clients_are_reused_per_key(self):
+        registry = LanguageModelClientRegistry()
+
+        client = get_client(registry, 'endpoint', 'gpt')
+
+        assert get_client(registry, 'endpoint', 'gpt') is client
+        assert get_client(registry, 'endpoint', 'embeddings') is not client
+        assert get_client(registry, 'other-endpoint', 'gpt') is not client
+        assert registry.size == 3
+
+    def test_least_recently_used_client_is_evicted(self):
+        registry = LanguageModelClientRegistry(max_size=2)
+        first = get_client(registry, 'endpoint', 'first')
+        second = get_client(registry, 'endpoint', 'second')
+        # Using the first client makes the second one the least recently used.
+        get_client(registry, 'endpoint', 'first')
+
+        get_client(registry, 'endpoint', 'third')
+
+        assert registry.size == 2
+        assert get_client(registry, 'endpoint', 'first') is first
+        assert get_client(registry, 'endpoint', 'second') is not second
+
+    def test_endpoint_configuration_change_evicts_the_clients_of_the_endpoint(self):
+        registry = LanguageModelClientRegistry()
+        client = get_client(registry, 'endpoint', 'gpt')
+        other_client = get_client(registry, 'other-endpoint', 'gpt')
+
+        changed_client = get_client(registry, 'endpoint', 'gpt', fingerprint='v2')
+
+        assert changed_client is not client
+        assert get_client(registry, 'endpoint', 'gpt', fingerprint='v2') is changed_client
+        assert get_client(registry, 'other-endpoint', 'gpt') is other_client
+
+    def test_invalidate_evicts_the_clients_of_an_endpoint_or_all_clients(self):
+        registry = LanguageModelClientRegistry()
+        client = get_client(registry, 'endpoint', 'gpt')
+        other_client = get_client(registry, 'other-endpoint', 'gpt')
+
+        registry.invalidate('endpoint')
+        assert get_client(registry, 'endpoint', 'gpt') is not client
+        assert get_client(registry, 'other-endpoint', 'gpt') is other_client
+
+        registry.invalidate()
+        assert registry.size == 0
+
+    def test_http_clients_are_shared_per_endpoint_and_closed_with_the_registry(self):
+        registry = LanguageModelClientRegistry()
+        http_client, async_http_client = registry.get_http_clients('https://endpoint.openai.azure.com')
+
+        assert registry.get_http_clients('https://endpoint.openai.azure.com') == (http_client, async_http_client)
+        assert registry.get_http_clients('https://other.openai.azure.com')[0] is not http_client
+
+        asyncio.run(registry.aclose())
+
+        assert http_client.is_closed
+        assert async_http_client.is_closed
+        assert registry.get_http_clients('https://endpoint.openai.azure.com')[0] is not http_client
+
+    def test_fingerprint_does_not_contain_the_values(self):
+        fingerprint = get_fingerprint('https://endpoint.openai.azure.com', 'secret-key')
+
+        assert 'secret-key' not in fingerprint
+        assert fingerprint == get_fingerprint('https://endpoint.openai.azure.com', 'secret-key')
+        assert fingerprint != get_fingerprint('https://endpoint.openai.azure.com', 'other-key')
+
+    @pytest.mark.parametrize('values, max_size', [
+        ({LANGUAGE_MODELS_CLIENT_CACHE_SIZE: '8'}, 8),
+        ({LANGUAGE_MODELS_CLIENT_CACHE_SIZE: '0'}, DEFAULT_CLIENT_CACHE_SIZE),
+        ({LANGUAGE_MODELS_CLIENT_CACHE_SIZE: 'many'}, DEFAULT_CLIENT_CACHE_SIZE),
+        ({}, DEFAULT_CLIENT_CACHE_SIZE)
+    ])
+    def test_from_config_falls_back_to_the_default_size(self, values, max_size):
+        registry = LanguageModelClientRegistry.from_config(FakeConfiguration(values))
+
+        assert registry.max_size == max_size
+
+    def test_max_size_must_be_positive(self):
+        with pytest.raises(ValueError):
+            LanguageModelClientRegistry(max_size=0)
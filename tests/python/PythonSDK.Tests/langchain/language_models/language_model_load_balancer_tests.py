@@ -0,0 +1,187 @@
+import asyncio
+import random
+import httpx
+import pytest
+from foundationallm.langchain.language_models.language_model_load_balancer import (
+    LATENCY_SMOOTHING_FACTOR,
+    AsyncLoadBalancingTransport,
+    LanguageModelLoadBalancer,
+    LoadBalancedDeployment,
+    LoadBalancingTransport
+)
+from foundationallm.resilience import CircuitBreakerRegistry, CircuitBreakerStates
+
+FIRST_URL = 'https://first.openai.azure.com'
+SECOND_URL = 'https://second.openai.azure.com'
+THIRD_URL = 'https://third.openai.azure.com'
+
+class FakeEndpoints:
+    """
+    Returns the status code configured for the host of each request and records the hosts called.
+    """
+    def __init__(self, status_codes: dict):
+        self.status_codes = status_codes
+        self.hosts = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.hosts.append(request.url.host)
+        status_code = self.status_codes.get(request.url.host, 200)
+        if status_code is None:
+            raise httpx.ConnectError('refused', request=request)
+        return httpx.Response(status_code, json={'deployment': request.url.path})
+
+def get_deployments(*urls: str):
+    return [LoadBalancedDeployment(url, 'gpt') for url in urls]
+
+def get_chat_request() -> httpx.Request:
+    return httpx.Request(
+        'POST',
+        f'{FIRST_URL}/openai/deployments/gpt/chat/completions?api-version=2024-10-21',
+        headers={'api-key': 'first-key'},
+        json={'messages': []})
+
+def get_rate_limit_response(remaining_requests: int, remaining_tokens: int) -> httpx.Response:
+    return httpx.Response(200, headers={
+        'x-ratelimit-remaining-requests': str(remaining_requests),
+        'x-ratelimit-remaining-tokens': str(remaining_tokens)
+    })
+
+def get_statistics(deployment: LoadBalancedDeployment):
+    return LanguageModelLoadBalancer._LanguageModelLoadBalancer__statistics[deployment.key]
+
+@pytest.fixture(autouse=True)
+def test_load_balancer(monkeypatch):
+    """
+    Clears the shared deployment statistics and circuit breakers, and makes the load balancer
+    select the deployment with the highest score instead of drawing it at random.
+    """
+    monkeypatch.setattr(LanguageModelLoadBalancer, '_LanguageModelLoadBalancer__statistics', {})
+    monkeypatch.setattr(CircuitBreakerRegistry, '_CircuitBreakerRegistry__breakers', {})
+    monkeypatch.setattr(random, 'choices', lambda population, weights: [max(population, key=lambda i: weights[i])])
+
+class LanguageModelLoadBalancerTests:
+    """
+    LanguageModelLoadBalancerTests is responsible for testing the load balancing and failover across the deployments of an AI model.
+    """
+
+    def test_request_is_sent_to_the_selected_deployment(self):
+        deployment = LoadBalancedDeployment(f'{SECOND_URL}/', 'gpt-eu', api_version='2025-01-01', get_auth_headers=lambda: {'api-key': 'second-key'})
+
+        request = deployment.get_request(get_chat_request())
+
+        assert str(request.url) == f'{SECOND_URL}/openai/deployments/gpt-eu/chat/completions?api-version=2025-01-01'
+        assert request.headers['host'] == 'second.openai.azure.com'
+        assert request.headers['api-key'] == 'second-key'
+
+    @pytest.mark.parametrize('status_code', [429, 500, 503, None])
+    def test_failed_requests_fail_over_to_the_next_deployment(self, status_code):
+        endpoints = FakeEndpoints({'first.openai.azure.com': status_code})
+        transport = LoadBalancingTransport(get_deployments(FIRST_URL, SECOND_URL), httpx.MockTransport(endpoints))
+
+        response = transport.handle_request(get_chat_request())
+
+        assert response.status_code == 200
+        assert endpoints.hosts == ['first.openai.azure.com', 'second.openai.azure.com']
+
+    def test_permanent_failures_do_not_fail_over(self):
+        endpoints = FakeEndpoints({'first.openai.azure.com': 400})
+        transport = LoadBalancingTransport(get_deployments(FIRST_URL, SECOND_URL), httpx.MockTransport(endpoints))
+
+        assert transport.handle_request(get_chat_request()).status_code == 400
+        assert endpoints.hosts == ['first.openai.azure.com']
+
+    def test_response_of_the_last_deployment_is_returned_when_all_fail(self):
+        endpoints = FakeEndpoints({'first.openai.azure.com': 503, 'second.openai.azure.com': 429})
+        transport = LoadBalancingTransport(get_deployments(FIRST_URL, SECOND_URL), httpx.MockTransport(endpoints))
+
+        assert transport.handle_request(get_chat_request()).status_code == 429
+
+        endpoints = FakeEndpoints({'first.openai.azure.com': None, 'second.openai.azure.com': None})
+        transport = LoadBalancingTransport(get_deployments(FIRST_URL, SECOND_URL), httpx.MockTransport(endpoints))
+
+        with pytest.raises(httpx.ConnectError):
+            transport.handle_request(get_chat_request())
+
+    def test_asynchronous_requests_fail_over_to_the_next_deployment(self):
+        endpoints = FakeEndpoints({'first.openai.azure.com': 503})
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return endpoints(request)
+
+        transport = AsyncLoadBalancingTransport(get_deployments(FIRST_URL, SECOND_URL), httpx.MockTransport(handler))
+
+        response = asyncio.run(transport.handle_async_request(get_chat_request()))
+
+        assert response.status_code == 200
+        assert endpoints.hosts == ['first.openai.azure.com', 'second.openai.azure.com']
+
+    def test_throttled_deployments_are_tried_last_until_their_retry_after_expires(self):
+        first, second = get_deployments(FIRST_URL, SECOND_URL)
+
+        LanguageModelLoadBalancer.record_response(first, httpx.Response(429, headers={'retry-after': '30'}), 0.1)
+
+        assert LanguageModelLoadBalancer.get_ordered_deployments([first, second]) == [second, first]
+
+        # Once the Retry-After expires, the deployment is selected again.
+        get_statistics(first).throttled_until = 0
+        LanguageModelLoadBalancer.record_response(second, httpx.Response(200), 0.2)
+        assert LanguageModelLoadBalancer.get_ordered_deployments([first, second]) == [first, second]
+
+    def test_deployments_with_an_open_circuit_breaker_are_tried_last(self):
+        first, second, third = get_deployments(FIRST_URL, SECOND_URL, THIRD_URL)
+
+        CircuitBreakerRegistry.get_breaker(FIRST_URL).state = CircuitBreakerStates.OPEN
+
+        assert LanguageModelLoadBalancer.get_ordered_deployments([first, second, third])[-1] == first
+
+    def test_deployments_with_more_remaining_capacity_are_preferred(self):
+        first, second, third = get_deployments(FIRST_URL, SECOND_URL, THIRD_URL)
+        for deployment in [first, second, third]:
+            LanguageModelLoadBalancer.record_response(deployment, get_rate_limit_response(100, 10000), 0.1)
+
+        # The capacity is the smallest share left of the requests and tokens rate limits.
+        LanguageModelLoadBalancer.record_response(first, get_rate_limit_response(90, 1000), 0.1)
+        LanguageModelLoadBalancer.record_response(second, get_rate_limit_response(50, 9000), 0.1)
+
+        assert get_statistics(first).get_capacity(get_statistics(first).updated_at) == pytest.approx(0.1)
+        assert get_statistics(second).get_capacity(get_statistics(second).updated_at) == pytest.approx(0.5)
+        assert LanguageModelLoadBalancer.get_ordered_deployments([first, second, third]) == [third, second, first]
+
+    def test_deployments_without_recent_rate_limits_have_full_capacity(self):
+        first, = get_deployments(FIRST_URL)
+        LanguageModelLoadBalancer.record_response(first, get_rate_limit_response(100, 10000), 0.1)
+        LanguageModelLoadBalancer.record_response(first, get_rate_limit_response(10, 1000), 0.1)
+        statistics = get_statistics(first)
+
+        assert statistics.get_capacity(statistics.updated_at) == pytest.approx(0.1)
+        assert statistics.get_capacity(statistics.updated_at + 61) == 1.0
+
+    def test_latency_is_a_moving_average_of_the_successful_responses(self):
+        first, = get_deployments(FIRST_URL)
+
+        LanguageModelLoadBalancer.record_response(first, httpx.Response(200), 1.0)
+        assert get_statistics(first).latency_seconds == 1.0
+
+        LanguageModelLoadBalancer.record_response(first, httpx.Response(200), 2.0)
+        assert get_statistics(first).latency_seconds == pytest.approx(1.0 + LATENCY_SMOOTHING_FACTOR * (2.0 - 1.0))
+
+        # Failed responses do not say how fast the deployment serves requests.
+        LanguageModelLoadBalancer.record_response(first, httpx.Response(500), 30.0)
+        assert get_statistics(first).latency_seconds == pytest.approx(1.2)
+
+    def test_deployments_with_a_lower_latency_are_preferred(self):
+        first, second = get_deployments(FIRST_URL, SECOND_URL)
+
+        LanguageModelLoadBalancer.record_response(first, httpx.Response(200), 2.0)
+        LanguageModelLoadBalancer.record_response(second, httpx.Response(200), 0.5)
+
+        assert LanguageModelLoadBalancer.get_ordered_deployments([first, second]) == [second, first]
+
+    def test_weights_set_the_share_of_the_traffic(self):
+        first = LoadBalancedDeployment(FIRST_URL, 'gpt', weight=1)
+        second = LoadBalancedDeployment(SECOND_URL, 'gpt', weight=3)
+
+        assert LanguageModelLoadBalancer.get_ordered_deployments([first, second]) == [second, first]
+
+        with pytest.raises(ValueError):
+            LoadBalancedDeployment(FIRST_URL, 'gpt', weight=0)
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import httpx
+import pytest
+from foundationallm.langchain.language_models.language_model_rate_limiter import (
+    AsyncRateLimitingTransport,
+    LanguageModelRateLimiter,
+    RateLimitingTransport,
+    TokenBucket,
+    estimate_tokens
+)
+
+TOKENS_PER_MINUTE = 60000
+
+def get_chat_request(endpoint_url: str) -> httpx.Request:
+    return httpx.Request(
+        'POST',
+        f'{endpoint_url}/openai/deployments/gpt/chat/completions?api-version=2024-10-21',
+        json={'messages': [{'role': 'user', 'content': 'x' * 400}], 'max_tokens': 896})
+
+def get_transport(endpoint_url: str, status_code: int, usage_tokens: int = None) -> RateLimitingTransport:
+    LanguageModelRateLimiter.set_tokens_per_minute(endpoint_url, 'gpt', TOKENS_PER_MINUTE)
+    content = {'usage': {'total_tokens': usage_tokens}} if usage_tokens is not None else {}
+    return RateLimitingTransport(httpx.MockTransport(lambda request: httpx.Response(status_code, json=content)))
+
+def get_stream_request(endpoint_url: str) -> httpx.Request:
+    return httpx.Request(
+        'POST',
+        f'{endpoint_url}/openai/deployments/gpt/chat/completions?api-version=2024-10-21',
+        json={'messages': [{'role': 'user', 'content': 'x' * 400}], 'max_tokens': 896, 'stream': True})
+
+def get_stream_content(usage_tokens: int = None) -> bytes:
+    """
+    Gets the server-sent events of a streamed chat completion of 400 characters, ending with a usage chunk if usage_tokens is set.
+    """
+    events = [{'choices': [{'index': 0, 'delta': {'content': 'y' * 100}}]} for _ in range(4)]
+    if usage_tokens is not None:
+        events.append({'choices': [], 'usage': {'total_tokens': usage_tokens}})
+    return ''.join(f'data: {json.dumps(event)}\n\n' for event in events).encode('utf-8') + b'data: [DONE]\n\n'
+
+def get_used_tokens(endpoint_url: str) -> float:
+    bucket = LanguageModelRateLimiter.get_bucket((endpoint_url, 'gpt'))
+    return (1 - bucket.available_share) * TOKENS_PER_MINUTE
+
+class LanguageModelRateLimiterTests:
+    """
+    LanguageModelRateLimiterTests is responsible for testing the client-side tokens-per-minute rate limiting.
+    """
+
+    def test_estimate_counts_prompt_characters_and_max_tokens(self):
+        body = {'messages': [{'role': 'user', 'content': 'x' * 400}], 'max_tokens': 896}
+        assert estimate_tokens(body) == 4 + 100 + 896
+
+    def test_reserve_waits_when_the_bucket_is_empty(self):
+        bucket = TokenBucket(600)
+
+        assert bucket.reserve(600, max_wait_seconds=0) == 0
+        wait_seconds = bucket.reserve(60, max_wait_seconds=10)
+        assert wait_seconds == pytest.approx(6, abs=0.1)
+        assert bucket.reserve(60, max_wait_seconds=10) is None
+
+    def test_release_returns_unused_tokens(self):
+        bucket = TokenBucket(600)
+        bucket.reserve(600, max_wait_seconds=0)
+
+        bucket.release(300)
+
+        assert bucket.available_share == pytest.approx(0.5, abs=0.01)
+
+    def test_successful_response_reconciles_the_reservation_with_the_usage(self):
+        endpoint_url = 'https://reconcile.openai.azure.com'
+        response = get_transport(endpoint_url, 200, usage_tokens=250).handle_request(get_chat_request(endpoint_url))
+
+        assert response.status_code == 200
+        assert get_used_tokens(endpoint_url) == pytest.approx(250, abs=10)
+
+    @pytest.mark.parametrize('status_code', [400, 429, 500, 503])
+    def test_unsuccessful_response_releases_the_reservation(self, status_code):
+        endpoint_url = f'https://release-{status_code}.openai.azure.com'
+        response = get_transport(endpoint_url, status_code).handle_request(get_chat_request(endpoint_url))
+
+        assert response.status_code == status_code
+        assert get_used_tokens(endpoint_url) == pytest.approx(0, abs=10)
+
+    def test_request_is_rejected_when_it_would_wait_too_long(self, monkeypatch):
+        endpoint_url = 'https://rejected.openai.azure.com'
+        monkeypatch.setattr(LanguageModelRateLimiter, 'max_queue_seconds', 0)
+        transport = get_transport(endpoint_url, 200, usage_tokens=TOKENS_PER_MINUTE)
+        transport.handle_request(get_chat_request(endpoint_url))
+
+        response = transport.handle_request(get_chat_request(endpoint_url))
+
+        assert response.status_code == 429
+        assert int(response.headers['retry-after-ms']) > 0
+        assert json.loads(response.content)['error']['code'] == 'ClientRateLimitExceeded'
+
+    def test_synchronous_requests_do_not_wait_longer_than_max_sync_queue_seconds(self, monkeypatch):
+        endpoint_url = 'https://sync-rejected.openai.azure.com'
+        monkeypatch.setattr(LanguageModelRateLimiter, 'max_sync_queue_seconds', 0.5)
+        transport = get_transport(endpoint_url, 200, usage_tokens=TOKENS_PER_MINUTE)
+        transport.handle_request(get_chat_request(endpoint_url))
+
+        # The second request needs about one second of refill, more than synchronous requests wait.
+        response = transport.handle_request(get_chat_request(endpoint_url))
+
+        assert response.status_code == 429
+
+    @pytest.mark.parametrize('usage_tokens, used_tokens', [
+        (300, 300),
+        # Without a usage chunk, the completion tokens are estimated from the 400 characters streamed.
+        (None, 4 + 100 + 100)
+    ])
+    def test_streamed_response_reconciles_the_reservation_when_the_stream_is_closed(self, usage_tokens, used_tokens):
+        endpoint_url = f'https://stream-{used_tokens}.openai.azure.com'
+        LanguageModelRateLimiter.set_tokens_per_minute(endpoint_url, 'gpt', TOKENS_PER_MINUTE)
+        content = get_stream_content(usage_tokens)
+        transport = RateLimitingTransport(httpx.MockTransport(
+            lambda request: httpx.Response(200, headers={'content-type': 'text/event-stream'}, stream=httpx.ByteStream(content))))
+
+        with httpx.Client(transport=transport) as client:
+            with client.stream('POST', get_stream_request(endpoint_url).url, content=get_stream_request(endpoint_url).content) as response:
+                # The estimate is held while the response is streamed.
+                assert get_used_tokens(endpoint_url) == pytest.approx(4 + 100 + 896, abs=10)
+                assert b''.join(response.iter_bytes(chunk_size=7)) == content
+
+        assert get_used_tokens(endpoint_url) == pytest.approx(used_tokens, abs=10)
+
+    def test_asynchronous_streamed_response_reconciles_the_reservation_when_the_stream_is_closed(self):
+        endpoint_url = 'https://stream-async.openai.azure.com'
+        LanguageModelRateLimiter.set_tokens_per_minute(endpoint_url, 'gpt', TOKENS_PER_MINUTE)
+        content = get_stream_content(300)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, headers={'content-type': 'text/event-stream'}, stream=httpx.ByteStream(content))
+
+        async def stream():
+            request = get_stream_request(endpoint_url)
+            async with httpx.AsyncClient(transport=AsyncRateLimitingTransport(httpx.MockTransport(handler))) as client:
+                async with client.stream('POST', request.url, content=request.content) as response:
+                    await response.aread()
+
+        asyncio.run(stream())
+
+        assert get_used_tokens(endpoint_url) == pytest.approx(300, abs=10)
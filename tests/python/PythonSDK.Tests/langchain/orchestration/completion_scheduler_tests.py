@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from foundationallm.langchain.orchestration import CompletionScheduler
+from foundationallm.models.orchestration import CompletionPriorityClasses
+
+async def run_requests(scheduler: CompletionScheduler, requests: list) -> list:
+    """
+    Queues the requests behind a request holding the only execution slot, releases
+    the slot and returns the names of the requests in the order they were granted a slot.
+    """
+    order = []
+    blocker_started = asyncio.Event()
+    release_blocker = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.schedule('blocker', 'blocker'):
+            blocker_started.set()
+            await release_blocker.wait()
+
+    async def request(name: str, instance_id: str, user_id: str, priority_class: CompletionPriorityClasses):
+        async with scheduler.schedule(instance_id, user_id, priority_class=priority_class):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    blocker_task = asyncio.create_task(blocker())
+    await blocker_started.wait()
+    tasks = []
+    for name, instance_id, user_id, priority_class in requests:
+        tasks.append(asyncio.create_task(request(name, instance_id, user_id, priority_class)))
+        await asyncio.sleep(0)
+    release_blocker.set()
+    await asyncio.gather(blocker_task, *tasks)
+    return order
+
+class CompletionSchedulerTests:
+    """
+    CompletionSchedulerTests is responsible for testing the fair scheduling of completion requests.
+    """
+
+    def test_users_share_the_slots_of_an_instance(self):
+        scheduler = CompletionScheduler(max_concurrency=1)
+        order = asyncio.run(run_requests(scheduler, [
+            ('a1', 'instance', 'user-a', None),
+            ('a2', 'instance', 'user-a', None),
+            ('a3', 'instance', 'user-a', None),
+            ('b1', 'instance', 'user-b', None)
+        ]))
+        assert order == ['a1', 'b1', 'a2', 'a3']
+
+    def test_instances_share_the_slots_according_to_their_weights(self):
+        scheduler = CompletionScheduler(max_concurrency=1, instance_weights={'heavy': 2})
+        order = asyncio.run(run_requests(scheduler, [
+            (f'{instance_id}{index}', instance_id, 'user', None)
+            for instance_id in ['heavy', 'light']
+            for index in range(1, 4)
+        ]))
+        assert order == ['heavy1', 'light1', 'heavy2', 'heavy3', 'light2', 'light3']
+
+    def test_interactive_requests_run_before_batch_requests(self):
+        scheduler = CompletionScheduler(max_concurrency=1)
+        order = asyncio.run(run_requests(scheduler, [
+            ('batch1', 'instance', 'user', CompletionPriorityClasses.BATCH),
+            ('batch2', 'other-instance', 'user', CompletionPriorityClasses.BATCH),
+            ('interactive1', 'instance', 'user', CompletionPriorityClasses.INTERACTIVE)
+        ]))
+        assert order == ['interactive1', 'batch1', 'batch2']
+
+    def test_batch_requests_are_capped(self):
+        scheduler = CompletionScheduler(max_concurrency=4)
+        assert scheduler.max_class_concurrency[CompletionPriorityClasses.BATCH] == 2
+
+        async def run():
+            running = 0
+            max_running = 0
+            async def request():
+                nonlocal running, max_running
+                async with scheduler.schedule('instance', 'user', priority_class=CompletionPriorityClasses.BATCH):
+                    running += 1
+                    max_running = max(max_running, running)
+                    await asyncio.sleep(0.01)
+                    running -= 1
+            await asyncio.gather(*[request() for _ in range(6)])
+            return max_running
+
+        assert asyncio.run(run()) == 2
+        assert scheduler.running == 0
+        assert scheduler.queued == 0
+
+    def test_cancelled_requests_release_their_place(self):
+        scheduler = CompletionScheduler(max_concurrency=1)
+
+        async def run():
+            release = asyncio.Event()
+            async def holder():
+                async with scheduler.schedule('instance', 'user'):
+                    await release.wait()
+            async def waiter():
+                async with scheduler.schedule('instance', 'user'):
+                    pass
+            holder_task = asyncio.create_task(holder())
+            await asyncio.sleep(0)
+            waiter_task = asyncio.create_task(waiter())
+            await asyncio.sleep(0)
+            waiter_task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter_task
+            queued = scheduler.queued
+            release.set()
+            await holder_task
+            return queued
+
+        assert asyncio.run(run()) == 0
+        assert scheduler.running == 0
+        assert scheduler.queued == 0
+
+    def test_invalid_weights_are_rejected(self):
+        with pytest.raises(ValueError):
+            CompletionScheduler(max_concurrency=1, user_weights={'user': 0})
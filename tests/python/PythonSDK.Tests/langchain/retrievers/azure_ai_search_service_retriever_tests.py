@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from foundationallm.langchain.retrievers import AzureAISearchServiceRetriever, azure_ai_search_service_retriever
+from foundationallm.models.agents import KnowledgeManagementIndexConfiguration
+from foundationallm.models.resource_providers.configuration import APIEndpointConfiguration
+from foundationallm.models.resource_providers.vectorization import AzureAISearchIndexingProfile
+from foundationallm.models.services import GatewayTextEmbeddingResponse
+from foundationallm.services.gateway_text_embedding import GatewayTextEmbeddingService
+
+class FakeTextEmbeddingService(GatewayTextEmbeddingService):
+    def __init__(self):
+        pass
+
+    async def aget_embedding(self, text: str) -> GatewayTextEmbeddingResponse:
+        return GatewayTextEmbeddingResponse(embedding_vector=[0.5, 0.5], tokens_count=1)
+
+class FakeSearchResults:
+    def __init__(self, results: list):
+        self.results = results
+
+    def __aiter__(self):
+        return self.__iterate()
+
+    async def __iterate(self):
+        for result in self.results:
+            yield result
+
+class FakeAsyncSearchClient:
+    """
+    Searches the index named by index_name: 'failing' raises, 'slow' does not respond,
+    and the other indexes return one document whose score is the length of the index name.
+    """
+    def __init__(self, index_name: str, **kwargs):
+        self.index_name = index_name
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def search(self, **kwargs) -> FakeSearchResults:
+        if self.index_name == 'failing':
+            raise ConnectionError(f'The {self.index_name} index is unavailable.')
+        if self.index_name == 'slow':
+            await asyncio.sleep(10)
+        return FakeSearchResults([{
+            'Id': self.index_name,
+            'Text': f'Text of {self.index_name}',
+            '@search.score': float(len(self.index_name))
+        }])
+
+def get_index_configuration(index_name: str) -> KnowledgeManagementIndexConfiguration:
+    return KnowledgeManagementIndexConfiguration(
+        indexing_profile=AzureAISearchIndexingProfile(
+            name=index_name,
+            indexer='AzureAISearchIndexer',
+            settings={'index_name': index_name},
+            configuration_references={}),
+        api_endpoint_configuration=APIEndpointConfiguration(
+            name='AzureAISearch',
+            category='General',
+            authentication_type='APIKey',
+            url='https://search',
+            retry_strategy_name='ExponentialBackoff'))
+
+def search(index_names: list) -> list:
+    retriever = AzureAISearchServiceRetriever(
+        config=None,
+        index_configurations=[get_index_configuration(index_name) for index_name in index_names],
+        gateway_text_embedding_service=FakeTextEmbeddingService())
+    return [document.id for document in asyncio.run(retriever.ainvoke('query'))]
+
+@pytest.fixture(autouse=True)
+def test_search_client(monkeypatch):
+    monkeypatch.setattr(azure_ai_search_service_retriever, 'AsyncSearchClient', FakeAsyncSearchClient)
+    monkeypatch.setattr(AzureAISearchServiceRetriever, 'index_timeout_seconds', 0.05)
+
+class AzureAISearchServiceRetrieverTests:
+    """
+    AzureAISearchServiceRetrieverTests is responsible for testing the concurrent searches of the Azure AI Search indexes.
+    """
+
+    def test_results_of_all_indexes_are_sorted_by_score(self):
+        assert search(['short', 'longest']) == ['longest', 'short']
+
+    def test_failing_index_is_left_out(self):
+        assert search(['short', 'failing', 'longest']) == ['longest', 'short']
+
+    def test_index_that_does_not_respond_is_left_out(self):
+        assert search(['slow', 'short']) == ['short']
+
+    def test_search_fails_when_all_the_indexes_fail(self):
+        with pytest.raises(ConnectionError):
+            search(['failing', 'failing'])
+
+    def test_search_times_out_when_no_index_responds(self):
+        with pytest.raises(asyncio.TimeoutError):
+            search(['slow'])
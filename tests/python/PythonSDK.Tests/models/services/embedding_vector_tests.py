@@ -0,0 +1,39 @@
+from array import array
+import pytest
+from foundationallm.models.services import GatewayTextEmbeddingResponse, to_embedding_vector
+
+class EmbeddingVectorTests:
+    """
+    EmbeddingVectorTests is responsible for testing the float32 embedding vectors.
+    """
+
+    def test_list_is_converted_to_float32(self):
+        vector = to_embedding_vector([0.5, -1.25, 3])
+
+        assert vector.typecode == 'f'
+        assert vector.tolist() == [0.5, -1.25, 3.0]
+
+    def test_packed_bytes_are_converted(self):
+        packed = array('f', [0.5, -1.25]).tobytes()
+
+        assert to_embedding_vector(packed).tolist() == [0.5, -1.25]
+        assert to_embedding_vector(memoryview(packed)).tolist() == [0.5, -1.25]
+
+    def test_float32_array_is_not_copied(self):
+        vector = array('f', [0.5])
+
+        assert to_embedding_vector(vector) is vector
+
+    def test_values_are_rounded_to_float32(self):
+        assert to_embedding_vector([0.1])[0] == pytest.approx(0.1, abs=1e-7)
+        assert to_embedding_vector([0.1])[0] != 0.1
+
+    def test_vector_round_trips_through_json(self):
+        response = GatewayTextEmbeddingResponse(embedding_vector=[0.5, -1.25], tokens_count=2)
+
+        json = response.model_dump_json()
+        round_tripped = GatewayTextEmbeddingResponse.model_validate_json(json)
+
+        assert json == '{"embedding_vector":[0.5,-1.25],"tokens_count":2}'
+        assert round_tripped.embedding_vector == response.embedding_vector
+        assert GatewayTextEmbeddingResponse.model_json_schema()['properties']['embedding_vector']['type'] == 'array'
@@ -0,0 +1,127 @@
+import asyncio
+from foundationallm.models.orchestration import CompletionResponse, OpenAITextMessageContentItem
+from foundationallm.operations import OperationResultWriter, OperationsManager
+from foundationallm.operations.operation_result_writer import _get_list_delta
+
+class FakeConfiguration:
+    def get_value(self, key: str) -> str:
+        return 'https://state-api' if key.endswith('APIUrl') else 'key'
+
+class FakeResponse:
+    def __init__(self, status: int):
+        self.status = status
+
+    async def text(self) -> str:
+        return ''
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+class FakeClientSession:
+    """
+    Records the State API requests and rejects the incremental results whose base sequence number is in rejected_base_sequence_numbers.
+    """
+    def __init__(self, rejected_base_sequence_numbers: set = None):
+        self.rejected_base_sequence_numbers = rejected_base_sequence_numbers or set()
+        self.requests = []
+
+    def post(self, url: str, json: dict, **kwargs) -> FakeResponse:
+        self.requests.append((url.rsplit('/operations/op/', 1)[1], json.get('sequence_number'), json.get('base_sequence_number')))
+        if url.endswith('/result/delta') and json['base_sequence_number'] in self.rejected_base_sequence_numbers:
+            return FakeResponse(409)
+        return FakeResponse(200)
+
+def get_completion_response(text: str) -> CompletionResponse:
+    return CompletionResponse(
+        operation_id='op',
+        user_prompt='prompt',
+        content=[OpenAITextMessageContentItem(value=text, agent_capability_category='FoundationaLLM.KnowledgeManagement')])
+
+async def write(writer: OperationResultWriter, text: str):
+    writer.submit(get_completion_response(text))
+    await writer.flush_async()
+
+class OperationResultWriterTests:
+    """
+    OperationResultWriterTests is responsible for testing the incremental writes of interim results.
+    """
+
+    def test_list_delta_appends_text(self):
+        delta = _get_list_delta([{'type': 'text', 'value': 'Hello'}], [{'type': 'text', 'value': 'Hello world'}])
+        assert delta == {'length': 1, 'updates': [{'index': 0, 'append': {'value': ' world'}}]}
+
+    def test_list_delta_replaces_changed_and_new_items(self):
+        delta = _get_list_delta(
+            [{'type': 'text', 'value': 'Hello'}],
+            [{'type': 'text', 'value': 'Goodbye'}, {'type': 'image', 'file_id': 'file'}])
+        assert delta == {'length': 2, 'updates': [
+            {'index': 0, 'item': {'type': 'text', 'value': 'Goodbye'}},
+            {'index': 1, 'item': {'type': 'image', 'file_id': 'file'}}
+        ]}
+
+    def test_list_delta_of_unchanged_list_is_empty(self):
+        items = [{'type': 'text', 'value': 'Hello'}]
+        assert _get_list_delta(items, list(items)) == {'length': 1, 'updates': []}
+
+    def test_rejected_delta_falls_back_to_the_full_result(self):
+        http_client_session = FakeClientSession(rejected_base_sequence_numbers={2})
+
+        async def run():
+            writer = OperationResultWriter(
+                OperationsManager(FakeConfiguration(), http_client_session),
+                'op', 'instance', flush_interval_seconds=0, delta_updates=True)
+            for text in ['a', 'ab', 'abc', 'abcd']:
+                await write(writer, text)
+
+        asyncio.run(run())
+        assert http_client_session.requests == [
+            ('result', 1, None),
+            ('result/delta', 2, 1),
+            ('result/delta', 3, 2),
+            ('result', 3, None)
+        ]
+
+    def test_deltas_start_once_the_full_result_is_delivered(self):
+        class FakeOperationsManager:
+            def __init__(self):
+                self.writes = []
+                self.deliveries = []
+
+            async def set_operation_result_async(self, operation_id, instance_id, completion_response, sequence_number=None):
+                return self.__write(('result', sequence_number))
+
+            async def set_operation_result_delta_async(self, operation_id, instance_id, result_delta):
+                return self.__write(('result/delta', result_delta['sequence_number']))
+
+            def __write(self, write):
+                self.writes.append(write)
+                delivery = asyncio.get_running_loop().create_future()
+                self.deliveries.append(delivery)
+                return delivery
+
+        async def run():
+            operations_manager = FakeOperationsManager()
+            writer = OperationResultWriter(operations_manager, 'op', 'instance', flush_interval_seconds=0, delta_updates=True)
+            await write(writer, 'a')
+            # The first result is not delivered yet, so the full result is sent again.
+            await write(writer, 'ab')
+            operations_manager.deliveries[1].set_result(True)
+            await asyncio.sleep(0)
+            await write(writer, 'abc')
+            await write(writer, 'abcd')
+            # The outbox discarded the first delta, so the State API does not have the base of the second one.
+            operations_manager.deliveries[2].set_result(False)
+            await asyncio.sleep(0)
+            await write(writer, 'abcde')
+            return operations_manager.writes
+
+        assert asyncio.run(run()) == [
+            ('result', 1),
+            ('result', 2),
+            ('result/delta', 3),
+            ('result/delta', 4),
+            ('result', 5)
+        ]
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from foundationallm.operations import OperationsOutbox, OutboxDeliveryRejectedException, OutboxWriteTypes
+
+@pytest.fixture
+def test_outbox_path(tmp_path):
+    return str(tmp_path / 'operations-outbox.db')
+
+class OperationsOutboxTests:
+    """
+    OperationsOutboxTests is responsible for testing the delivery of State API writes through the outbox.
+    """
+
+    def test_result_writes_are_coalesced(self, test_outbox_path):
+        async def run():
+            outbox = OperationsOutbox(path=test_outbox_path)
+            await outbox.enqueue_async('op', 'instance', OutboxWriteTypes.STATUS, {'status': 'InProgress'})
+            await outbox.enqueue_async('op', 'instance', OutboxWriteTypes.RESULT, {'completion': 'a'})
+            await outbox.enqueue_async('op', 'instance', OutboxWriteTypes.RESULT, {'completion': 'ab'})
+            assert await outbox.get_pending_async() == 2
+
+            sent = []
+            async def send(entry):
+                sent.append((entry.write_type, entry.payload))
+            outbox.start(send)
+            await outbox.stop_async()
+            return sent
+
+        assert asyncio.run(run()) == [
+            (OutboxWriteTypes.STATUS, {'status': 'InProgress'}),
+            (OutboxWriteTypes.RESULT, {'completion': 'ab'})
+        ]
+
+    def test_writes_are_replayed_after_a_restart(self, test_outbox_path):
+        async def store():
+            outbox = OperationsOutbox(path=test_outbox_path)
+            await outbox.enqueue_async('op', 'instance', OutboxWriteTypes.STATUS, {'status': 'Completed'})
+            await outbox.stop_async(timeout_seconds=0)
+
+        async def replay():
+            outbox = OperationsOutbox(path=test_outbox_path)
+            sent = []
+            async def send(entry):
+                sent.append((entry.operation_id, entry.instance_id, entry.payload))
+            outbox.start(send)
+            await outbox.stop_async()
+            return sent
+
+        asyncio.run(store())
+        assert asyncio.run(replay()) == [('op', 'instance', {'status': 'Completed'})]
+
+    def test_writes_of_an_operation_are_delivered_in_order_after_retries(self, test_outbox_path):
+        async def run():
+            outbox = OperationsOutbox(path=test_outbox_path, initial_backoff_seconds=0.01)
+            sent = []
+            failures = {'count': 0}
+            async def send(entry):
+                if entry.payload['index'] == 1 and failures['count'] < 2:
+                    failures['count'] += 1
+                    raise ConnectionError('The State API is unavailable.')
+                sent.append(entry.payload['index'])
+            outbox.start(send)
+            for index in range(1, 4):
+                await outbox.enqueue_async('op', 'instance', OutboxWriteTypes.STATUS, {'index': index})
+            await outbox.stop_async()
+            return sent
+
+        assert asyncio.run(run()) == [1, 2, 3]
+
+    def test_slow_operation_does_not_delay_other_operations(self, test_outbox_path):
+        async def run():
+            outbox = OperationsOutbox(path=test_outbox_path)
+            slow_operation_released = asyncio.Event()
+            fast_operation_delivered = asyncio.Event()
+            async def send(entry):
+                if entry.operation_id == 'slow':
+                    await slow_operation_released.wait()
+                else:
+                    fast_operation_delivered.set()
+            outbox.start(send)
+            await outbox.enqueue_async('slow', 'instance', OutboxWriteTypes.STATUS, {})
+            await outbox.enqueue_async('fast', 'instance', OutboxWriteTypes.STATUS, {})
+            await asyncio.wait_for(fast_operation_delivered.wait(), timeout=5)
+            slow_operation_released.set()
+            await outbox.stop_async()
+
+        asyncio.run(run())
+
+    def test_delivery_futures_report_the_outcome(self, test_outbox_path):
+        async def run():
+            outbox = OperationsOutbox(path=test_outbox_path, max_attempts=2, initial_backoff_seconds=0.01)
+            async def send(entry):
+                if entry.payload.get('rejected'):
+                    raise OutboxDeliveryRejectedException('The sequence number does not match.')
+                if entry.payload.get('failing'):
+                    raise ConnectionError('The State API is unavailable.')
+            delivered = await outbox.enqueue_async('op1', 'instance', OutboxWriteTypes.RESULT_DELTA, {})
+            rejected = await outbox.enqueue_async('op2', 'instance', OutboxWriteTypes.RESULT_DELTA, {'rejected': True})
+            failing = await outbox.enqueue_async('op3', 'instance', OutboxWriteTypes.RESULT_DELTA, {'failing': True})
+            outbox.start(send)
+            results = await asyncio.gather(delivered, rejected, failing)
+            assert await outbox.get_pending_async() == 0
+            await outbox.stop_async()
+            return results
+
+        assert asyncio.run(run()) == [True, False, False]
+
+    def test_coalesced_result_writes_resolve_together(self, test_outbox_path):
+        async def run():
+            outbox = OperationsOutbox(path=test_outbox_path)
+            first = await outbox.enqueue_async('op', 'instance', OutboxWriteTypes.RESULT, {'completion': 'a'})
+            second = await outbox.enqueue_async('op', 'instance', OutboxWriteTypes.RESULT, {'completion': 'ab'})
+            async def send(entry):
+                pass
+            outbox.start(send)
+            results = await asyncio.gather(first, second)
+            await outbox.stop_async()
+            return results
+
+        assert asyncio.run(run()) == [True, True]
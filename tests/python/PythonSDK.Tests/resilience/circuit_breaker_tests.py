@@ -0,0 +1,99 @@
+import time
+import pytest
+from foundationallm.resilience import (
+    CircuitBreaker,
+    CircuitBreakerOpenException,
+    CircuitBreakerStates,
+    RetryStrategy
+)
+
+class FakeHttpError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+
+@pytest.fixture
+def test_circuit_breaker():
+    return CircuitBreaker(
+        'https://dependency',
+        failure_rate_threshold=0.5,
+        minimum_throughput=4,
+        break_duration_seconds=0.05)
+
+def fail(status_code: int = 503):
+    raise FakeHttpError(status_code)
+
+def open_circuit_breaker(circuit_breaker: CircuitBreaker):
+    circuit_breaker.execute(lambda: 'ok')
+    circuit_breaker.execute(lambda: 'ok')
+    for _ in range(2):
+        with pytest.raises(FakeHttpError):
+            circuit_breaker.execute(fail)
+
+class CircuitBreakerTests:
+    """
+    CircuitBreakerTests is responsible for testing the state transitions of circuit breakers.
+    """
+
+    def test_opens_when_the_failure_rate_reaches_the_threshold(self, test_circuit_breaker):
+        open_circuit_breaker(test_circuit_breaker)
+
+        assert test_circuit_breaker.state == CircuitBreakerStates.OPEN
+        with pytest.raises(CircuitBreakerOpenException) as e:
+            test_circuit_breaker.execute(lambda: 'ok')
+        assert e.value.status_code == 503
+
+    def test_stays_closed_below_the_minimum_throughput(self, test_circuit_breaker):
+        for _ in range(3):
+            with pytest.raises(FakeHttpError):
+                test_circuit_breaker.execute(fail)
+
+        assert test_circuit_breaker.state == CircuitBreakerStates.CLOSED
+
+    def test_throttling_is_not_a_failure(self, test_circuit_breaker):
+        for _ in range(6):
+            with pytest.raises(FakeHttpError):
+                test_circuit_breaker.execute(lambda: fail(429))
+
+        assert test_circuit_breaker.state == CircuitBreakerStates.CLOSED
+
+    def test_half_open_probe_success_closes_the_breaker(self, test_circuit_breaker):
+        open_circuit_breaker(test_circuit_breaker)
+        time.sleep(0.06)
+
+        is_probe = test_circuit_breaker.before_call()
+        assert is_probe
+        assert test_circuit_breaker.state == CircuitBreakerStates.HALF_OPEN
+        # A single probe call is let through while the breaker is half-open.
+        with pytest.raises(CircuitBreakerOpenException):
+            test_circuit_breaker.before_call()
+        test_circuit_breaker.after_call(is_probe)
+
+        assert test_circuit_breaker.state == CircuitBreakerStates.CLOSED
+        assert test_circuit_breaker.execute(lambda: 'ok') == 'ok'
+
+    def test_half_open_probe_failure_opens_the_breaker_again(self, test_circuit_breaker):
+        open_circuit_breaker(test_circuit_breaker)
+        time.sleep(0.06)
+
+        with pytest.raises(FakeHttpError):
+            test_circuit_breaker.execute(fail)
+
+        assert test_circuit_breaker.state == CircuitBreakerStates.OPEN
+        with pytest.raises(CircuitBreakerOpenException):
+            test_circuit_breaker.execute(lambda: 'ok')
+
+    def test_cancelled_probe_lets_the_next_call_probe(self, test_circuit_breaker):
+        open_circuit_breaker(test_circuit_breaker)
+        time.sleep(0.06)
+
+        test_circuit_breaker.after_call(test_circuit_breaker.before_call(), cancelled=True)
+
+        assert test_circuit_breaker.state == CircuitBreakerStates.HALF_OPEN
+        assert test_circuit_breaker.before_call()
+
+    def test_open_breaker_rejections_are_not_retried(self):
+        retry_strategy = RetryStrategy('default')
+
+        assert not retry_strategy.is_transient(CircuitBreakerOpenException('https://dependency', 1.0))
+        assert retry_strategy.is_transient(FakeHttpError(503))
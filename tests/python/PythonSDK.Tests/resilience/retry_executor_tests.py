@@ -0,0 +1,118 @@
+import asyncio
+import time
+import pytest
+from foundationallm.resilience import RetryContext, RetryExecutor, RetryStrategy
+
+class FakeHttpError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+
+class FailingCall:
+    """
+    Raises the configured exceptions in turn, then returns 'ok'.
+    """
+    def __init__(self, *exceptions: Exception):
+        self.exceptions = list(exceptions)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.exceptions:
+            raise self.exceptions.pop(0)
+        return 'ok'
+
+    async def call_async(self):
+        return self()
+
+@pytest.fixture
+def test_executor():
+    return RetryExecutor(RetryStrategy('Test', max_retries=3, initial_delay_seconds=0.001, use_jitter=False))
+
+class RetryExecutorTests:
+    """
+    RetryExecutorTests is responsible for testing the retries of the calls and the retry budget and deadline of the operations.
+    """
+
+    def test_transient_failures_are_retried_until_the_call_succeeds(self, test_executor):
+        call = FailingCall(FakeHttpError(503), ConnectionError())
+
+        assert test_executor.execute(call) == 'ok'
+        assert call.calls == 3
+
+    def test_last_exception_is_raised_when_the_retries_are_exhausted(self, test_executor):
+        call = FailingCall(*[FakeHttpError(429) for _ in range(5)])
+
+        with pytest.raises(FakeHttpError):
+            test_executor.execute(call)
+        assert call.calls == 4
+
+    def test_permanent_failures_are_not_retried(self, test_executor):
+        call = FailingCall(FakeHttpError(400))
+
+        with pytest.raises(FakeHttpError):
+            test_executor.execute(call)
+        assert call.calls == 1
+
+    def test_calls_that_are_not_idempotent_are_not_retried_after_being_processed(self, test_executor):
+        call = FailingCall(FakeHttpError(502))
+
+        with pytest.raises(FakeHttpError):
+            test_executor.execute(call, idempotent=False)
+        assert call.calls == 1
+
+    def test_asynchronous_calls_are_retried(self, test_executor):
+        call = FailingCall(FakeHttpError(503), TimeoutError())
+
+        assert asyncio.run(test_executor.execute_async(call.call_async)) == 'ok'
+        assert call.calls == 3
+
+    def test_retry_budget_is_shared_by_the_calls_of_an_operation(self, test_executor):
+        first_call = FailingCall(FakeHttpError(503))
+        second_call = FailingCall(FakeHttpError(503))
+
+        with RetryContext(retry_budget=1) as context:
+            assert test_executor.execute(first_call) == 'ok'
+            with pytest.raises(FakeHttpError):
+                test_executor.execute(second_call)
+
+        assert context.retries == 1
+        assert (first_call.calls, second_call.calls) == (2, 1)
+
+    def test_retries_that_would_overrun_the_deadline_are_denied(self):
+        executor = RetryExecutor(RetryStrategy('Test', max_retries=3, initial_delay_seconds=5, use_jitter=False))
+        call = FailingCall(FakeHttpError(503))
+
+        with RetryContext(timeout_seconds=1):
+            start = time.monotonic()
+            with pytest.raises(FakeHttpError):
+                executor.execute(call)
+
+        assert call.calls == 1
+        assert time.monotonic() - start < 1
+
+    def test_retry_context_is_only_active_inside_its_block(self):
+        assert RetryContext.current() is None
+
+        with RetryContext() as context:
+            assert RetryContext.current() is context
+            with RetryContext() as inner_context:
+                assert RetryContext.current() is inner_context
+            assert RetryContext.current() is context
+
+        assert RetryContext.current() is None
+
+    def test_call_timeouts_are_capped_to_the_deadline(self):
+        assert RetryContext.get_timeout_seconds(30) == 30
+
+        with RetryContext(timeout_seconds=10):
+            assert RetryContext.get_timeout_seconds(30) <= 10
+            assert RetryContext.get_timeout_seconds(5) == 5
+            assert RetryContext.get_timeout_seconds(None) <= 10
+
+        with RetryContext():
+            assert RetryContext.get_timeout_seconds(30) == 30
+
+    def test_retry_budget_cannot_be_negative(self):
+        with pytest.raises(ValueError):
+            RetryContext(retry_budget=-1)
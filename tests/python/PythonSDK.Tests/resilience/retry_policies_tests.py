@@ -0,0 +1,82 @@
+import asyncio
+import httpx
+import pytest
+from foundationallm.resilience import AsyncRetryTransport, RetryContext, RetryStrategy, RetryTransport
+
+class FakeEndpoint:
+    """
+    Returns the configured status codes in turn, then 200 responses.
+    """
+    def __init__(self, *status_codes: int, headers: dict = None):
+        self.status_codes = list(status_codes)
+        self.headers = headers or {}
+        self.requests = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.status_codes:
+            return httpx.Response(self.status_codes.pop(0), headers=self.headers, json={'error': 'failed'})
+        return httpx.Response(200, json={'result': 'ok'})
+
+@pytest.fixture
+def test_strategy():
+    return RetryStrategy('Test', max_retries=2, initial_delay_seconds=0.001, use_jitter=False)
+
+def send(strategy: RetryStrategy, endpoint: FakeEndpoint) -> httpx.Response:
+    with httpx.Client(transport=RetryTransport(strategy, httpx.MockTransport(endpoint))) as client:
+        return client.post('https://endpoint.openai.azure.com/chat/completions', json={})
+
+class RetryTransportTests:
+    """
+    RetryTransportTests is responsible for testing the retries of the requests sent by the OpenAI clients.
+    """
+
+    def test_throttled_requests_are_retried(self, test_strategy):
+        endpoint = FakeEndpoint(429, 503)
+
+        response = send(test_strategy, endpoint)
+
+        assert response.status_code == 200
+        assert endpoint.requests == 3
+
+    def test_last_response_is_returned_when_the_retries_are_exhausted(self, test_strategy):
+        endpoint = FakeEndpoint(429, 429, 429, 429)
+
+        response = send(test_strategy, endpoint)
+
+        assert response.status_code == 429
+        assert response.json() == {'error': 'failed'}
+        assert endpoint.requests == 3
+
+    def test_permanent_failures_are_not_retried(self, test_strategy):
+        endpoint = FakeEndpoint(400)
+
+        assert send(test_strategy, endpoint).status_code == 400
+        assert endpoint.requests == 1
+
+    def test_responses_that_must_not_be_retried_are_returned(self, test_strategy):
+        endpoint = FakeEndpoint(503, headers={'x-should-retry': 'false'})
+
+        assert send(test_strategy, endpoint).status_code == 503
+        assert endpoint.requests == 1
+
+    def test_retries_are_limited_by_the_retry_budget_of_the_operation(self, test_strategy):
+        endpoint = FakeEndpoint(429, 429)
+
+        with RetryContext(retry_budget=1):
+            response = send(test_strategy, endpoint)
+
+        assert response.status_code == 429
+        assert endpoint.requests == 2
+
+    def test_asynchronous_requests_are_retried(self, test_strategy):
+        endpoint = FakeEndpoint(503)
+
+        async def send_async():
+            async with httpx.AsyncClient(transport=AsyncRetryTransport(test_strategy, httpx.MockTransport(endpoint))) as client:
+                return await client.post('https://endpoint.openai.azure.com/chat/completions', json={})
+
+        response = asyncio.run(send_async())
+
+        assert response.status_code == 200
+        assert endpoint.requests == 2
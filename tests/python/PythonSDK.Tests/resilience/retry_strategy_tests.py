@@ -0,0 +1,103 @@
+from email.utils import formatdate
+import time
+import httpx
+import pytest
+from foundationallm.resilience import CircuitBreakerOpenException, RetryStrategy, RetryStrategyRegistry
+
+class FakeHttpError(Exception):
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+        self.response = httpx.Response(status_code, headers=headers or {})
+
+class FakeConfiguration:
+    def __init__(self, values: dict):
+        self.values = values
+
+    def get_value(self, key: str):
+        if key not in self.values:
+            raise Exception(f'The configuration variable {key} was not found.')
+        return self.values[key]
+
+@pytest.fixture
+def test_strategy():
+    return RetryStrategy('Test', max_retries=3, initial_delay_seconds=1, max_delay_seconds=5, use_jitter=False, max_retry_after_seconds=30)
+
+class RetryStrategyTests:
+    """
+    RetryStrategyTests is responsible for testing the classification of failures and the delays of the retry strategies.
+    """
+
+    @pytest.mark.parametrize('exception', [
+        FakeHttpError(429),
+        FakeHttpError(502),
+        FakeHttpError(503),
+        ConnectionError(),
+        TimeoutError(),
+        httpx.ConnectError('refused'),
+        httpx.ReadTimeout('timed out'),
+        httpx.RemoteProtocolError('disconnected')
+    ])
+    def test_transient_failures_are_retried(self, test_strategy, exception):
+        assert test_strategy.is_transient(exception)
+
+    @pytest.mark.parametrize('exception', [
+        FakeHttpError(400),
+        FakeHttpError(401),
+        FakeHttpError(500),
+        ValueError('invalid'),
+        CircuitBreakerOpenException('https://dependency', 10)
+    ])
+    def test_permanent_failures_are_not_retried(self, test_strategy, exception):
+        assert not test_strategy.is_transient(exception)
+
+    @pytest.mark.parametrize('exception, is_transient', [
+        (FakeHttpError(429), True),
+        (FakeHttpError(503), True),
+        (FakeHttpError(502), False),
+        (httpx.ConnectError('refused'), True),
+        (httpx.ReadTimeout('timed out'), False)
+    ])
+    def test_calls_that_are_not_idempotent_are_only_retried_when_not_processed(self, test_strategy, exception, is_transient):
+        assert test_strategy.is_transient(exception, idempotent=False) == is_transient
+
+    def test_delays_grow_exponentially_up_to_the_maximum(self, test_strategy):
+        assert [test_strategy.get_delay_seconds(retry) for retry in range(1, 5)] == [1, 2, 4, 5]
+
+    def test_jitter_keeps_delays_between_half_and_the_full_delay(self):
+        strategy = RetryStrategy('Test', initial_delay_seconds=4)
+
+        for _ in range(20):
+            assert 2 <= strategy.get_delay_seconds(1) <= 4
+
+    @pytest.mark.parametrize('headers, delay', [
+        ({'Retry-After': '3'}, 3),
+        ({'retry-after-ms': '2500'}, 2.5),
+        ({'x-ms-retry-after-ms': '4000'}, 4),
+        # A Retry-After shorter than the computed delay does not shorten it.
+        ({'Retry-After': '0'}, 1)
+    ])
+    def test_retry_after_replaces_a_shorter_delay(self, test_strategy, headers, delay):
+        assert test_strategy.get_delay_seconds(1, FakeHttpError(429, headers)) == pytest.approx(delay)
+
+    def test_retry_after_can_be_an_http_date(self, test_strategy):
+        exception = FakeHttpError(503, {'Retry-After': formatdate(time.time() + 10, usegmt=True)})
+
+        assert test_strategy.get_delay_seconds(1, exception) == pytest.approx(10, abs=1.5)
+
+    def test_retry_after_longer_than_the_maximum_is_not_waited_out(self, test_strategy):
+        assert test_strategy.get_delay_seconds(1, FakeHttpError(429, {'Retry-After': '120'})) is None
+
+    def test_registry_resolves_configured_and_unknown_strategies(self, monkeypatch):
+        monkeypatch.setattr(RetryStrategyRegistry, '_RetryStrategyRegistry__strategies',
+            dict(RetryStrategyRegistry._RetryStrategyRegistry__strategies))
+        RetryStrategyRegistry.configure(FakeConfiguration({
+            'FoundationaLLM:APIEndpoints:LangChainAPI:Configuration:Retry:Strategies':
+                '{"Interactive": {"max_retries": 2}, "Invalid": {"max_retries": -1}}'
+        }))
+
+        assert RetryStrategyRegistry.get_strategy('Interactive').max_retries == 2
+        assert RetryStrategyRegistry.get_strategy('Invalid').name == 'ExponentialBackoff'
+        assert RetryStrategyRegistry.get_strategy('Unknown').name == 'ExponentialBackoff'
+        assert RetryStrategyRegistry.get_strategy(None).name == 'ExponentialBackoff'
+        assert RetryStrategyRegistry.get_strategy('NoRetry').max_retries == 0
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+import pytest
+from foundationallm.models.resource_providers.configuration import APIEndpointConfiguration
+from foundationallm.resilience import RetryContext
+from foundationallm.services.gateway_text_embedding import GatewayTextEmbeddingService, TextEmbeddingCache
+from foundationallm.services.gateway_text_embedding.text_embedding_response import TextEmbeddingResponse
+
+class FakeConfiguration:
+    def get_value(self, key: str) -> str:
+        if key == 'FoundationaLLM:APIEndpoints:GatewayAPI:APIKey':
+            return 'key'
+        raise Exception(f'The configuration value {key} is not set.')
+
+class FakeGatewayAPI:
+    """
+    Completes the embedding operations after the configured number of polls, returning the text chunks
+    in reverse order. The embedding of a text is [length of the text].
+    """
+    def __init__(self, missing_positions: set = None, polls_until_completed: int = 0):
+        self.base_url = 'https://gateway-api'
+        self.missing_positions = missing_positions or set()
+        self.polls_until_completed = polls_until_completed
+        self.requests = []
+        self.polls = []
+        self.operations = {}
+
+    def post(self, endpoint: str, data = None, idempotent: bool = False) -> dict:
+        text_chunks = json.loads(data)['text_chunks']
+        self.requests.append([text_chunk['content'] for text_chunk in text_chunks])
+        operation_id = f'operation-{len(self.requests)}'
+        self.operations[operation_id] = {
+            'in_progress': False,
+            'operation_id': operation_id,
+            'text_chunks': [
+                {'position': text_chunk['position'], 'embedding': [len(text_chunk['content'])], 'tokens_count': 1}
+                for text_chunk in reversed(text_chunks)
+                if text_chunk['position'] not in self.missing_positions
+            ]
+        }
+        return self.get_operation(operation_id)
+
+    def get(self, endpoint: str) -> dict:
+        self.polls.append(endpoint)
+        return self.get_operation(endpoint.split('operationId=')[1])
+
+    async def post_async(self, endpoint: str, data = None, idempotent: bool = False) -> dict:
+        return self.post(endpoint, data, idempotent)
+
+    async def get_async(self, endpoint: str) -> dict:
+        return self.get(endpoint)
+
+    def get_operation(self, operation_id: str) -> dict:
+        if len(self.polls) < self.polls_until_completed:
+            return {'in_progress': True, 'operation_id': operation_id}
+        return self.operations[operation_id]
+
+@pytest.fixture
+def test_gateway_api():
+    return FakeGatewayAPI()
+
+@pytest.fixture
+def test_service(test_gateway_api, monkeypatch):
+    monkeypatch.setattr(GatewayTextEmbeddingService, 'max_batch_size', 2)
+    monkeypatch.setattr(GatewayTextEmbeddingService, 'batcher', None)
+    endpoint_configuration = APIEndpointConfiguration(
+        name='GatewayAPI',
+        category='General',
+        authentication_type='APIKey',
+        url='https://gateway-api',
+        authentication_parameters={
+            'api_key_configuration_name': 'FoundationaLLM:APIEndpoints:GatewayAPI:APIKey',
+            'api_key_header_name': 'X-API-KEY'
+        },
+        retry_strategy_name='ExponentialBackoff')
+    service = GatewayTextEmbeddingService('instance', None, endpoint_configuration, 'ada', FakeConfiguration(), TextEmbeddingCache())
+    service.http_client = test_gateway_api
+    return service
+
+def get_values(embeddings) -> list:
+    return [embedding.embedding_vector[0] for embedding in embeddings]
+
+class GatewayTextEmbeddingServiceTests:
+    """
+    GatewayTextEmbeddingServiceTests is responsible for testing the batched embedding operations of the Gateway API.
+    """
+
+    def test_embeddings_are_matched_to_texts_by_position(self, test_service, test_gateway_api):
+        embeddings = test_service.get_embeddings(['a', 'bb', 'ccc'])
+
+        assert get_values(embeddings) == [1, 2, 3]
+        assert test_gateway_api.requests == [['a', 'bb'], ['ccc']]
+
+    def test_asynchronous_embeddings_are_matched_to_texts_by_position(self, test_service, test_gateway_api):
+        embeddings = asyncio.run(test_service.aget_embeddings(['a', 'bb', 'ccc']))
+
+        assert get_values(embeddings) == [1, 2, 3]
+        assert test_gateway_api.requests == [['a', 'bb'], ['ccc']]
+
+    def test_duplicate_and_cached_texts_are_not_sent(self, test_service, test_gateway_api):
+        test_service.get_embeddings(['a'])
+
+        embeddings = test_service.get_embeddings(['bb', 'a', 'bb'])
+
+        assert get_values(embeddings) == [2, 1, 2]
+        assert test_gateway_api.requests == [['a'], ['bb']]
+
+    def test_missing_position_raises(self, test_service, test_gateway_api):
+        test_gateway_api.missing_positions = {2}
+
+        with pytest.raises(Exception, match='position 2'):
+            test_service.get_embeddings(['a', 'bb'])
+        assert test_service.cache.get('ada', 'a') is None
+
+    def test_operations_are_polled_with_a_growing_delay(self, test_service, test_gateway_api, monkeypatch):
+        monkeypatch.setattr(GatewayTextEmbeddingService, 'polling_initial_delay_seconds', 0.05)
+        monkeypatch.setattr(GatewayTextEmbeddingService, 'polling_max_delay_seconds', 0.2)
+        test_gateway_api.polls_until_completed = 5
+        delays = []
+        monkeypatch.setattr(time, 'sleep', delays.append)
+
+        embeddings = test_service.get_embeddings(['a'])
+
+        assert get_values(embeddings) == [1]
+        assert test_gateway_api.polls == ['/instances/instance/embeddings?operationId=operation-1'] * 5
+        assert delays == pytest.approx([0.05, 0.1, 0.2, 0.2, 0.2])
+
+    def test_asynchronous_operations_are_polled_until_completed(self, test_service, test_gateway_api, monkeypatch):
+        monkeypatch.setattr(GatewayTextEmbeddingService, 'polling_initial_delay_seconds', 0.001)
+        test_gateway_api.polls_until_completed = 3
+
+        embeddings = asyncio.run(test_service.aget_embeddings(['a', 'bb']))
+
+        assert get_values(embeddings) == [1, 2]
+        assert len(test_gateway_api.polls) == 3
+
+    def test_operations_not_completed_by_their_deadline_raise(self, test_service, test_gateway_api, monkeypatch):
+        monkeypatch.setattr(GatewayTextEmbeddingService, 'polling_initial_delay_seconds', 0.01)
+        monkeypatch.setattr(GatewayTextEmbeddingService, 'operation_timeout_seconds', 0.1)
+        test_gateway_api.polls_until_completed = 1000
+        start = time.monotonic()
+
+        with pytest.raises(TimeoutError, match='operation-1'):
+            test_service.get_embeddings(['a'])
+        with pytest.raises(TimeoutError, match='operation-2'):
+            asyncio.run(test_service.aget_embeddings(['bb']))
+
+        assert time.monotonic() - start < 1
+        assert test_service.cache.get('ada', 'a') is None
+
+    def test_operation_deadline_is_capped_to_the_deadline_of_the_current_operation(self, test_service, test_gateway_api, monkeypatch):
+        monkeypatch.setattr(GatewayTextEmbeddingService, 'polling_initial_delay_seconds', 0.01)
+        test_gateway_api.polls_until_completed = 1000
+        start = time.monotonic()
+
+        with RetryContext(timeout_seconds=0.1):
+            with pytest.raises(TimeoutError):
+                test_service.get_embeddings(['a'])
+
+        assert time.monotonic() - start < 1
+
+    def test_polling_delay_does_not_overrun_the_deadline(self, test_service, monkeypatch):
+        monkeypatch.setattr(GatewayTextEmbeddingService, 'polling_initial_delay_seconds', 1.0)
+        response = TextEmbeddingResponse(operation_id='operation-1', in_progress=True)
+
+        assert test_service._get_polling_delay(0, response, time.monotonic() + 0.5) <= 0.5
+        assert test_service._get_polling_delay(0, response, time.monotonic() + 5) == 1.0
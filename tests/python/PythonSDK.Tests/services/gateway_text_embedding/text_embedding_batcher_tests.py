@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from foundationallm.models.services import GatewayTextEmbeddingResponse
+from foundationallm.resilience import RetryContext
+from foundationallm.services.gateway_text_embedding import TextEmbeddingBatcher
+
+class FakeHttpClient:
+    base_url = 'https://gateway-api'
+
+class FakeTextEmbeddingService:
+    """
+    Records the batched operations and their retry contexts; the embedding of a text is [length of the text].
+    """
+    def __init__(self, error: Exception = None, delay_seconds: float = 0):
+        self.http_client = FakeHttpClient()
+        self.url = '/instances/instance/embeddings'
+        self.model_name = 'ada'
+        self.error = error
+        self.delay_seconds = delay_seconds
+        self.operations = []
+        self.retry_contexts = []
+
+    async def _arun_operation(self, texts):
+        self.operations.append(texts)
+        self.retry_contexts.append(RetryContext.current())
+        await asyncio.sleep(self.delay_seconds)
+        if self.error is not None:
+            raise self.error
+        return [GatewayTextEmbeddingResponse(embedding_vector=[len(text)], tokens_count=1) for text in texts]
+
+async def get_embeddings(batcher: TextEmbeddingBatcher, service: FakeTextEmbeddingService, texts) -> list:
+    embeddings = await asyncio.gather(*[batcher.aget_embedding(service, text) for text in texts], return_exceptions=True)
+    return [embedding if isinstance(embedding, Exception) else embedding.embedding_vector[0] for embedding in embeddings]
+
+class TextEmbeddingBatcherTests:
+    """
+    TextEmbeddingBatcherTests is responsible for testing the micro-batching of concurrent embedding requests.
+    """
+
+    def test_concurrent_texts_are_sent_in_one_operation(self):
+        service = FakeTextEmbeddingService()
+
+        embeddings = asyncio.run(get_embeddings(TextEmbeddingBatcher(10, 0.01), service, ['a', 'bb', 'a', 'ccc']))
+
+        assert embeddings == [1, 2, 1, 3]
+        assert service.operations == [['a', 'bb', 'ccc']]
+
+    def test_full_batch_is_sent_without_waiting(self):
+        service = FakeTextEmbeddingService()
+
+        embeddings = asyncio.run(get_embeddings(TextEmbeddingBatcher(2, 0.01), service, ['a', 'bb', 'ccc']))
+
+        assert embeddings == [1, 2, 3]
+        assert service.operations == [['a', 'bb'], ['ccc']]
+
+    def test_failed_operation_fails_all_the_callers(self):
+        error = ValueError('The Gateway API is unavailable.')
+        service = FakeTextEmbeddingService(error)
+
+        embeddings = asyncio.run(get_embeddings(TextEmbeddingBatcher(10, 0.01), service, ['a', 'bb', 'a']))
+
+        assert embeddings == [error, error, error]
+        assert len(service.operations) == 1
+
+    def test_cancelled_caller_does_not_fail_the_batch(self):
+        service = FakeTextEmbeddingService()
+
+        async def run():
+            batcher = TextEmbeddingBatcher(10, 0.01)
+            cancelled = asyncio.ensure_future(batcher.aget_embedding(service, 'a'))
+            embedding = asyncio.ensure_future(batcher.aget_embedding(service, 'bb'))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            return (await embedding).embedding_vector[0], cancelled.cancelled()
+
+        assert asyncio.run(run()) == (2, True)
+
+    def test_operations_do_not_run_in_the_retry_context_of_a_caller(self):
+        service = FakeTextEmbeddingService()
+
+        async def run():
+            batcher = TextEmbeddingBatcher(2, 0.01)
+            with RetryContext(retry_budget=0, timeout_seconds=10):
+                # The second text fills the batch, which is sent from the context of its caller.
+                return await get_embeddings(batcher, service, ['a', 'bb'])
+
+        assert asyncio.run(run()) == [1, 2]
+        assert service.retry_contexts == [None]
+
+    def test_callers_only_wait_until_their_own_deadline(self):
+        service = FakeTextEmbeddingService(delay_seconds=0.2)
+
+        async def get_embedding_with_deadline(batcher: TextEmbeddingBatcher):
+            with RetryContext(timeout_seconds=0.05):
+                return await batcher.aget_embedding(service, 'a')
+
+        async def run():
+            batcher = TextEmbeddingBatcher(10, 0.01)
+            return await asyncio.gather(
+                get_embedding_with_deadline(batcher),
+                batcher.aget_embedding(service, 'bb'),
+                return_exceptions=True)
+
+        timed_out, embedding = asyncio.run(run())
+
+        assert isinstance(timed_out, asyncio.TimeoutError)
+        assert embedding.embedding_vector[0] == 2
+        assert service.operations == [['a', 'bb']]
+
+    def test_max_batch_size_must_be_positive(self):
+        with pytest.raises(ValueError):
+            TextEmbeddingBatcher(0, 0.01)
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import time
+import pytest
+from foundationallm.models.services import GatewayTextEmbeddingResponse
+from foundationallm.services.gateway_text_embedding import TextEmbeddingCache
+from foundationallm.services.gateway_text_embedding.text_embedding_cache import BYTES_PER_DIMENSION, BYTES_PER_ENTRY
+
+DIMENSIONS = 128
+ENTRY_SIZE_BYTES = DIMENSIONS * BYTES_PER_DIMENSION + BYTES_PER_ENTRY
+
+def get_embedding(value: float) -> GatewayTextEmbeddingResponse:
+    return GatewayTextEmbeddingResponse(embedding_vector=[value] * DIMENSIONS, tokens_count=3)
+
+def get_cached_texts(cache: TextEmbeddingCache, texts) -> list:
+    return [text for text, embedding in cache.get_many('ada', texts).items() if embedding is not None]
+
+class TextEmbeddingCacheTests:
+    """
+    TextEmbeddingCacheTests is responsible for testing the memory and disk tiers of the embedding cache.
+    """
+
+    def test_texts_are_normalized(self):
+        cache = TextEmbeddingCache()
+        cache.set('ada', 'hello  world', get_embedding(1.0))
+
+        assert cache.get('ada', ' hello\nworld ') is not None
+        assert cache.get('other-model', 'hello world') is None
+
+    def test_expired_embeddings_are_not_returned(self):
+        cache = TextEmbeddingCache(time_to_live_seconds=0)
+        cache.set('ada', 'a', get_embedding(1.0))
+
+        assert cache.get('ada', 'a') is None
+        assert cache.size_bytes == 0
+
+    def test_least_recently_used_embeddings_are_evicted(self):
+        cache = TextEmbeddingCache(max_size_megabytes=3 * ENTRY_SIZE_BYTES / (1024 * 1024))
+        cache.set_many('ada', {'a': get_embedding(1.0), 'b': get_embedding(2.0), 'c': get_embedding(3.0)})
+        cache.get('ada', 'a')
+
+        cache.set('ada', 'd', get_embedding(4.0))
+
+        assert get_cached_texts(cache, ['a', 'b', 'c', 'd']) == ['a', 'c', 'd']
+        assert cache.size_bytes == 3 * ENTRY_SIZE_BYTES
+
+    def test_embeddings_are_read_back_from_disk(self, tmp_path):
+        TextEmbeddingCache(directory=str(tmp_path)).set('ada', 'a', get_embedding(0.5))
+
+        embedding = TextEmbeddingCache(directory=str(tmp_path)).get('ada', 'a')
+
+        assert embedding.embedding_vector.tolist() == [0.5] * DIMENSIONS
+        assert embedding.tokens_count == 3
+
+    def test_sweep_removes_expired_and_oldest_files(self, tmp_path):
+        cache = TextEmbeddingCache(directory=str(tmp_path), time_to_live_seconds=3600)
+        cache.set_many('ada', {'a': get_embedding(1.0), 'b': get_embedding(2.0), 'c': get_embedding(3.0)})
+        cache.clear()
+        paths = sorted(os.path.join(tmp_path, name) for name in os.listdir(tmp_path))
+        stale_temporary_path = os.path.join(tmp_path, 'partial.json.1.1.tmp')
+        open(stale_temporary_path, 'w', encoding='utf-8').close()
+        now = time.time()
+        os.utime(paths[0], (now - 7200, now - 7200))
+        os.utime(paths[1], (now - 60, now - 60))
+        os.utime(stale_temporary_path, (now - 600, now - 600))
+
+        cache.max_disk_size_bytes = os.path.getsize(paths[2])
+        cache.sweep_directory()
+
+        assert os.listdir(tmp_path) == [os.path.basename(paths[2])]
+
+    def test_asynchronous_methods_use_both_tiers(self, tmp_path):
+        async def run():
+            await TextEmbeddingCache(directory=str(tmp_path)).aset_many('ada', {'a': get_embedding(1.0), 'b': get_embedding(2.0)})
+            cache = TextEmbeddingCache(directory=str(tmp_path))
+            embeddings = await cache.aget_many('ada', ['a', 'b', 'c'])
+            return {text: embedding.embedding_vector[0] if embedding else None for text, embedding in embeddings.items()}, cache.size_bytes
+
+        embeddings, size_bytes = asyncio.run(run())
+
+        assert embeddings == {'a': pytest.approx(1.0), 'b': pytest.approx(2.0), 'c': None}
+        assert size_bytes == 2 * ENTRY_SIZE_BYTES
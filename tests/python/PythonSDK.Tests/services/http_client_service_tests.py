@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from foundationallm.models.resource_providers.configuration import APIEndpointConfiguration
+from foundationallm.services import HttpClientService
+
+class FakeConfiguration:
+    def get_value(self, key: str) -> str:
+        if key == 'FoundationaLLM:APIEndpoints:TestAPI:APIKey':
+            return 'key'
+        raise Exception(f'The configuration value {key} is not set.')
+
+class CookieHandler(BaseHTTPRequestHandler):
+    """
+    Sets a session cookie on every response and echoes the cookies and client port of the request.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_echo()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_echo()
+
+    def send_echo(self):
+        body = json.dumps({
+            'cookie': self.headers.get('Cookie'),
+            'client_port': self.client_address[1]
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Set-Cookie', 'session=user-a; Path=/')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def test_server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CookieHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def test_services(test_server_url):
+    """
+    Creates HTTP client services for two API endpoints sharing the base URL of the test server.
+    """
+    def get_service(path: str) -> HttpClientService:
+        endpoint_configuration = APIEndpointConfiguration(
+            name='TestAPI',
+            category='General',
+            authentication_type='APIKey',
+            url=f'{test_server_url}{path}',
+            authentication_parameters={
+                'api_key_configuration_name': 'FoundationaLLM:APIEndpoints:TestAPI:APIKey',
+                'api_key_header_name': 'X-API-KEY'
+            },
+            retry_strategy_name='ExponentialBackoff')
+        return HttpClientService(endpoint_configuration, None, FakeConfiguration())
+
+    HttpClientService.configure(FakeConfiguration())
+    yield get_service('/first'), get_service('/second')
+    asyncio.run(HttpClientService.close_sessions_async())
+
+class HttpClientServiceTests:
+    """
+    HttpClientServiceTests is responsible for testing the pooled sessions shared by the HTTP client services.
+    """
+
+    def test_services_of_a_base_url_share_one_pooled_connection(self, test_services):
+        first, second = test_services
+
+        responses = [first.get('/echo'), second.get('/echo'), first.post('/echo', data='{}')]
+
+        assert len({response['client_port'] for response in responses}) == 1
+
+    def test_sessions_do_not_send_cookies_set_for_previous_requests(self, test_services):
+        first, second = test_services
+
+        responses = [first.get('/echo'), second.get('/echo'), first.post('/echo', data='{}')]
+
+        assert [response['cookie'] for response in responses] == [None, None, None]
+
+    def test_asynchronous_services_share_one_pooled_connection_without_cookies(self, test_services):
+        first, second = test_services
+
+        async def send_requests():
+            responses = [await first.get_async('/echo'), await second.get_async('/echo')]
+            responses.append(await first.post_async('/echo', data='{}'))
+            return responses
+
+        responses = asyncio.run(send_requests())
+
+        assert len({response['client_port'] for response in responses}) == 1
+        assert [response['cookie'] for response in responses] == [None, None, None]
+
+    def test_asynchronous_sessions_are_not_shared_across_event_loops(self, test_services):
+        first, _ = test_services
+
+        # Each asyncio.run() uses a new event loop; the session of a closed loop is replaced.
+        assert asyncio.run(first.get_async('/echo'))['cookie'] is None
+        assert asyncio.run(first.get_async('/echo'))['cookie'] is None